@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Compare Apify collection cycles with and without multi-term query batching.
+Every Apify collector appends one line per cycle to data/apify_cycle_metrics.jsonl (runs, items,
+compute units, USD cost, wall time). Run some cycles with APIFY_BATCH_QUERIES=false and some with
+the default (true); this script reports the per-collector medians of each mode side by side.
+
+Run with: python scripts/apify_cycle_report.py [--file data/apify_cycle_metrics.jsonl] [--collector twitter] [--last 20]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# Add parent directory to path for consistency with the other scripts
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+parser = argparse.ArgumentParser(description="Report Apify cycle wall time and compute units, batched vs unbatched")
+parser.add_argument("--file", default=str(Path(__file__).parent.parent / "data" / "apify_cycle_metrics.jsonl"))
+parser.add_argument("--collector", help="Only report this collector (twitter, facebook, instagram, tiktok, news)")
+parser.add_argument("--last", type=int, default=20, help="Cycles per collector and mode to include (most recent)")
+args = parser.parse_args()
+
+COLUMNS = ["runs", "items", "wall_secs", "compute_units", "usage_usd"]
+
+
+def load_cycles(path: Path):
+    cycles = defaultdict(list)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if args.collector and entry.get('collector') != args.collector:
+                continue
+            cycles[(entry.get('collector'), bool(entry.get('batched')))].append(entry)
+    return cycles
+
+
+def median(entries, key):
+    return statistics.median(entry.get(key, 0) or 0 for entry in entries)
+
+
+def main():
+    path = Path(args.file)
+    if not path.exists():
+        print(f"No cycle metrics in {path}; run the Apify collectors first")
+        return
+    cycles = load_cycles(path)
+
+    print(f"\n{'Collector':<12}{'Mode':<11}{'Cycles':>7}" + ''.join(f"{column:>15}" for column in COLUMNS)
+          + f"{'CU/100 items':>15}")
+    for collector in sorted({collector for collector, _ in cycles}):
+        medians = {}
+        for batched in (False, True):
+            entries = cycles.get((collector, batched), [])[-args.last:]
+            if not entries:
+                continue
+            medians[batched] = {column: median(entries, column) for column in COLUMNS}
+            items = medians[batched]['items']
+            per_100 = 100 * medians[batched]['compute_units'] / items if items else 0
+            print(f"{collector:<12}{'batched' if batched else 'per-query':<11}{len(entries):>7}"
+                  + ''.join(f"{medians[batched][column]:>15.4g}" for column in COLUMNS) + f"{per_100:>15.4g}")
+        if len(medians) == 2:
+            changes = []
+            for column in ('runs', 'wall_secs', 'compute_units'):
+                before, after = medians[False][column], medians[True][column]
+                if before:
+                    changes.append(f"{column} {100 * (after - before) / before:+.0f}%")
+            print(f"{'':<12}{'change':<11}{'':>7}  " + ', '.join(changes))
+
+
+if __name__ == "__main__":
+    main()
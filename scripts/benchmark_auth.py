@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request authentication overhead: two independent JWT verifications
+(middleware + get_current_user_id, before) vs the shared verified-token cache with the
+user id passed on request.state (after).
+Reports per-call cost of the auth paths and p50/p95 of a full ASGI round trip through
+UsageTrackingMiddleware and an authenticated endpoint.
+
+Run with: python scripts/benchmark_auth.py [--requests 5000] [--users 50]
+Uses a random HS256 secret and a throwaway SQLite file; no external services are needed.
+The users and user_system_usage tables are dropped and recreated, so a --database-url other than
+SQLite is refused unless --drop-existing is passed as well.
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+parser = argparse.ArgumentParser(description="Benchmark per-request authentication overhead")
+parser.add_argument("--requests", type=int, default=5000)
+parser.add_argument("--users", type=int, default=50)
+parser.add_argument("--database-url", default=None, help="Defaults to a throwaway SQLite file")
+parser.add_argument("--drop-existing", action="store_true",
+                    help="Allow a non-SQLite --database-url; its users and user_system_usage tables are dropped")
+args = parser.parse_args()
+
+if args.database_url and not args.database_url.startswith("sqlite") and not args.drop_existing:
+    parser.error("--database-url is not SQLite; the benchmark drops and recreates the users and "
+                 "user_system_usage tables there, pass --drop-existing to confirm")
+
+# Configure the app modules before importing them; never the DATABASE_URL the shell exports
+os.environ["SUPABASE_JWT_SECRET"] = secrets.token_urlsafe(32)
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+
+# Add parent directory to path to import models
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import Depends, FastAPI
+from jose import jwt
+from sqlalchemy import insert
+from sqlalchemy.schema import CreateTable, CreateIndex
+
+from src.api import auth, database
+from src.api.models import User, UserSystemUsage
+from src.api.auth import get_current_user_id, token_cache, verify_token
+from src.api.middlewares import UsageTrackingMiddleware
+from src.api.usage_sink import usage_sink
+
+
+def setup_database(user_ids):
+    """Create the tables the usage sink writes to and the benchmark users."""
+    with database.engine.begin() as conn:
+        for table in [User.__table__, UserSystemUsage.__table__]:
+            table.drop(conn, checkfirst=True)
+            conn.execute(CreateTable(table))
+            for index in {index.name: index for index in table.indexes}.values():
+                conn.execute(CreateIndex(index))
+        conn.execute(insert(User.__table__), [
+            {"id": user_id, "email": f"bench-{i}@example.com", "api_calls_count": 0}
+            for i, user_id in enumerate(user_ids)
+        ])
+
+
+def make_tokens(user_ids):
+    expires = int(time.time()) + 3600
+    return [jwt.encode({"sub": str(user_id), "exp": expires, "role": "authenticated"},
+                       auth.SECRET_KEY, algorithm=auth.ALGORITHM) for user_id in user_ids]
+
+
+def decode_uncached(token: str):
+    return jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM], options={"verify_aud": False})
+
+
+def time_per_call(fn, tokens, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(tokens[i % len(tokens)])
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def asgi_round_trips(app, tokens, count: int):
+    """Send GET /whoami straight to the ASGI app and return per-request latencies in microseconds."""
+    latencies = []
+    statuses = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses[message["status"]] = statuses.get(message["status"], 0) + 1
+
+    for i in range(count):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/whoami", "raw_path": b"/whoami", "root_path": "", "query_string": b"",
+            "headers": [(b"authorization", f"Bearer {tokens[i % len(tokens)]}".encode())],
+            "client": ("127.0.0.1", 1234), "server": ("127.0.0.1", 8000)
+        }
+        start = time.perf_counter()
+        await app(scope, receive, send)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    if set(statuses) != {200}:
+        raise RuntimeError(f"Unexpected response statuses: {statuses}")
+    return latencies
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    user_ids = [uuid.uuid4() for _ in range(args.users)]
+    setup_database(user_ids)
+    tokens = make_tokens(user_ids)
+
+    before = time_per_call(lambda token: (decode_uncached(token), decode_uncached(token)), tokens, args.requests)
+    token_cache.clear()
+    after = time_per_call(verify_token, tokens, args.requests)
+    print(f"Auth per request, 2 uncached decodes (before): {before:8.1f} us")
+    print(f"Auth per request, shared cache (after):        {after:8.1f} us "
+          f"({token_cache.hits} hits, {token_cache.misses} misses)")
+
+    app = FastAPI()
+    app.add_middleware(UsageTrackingMiddleware)
+
+    @app.get("/whoami")
+    async def whoami(user_id: uuid.UUID = Depends(get_current_user_id)):
+        return {"user_id": str(user_id)}
+
+    for label, max_entries in [("no token cache", 0), ("token cache", auth.TOKEN_CACHE_MAX_ENTRIES)]:
+        token_cache.clear()
+        token_cache.max_entries = max_entries
+        latencies = asyncio.run(asgi_round_trips(app, tokens, args.requests))
+        print(f"ASGI round trip, {label:15s} p50 {statistics.median(latencies):8.1f} us   "
+              f"p95 {percentile(latencies, 0.95):8.1f} us")
+
+    usage_sink.stop()
+    print(f"Usage rows written by the sink: {usage_sink.written:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark analysis write-back: legacy per-record ORM path vs BulkResultWriter.
+Reports statement round trips and wall-clock time per 1k records.
+
+Run with: python scripts/benchmark_bulk_result_writer.py [--records 1000] [--database-url URL]
+Defaults to a throwaway SQLite file; pass a PostgreSQL URL to measure the UPDATE ... FROM (VALUES ...) path.
+The benchmark tables are dropped and recreated there, so a database where they hold data is refused
+unless --drop-existing is passed.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Keep the app's engine off the real database while importing models
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{Path(tempfile.mkdtemp()) / 'app.db'}")
+
+# Add parent directory to path to import models
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, event, update, delete
+from sqlalchemy.orm import sessionmaker
+
+from benchmark_db import create_schema
+from src.api.models import SentimentData, SentimentEmbedding
+from src.utils.bulk_result_writer import BulkResultWriter
+
+
+def fake_result(rng: random.Random) -> dict:
+    """Build a combined analysis result shaped like DataProcessor.batch_get_sentiment output."""
+    return {
+        'sentiment_label': rng.choice(['positive', 'negative', 'neutral']),
+        'sentiment_score': rng.uniform(-1, 1),
+        'sentiment_justification': 'Benchmark justification ' * 5,
+        'issue_label': 'Fuel Subsidy',
+        'issue_slug': 'fuel-subsidy',
+        'issue_confidence': rng.uniform(0, 1),
+        'issue_keywords': ['fuel', 'subsidy'],
+        'ministry_hint': 'petroleum_resources',
+        'embedding': [rng.uniform(-1, 1) for _ in range(1536)],
+    }
+
+
+def seed(Session, count: int) -> list:
+    """Insert unanalyzed rows and return their entry_ids."""
+    with Session() as db:
+        mappings = [{
+            'run_timestamp': datetime.utcnow(),
+            'text': f'Benchmark post {i} about fuel subsidy reform',
+            'platform': 'twitter',
+        } for i in range(count)]
+        db.bulk_insert_mappings(SentimentData, mappings, return_defaults=True)
+        db.commit()
+        return [m['entry_id'] for m in mappings]
+
+
+def reset(Session):
+    """Clear analysis results between runs."""
+    with Session() as db:
+        db.execute(delete(SentimentEmbedding))
+        db.execute(update(SentimentData).values(sentiment_label=None, issue_slug=None))
+        db.commit()
+
+
+def run_legacy(Session, entry_ids: list, results: list):
+    """Per-record attribute updates plus an existence query and insert per embedding (pre-BulkResultWriter path)."""
+    with Session() as db:
+        records = db.query(SentimentData).filter(SentimentData.entry_id.in_(entry_ids)).all()
+        by_id = {record.entry_id: record for record in records}
+        for entry_id, result in zip(entry_ids, results):
+            record = by_id[entry_id]
+            record.sentiment_label = result['sentiment_label']
+            record.sentiment_score = result['sentiment_score']
+            record.sentiment_justification = result['sentiment_justification']
+            record.issue_label = result.get('issue_label')
+            record.issue_slug = result.get('issue_slug')
+            record.issue_confidence = result.get('issue_confidence')
+            record.issue_keywords = json.dumps(result.get('issue_keywords', []))
+            record.ministry_hint = result.get('ministry_hint')
+            existing = db.query(SentimentEmbedding).filter(SentimentEmbedding.entry_id == entry_id).first()
+            if existing:
+                existing.embedding = json.dumps(result['embedding'])
+            else:
+                db.add(SentimentEmbedding(entry_id=entry_id, embedding=json.dumps(result['embedding']),
+                                          embedding_model='text-embedding-3-small'))
+        db.commit()
+
+
+def run_bulk(Session, entry_ids: list, results: list):
+    """BulkResultWriter path: one UPDATE + one upsert, committed once."""
+    with Session() as db:
+        writer = BulkResultWriter(db)
+        for entry_id, result in zip(entry_ids, results):
+            writer.add(entry_id, result)
+        writer.flush()
+        db.commit()
+
+
+def measure(name, func, engine, Session, entry_ids, results, batch_size):
+    """Run func over entry_ids in batches and return (round_trips, seconds)."""
+    counter = {'statements': 0}
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        counter['statements'] += 1
+
+    reset(Session)
+    event.listen(engine, "before_cursor_execute", count_statement)
+    start = time.perf_counter()
+    for i in range(0, len(entry_ids), batch_size):
+        func(Session, entry_ids[i:i + batch_size], results[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+    event.remove(engine, "before_cursor_execute", count_statement)
+    return counter['statements'], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysis result write-back")
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=150, help="Matches parallel_processing.sentiment_batch_size")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--drop-existing", action="store_true",
+                        help="Drop the benchmark tables on --database-url even if they hold data")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+    engine = create_engine(database_url)
+    create_schema(engine, [SentimentData.__table__, SentimentEmbedding.__table__], args.drop_existing)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    rng = random.Random(42)
+    entry_ids = seed(Session, args.records)
+    results = [fake_result(rng) for _ in entry_ids]
+
+    per_k = 1000 / args.records
+    print(f"Database: {engine.dialect.name} | Records: {args.records} | Batch size: {args.batch_size}\n")
+    print(f"{'Path':<22}{'Round trips':>14}{'per 1k':>10}{'Seconds':>12}{'s per 1k':>12}")
+    for name, func in (("legacy per-record ORM", run_legacy), ("BulkResultWriter", run_bulk)):
+        trips, seconds = measure(name, func, engine, Session, entry_ids, results, args.batch_size)
+        print(f"{name:<22}{trips:>14}{trips * per_k:>10.0f}{seconds:>12.3f}{seconds * per_k:>12.3f}")
+
+    print("\nRound trips count cursor executions; an executemany counts once.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Schema setup shared by the benchmark and load-test scripts.
+Tables are dropped and recreated, so a target database where any of them holds rows is refused
+unless the caller opts in.
+"""
+
+import sys
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateTable, CreateIndex
+
+
+def populated_tables(conn, tables) -> List[str]:
+    """Names of the given tables that already exist on the target database and hold rows."""
+    existing = set(inspect(conn).get_table_names())
+    quote = conn.dialect.identifier_preparer.quote
+    return [table.name for table in tables if table.name in existing
+            and conn.execute(text(f"SELECT 1 FROM {quote(table.name)} LIMIT 1")).first() is not None]
+
+
+def create_schema(engine, tables: list, drop_existing: bool = False):
+    """
+    Drop and recreate tables (in dependency order) with each index once (models declare some indexes twice).
+
+    Exits when one of the tables already holds rows, unless drop_existing is set.
+    """
+    with engine.begin() as conn:
+        populated = populated_tables(conn, tables)
+        if populated and not drop_existing:
+            sys.exit(f"Refusing to drop tables that hold data: {', '.join(populated)}. "
+                     "Point --database-url at a scratch database or pass --drop-existing.")
+        for table in reversed(tables):
+            table.drop(conn, checkfirst=True)
+        for table in tables:
+            conn.execute(CreateTable(table, include_foreign_key_constraints=[]))
+            for index in {index.name: index for index in table.indexes}.values():
+                conn.execute(CreateIndex(index))
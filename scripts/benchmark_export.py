@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming export used by /data/export.
+Exports increasing row counts and reports throughput, output size and peak Python memory
+(traced in a separate run), which should stay flat as the row count grows.
+
+Run with: python scripts/benchmark_export.py [--records 1000000] [--format ndjson|csv] [--no-gzip]
+Uses a throwaway SQLite file; pass --database-url to benchmark against PostgreSQL. sentiment_data is
+dropped and recreated there, so a database where it holds data is refused unless --drop-existing
+is passed.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Point the app's engine at the benchmark database before importing it
+parser = argparse.ArgumentParser(description="Benchmark streaming export")
+parser.add_argument("--records", type=int, default=1000000)
+parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+parser.add_argument("--no-gzip", action="store_true")
+parser.add_argument("--database-url", default=None)
+parser.add_argument("--drop-existing", action="store_true",
+                    help="Drop sentiment_data on --database-url even if it holds data")
+args = parser.parse_args()
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+
+# Add parent directory to path to import models
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert
+
+from benchmark_db import create_schema
+from src.api import database
+from src.api.models import SentimentData
+from src.api.data_query import DataFilters, parse_fields, iter_export_chunks, gzip_chunks
+
+
+def seed(user_id: uuid.UUID, count: int):
+    """Insert analyzed rows for one tenant in chunks."""
+    start = datetime(2025, 1, 1)
+    body = "Citizens react to the new policy announcement across several states. " * 4
+    with database.engine.begin() as conn:
+        for offset in range(0, count, 10000):
+            conn.execute(insert(SentimentData.__table__), [{
+                "run_timestamp": start, "user_id": user_id, "title": f"Headline {i}", "text": f"Post {i}",
+                "content": body, "url": f"https://example.com/{i}", "platform": "X",
+                "date": start + timedelta(seconds=i), "likes": i % 1000,
+                "sentiment_label": "neutral", "sentiment_justification": "Benchmark justification.",
+                "issue_keywords": ["fuel", "subsidy"],
+            } for i in range(offset, min(offset + 10000, count))])
+
+
+def export(user_id: uuid.UUID, limit_rows: int, trace_memory: bool):
+    """Run one export and return (bytes written, seconds, peak MB or None)."""
+    filters = DataFilters.from_params(user_id=user_id, end_date=datetime(2025, 1, 1) + timedelta(seconds=limit_rows - 1))
+    chunks = iter_export_chunks(database.SessionLocal, filters, parse_fields(None), args.format)
+    if not args.no_gzip:
+        chunks = gzip_chunks(chunks)
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    written = 0
+    for chunk in chunks:
+        written += len(chunk)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak = peak / 1024 / 1024
+    return written, elapsed, peak
+
+
+def main():
+    user_id = uuid.uuid4()
+    create_schema(database.engine, [SentimentData.__table__], args.drop_existing)
+    seed_start = time.perf_counter()
+    seed(user_id, args.records)
+    print(f"Seeded {args.records} rows in {time.perf_counter() - seed_start:.1f}s ({database.engine.dialect.name})")
+    print(f"Format: {args.format} | gzip: {not args.no_gzip}\n")
+
+    print(f"{'Rows':>10}{'Output MB':>12}{'Seconds':>10}{'Rows/s':>12}{'Peak MB':>10}")
+    for rows in sorted({max(1, args.records // 100), max(1, args.records // 10), args.records}):
+        # Timed run without tracing (tracemalloc slows allocation-heavy code), then a traced run for peak memory
+        written, elapsed, _ = export(user_id, rows, trace_memory=False)
+        _, _, peak = export(user_id, rows, trace_memory=True)
+        print(f"{rows:>10}{written / 1024 / 1024:>12.1f}{elapsed:>10.1f}{rows / elapsed:>12.0f}{peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML article extraction for the radio and online source scrapers: the BeautifulSoup
+path (html.parser tree, repeated soup.select/find_all passes) vs the lxml path (one parse,
+precompiled XPath per site, one traversal per article element).
+Runs on saved fixture pages, one per configured web URL, and reports per-page timings, peak
+Python memory of one extraction (tracemalloc; lxml's C-level tree is not traced) and whether
+both paths produce the same articles, section links and pagination links.
+
+Run with: python scripts/benchmark_html_extraction.py [--refresh] [--repeat 5] [--fixtures DIR]
+--refresh downloads the current page of every station and online source into the fixture
+directory (default data/fixtures/radio_pages) first; later runs reuse the saved pages offline.
+"""
+
+import argparse
+import json
+import logging
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+# Add parent directory to path to import collectors
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import requests
+from bs4 import BeautifulSoup
+
+from src.collectors.collect_radio_hybrid import HybridRadioCollector
+from src.collectors.collect_radio_stations import RadioStationCollector
+
+parser = argparse.ArgumentParser(description="Benchmark BeautifulSoup vs lxml article extraction")
+parser.add_argument("--fixtures", default=str(Path(__file__).parent.parent / "data" / "fixtures" / "radio_pages"))
+parser.add_argument("--refresh", action="store_true", help="Download every configured page before benchmarking")
+parser.add_argument("--repeat", type=int, default=5)
+args = parser.parse_args()
+
+# Per-page INFO logs and soupsieve's :contains deprecation warning would drown the report
+logging.disable(logging.INFO)
+warnings.simplefilter("ignore", FutureWarning)
+
+
+def configured_pages(hybrid: HybridRadioCollector, stations: RadioStationCollector):
+    """(collector, source name, url) for every web page the scrapers start from."""
+    pages = []
+    for name, config in hybrid.radio_stations.items():
+        pages += [("hybrid", name, url) for url in config.get('urls', {}).get('web', [])]
+    for name, config in hybrid.online_sources.items():
+        pages += [("hybrid", name, url) for url in config.get('urls', [])]
+    for region_stations in stations.radio_stations.values():
+        pages += [("stations", station['name'], station['website_url']) for station in region_stations
+                  if station.get('website_url')]
+    return pages
+
+
+def refresh(fixture_dir: Path, pages, session: requests.Session):
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for collector, name, url in pages:
+        file_name = f"{collector}-{re.sub(r'[^a-z0-9]+', '-', (name + ' ' + url).lower()).strip('-')[:100]}.html"
+        try:
+            response = session.get(url, timeout=20)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"  skipped {url}: {e}")
+            continue
+        (fixture_dir / file_name).write_bytes(response.content)
+        manifest[file_name] = {"collector": collector, "source": name, "url": url}
+        print(f"  saved {url} ({len(response.content) / 1024:.0f} KiB)")
+    (fixture_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+
+def station_config(stations: RadioStationCollector, name: str, url: str):
+    for region_stations in stations.radio_stations.values():
+        for station in region_stations:
+            if station['name'] == name:
+                return station
+    return {'name': name, 'website_url': url, 'location': 'Unknown', 'region': 'Unknown'}
+
+
+def comparable(result):
+    """Extraction output without the time-based article ids."""
+    articles, *links = result
+    return [{k: v for k, v in article.items() if k != 'id'} for article in articles], *links
+
+
+def time_call(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def peak_kib(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    fixture_dir = Path(args.fixtures)
+    hybrid = HybridRadioCollector()
+    stations = RadioStationCollector()
+    hybrid.crawl_state = None
+
+    if args.refresh:
+        print(f"Downloading fixture pages into {fixture_dir}")
+        refresh(fixture_dir, configured_pages(hybrid, stations), hybrid.session)
+
+    manifest_file = fixture_dir / "manifest.json"
+    if not manifest_file.exists():
+        print(f"No fixtures in {fixture_dir}; run with --refresh to download them")
+        return
+    manifest = json.loads(manifest_file.read_text())
+
+    print(f"\n{'Page':<48}{'KiB':>7}{'bs4 ms':>9}{'lxml ms':>9}{'speedup':>9}{'bs4 KiB':>9}{'lxml KiB':>10}  same")
+    totals = {"bs4": 0.0, "lxml": 0.0}
+    mismatches = 0
+    for file_name, entry in manifest.items():
+        path = fixture_dir / file_name
+        if not path.exists():
+            continue
+        content = path.read_bytes()
+        name, url = entry["source"], entry["url"]
+
+        if entry["collector"] == "hybrid":
+            def soup_path():
+                soup = BeautifulSoup(content, 'html.parser')
+                return (hybrid._extract_articles_from_soup(soup, name, url),
+                        hybrid._find_section_links(soup, url), hybrid._find_pagination_links(soup, url))
+
+            def lxml_path():
+                return hybrid._parse_page(content, name, url, find_links=True)
+        else:
+            station = station_config(stations, name, url)
+
+            def soup_path():
+                return (stations._extract_articles_from_soup(BeautifulSoup(content, 'html.parser'), station, url),)
+
+            def lxml_path():
+                return (stations._parse_page(content, station, url),)
+
+        same = comparable(soup_path()) == comparable(lxml_path())
+        mismatches += not same
+        bs4_ms, lxml_ms = time_call(soup_path, args.repeat), time_call(lxml_path, args.repeat)
+        totals["bs4"] += bs4_ms
+        totals["lxml"] += lxml_ms
+        label = f"{entry['collector']}: {name}"[:46]
+        print(f"{label:<48}{len(content) / 1024:>7.0f}{bs4_ms:>9.1f}{lxml_ms:>9.1f}{bs4_ms / lxml_ms:>8.1f}x"
+              f"{peak_kib(soup_path):>9.0f}{peak_kib(lxml_path):>10.0f}  {'yes' if same else 'NO'}")
+
+    if totals["lxml"]:
+        print(f"\nTotal: bs4 {totals['bs4']:.1f} ms, lxml {totals['lxml']:.1f} ms "
+              f"({totals['bs4'] / totals['lxml']:.1f}x); {mismatches} page(s) with different output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark /latest-data response building: full materialization (before) vs keyset pages
+with field projection and pushed-down filters (after).
+Reports response size and p50/p95 latency per scenario for one synthetic tenant.
+
+Run with: python scripts/benchmark_latest_data.py [--records 500000] [--runs 20] [--page-size 200]
+Uses a throwaway SQLite file; pass --database-url to benchmark against PostgreSQL. sentiment_data is
+dropped and recreated there, so a database where it holds data is refused unless --drop-existing
+is passed.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Point the app's engine at the benchmark database before importing it
+parser = argparse.ArgumentParser(description="Benchmark /latest-data response building")
+parser.add_argument("--records", type=int, default=500000)
+parser.add_argument("--runs", type=int, default=20)
+parser.add_argument("--page-size", type=int, default=200)
+parser.add_argument("--database-url", default=None)
+parser.add_argument("--drop-existing", action="store_true",
+                    help="Drop sentiment_data on --database-url even if it holds data")
+args = parser.parse_args()
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+
+# Add parent directory to path to import models
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert
+
+from benchmark_db import create_schema
+from src.api import database
+from src.api.models import SentimentData
+from src.api.data_cache import SentimentDataCache
+from src.api.data_query import DataFilters, parse_fields, page_frame, project_frame, frame_to_records
+
+PLATFORMS = ["X", "Facebook", "Instagram", "TikTok", "YouTube", "News", "Radio"]
+SENTIMENTS = ["positive", "negative", "neutral"]
+MINISTRIES = ["health", "education", "petroleum_resources", "finance", "non_governance"]
+
+
+def seed(user_id: uuid.UUID, count: int):
+    """Insert analyzed rows for one tenant in chunks."""
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+    body = "Citizens react to the new policy announcement across several states. " * 6
+    with database.engine.begin() as conn:
+        for offset in range(0, count, 5000):
+            rows = []
+            for i in range(offset, min(offset + 5000, count)):
+                rows.append({
+                    "run_timestamp": start, "created_at": start, "user_id": user_id,
+                    "title": f"Headline {i}", "text": f"Post {i} {body[:140]}", "content": body,
+                    "description": body[:200], "url": f"https://example.com/{i}",
+                    "platform": rng.choice(PLATFORMS), "source": "bench", "source_name": "Bench Source",
+                    "date": start + timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+                    "likes": rng.randint(0, 5000), "retweets": rng.randint(0, 500), "comments": rng.randint(0, 300),
+                    "sentiment_label": rng.choice(SENTIMENTS), "sentiment_score": rng.uniform(-1, 1),
+                    "sentiment_justification": "Benchmark justification for this record.",
+                    "issue_label": "Fuel Subsidy", "issue_slug": "fuel-subsidy", "issue_confidence": 0.8,
+                    "issue_keywords": ["fuel", "subsidy"], "ministry_hint": rng.choice(MINISTRIES),
+                })
+            conn.execute(insert(SentimentData.__table__), rows)
+
+
+def measure(build, runs: int):
+    """Return (response bytes, p50 ms, p95 ms) for a response builder."""
+    timings, size = [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = len(json.dumps(build(), default=str).encode())
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+    return size, statistics.median(timings), p95
+
+
+def main():
+    user_id = uuid.uuid4()
+    create_schema(database.engine, [SentimentData.__table__], args.drop_existing)
+    seed_start = time.perf_counter()
+    seed(user_id, args.records)
+    print(f"Seeded {args.records} rows in {time.perf_counter() - seed_start:.1f}s ({database.engine.dialect.name})")
+
+    cache = SentimentDataCache()
+    db = database.SessionLocal()
+    load_start = time.perf_counter()
+    frame = cache.get_all_frame(db, user_id=str(user_id))
+    print(f"Snapshot load: {(time.perf_counter() - load_start):.1f}s, {cache.get_cache_info()['memory_bytes'] / 1024 / 1024:.0f} MB\n")
+
+    all_fields = parse_fields(None)
+    slim_fields = parse_fields("entry_id,date,title,platform,sentiment_label,sentiment_score,ministry_hint,likes")
+    unfiltered = DataFilters.from_params(user_id=str(user_id))
+    filtered = DataFilters.from_params(user_id=str(user_id), start_date=datetime(2025, 6, 1),
+                                       end_date=datetime(2025, 8, 31), platform="X,Facebook",
+                                       sentiment="negative", ministry="health")
+    _, deep_cursor = page_frame(unfiltered.apply_to_frame(frame), None, args.records // 2)
+
+    def before():
+        # Previous behaviour: every AI-processed row, every field
+        return cache.to_records(cache.get_ai_processed_frame(db, user_id=str(user_id)))
+
+    def page(filters, fields, cursor=None):
+        def build():
+            rows, next_cursor = page_frame(filters.apply_to_frame(cache.get_all_frame(db, user_id=str(user_id))),
+                                           cursor, args.page_size)
+            return {"data": frame_to_records(project_frame(rows, fields)), "next_cursor": next_cursor}
+        return build
+
+    scenarios = [
+        ("before: full list, all fields", before, max(1, args.runs // 5)),
+        ("after: first page, all fields", page(unfiltered, all_fields), args.runs),
+        ("after: first page, projected", page(unfiltered, slim_fields), args.runs),
+        ("after: deep page, projected", page(unfiltered, slim_fields, deep_cursor), args.runs),
+        ("after: filtered page, projected", page(filtered, slim_fields), args.runs),
+    ]
+    print(f"{'Scenario':<36}{'Response':>14}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, build, runs in scenarios:
+        size, p50, p95 = measure(build, runs)
+        print(f"{name:<36}{size / 1024:>11.0f} KB{p50:>10.1f}{p95:>10.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
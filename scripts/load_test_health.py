@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Load test: /health latency while heavy data endpoints are busy.
+Probes /health at a fixed interval, first on an idle app, then while concurrent clients hammer
+/latest-data (a sync endpoint that FastAPI runs on the worker threadpool), and finally while the
+same handler runs inline on the event loop (how the previous `async def` endpoint behaved).
+Requests go straight to the ASGI app in-process, so the numbers isolate event-loop blocking.
+
+Run with: python scripts/load_test_health.py [--records 10000] [--clients 4] [--duration 5] [--probe-interval-ms 20]
+Uses a throwaway SQLite file; pass --database-url to load test against PostgreSQL. Every model table
+is dropped and recreated there, so a database whose tables hold data is refused unless
+--drop-existing is passed.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Point the app's engine at the load-test database before importing it
+parser = argparse.ArgumentParser(description="Load test /health latency under heavy endpoint load")
+parser.add_argument("--records", type=int, default=10000)
+parser.add_argument("--clients", type=int, default=4, help="Concurrent heavy-endpoint clients")
+parser.add_argument("--duration", type=float, default=5.0, help="Seconds per phase")
+parser.add_argument("--probe-interval-ms", type=float, default=20.0)
+parser.add_argument("--database-url", default=None)
+parser.add_argument("--drop-existing", action="store_true",
+                    help="Drop the benchmark tables on --database-url even if they hold data")
+args = parser.parse_args()
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'loadtest.db'}"
+
+# Add parent directory to path to import models
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert
+
+from benchmark_db import create_schema
+from src.api import database
+from src.api.database import Base, SessionLocal, configure_threadpool
+from src.api.models import SentimentData
+from src.api.service import app, get_latest_data
+
+# Per-request INFO logs would dominate the timings
+logging.disable(logging.INFO)
+
+PLATFORMS = ["X", "Facebook", "Instagram", "TikTok", "YouTube", "News", "Radio"]
+SENTIMENTS = ["positive", "negative", "neutral"]
+
+
+def seed(user_id: uuid.UUID, count: int):
+    """Insert analyzed rows for one tenant in chunks."""
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+    body = "Citizens react to the new policy announcement across several states. " * 3
+    with database.engine.begin() as conn:
+        for offset in range(0, count, 5000):
+            conn.execute(insert(SentimentData.__table__), [{
+                "run_timestamp": start, "created_at": start, "user_id": user_id,
+                "title": f"Headline {i}", "text": f"Post {i} {body[:140]}", "content": body,
+                "url": f"https://example.com/{i}", "platform": rng.choice(PLATFORMS),
+                "date": start + timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+                "sentiment_label": rng.choice(SENTIMENTS), "sentiment_score": rng.uniform(-1, 1),
+                "sentiment_justification": "Load test justification."
+            } for i in range(offset, min(offset + 5000, count))])
+
+
+def add_inline_route():
+    """The /latest-data handler called directly on the event loop, as the old async endpoint ran."""
+    @app.get("/_loadtest/latest-data-inline")
+    async def latest_data_inline(user_id: str):
+        db = SessionLocal()
+        try:
+            return get_latest_data(db=db, user_id=user_id, limit=None, cursor=None, fields=None,
+                                   start_date=None, end_date=None, platform=None, sentiment=None,
+                                   ministry=None, issue=None)
+        finally:
+            db.close()
+
+
+async def call(path: str, query: str = "") -> int:
+    """Send one GET straight to the ASGI app and return the status code."""
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app({
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [], "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000)
+    }, receive, send)
+    return status.get("code", 0)
+
+
+async def run_phase(heavy_path, user_id: str):
+    """Probe /health for --duration seconds while --clients loop on heavy_path (None: idle)."""
+    stop = asyncio.Event()
+    heavy_done = []
+
+    async def heavy_client():
+        while not stop.is_set():
+            await call(heavy_path, f"user_id={user_id}")
+            heavy_done.append(1)
+
+    async def prober():
+        latencies = []
+        deadline = time.perf_counter() + args.duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if await call("/health") != 200:
+                raise RuntimeError("/health did not return 200")
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(args.probe_interval_ms / 1000)
+        stop.set()
+        return latencies
+
+    clients = [asyncio.create_task(heavy_client()) for _ in range(args.clients if heavy_path else 0)]
+    latencies = await prober()
+    await asyncio.gather(*clients)
+    return latencies, len(heavy_done)
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_all(user_id: str):
+    configure_threadpool()
+    # Warm the snapshot cache so every phase measures steady-state request handling
+    if await call("/latest-data", f"user_id={user_id}") != 200:
+        raise RuntimeError("/latest-data warm-up failed")
+
+    print(f"{'Phase':<44}{'probes':>8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'heavy req':>11}")
+    for name, heavy_path in [("idle", None),
+                             ("/latest-data on threadpool (sync endpoint)", "/latest-data"),
+                             ("/latest-data inline on event loop (before)", "/_loadtest/latest-data-inline")]:
+        latencies, heavy_requests = await run_phase(heavy_path, user_id)
+        print(f"{name:<44}{len(latencies):>8}{statistics.median(latencies):>9.1f}"
+              f"{percentile(latencies, 0.95):>9.1f}{max(latencies):>9.1f}{heavy_requests:>11}")
+
+
+def main():
+    user_id = uuid.uuid4()
+    create_schema(database.engine, Base.metadata.sorted_tables, args.drop_existing)
+    seed(user_id, args.records)
+    print(f"Seeded {args.records} rows ({database.engine.dialect.name}), "
+          f"{args.clients} heavy clients, {args.duration:.0f}s per phase\n")
+    add_inline_route()
+    asyncio.run(run_all(str(user_id)))
+
+
+if __name__ == "__main__":
+    main()
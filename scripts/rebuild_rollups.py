@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Rebuild the dashboard rollup tables (sentiment_rollups) from sentiment_data.
+Use for backfills after bulk imports, label fixes or when enabling rollups on an existing database;
+the agent keeps rollups current incrementally afterwards.
+
+Run with: python scripts/rebuild_rollups.py [--user-id <uuid> ...] [--hourly-retention-days 14] [--chunk-days 7]
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+import os
+
+# Add parent directory to path to import models
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Load environment variables
+env_path = Path(__file__).parent.parent / 'config' / '.env'
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+load_dotenv()
+
+if not os.getenv("DATABASE_URL"):
+    print("DATABASE_URL not found in environment variables")
+    print("Please check your .env file")
+    sys.exit(1)
+
+from src.api.database import SessionLocal
+from src.utils.sentiment_rollups import rebuild_rollups, DEFAULT_ROLLUP_CONFIG
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild dashboard rollup tables")
+    parser.add_argument("--user-id", action="append", default=None,
+                        help="Rebuild only this user (repeatable); default is every user")
+    parser.add_argument("--hourly-retention-days", type=int, default=DEFAULT_ROLLUP_CONFIG['hourly_retention_days'])
+    parser.add_argument("--chunk-days", type=int, default=7, help="Days aggregated per step")
+    args = parser.parse_args()
+
+    user_ids = [uuid.UUID(user_id) for user_id in args.user_id] if args.user_id else None
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        written = rebuild_rollups(db, user_ids, hourly_retention_days=args.hourly_retention_days,
+                                  chunk_days=args.chunk_days)
+        print(f"Rebuilt {written:,} rollup rows in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding rollups: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -30,14 +30,20 @@ from src.utils.mail_config import NOTIFY_ON_ANALYSIS
 from src.utils.notification_service import send_analysis_report, send_processing_notification, send_collection_notification
 from src.processing.presidential_sentiment_analyzer import PresidentialSentimentAnalyzer
 from src.processing.data_processor import DataProcessor
+from src.processing.record_triage import RecordTriage
 from uuid import UUID
 # Add necessary DB imports
 from sqlalchemy.orm import sessionmaker, Session 
 from src.api.models import TargetIndividualConfiguration, EmailConfiguration
 import src.api.models as models # Added for location classification update
-from sqlalchemy import or_
+from sqlalchemy import or_, update, bindparam, func
 # Add deduplication service import
 from src.utils.deduplication_service import DeduplicationService
+from src.utils.bulk_result_writer import BulkResultWriter
+from src.utils.engagement_tracker import EngagementSnapshotWriter, compact_snapshots, DEFAULT_ENGAGEMENT_CONFIG
+from src.api.target_matching import sync_target_matches, rematch_entries
+from src.utils.sentiment_rollups import update_rollups_for_entries, DEFAULT_ROLLUP_CONFIG
+from src.collectors.raw_output import RawShardManifest
 
 # Configure logging
 # Configure handlers with UTF-8 encoding to support emoji characters
@@ -154,6 +160,10 @@ def safe_int(value):
     return None
 
 
+# Mutable metrics refreshed when a post is re-collected (sentiment_data has no view-count column)
+ENGAGEMENT_COLUMNS = ['likes', 'retweets', 'comments', 'direct_reach', 'cumulative_reach', 'domain_reach']
+
+
 class SentimentAnalysisAgent:
     """Core agent responsible for data collection, processing, analysis, and scheduling."""
 
@@ -248,6 +258,10 @@ class SentimentAnalysisAgent:
             'suggestions': []
         }
         self.active_collection_threads = {}  # NEW: Track running collection threads
+        # Per-user entry_id arrays handed from ingest to the analysis phases; user cycles run on their own threads
+        self._new_entry_ids: Dict[str, np.ndarray] = {}
+        self._refreshed_entry_ids: Dict[str, np.ndarray] = {}
+        self._phase_entry_ids: Dict[str, np.ndarray] = {}
         
         # Initialize processor with dual-analyzer system
         # DataProcessor now includes both PresidentialSentimentAnalyzer + GovernanceAnalyzer (two-phase)
@@ -257,6 +271,19 @@ class SentimentAnalysisAgent:
         # Keep reference to sentiment analyzer for backward compatibility
         self.sentiment_analyzer = PresidentialSentimentAnalyzer()
         
+        # Deterministic pre-LLM triage (rules configured under "triage")
+        self.record_triage = RecordTriage(self.config.get('triage', {}))
+        
+        # Engagement time series (snapshots + velocity windows, configured under "engagement_tracking")
+        self.engagement_config = {**DEFAULT_ENGAGEMENT_CONFIG, **self.config.get('engagement_tracking', {})}
+        self._engagement_compacted_until = {}
+        
+        # Dashboard rollups refreshed after the sentiment and location phases (configured under "rollups")
+        self.rollup_config = {**DEFAULT_ROLLUP_CONFIG, **self.config.get('rollups', {})}
+        
+        # Callbacks run with the user_id after analysis results are written (e.g. API cache invalidation)
+        self._analysis_listeners: List[Callable[[str], None]] = []
+        
         # Initialize enhanced location classifier
         self.location_classifier = self._init_location_classifier()
         
@@ -786,6 +813,32 @@ class SentimentAnalysisAgent:
             logger.error(f"Error loading config from {self.config_path}: {e}. Using default configuration.", exc_info=True)
             return default_config
 
+    def add_analysis_listener(self, listener: Callable[[str], None]):
+        """Register a callback invoked with the user_id after sentiment or location results are written."""
+        self._analysis_listeners.append(listener)
+
+    def _notify_analysis_complete(self, user_id: str):
+        """Run analysis listeners; a failing listener never fails the cycle."""
+        for listener in self._analysis_listeners:
+            try:
+                listener(user_id)
+            except Exception as e:
+                logger.warning(f"Analysis listener {getattr(listener, '__name__', listener)} failed for user {user_id}: {e}")
+
+    def _update_rollups(self, user_id: str, entry_ids: np.ndarray):
+        """Recompute the dashboard rollup buckets touched by a phase's records."""
+        if not self.rollup_config.get('enabled', True) or entry_ids is None or len(entry_ids) == 0:
+            return
+        try:
+            with self.db_factory() as db:
+                written = update_rollups_for_entries(
+                    db, entry_ids, hourly_retention_days=self.rollup_config.get('hourly_retention_days', 14)
+                )
+                db.commit()
+            logger.info(f"Refreshed dashboard rollups for {len(entry_ids)} records ({written} rollup rows)")
+        except Exception as e:
+            logger.error(f"Error updating dashboard rollups for user {user_id}: {e}", exc_info=True)
+
     def _get_latest_target_config(self, db: Session, user_id: str) -> Optional[TargetIndividualConfiguration]:
         """Fetches the latest target config model object from DB for a specific user."""
         if not user_id:
@@ -2028,6 +2081,7 @@ class SentimentAnalysisAgent:
                     logger.info(f"Starting parallel sentiment analysis for user {user_id}...")
                     auto_schedule_logger.info(f"[PHASE 4: SENTIMENT ANALYSIS START] User: {user_id} | Timestamp: {sentiment_start.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}")
                     auto_schedule_logger.info(f"[PHASE 4: SENTIMENT] Max Workers: {self.max_sentiment_workers} | Batch Size: {self.sentiment_batch_size}")
+                    self._phase_entry_ids.pop(str(user_id), None)
                     sentiment_success = self._run_task(
                         lambda: self._run_sentiment_batch_update_parallel(user_id), 
                         f'sentiment_batch_{user_id}'
@@ -2038,12 +2092,19 @@ class SentimentAnalysisAgent:
                         auto_schedule_logger.info(f"[PHASE 4: SENTIMENT ANALYSIS END] User: {user_id} | Timestamp: {sentiment_end.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} | Duration: {sentiment_duration:.2f}s | Max Workers: {self.max_sentiment_workers} | Status: SUCCESS")
                     else:
                         auto_schedule_logger.error(f"[PHASE 4: SENTIMENT ANALYSIS END] User: {user_id} | Timestamp: {sentiment_end.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} | Duration: {sentiment_duration:.2f}s | Max Workers: {self.max_sentiment_workers} | Status: FAILED")
+                    # Engagement-only refreshes of duplicates change rollup sums too
+                    self._update_rollups(user_id, np.union1d(
+                        self._phase_entry_ids.get(str(user_id), np.empty(0, dtype=np.int64)),
+                        self._refreshed_entry_ids.get(str(user_id), np.empty(0, dtype=np.int64))
+                    ))
+                    self._notify_analysis_complete(user_id)
                     
                     # 5. Parallel location classification (configurable batch size)
                     location_start = datetime.now()
                     logger.info(f"Starting parallel location updates for user {user_id}...")
                     auto_schedule_logger.info(f"[PHASE 5: LOCATION CLASSIFICATION START] User: {user_id} | Timestamp: {location_start.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}")
                     auto_schedule_logger.info(f"[PHASE 5: LOCATION] Max Workers: {self.max_location_workers} | Batch Size: {self.location_batch_size}")
+                    self._phase_entry_ids.pop(str(user_id), None)
                     location_success = self._run_task(
                         lambda: self._run_location_batch_update_parallel(user_id), 
                         f'location_batch_{user_id}'
@@ -2054,6 +2115,8 @@ class SentimentAnalysisAgent:
                         auto_schedule_logger.info(f"[PHASE 5: LOCATION CLASSIFICATION END] User: {user_id} | Timestamp: {location_end.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} | Duration: {location_duration:.2f}s | Max Workers: {self.max_location_workers} | Status: SUCCESS")
                     else:
                         auto_schedule_logger.error(f"[PHASE 5: LOCATION CLASSIFICATION END] User: {user_id} | Timestamp: {location_end.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} | Duration: {location_duration:.2f}s | Max Workers: {self.max_location_workers} | Status: FAILED")
+                    self._update_rollups(user_id, self._phase_entry_ids.get(str(user_id)))
+                    self._notify_analysis_complete(user_id)
                     
                     logger.info(f"Parallel cycle completed for user {user_id}: Collection ✅, Deduplication ✅, Sentiment ✅, Location ✅")
                     total_duration = (location_end - collection_start).total_seconds()
@@ -2069,8 +2132,9 @@ class SentimentAnalysisAgent:
             logger.error(f"Unexpected error during run_single_cycle_parallel for user {user_id}: {e}", exc_info=True)
             auto_schedule_logger.error(f"[CYCLE EXCEPTION] User: {user_id} | Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} | Error: {str(e)}")
         finally:
-            # Ensure busy status is reset
-            pass
+            # This cycle's entry_ids must not leak into the next one (or its pending-record fallback)
+            for entry_ids in (self._new_entry_ids, self._refreshed_entry_ids, self._phase_entry_ids):
+                entry_ids.pop(str(user_id), None)
 
     # --- Modified: Old scheduled run - Adapt or remove later --- 
     def _init_location_classifier(self):
@@ -2356,9 +2420,15 @@ class SentimentAnalysisAgent:
                 logger.warning("No raw data directory found")
                 return True
             
-            # Get all raw CSV files
-            raw_files = list(raw_data_path.glob('*.csv'))
-            logger.info(f"🔍 DEBUG: Found {len(raw_files)} CSV files: {[f.name for f in raw_files]}")
+            # Completed shards listed in the manifest, plus CSVs from collectors that still write whole files
+            manifest = RawShardManifest(raw_data_path)
+            pending_shards = manifest.pending()
+            legacy_files = list(raw_data_path.glob('*.csv'))
+            raw_files = [manifest.shard_path(entry) for entry in pending_shards] + legacy_files
+            # Only what is read here is marked done / removed after deduplication, not files written meanwhile
+            self._consumed_shards = pending_shards
+            self._consumed_raw_files = legacy_files
+            logger.info(f"🔍 DEBUG: Found {len(pending_shards)} pending shards and {len(legacy_files)} CSV files: {[f.name for f in raw_files]}")
             
             if not raw_files:
                 logger.info("No raw data files found to push to DB")
@@ -2499,6 +2569,145 @@ class SentimentAnalysisAgent:
         
         return db_mapping
 
+    def _refresh_duplicate_engagement(self, db: Session, duplicate_map: Dict[int, List[int]],
+                                      current_timestamp: datetime,
+                                      snapshot_writer: Optional[EngagementSnapshotWriter] = None) -> tuple:
+        """
+        Update re-collected duplicates in place with only their mutable metrics.
+
+        Every duplicate is queued on snapshot_writer (the engagement time series), which is
+        where the latest counts are served from. The counters on sentiment_data are only a
+        periodic copy: with snapshots on, a row is rewritten when one of its ENGAGEMENT_COLUMNS
+        changed and either its last write (run_timestamp) is counter_refresh_hours old or a
+        counter moved by counter_refresh_ratio of its stored value; with snapshots off, on
+        any change. The write is one executemany UPDATE of those columns and run_timestamp,
+        where a metric missing from the new record keeps its stored value. Analysis columns
+        are never written, except that sentiment_label is cleared (and the new text stored,
+        with run_timestamp) when the text changed materially, so the record is picked up for
+        re-analysis.
+
+        Returns:
+            (update mappings, entry_ids flagged for re-analysis)
+        """
+        table = models.SentimentData.__table__
+        targets = {}
+        for new_index, existing_entry_ids in duplicate_map.items():
+            if new_index < len(self._temp_raw_records) and existing_entry_ids:
+                targets[existing_entry_ids[0]] = self._temp_raw_records[new_index]  # Update the first duplicate found
+        if not targets:
+            return [], []
+        
+        # Stored text and counters of the matched rows, to detect text and metric changes
+        existing_rows = {}
+        target_ids = list(targets)
+        for start in range(0, len(target_ids), 1000):
+            for row in db.query(
+                models.SentimentData.entry_id,
+                models.SentimentData.run_timestamp,
+                models.SentimentData.text,
+                models.SentimentData.content,
+                models.SentimentData.title,
+                models.SentimentData.description,
+                *[table.c[column] for column in ENGAGEMENT_COLUMNS]
+            ).filter(models.SentimentData.entry_id.in_(target_ids[start:start + 1000])):
+                existing_rows[row.entry_id] = row._asdict()
+        
+        counter_refresh = timedelta(hours=self.engagement_config.get('counter_refresh_hours', 6))
+        counter_refresh_ratio = self.engagement_config.get('counter_refresh_ratio', 0.5)
+        update_mappings = []
+        text_mappings = []
+        for entry_id, record_data in targets.items():
+            if snapshot_writer is not None:
+                snapshot_writer.add(entry_id, record_data)
+            
+            existing = existing_rows.get(entry_id)
+            mapping = {'b_entry_id': entry_id, 'b_run_timestamp': current_timestamp}
+            for column in ENGAGEMENT_COLUMNS:
+                try:
+                    mapping[f'b_{column}'] = safe_int(record_data.get(column))
+                except (ValueError, TypeError):
+                    mapping[f'b_{column}'] = None
+            changed = [
+                column for column in ENGAGEMENT_COLUMNS
+                if existing is None or (mapping[f'b_{column}'] is not None and mapping[f'b_{column}'] != existing[column])
+            ]
+            if changed and snapshot_writer is not None and existing is not None:
+                # The snapshots already hold the new counts; refresh the row's copy only when it is old or far off
+                due = existing['run_timestamp'] is None or current_timestamp - existing['run_timestamp'] >= counter_refresh
+                jumped = any(
+                    abs(mapping[f'b_{column}'] - (existing[column] or 0)) >= counter_refresh_ratio * max(existing[column] or 0, 1)
+                    for column in changed
+                )
+                if not (due or jumped):
+                    changed = []
+            if changed:
+                update_mappings.append(mapping)
+            
+            if existing and self.deduplication_service.has_material_text_change(existing, record_data):
+                text_mapping = {'b_entry_id': entry_id, 'b_run_timestamp': current_timestamp}
+                for field in self.deduplication_service.text_fields:
+                    value = record_data.get(field)
+                    # Missing text is stored as NULL, as on insert
+                    text_mapping[f'b_{field}'] = None if value is None or pd.isna(value) else str(value)
+                text_mappings.append(text_mapping)
+        
+        # Minimal-column UPDATE; COALESCE keeps stored metrics the new record doesn't carry
+        engagement_stmt = update(table).where(table.c.entry_id == bindparam('b_entry_id')).values({
+            'run_timestamp': bindparam('b_run_timestamp'),
+            **{column: func.coalesce(bindparam(f'b_{column}'), table.c[column]) for column in ENGAGEMENT_COLUMNS}
+        })
+        if update_mappings:
+            db.execute(engagement_stmt, update_mappings)
+        
+        if text_mappings:
+            reanalysis_stmt = update(table).where(table.c.entry_id == bindparam('b_entry_id')).values({
+                'run_timestamp': bindparam('b_run_timestamp'),
+                'sentiment_label': None,
+                **{field: bindparam(f'b_{field}') for field in self.deduplication_service.text_fields}
+            })
+            db.execute(reanalysis_stmt, text_mappings)
+        
+        return update_mappings, [mapping['b_entry_id'] for mapping in text_mappings]
+
+    def _write_engagement_snapshots(self, db: Session, snapshot_writer: EngagementSnapshotWriter,
+                                    current_timestamp: datetime):
+        """Flush engagement snapshots and velocity windows, then compact older snapshots."""
+        try:
+            snapshot_count = snapshot_writer.flush(current_timestamp)
+            db.commit()
+            logger.info(f"Appended {snapshot_count} engagement snapshots")
+        except Exception as e:
+            logger.error(f"Error writing engagement snapshots: {e}", exc_info=True)
+            db.rollback()
+            return
+        
+        try:
+            compaction = compact_snapshots(
+                db, now=current_timestamp,
+                raw_retention_hours=self.engagement_config.get('raw_retention_hours', 48),
+                hourly_retention_days=self.engagement_config.get('hourly_retention_days', 14),
+                since=self._engagement_compacted_until
+            )
+            db.commit()
+            self._engagement_compacted_until = compaction['cutoffs']
+        except Exception as e:
+            logger.error(f"Error compacting engagement snapshots: {e}", exc_info=True)
+            db.rollback()
+
+    def _update_target_matches(self, db: Session, user_id: str, changed_entry_ids: List[int]):
+        """Match newly inserted records (and records whose text changed) against the user's target config."""
+        target_config = self._get_latest_target_config(db, user_id)
+        if not target_config:
+            return
+        try:
+            if changed_entry_ids:
+                rematch_entries(db, target_config, changed_entry_ids)
+                db.commit()
+            sync_target_matches(db, target_config)
+        except Exception as e:
+            logger.error(f"Error updating target matches for user {user_id}: {e}", exc_info=True)
+            db.rollback()
+
     def _run_deduplication(self, user_id: str):
         """Run deduplication on collected raw data - updates existing records instead of filtering duplicates"""
         try:
@@ -2511,6 +2720,8 @@ class SentimentAnalysisAgent:
                 logger.info("No raw records to process")
                 # Set empty stats for logging
                 self._dedup_stats = {'total': 0, 'unique': 0, 'duplicates': 0, 'updated': 0}
+                self._new_entry_ids[str(user_id)] = np.empty(0, dtype=np.int64)
+                self._refreshed_entry_ids[str(user_id)] = np.empty(0, dtype=np.int64)
                 return True
             
             logger.info(f"Starting deduplication/update for user {user_id} with {len(self._temp_raw_records)} records")
@@ -2530,37 +2741,32 @@ class SentimentAnalysisAgent:
                 update_count = 0
                 insert_count = 0
                 update_mappings = []  # Initialize outside the if block
+                new_entry_ids = []
+                snapshot_writer = None
+                if self.engagement_config.get('enabled', True):
+                    snapshot_writer = EngagementSnapshotWriter(
+                        db, user_id=UUID(user_id) if isinstance(user_id, str) else user_id,
+                        windows_hours=self.engagement_config.get('velocity_windows_hours')
+                    )
                 
-                # Update existing duplicate records
+                # Refresh engagement metrics on existing duplicate records (analysis columns are left untouched)
+                reanalyze_entry_ids = []
                 if duplicate_map:
-                    logger.info(f"Updating {len(duplicate_map)} existing duplicate records")
-                    
-                    # For each duplicate, update the first existing record (take the first entry_id from the list)
-                    for new_index, existing_entry_ids in duplicate_map.items():
-                        if new_index < len(self._temp_raw_records) and existing_entry_ids:
-                            try:
-                                record_data = self._temp_raw_records[new_index]
-                                db_mapping = self._prepare_record_mapping(record_data, user_id, current_timestamp)
-                                # Add entry_id for update
-                                db_mapping['entry_id'] = existing_entry_ids[0]  # Update the first duplicate found
-                                update_mappings.append(db_mapping)
-                            except Exception as e:
-                                logger.error(f"Error preparing duplicate record for update: {e}")
-                                if new_index < len(self._temp_raw_records):
-                                    record_data = self._temp_raw_records[new_index]
-                                    logger.error(f"Record URL: {record_data.get('url', 'N/A')}")
-                                continue
-                    
-                    # Perform bulk update
-                    if update_mappings:
-                        try:
-                            db.bulk_update_mappings(models.SentimentData, update_mappings)
-                            db.commit()
-                            update_count = len(update_mappings)
-                            logger.info(f"Successfully updated {update_count} existing records in database")
-                        except Exception as e:
-                            logger.error(f"Error during bulk update: {e}", exc_info=True)
-                            db.rollback()
+                    logger.info(f"Refreshing engagement metrics on {len(duplicate_map)} existing duplicate records")
+                    try:
+                        update_mappings, reanalyze_entry_ids = self._refresh_duplicate_engagement(
+                            db, duplicate_map, current_timestamp, snapshot_writer
+                        )
+                        db.commit()
+                        update_count = len(update_mappings)
+                        logger.info(f"Successfully refreshed {update_count} existing records in database "
+                                    f"({len(reanalyze_entry_ids)} flagged for re-analysis after text changes)")
+                    except Exception as e:
+                        logger.error(f"Error during engagement refresh: {e}", exc_info=True)
+                        db.rollback()
+                        update_mappings = []
+                        reanalyze_entry_ids = []
+                        snapshot_writer = None
                 
                 # Insert unique records into database using bulk insert
                 if unique_records:
@@ -2568,28 +2774,45 @@ class SentimentAnalysisAgent:
                     
                     # Prepare data for bulk insert
                     bulk_data = []
+                    bulk_sources = []  # Raw record per mapping, for engagement snapshots
                     
                     for record_data in unique_records:
                         try:
                             db_mapping = self._prepare_record_mapping(record_data, user_id, current_timestamp)
                             bulk_data.append(db_mapping)
+                            bulk_sources.append(record_data)
                         except Exception as e:
                             logger.error(f"Error preparing record for bulk insert: {e}")
                             logger.error(f"Record URL: {record_data.get('url', 'N/A')}")
                             logger.error(f"Record platform: {record_data.get('platform', 'N/A')}")
                             continue
                     
-                    # Use bulk_insert_mappings for better performance and explicit column mapping
+                    # Use bulk_insert_mappings for better performance and explicit column mapping.
+                    # return_defaults=True populates the generated entry_id back into each mapping
+                    # (batched RETURNING on PostgreSQL/SQLite), so analysis phases can select by
+                    # primary key instead of re-matching on text.
                     if bulk_data:
                         try:
-                            db.bulk_insert_mappings(models.SentimentData, bulk_data)
+                            db.bulk_insert_mappings(models.SentimentData, bulk_data, return_defaults=True)
                             db.commit()
                             insert_count = len(bulk_data)
+                            new_entry_ids = [mapping['entry_id'] for mapping in bulk_data if mapping.get('entry_id') is not None]
                             logger.info(f"Successfully inserted {insert_count} unique records into database")
+                            if snapshot_writer is not None:
+                                for mapping, record_data in zip(bulk_data, bulk_sources):
+                                    if mapping.get('entry_id') is not None:
+                                        snapshot_writer.add(mapping['entry_id'], record_data)
                         except Exception as e:
                             logger.error(f"Error during bulk insert: {e}", exc_info=True)
                             db.rollback()
                 
+                # Append engagement snapshots for everything collected this cycle
+                if snapshot_writer is not None:
+                    self._write_engagement_snapshots(db, snapshot_writer, current_timestamp)
+                
+                # Precompute target-term matches so API filtering is an indexed lookup
+                self._update_target_matches(db, user_id, reanalyze_entry_ids)
+                
                 # Update stats for logging
                 self._dedup_stats = {
                     'total': len(self._temp_raw_records),
@@ -2603,23 +2826,33 @@ class SentimentAnalysisAgent:
                 
                 # Store unique records for potential use in sentiment analysis
                 self._unique_records = unique_records
+                # Hand the inserted primary keys to the analysis phases as a compact sorted array
+                # (plus duplicates whose text changed and were flagged for re-analysis)
+                self._new_entry_ids[str(user_id)] = np.unique(np.asarray(new_entry_ids + reanalyze_entry_ids, dtype=np.int64))
+                # Every existing record whose counters were refreshed, for the dashboard rollups
+                self._refreshed_entry_ids[str(user_id)] = np.unique(np.asarray(
+                    [mapping['b_entry_id'] for mapping in update_mappings], dtype=np.int64))
                 
                 if not unique_records and not update_mappings:
                     logger.info("No records to insert or update")
                 
-                # Clean up raw CSV files after successful processing
-                raw_data_path = self.base_path / 'data' / 'raw'
-                if raw_data_path.exists():
-                    raw_files = list(raw_data_path.glob('*.csv'))
-                    if raw_files:
-                        logger.info(f"Cleaning up {len(raw_files)} raw CSV files after successful processing")
-                        for file_path in raw_files:
-                            try:
-                                file_path.unlink()
-                                logger.debug(f"Deleted raw file: {file_path.name}")
-                            except Exception as e:
-                                logger.warning(f"Failed to delete raw file {file_path.name}: {e}")
-                        logger.info("Raw file cleanup completed")
+                # Mark the consumed shards done and remove the raw files read for this run
+                consumed_shards = getattr(self, '_consumed_shards', [])
+                if consumed_shards:
+                    logger.info(f"Marking {len(consumed_shards)} raw shards done after successful processing")
+                    RawShardManifest(self.base_path / 'data' / 'raw').mark_done(consumed_shards)
+                raw_files = getattr(self, '_consumed_raw_files', [])
+                if raw_files:
+                    logger.info(f"Cleaning up {len(raw_files)} raw CSV files after successful processing")
+                    for file_path in raw_files:
+                        try:
+                            file_path.unlink()
+                            logger.debug(f"Deleted raw file: {file_path.name}")
+                        except Exception as e:
+                            logger.warning(f"Failed to delete raw file {file_path.name}: {e}")
+                    logger.info("Raw file cleanup completed")
+                self._consumed_shards = []
+                self._consumed_raw_files = []
                 
                 # Clean up temporary data
                 if hasattr(self, '_temp_raw_records'):
@@ -2634,184 +2867,176 @@ class SentimentAnalysisAgent:
             logger.error(f"Error during deduplication: {e}", exc_info=True)
             return False
 
+    def _get_pending_entry_ids(self, db: Session, user_id: str, *pending_criteria) -> np.ndarray:
+        """
+        Resolve the entry_ids an analysis phase should work on.
+
+        Uses the primary keys _run_deduplication captured at ingest for this user's cycle when
+        available, otherwise falls back to up to 10k pending records for the user (ids only).
+
+        Returns:
+            Sorted int64 numpy array of entry_ids
+        """
+        new_entry_ids = self._new_entry_ids.get(str(user_id))
+        if new_entry_ids is not None and len(new_entry_ids) > 0:
+            logger.info(f"Using {len(new_entry_ids)} entry_ids captured at ingest")
+            self._phase_entry_ids[str(user_id)] = new_entry_ids
+            return new_entry_ids
+
+        logger.info("No ingest entry_ids available, querying database for pending record ids")
+        rows = db.query(models.SentimentData.entry_id).filter(
+            models.SentimentData.user_id == user_id,
+            *pending_criteria
+        ).order_by(models.SentimentData.entry_id).limit(10000).all()  # Process up to 10k records at a time
+        self._phase_entry_ids[str(user_id)] = np.asarray([row.entry_id for row in rows], dtype=np.int64)
+        return self._phase_entry_ids[str(user_id)]
+
+    @staticmethod
+    def _split_entry_ids(entry_ids: np.ndarray, batch_size: int) -> List[np.ndarray]:
+        """Split a sorted entry_id array into contiguous batches."""
+        return [entry_ids[i:i + batch_size] for i in range(0, len(entry_ids), batch_size)]
+
+    def _load_batch_rows(self, db: Session, user_id: str, entry_ids: np.ndarray, columns: List, *criteria) -> List:
+        """
+        Load only the given columns for a batch of entry_ids.
+
+        Selects by primary-key range (entry_ids is sorted) so the lookup is an index range
+        scan, then keeps only the ids that belong to the batch.
+        """
+        if len(entry_ids) == 0:
+            return []
+        rows = db.query(models.SentimentData.entry_id, *columns).filter(
+            models.SentimentData.user_id == user_id,
+            models.SentimentData.entry_id.between(int(entry_ids[0]), int(entry_ids[-1])),
+            *criteria
+        ).order_by(models.SentimentData.entry_id).all()
+        wanted = set(entry_ids.tolist())
+        return [row for row in rows if row.entry_id in wanted]
+
     def _run_sentiment_batch_update_parallel(self, user_id: str):
         """Run sentiment analysis in parallel batches for newly inserted unique records or existing unanalyzed records"""
         try:
             logger.info(f"Starting parallel batch sentiment analysis for user {user_id}")
             
-            # Get the database records that need sentiment analysis
+            # Resolve the primary keys of records that need sentiment analysis
             with self.db_factory() as db:
-                # If we have unique records from deduplication, filter to just those
-                if hasattr(self, '_unique_records') and self._unique_records:
-                    logger.info(f"Using unique records from deduplication for sentiment analysis")
-                    # Query for the records that were just inserted (they won't have sentiment analysis yet)
-                    unique_texts = []
-                    for record in self._unique_records:
-                        text_content = record.get('text') or record.get('content') or record.get('title') or record.get('description')
-                        if text_content:
-                            unique_texts.append(text_content)
-                    
-                    if not unique_texts:
-                        logger.info("No text content found in unique records, skipping sentiment analysis")
-                        return True
-                    
-                    # Query database for the records that were just inserted
-                    records_to_update = db.query(models.SentimentData).filter(
-                        models.SentimentData.user_id == user_id,
-                        models.SentimentData.sentiment_label.is_(None),  # Records without sentiment analysis
-                        models.SentimentData.text.in_(unique_texts)  # Only the newly inserted records
-                    ).all()
-                else:
-                    # No deduplication records, query for all unanalyzed records for this user
-                    logger.info(f"No deduplication records, querying database for all unanalyzed records")
-                    records_to_update = db.query(models.SentimentData).filter(
-                        models.SentimentData.user_id == user_id,
-                        models.SentimentData.sentiment_label.is_(None)  # Records without sentiment analysis
-                    ).limit(10000).all()  # Process up to 10k records at a time
-                
-                if not records_to_update:
-                    logger.info(f"No newly inserted records found for sentiment analysis for user {user_id}")
-                    return True
-                
-                logger.info(f"Found {len(records_to_update)} newly inserted records for parallel sentiment analysis")
-                
-                # Process in parallel batches
-                batch_size = self.sentiment_batch_size
-                processed_count = 0
-                
-                # Split records into batches for parallel processing
-                batches = []
-                for i in range(0, len(records_to_update), batch_size):
-                    batch = records_to_update[i:i + batch_size]
-                    batches.append(batch)
-                
-                actual_sentiment_workers = min(self.max_sentiment_workers, len(batches))
-                logger.info(f"Processing {len(batches)} sentiment batches in parallel with {self.max_sentiment_workers} workers (actual: {actual_sentiment_workers})")
-                auto_schedule_logger.info(f"[PHASE 4: SENTIMENT] Batches: {len(batches)} | Max Workers: {self.max_sentiment_workers} | Actual Workers: {actual_sentiment_workers} | Records: {len(records_to_update)}")
-                
-                # Process batches in parallel
-                batch_results = self._process_sentiment_batches_parallel(batches, user_id)
-                
-                # Count successful processing
-                processed_count = sum(batch_results.values())
-                
-                logger.info(f"Parallel sentiment analysis completed: {processed_count}/{len(records_to_update)} records processed")
+                entry_ids = self._get_pending_entry_ids(
+                    db, user_id,
+                    models.SentimentData.sentiment_label.is_(None)  # Records without sentiment analysis
+                )
                 
-                return processed_count > 0
+                # Target terms for the triage keyword rule
+                target_config = self._get_latest_target_config(db, user_id)
+                target_terms = []
+                if target_config:
+                    target_terms = [target_config.individual_name] + list(target_config.query_variations or [])
+            
+            if len(entry_ids) == 0:
+                logger.info(f"No newly inserted records found for sentiment analysis for user {user_id}")
+                return True
+            
+            logger.info(f"Found {len(entry_ids)} newly inserted records for parallel sentiment analysis")
+            
+            # Split entry_ids into batches for parallel processing
+            batches = self._split_entry_ids(entry_ids, self.sentiment_batch_size)
+            
+            actual_sentiment_workers = min(self.max_sentiment_workers, len(batches))
+            logger.info(f"Processing {len(batches)} sentiment batches in parallel with {self.max_sentiment_workers} workers (actual: {actual_sentiment_workers})")
+            auto_schedule_logger.info(f"[PHASE 4: SENTIMENT] Batches: {len(batches)} | Max Workers: {self.max_sentiment_workers} | Actual Workers: {actual_sentiment_workers} | Records: {len(entry_ids)}")
+            
+            # Process batches in parallel
+            batch_results = self._process_sentiment_batches_parallel(batches, user_id, target_terms)
+            
+            # Count successful processing
+            processed_count = sum(batch_results.values())
+            
+            logger.info(f"Parallel sentiment analysis completed: {processed_count}/{len(entry_ids)} records processed")
+            
+            return processed_count > 0
                 
         except Exception as e:
             logger.error(f"Error during parallel sentiment batch update: {e}", exc_info=True)
             return False
     
-    def _process_sentiment_batches_parallel(self, batches: List[List], user_id: str) -> Dict[int, int]:
-        """Process sentiment analysis batches in parallel using ThreadPoolExecutor."""
+    def _process_sentiment_batches_parallel(self, batches: List[np.ndarray], user_id: str,
+                                            target_terms: Optional[List[str]] = None) -> Dict[int, int]:
+        """Process sentiment analysis batches (arrays of entry_ids) in parallel using ThreadPoolExecutor."""
         results = {}
+        triage_totals = {'skipped': 0, 'tokens_saved': 0, 'reasons': {}}
+        triage_lock = threading.Lock()
+        sentiment_columns = [
+            models.SentimentData.text,
+            models.SentimentData.content,
+            models.SentimentData.title,
+            models.SentimentData.description,
+            models.SentimentData.source_type
+        ]
         
         def process_single_batch(batch_data: tuple) -> int:
-            """Process a single batch of records and return count of processed records."""
-            batch_idx, batch = batch_data
+            """Process a single batch of entry_ids and return count of processed records."""
+            batch_idx, batch_entry_ids = batch_data
             processed_in_batch = 0
             
             try:
-                logger.info(f"Processing sentiment batch {batch_idx + 1}/{len(batches)} ({len(batch)} records)")
+                logger.info(f"Processing sentiment batch {batch_idx + 1}/{len(batches)} ({len(batch_entry_ids)} records)")
                 
                 # Create a new database session for this thread
                 with self.db_factory() as db:
-                    # Prepare batch data
-                    records_list = []
-                    texts_list = []
-                    source_types_list = []
+                    # Load only the columns the analyzers need, by primary-key range
+                    rows = self._load_batch_rows(
+                        db, user_id, batch_entry_ids, sentiment_columns,
+                        models.SentimentData.sentiment_label.is_(None)
+                    )
                     
-                    for record in batch:
-                        # CRITICAL FIX: Merge record into this thread's session
-                        record = db.merge(record)
-                        records_list.append(record)
-                        
-                        text_content = record.text or record.content or record.title or record.description
-                        if text_content:
-                            texts_list.append(text_content)
-                            source_types_list.append(record.source_type)
-                        else:
-                            texts_list.append("")  # Empty text placeholder
-                            source_types_list.append(record.source_type)
+                    texts_list = [row.text or row.content or row.title or row.description or "" for row in rows]
+                    match_texts = [" ".join(filter(None, [row.title, row.text, row.content, row.description])) for row in rows]
+                    result_writer = BulkResultWriter(db)
+                    
+                    # Drop records that shouldn't reach the model; they get a default result tagged with the reason
+                    triage = self.record_triage.triage(texts_list, target_terms, match_texts)
+                    if triage.skipped:
+                        with triage_lock:
+                            triage_totals['skipped'] += len(triage.skipped)
+                            triage_totals['tokens_saved'] += triage.estimated_tokens_saved
+                            for reason, count in triage.reason_counts().items():
+                                triage_totals['reasons'][reason] = triage_totals['reasons'].get(reason, 0) + count
+                    send_rows = [rows[i] for i in triage.send_indices]
+                    send_texts = [texts_list[i] for i in triage.send_indices]
+                    send_source_types = [row.source_type for row in send_rows]
+                    sent_results = []
                     
-                    if texts_list:
+                    if send_texts:
                         # Batch process all texts at once
                         try:
-                            analysis_results = self.data_processor.batch_get_sentiment(
-                                texts_list, 
-                                source_types_list, 
-                                max_workers=min(self.max_sentiment_workers, len(texts_list))
+                            sent_results = self.data_processor.batch_get_sentiment(
+                                send_texts, 
+                                send_source_types, 
+                                max_workers=min(self.max_sentiment_workers, len(send_texts))
                             )
-                            
-                            # Update all records with batch results
-                            for i, record in enumerate(records_list):
-                                if i < len(analysis_results):
-                                    try:
-                                        analysis_result = analysis_results[i]
-                                        
-                                        # Update record with presidential sentiment analysis
-                                        record.sentiment_label = analysis_result['sentiment_label']
-                                        record.sentiment_score = analysis_result['sentiment_score']
-                                        record.sentiment_justification = analysis_result['sentiment_justification']
-                                        
-                                        # Update record with governance classification (two-phase: ministry + issue)
-                                        record.issue_label = analysis_result.get('issue_label')
-                                        record.issue_slug = analysis_result.get('issue_slug')
-                                        record.issue_confidence = analysis_result.get('issue_confidence')
-                                        record.issue_keywords = json.dumps(analysis_result.get('issue_keywords', []))
-                                        record.ministry_hint = analysis_result.get('ministry_hint')
-                                        
-                                        # Store embedding in separate table
-                                        embedding_data = analysis_result.get('embedding', [])
-                                        if embedding_data and len(embedding_data) == 1536:  # Validate embedding
-                                            try:
-                                                # Check if embedding already exists for this record
-                                                existing_embedding = db.query(models.SentimentEmbedding).filter(
-                                                    models.SentimentEmbedding.entry_id == record.entry_id
-                                                ).first()
-                                                
-                                                if existing_embedding:
-                                                    # Update existing embedding
-                                                    existing_embedding.embedding = json.dumps(embedding_data)
-                                                    existing_embedding.embedding_model = 'text-embedding-3-small'
-                                                else:
-                                                    # Create new embedding record
-                                                    new_embedding = models.SentimentEmbedding(
-                                                        entry_id=record.entry_id,
-                                                        embedding=json.dumps(embedding_data),
-                                                        embedding_model='text-embedding-3-small'
-                                                    )
-                                                    db.add(new_embedding)
-                                            except Exception as e:
-                                                logger.warning(f"Failed to store embedding for record {record.entry_id}: {e}")
-                                        
-                                        processed_in_batch += 1
-                                        
-                                    except Exception as e:
-                                        logger.error(f"Error processing record {record.entry_id}: {e}")
-                                        continue
                         except Exception as e:
                             logger.error(f"Error in batch sentiment processing: {e}")
                             # Fallback to sequential processing
-                            for record in records_list:
+                            sent_results = []
+                            for row, text_content in zip(send_rows, send_texts):
                                 try:
-                                    text_content = record.text or record.content or record.title or record.description
-                                    if text_content:
-                                        analysis_result = self.data_processor.get_sentiment(text_content, record.source_type)
-                                        
-                                        record.sentiment_label = analysis_result['sentiment_label']
-                                        record.sentiment_score = analysis_result['sentiment_score']
-                                        record.sentiment_justification = analysis_result['sentiment_justification']
-                                        record.issue_label = analysis_result.get('issue_label')
-                                        record.issue_slug = analysis_result.get('issue_slug')
-                                        record.issue_confidence = analysis_result.get('issue_confidence')
-                                        record.issue_keywords = json.dumps(analysis_result.get('issue_keywords', []))
-                                        record.ministry_hint = analysis_result.get('ministry_hint')
-                                        processed_in_batch += 1
+                                    sent_results.append(self.data_processor.get_sentiment(text_content, row.source_type))
                                 except Exception as e2:
-                                    logger.error(f"Error in fallback processing for record {record.entry_id}: {e2}")
-                                    continue
+                                    logger.error(f"Error in fallback processing for record {row.entry_id}: {e2}")
+                                    sent_results.append(None)
+                    
+                    # Queue sentiment, issue and embedding results (including triaged records) for a single bulk write
+                    for row, analysis_result in zip(rows, triage.expand(sent_results)):
+                        if analysis_result is None:
+                            continue
+                        try:
+                            result_writer.add(row.entry_id, analysis_result)
+                            processed_in_batch += 1
+                        except Exception as e:
+                            logger.error(f"Error processing record {row.entry_id}: {e}")
+                            continue
+                    
+                    # One UPDATE for sentiment_data and one upsert for sentiment_embeddings
+                    result_writer.flush()
                     
                     # Commit changes for this batch
                     db.commit()
@@ -2819,6 +3044,7 @@ class SentimentAnalysisAgent:
                 
             except Exception as e:
                 logger.error(f"Error processing sentiment batch {batch_idx + 1}: {e}")
+                processed_in_batch = 0
             
             return processed_in_batch
         
@@ -2839,6 +3065,10 @@ class SentimentAnalysisAgent:
                     logger.error(f"Exception in sentiment batch {batch_idx}: {e}")
                     results[batch_idx] = 0
         
+        self._triage_stats = triage_totals
+        logger.info(f"Triage skipped {triage_totals['skipped']} records before the LLM (~{triage_totals['tokens_saved']} tokens saved): {triage_totals['reasons']}")
+        auto_schedule_logger.info(f"[PHASE 4: SENTIMENT] Triage | User: {user_id} | Skipped: {triage_totals['skipped']} | Estimated Tokens Saved: {triage_totals['tokens_saved']} | Reasons: {triage_totals['reasons']}")
+        
         return results
 
     def _run_location_batch_update_parallel(self, user_id: str):
@@ -2846,117 +3076,114 @@ class SentimentAnalysisAgent:
         try:
             logger.info(f"Starting parallel batch location updates for user {user_id}")
             
+            # Resolve the primary keys of records that need location updates
             with self.db_factory() as db:
-                # If we have unique records from deduplication, filter to just those
-                if hasattr(self, '_unique_records') and self._unique_records:
-                    logger.info(f"Using unique records from deduplication for location updates")
-                    # Query for the records that were just inserted (they won't have location data yet)
-                    unique_texts = []
-                    for record in self._unique_records:
-                        text_content = record.get('text') or record.get('content') or record.get('title') or record.get('description')
-                        if text_content:
-                            unique_texts.append(text_content)
-                    
-                    if not unique_texts:
-                        logger.info("No text content found in unique records, skipping location updates")
-                        return True
-                    
-                    # Query database for the newly inserted records that need location updates
-                    records_needing_location = db.query(models.SentimentData).filter(
-                        models.SentimentData.user_id == user_id,
-                        models.SentimentData.text.in_(unique_texts),  # Only the newly inserted records
-                        or_(
-                            models.SentimentData.location_label.is_(None),
-                            models.SentimentData.location_confidence < 0.7
-                        )
-                    ).all()
-                else:
-                    # No deduplication records, query for all unanalyzed records for this user
-                    logger.info(f"No deduplication records, querying database for all records needing location updates")
-                    records_needing_location = db.query(models.SentimentData).filter(
-                        models.SentimentData.user_id == user_id,
-                        or_(
-                            models.SentimentData.location_label.is_(None),
-                            models.SentimentData.location_confidence < 0.7
-                        )
-                    ).limit(10000).all()  # Process up to 10k records at a time
-                
-                if not records_needing_location:
-                    logger.info(f"No newly inserted records need location updates for user {user_id}")
-                    return True
-                
-                logger.info(f"Found {len(records_needing_location)} newly inserted records for parallel location updates")
-                
-                # Process in parallel batches
-                batch_size = self.location_batch_size
-                
-                # Split records into batches for parallel processing
-                batches = []
-                for i in range(0, len(records_needing_location), batch_size):
-                    batch = records_needing_location[i:i + batch_size]
-                    batches.append(batch)
-                
-                actual_location_workers = min(self.max_location_workers, len(batches))
-                logger.info(f"Processing {len(batches)} location batches in parallel with {self.max_location_workers} workers (actual: {actual_location_workers})")
-                auto_schedule_logger.info(f"[PHASE 5: LOCATION] Batches: {len(batches)} | Max Workers: {self.max_location_workers} | Actual Workers: {actual_location_workers} | Records: {len(records_needing_location)}")
-                
-                # Process batches in parallel
-                batch_results = self._process_location_batches_parallel(batches, user_id)
-                
-                # Count successful processing
-                updated_count = sum(batch_results.values())
-                
-                logger.info(f"Parallel location updates completed: {updated_count}/{len(records_needing_location)} records updated")
-                
-                return updated_count > 0
+                entry_ids = self._get_pending_entry_ids(
+                    db, user_id,
+                    or_(
+                        models.SentimentData.location_label.is_(None),
+                        models.SentimentData.location_confidence < 0.7
+                    )
+                )
+            
+            if len(entry_ids) == 0:
+                logger.info(f"No newly inserted records need location updates for user {user_id}")
+                return True
+            
+            logger.info(f"Found {len(entry_ids)} newly inserted records for parallel location updates")
+            
+            # Split entry_ids into batches for parallel processing
+            batches = self._split_entry_ids(entry_ids, self.location_batch_size)
+            
+            actual_location_workers = min(self.max_location_workers, len(batches))
+            logger.info(f"Processing {len(batches)} location batches in parallel with {self.max_location_workers} workers (actual: {actual_location_workers})")
+            auto_schedule_logger.info(f"[PHASE 5: LOCATION] Batches: {len(batches)} | Max Workers: {self.max_location_workers} | Actual Workers: {actual_location_workers} | Records: {len(entry_ids)}")
+            
+            # Process batches in parallel
+            batch_results = self._process_location_batches_parallel(batches, user_id)
+            
+            # Count successful processing
+            updated_count = sum(batch_results.values())
+            
+            logger.info(f"Parallel location updates completed: {updated_count}/{len(entry_ids)} records updated")
+            
+            return updated_count > 0
                 
         except Exception as e:
             logger.error(f"Error during parallel location batch update: {e}", exc_info=True)
             return False
     
-    def _process_location_batches_parallel(self, batches: List[List], user_id: str) -> Dict[int, int]:
-        """Process location classification batches in parallel using ThreadPoolExecutor."""
+    def _process_location_batches_parallel(self, batches: List[np.ndarray], user_id: str) -> Dict[int, int]:
+        """Process location classification batches (arrays of entry_ids) in parallel using ThreadPoolExecutor."""
         results = {}
+        location_columns = [
+            models.SentimentData.text,
+            models.SentimentData.content,
+            models.SentimentData.title,
+            models.SentimentData.platform,
+            models.SentimentData.source,
+            models.SentimentData.user_location,
+            models.SentimentData.user_name,
+            models.SentimentData.user_handle
+        ]
         
         def process_single_location_batch(batch_data: tuple) -> int:
-            """Process a single batch of records for location classification and return count of updated records."""
-            batch_idx, batch = batch_data
+            """Process a single batch of entry_ids for location classification and return count of updated records."""
+            batch_idx, batch_entry_ids = batch_data
             updated_in_batch = 0
             
             try:
-                logger.info(f"Processing location batch {batch_idx + 1}/{len(batches)} ({len(batch)} records)")
+                logger.info(f"Processing location batch {batch_idx + 1}/{len(batches)} ({len(batch_entry_ids)} records)")
                 
                 # Create a new database session for this thread
                 with self.db_factory() as db:
-                    for record in batch:
+                    rows = self._load_batch_rows(
+                        db, user_id, batch_entry_ids, location_columns,
+                        or_(
+                            models.SentimentData.location_label.is_(None),
+                            models.SentimentData.location_confidence < 0.7
+                        )
+                    )
+                    update_mappings = []
+                    classified_at = datetime.utcnow()  # Moves run_timestamp so the API cache re-reads the row
+                    
+                    for row in rows:
                         try:
-                            text = record.text or record.content or record.title or ""
-                            platform = record.platform or ""
-                            source = record.source or ""
-                            user_location = record.user_location or ""
-                            user_name = record.user_name or ""
-                            user_handle = record.user_handle or ""
+                            text = row.text or row.content or row.title or ""
+                            platform = row.platform or ""
+                            source = row.source or ""
+                            user_location = row.user_location or ""
+                            user_name = row.user_name or ""
+                            user_handle = row.user_handle or ""
                             
                             # Perform location classification
                             location_label, confidence = self.location_classifier.classify(
                                 text, platform, source, user_location, user_name, user_handle
                             )
                             
-                            # Update record with location data
-                            record.location_label = location_label
-                            record.location_confidence = confidence
+                            update_mappings.append({
+                                'entry_id': row.entry_id,
+                                'location_label': location_label,
+                                'location_confidence': confidence,
+                                'run_timestamp': classified_at
+                            })
                             updated_in_batch += 1
                             
                         except Exception as e:
-                            logger.error(f"Error updating location for record {record.entry_id}: {e}")
+                            logger.error(f"Error updating location for record {row.entry_id}: {e}")
                             continue
                     
+                    # Write location data for this batch in one bulk update
+                    if update_mappings:
+                        db.bulk_update_mappings(models.SentimentData, update_mappings)
+                    
                     # Commit changes for this batch
                     db.commit()
                     logger.info(f"✅ Committed location batch {batch_idx + 1}/{len(batches)} ({updated_in_batch} records)")
                 
             except Exception as e:
                 logger.error(f"Error processing location batch {batch_idx + 1}: {e}")
+                updated_in_batch = 0
             
             return updated_in_batch
         
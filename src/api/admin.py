@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, case, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import uuid
 from pydantic import BaseModel
 
-from .database import get_db
+from .database import get_db, get_async_db
 from . import models
 from .auth import get_current_user_id
+from .usage_rollup import UsageTotals, refresh_usage_rollup, usage_totals_by_user, daily_usage
 
 # Create router
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -47,9 +49,9 @@ class DetailedUsageLog(BaseModel):
     error_message: Optional[str] = None
 
 # Admin authorization middleware
-async def admin_only(user_id: str = Depends(get_current_user_id), db: Session = Depends(get_db)):
+async def admin_only(user_id: str = Depends(get_current_user_id), db: AsyncSession = Depends(get_async_db)):
     """Dependency to ensure only admin users can access these routes"""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user or not user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -62,17 +64,17 @@ async def admin_only(user_id: str = Depends(get_current_user_id), db: Session =
 async def get_all_users(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(admin_only)
 ):
     """Get list of all users (admin only)"""
-    users = db.query(models.User).offset(skip).limit(limit).all()
+    users = (await db.execute(select(models.User).offset(skip).limit(limit))).scalars().all()
     return users
 
 @router.get("/users/{user_id}", response_model=UserInfo)
 async def get_user_details(
     user_id: str, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(admin_only)
 ):
     """Get detailed information about a specific user (admin only)"""
@@ -81,14 +83,14 @@ async def get_user_details(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format")
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, uuid_obj)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     return user
 
 @router.get("/usage", response_model=List[UserUsageStats])
-async def get_user_usage_stats(
+def get_user_usage_stats(
     days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db),
     _: str = Depends(admin_only)
@@ -98,56 +100,39 @@ async def get_user_usage_stats(
     now = datetime.utcnow()
     recent_date = now - timedelta(days=days)
     
-    results = []
-    users = db.query(models.User).all()
+    # Fold completed days into the daily rollup, then aggregate with grouped queries
+    refresh_usage_rollup(db, now)
+    usage_totals = usage_totals_by_user(db, recent_date, now)
     
-    for user in users:
-        # Get total API calls
-        total_api_calls = user.api_calls_count
-        
-        # Get total data entries
-        total_data_entries = db.query(func.count(models.SentimentData.entry_id))\
-            .filter(models.SentimentData.user_id == user.id).scalar() or 0
-        
-        # Get recent API calls (from the usage log)
-        recent_calls = db.query(func.count(models.UserSystemUsage.id))\
-            .filter(models.UserSystemUsage.user_id == user.id)\
-            .filter(models.UserSystemUsage.timestamp >= recent_date).scalar() or 0
-        
-        # Get recent data entries
-        recent_entries = db.query(func.count(models.SentimentData.entry_id))\
-            .filter(models.SentimentData.user_id == user.id)\
-            .filter(models.SentimentData.created_at >= recent_date).scalar() or 0
-        
-        # Calculate average execution time
-        avg_time = db.query(func.avg(models.UserSystemUsage.execution_time_ms))\
-            .filter(models.UserSystemUsage.user_id == user.id).scalar()
-        
-        # Calculate error rate
-        total_requests = db.query(func.count(models.UserSystemUsage.id))\
-            .filter(models.UserSystemUsage.user_id == user.id).scalar() or 1  # avoid div by zero
-        
-        error_count = db.query(func.count(models.UserSystemUsage.id))\
-            .filter(models.UserSystemUsage.user_id == user.id)\
-            .filter(models.UserSystemUsage.is_error == True).scalar() or 0
-        
-        error_rate = (error_count / total_requests) * 100 if total_requests > 0 else 0
-        
+    # Total and recent data entries per user in one pass
+    entry_counts = {
+        user_id: (total or 0, recent or 0)
+        for user_id, total, recent in db.query(
+            models.SentimentData.user_id,
+            func.count(models.SentimentData.entry_id),
+            func.sum(case((models.SentimentData.created_at >= recent_date, 1), else_=0))
+        ).group_by(models.SentimentData.user_id)
+    }
+    
+    results = []
+    for user_id, email, api_calls_count in db.query(models.User.id, models.User.email, models.User.api_calls_count):
+        totals = usage_totals.get(user_id, UsageTotals())
+        total_data_entries, recent_entries = entry_counts.get(user_id, (0, 0))
         results.append(UserUsageStats(
-            user_id=str(user.id),
-            email=user.email,
-            total_api_calls=total_api_calls,
+            user_id=str(user_id),
+            email=email,
+            total_api_calls=api_calls_count or 0,
             total_data_entries=total_data_entries,
-            recent_calls=recent_calls,
+            recent_calls=totals.recent_requests,
             recent_entries=recent_entries,
-            avg_execution_time=avg_time,
-            error_rate=error_rate
+            avg_execution_time=totals.avg_execution_time,
+            error_rate=totals.error_rate
         ))
     
     return results
 
 @router.get("/usage/{user_id}/by-date", response_model=List[UsageByDate])
-async def get_user_usage_by_date(
+def get_user_usage_by_date(
     user_id: str,
     days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db),
@@ -163,34 +148,19 @@ async def get_user_usage_by_date(
     now = datetime.utcnow()
     start_date = now - timedelta(days=days)
     
-    # Get daily usage counts
-    query = db.query(
-        func.date_trunc('day', models.UserSystemUsage.timestamp).label('date'),
-        func.count(models.UserSystemUsage.id).label('count')
-    ).filter(
-        models.UserSystemUsage.user_id == user_id,
-        models.UserSystemUsage.timestamp >= start_date
-    ).group_by(
-        func.date_trunc('day', models.UserSystemUsage.timestamp)
-    ).order_by(
-        func.date_trunc('day', models.UserSystemUsage.timestamp)
-    )
-    
-    results = []
-    for row in query:
-        results.append(UsageByDate(
-            date=row.date.strftime('%Y-%m-%d'),
-            count=row.count
-        ))
-    
-    return results
+    # Get daily usage counts (rolled-up days plus the raw tail)
+    refresh_usage_rollup(db, now)
+    return [
+        UsageByDate(date=day.strftime('%Y-%m-%d'), count=count)
+        for day, count in daily_usage(db, uuid_obj, start_date, now)
+    ]
 
 @router.get("/usage/{user_id}/logs", response_model=List[DetailedUsageLog])
 async def get_user_usage_logs(
     user_id: str,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(admin_only)
 ):
     """Get detailed usage logs for a specific user (admin only)"""
@@ -199,64 +169,63 @@ async def get_user_usage_logs(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format")
     
-    logs = db.query(models.UserSystemUsage)\
-        .filter(models.UserSystemUsage.user_id == user_id)\
-        .order_by(desc(models.UserSystemUsage.timestamp))\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    logs = (await db.execute(
+        select(models.UserSystemUsage)
+        .where(models.UserSystemUsage.user_id == uuid_obj)
+        .order_by(desc(models.UserSystemUsage.timestamp))
+        .offset(skip)
+        .limit(limit)
+    )).scalars().all()
     
     return logs
 
 @router.get("/summary")
-async def get_system_summary(
+def get_system_summary(
     db: Session = Depends(get_db),
     _: str = Depends(admin_only)
 ):
     """Get summary statistics of the entire system (admin only)"""
-    # Total users
-    total_users = db.query(func.count(models.User.id)).scalar() or 0
+    now = datetime.utcnow()
     
-    # Active users in last 30 days
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    active_users = db.query(func.count(func.distinct(models.UserSystemUsage.user_id)))\
-        .filter(models.UserSystemUsage.timestamp >= thirty_days_ago).scalar() or 0
+    # Total users and total API calls
+    total_users, total_api_calls = db.query(
+        func.count(models.User.id), func.sum(models.User.api_calls_count)
+    ).one()
     
     # Total data entries
     total_entries = db.query(func.count(models.SentimentData.entry_id)).scalar() or 0
     
-    # Total API calls
-    total_api_calls = db.query(func.sum(models.User.api_calls_count)).scalar() or 0
+    # Active users, error rate and response time from the daily rollup plus the raw tail
+    refresh_usage_rollup(db, now)
+    usage_totals = usage_totals_by_user(db, now - timedelta(days=30), now)
+    active_users = sum(1 for totals in usage_totals.values() if totals.recent_requests)
+    system_totals = UsageTotals(
+        requests=sum(totals.requests for totals in usage_totals.values()),
+        errors=sum(totals.errors for totals in usage_totals.values()),
+        execution_time_sum_ms=sum(totals.execution_time_sum_ms for totals in usage_totals.values()),
+        execution_time_count=sum(totals.execution_time_count for totals in usage_totals.values())
+    )
     
     # Recent API calls (last 24 hours)
-    day_ago = datetime.utcnow() - timedelta(days=1)
+    day_ago = now - timedelta(days=1)
     recent_calls = db.query(func.count(models.UserSystemUsage.id))\
         .filter(models.UserSystemUsage.timestamp >= day_ago).scalar() or 0
     
-    # System error rate
-    total_requests = db.query(func.count(models.UserSystemUsage.id)).scalar() or 1
-    error_count = db.query(func.count(models.UserSystemUsage.id))\
-        .filter(models.UserSystemUsage.is_error == True).scalar() or 0
-    error_rate = (error_count / total_requests) * 100 if total_requests > 0 else 0
-    
-    # Average response time
-    avg_time = db.query(func.avg(models.UserSystemUsage.execution_time_ms)).scalar()
-    
     return {
-        "total_users": total_users,
+        "total_users": total_users or 0,
         "active_users_30d": active_users,
         "total_data_entries": total_entries,
-        "total_api_calls": total_api_calls,
+        "total_api_calls": total_api_calls or 0,
         "api_calls_24h": recent_calls,
-        "error_rate": error_rate,
-        "avg_response_time_ms": avg_time
+        "error_rate": system_totals.error_rate,
+        "avg_response_time_ms": system_totals.avg_execution_time
     }
 
 # API to toggle admin status
 @router.put("/users/{user_id}/toggle-admin")
 async def toggle_admin_status(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: str = Depends(admin_only)
 ):
     """Toggle admin status for a user (admin only)"""
@@ -265,7 +234,7 @@ async def toggle_admin_status(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format")
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, uuid_obj)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -278,12 +247,12 @@ async def toggle_admin_status(
     
     # Toggle admin status
     user.is_admin = not user.is_admin
-    db.commit()
+    await db.commit()
     
     return {"id": str(user.id), "email": user.email, "is_admin": user.is_admin}
 
 @router.post("/add-showcase-data")
-async def add_showcase_data(
+def add_showcase_data(
     db: Session = Depends(get_db),
     _: str = Depends(admin_only)
 ):
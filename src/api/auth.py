@@ -1,5 +1,9 @@
 import os
-from fastapi import Depends, HTTPException, status
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from pathlib import Path
@@ -19,33 +23,113 @@ else:
 
 
 # --- Configuration ---
-SECRET_KEY = os.getenv("SUPABASE_JWT_SECRET")
 ALGORITHM = "HS256"  # Supabase uses HS256 for JWT signing
+# Verified tokens are reused until this many seconds pass or the token expires, whichever is first
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
 
-if not SECRET_KEY:
+
+def load_jwt_secret() -> Optional[str]:
+    """Read SUPABASE_JWT_SECRET once (falling back to config/.env); callers share SECRET_KEY."""
+    secret_key = os.getenv("SUPABASE_JWT_SECRET")
+    if secret_key:
+        return secret_key
     logger.error("CRITICAL: SUPABASE_JWT_SECRET environment variable not set. Authentication will fail.")
     # Try to load from config/.env if not already loaded
-    from pathlib import Path
     config_env_path = Path(__file__).parent.parent.parent / "config" / ".env"
     if config_env_path.exists():
         load_dotenv(dotenv_path=config_env_path)
-        SECRET_KEY = os.getenv("SUPABASE_JWT_SECRET")
-        if SECRET_KEY:
+        secret_key = os.getenv("SUPABASE_JWT_SECRET")
+        if secret_key:
             logger.info("Successfully loaded SUPABASE_JWT_SECRET from config/.env")
         else:
             logger.error("SUPABASE_JWT_SECRET still not found after loading config/.env")
     else:
         logger.error("Config .env file not found. Please create config/.env with SUPABASE_JWT_SECRET")
+    return secret_key
+
+
+SECRET_KEY = load_jwt_secret()
+
+
+class VerifiedTokenCache:
+    """
+    LRU cache of verified token -> claims.
+
+    Entries expire at the token's exp claim or after the TTL, so a cached token is never
+    accepted past its expiry. Failed verifications are not cached.
+    """
+
+    def __init__(self, ttl_seconds: int = TOKEN_CACHE_TTL_SECONDS, max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if expires_at <= now:
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any]):
+        expires_at = time.time() + self.ttl_seconds
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, claims["exp"])
+        with self._lock:
+            self._entries[token] = (expires_at, claims)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache()
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a Supabase JWT and return its claims, reusing earlier verifications of the same token.
+
+    Raises:
+        JWTError (ExpiredSignatureError for expired tokens) when the token cannot be verified
+    """
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+    if not SECRET_KEY:
+        raise JWTError("SUPABASE_JWT_SECRET is not set")
+    # Supabase standard JWTs don't always require audience/issuer validation on backend
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_aud": False})
+    token_cache.put(token, claims)
+    return claims
 
 # --- Reusable Security Scheme ---
 token_scheme = HTTPBearer()
 
 # --- Authentication Dependency ---
-async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(token_scheme)) -> UUID:
+async def get_current_user_id(request: Request, credentials: HTTPAuthorizationCredentials = Depends(token_scheme)) -> UUID:
     """
     Dependency function to verify the JWT token and extract the user ID.
+    Reuses the user ID UsageTrackingMiddleware already verified for this request when present.
 
     Args:
+        request: The incoming request (request.state.user_id is set by the middleware).
         credentials: The HTTP Authorization credentials (Bearer token).
 
     Returns:
@@ -65,6 +149,10 @@ async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depend
             headers={"WWW-Authenticate": "Bearer"},
         )
         
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is not None:
+        return user_id
+
     token = credentials.credentials
     logger.debug(f"get_current_user_id: Received token starting with: {token[:10]}...") # Log token prefix
     
@@ -85,19 +173,8 @@ async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depend
              logger.error("SUPABASE_JWT_SECRET is missing, cannot verify token.")
              raise credentials_exception
         
-        logger.info(f"Attempting to decode JWT token with secret length: {len(SECRET_KEY)}")
-        logger.info(f"Token starts with: {token[:20]}... and ends with: ...{token[-20:]}")
-        
-        # Decode the JWT token
-        payload = jwt.decode(
-            token, 
-            SECRET_KEY, 
-            algorithms=[ALGORITHM],
-            options={"verify_aud": False}
-            # Supabase standard JWTs don't always require audience/issuer validation on backend
-            # If needed, add options: options={"verify_aud": False, "verify_iss": False}
-            # Or provide expected audience/issuer: audience="your_audience", issuer="your_issuer"
-        )
+        # Decode the JWT token (cached per token until it expires)
+        payload = verify_token(token)
         
         # Extract the user ID (subject claim)
         user_id: str = payload.get("sub")
@@ -1,33 +1,68 @@
 """
 Centralized Data Cache System for Sentiment Analysis API
-Provides efficient data access and caching for all endpoints
+Keeps a per-user columnar snapshot of sentiment data, refreshed incrementally
+and served stale-while-revalidate under a global memory cap
 """
 
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from threading import Lock
-import json
 
+import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import text, or_
+from sqlalchemy import or_
 
 from . import models
-from .database import get_db
+from .database import SessionLocal
+from .data_query import frame_to_records
+from .target_matching import (
+    target_search_words, compile_target_pattern, match_mask, filter_frame_by_matches, filter_records_by_matches
+)
 
 logger = logging.getLogger(__name__)
 
+# Columns kept in the snapshot: everything SentimentData.to_dict exposes plus the keys used for refresh
+SNAPSHOT_COLUMNS = [
+    'entry_id', 'run_timestamp', 'created_at',
+    'title', 'description', 'content', 'url', 'published_date', 'source', 'source_url', 'query',
+    'language', 'platform', 'date', 'text', 'file_source', 'original_id', 'alert_id', 'published_at',
+    'source_type', 'country', 'favorite', 'tone', 'source_name', 'parent_url', 'parent_id', 'children',
+    'direct_reach', 'cumulative_reach', 'domain_reach', 'tags', 'score', 'alert_name', 'type', 'post_id',
+    'retweets', 'likes', 'user_location', 'comments', 'user_name', 'user_handle', 'user_avatar',
+    'sentiment_label', 'sentiment_score', 'sentiment_justification', 'location_label', 'location_confidence',
+    'issue_label', 'issue_slug', 'issue_confidence', 'issue_keywords', 'ministry_hint'
+]
+# Low-cardinality strings stored as pandas categoricals
+CATEGORICAL_COLUMNS = [
+    'platform', 'source', 'source_name', 'source_type', 'language', 'country', 'query', 'type', 'tone',
+    'sentiment_label', 'location_label', 'issue_label', 'issue_slug', 'ministry_hint', 'file_source', 'alert_name'
+]
+INTEGER_COLUMNS = ['alert_id', 'children', 'direct_reach', 'cumulative_reach', 'domain_reach', 'retweets', 'likes', 'comments']
+DATETIME_COLUMNS = ['run_timestamp', 'created_at', 'published_date', 'date', 'published_at']
+INTERNAL_COLUMNS = ['entry_id', 'run_timestamp', 'created_at', 'ai_processed']
+
+ALL_USERS_KEY = "__all__"
+
+
 @dataclass
-class CacheEntry:
-    """Represents a cached data entry with metadata"""
-    data: Any
-    timestamp: datetime
-    ttl_minutes: int = 15
-    
-    def is_expired(self) -> bool:
-        """Check if cache entry has expired"""
-        return datetime.now() > (self.timestamp + timedelta(minutes=self.ttl_minutes))
+class UserSnapshot:
+    """Columnar snapshot of one user's sentiment data with refresh watermarks"""
+    frame: pd.DataFrame
+    loaded_at: datetime
+    full_loaded_at: datetime
+    entry_id_floor: int = 0                     # Rows above this are re-read on every refresh
+    run_timestamp_watermark: Optional[datetime] = None  # Rows touched after this are re-read
+    nbytes: int = 0
+    refreshing: bool = False
+    stale: bool = False
+    lock: Lock = field(default_factory=Lock)
+
 
 @dataclass
 class DataCacheStats:
@@ -39,292 +74,418 @@ class DataCacheStats:
     sources: List[str] = field(default_factory=list)
     date_range: Tuple[Optional[datetime], Optional[datetime]] = (None, None)
 
+
+@dataclass
+class CacheTimings:
+    """Hit/miss counters and refresh timings"""
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    full_refreshes: int = 0
+    incremental_refreshes: int = 0
+    refresh_errors: int = 0
+    last_full_refresh_ms: Optional[float] = None
+    last_incremental_refresh_ms: Optional[float] = None
+    total_full_refresh_ms: float = 0.0
+    total_incremental_refresh_ms: float = 0.0
+    total_miss_wait_ms: float = 0.0
+
+
 class SentimentDataCache:
-    """Centralized cache for sentiment data with intelligent refresh"""
-    
-    def __init__(self):
-        self._cache: Dict[str, CacheEntry] = {}
+    """
+    Per-user columnar cache for sentiment data.
+
+    Each user's rows live in a pandas DataFrame (categoricals for platform/source/labels).
+    A stale snapshot is returned immediately while a background thread pulls only rows
+    above the entry_id floor or touched since the last run_timestamp watermark (every
+    in-place write to sentiment_data bumps run_timestamp). A full reload happens on
+    first access and every full_refresh_minutes. Snapshots are evicted least-recently-used
+    first when their combined size exceeds max_memory_mb.
+    """
+
+    def __init__(self, ttl_minutes: int = 15, full_refresh_minutes: int = 360,
+                 max_memory_mb: Optional[int] = None, pending_window_hours: int = 24,
+                 watermark_overlap_minutes: int = 10):
+        self._snapshots: "OrderedDict[str, UserSnapshot]" = OrderedDict()
         self._lock = Lock()
-        self._stats = DataCacheStats()
-        
-        # Cache keys
-        self.ALL_DATA_KEY = "all_sentiment_data"
-        self.AI_PROCESSED_KEY = "ai_processed_data"
-        self.STATS_KEY = "data_stats"
-        
-    def _load_all_data_from_db(self, db: Session) -> List[models.SentimentData]:
-        """Load all sentiment data from database"""
+        self._timings = CacheTimings()
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.full_refresh_interval = timedelta(minutes=full_refresh_minutes)
+        self.max_memory_bytes = int(max_memory_mb or int(os.getenv("SENTIMENT_CACHE_MAX_MB", "512"))) * 1024 * 1024
+        # Unanalyzed rows younger than this keep the entry_id floor down so their analysis is picked up
+        self.pending_window = timedelta(hours=pending_window_hours)
+        # Rows are stamped before their transaction commits, so each refresh re-reads this far below the watermark
+        self.watermark_overlap = timedelta(minutes=watermark_overlap_minutes)
+
+    # ------------------------------------------------------------------ loading
+
+    @staticmethod
+    def _cache_key(user_id: Optional[Any]) -> str:
+        return str(user_id) if user_id else ALL_USERS_KEY
+
+    def _query_rows(self, db: Session, user_id: Optional[Any], *criteria) -> pd.DataFrame:
+        """Read snapshot columns for a user (or all users) as a frame."""
+        query = db.query(*[getattr(models.SentimentData, column) for column in SNAPSHOT_COLUMNS])
+        if user_id:
+            from uuid import UUID
+            user_uuid = UUID(user_id) if isinstance(user_id, str) else user_id
+            query = query.filter(models.SentimentData.user_id == user_uuid)
+        if criteria:
+            query = query.filter(*criteria)
+        return pd.DataFrame(query.all(), columns=SNAPSHOT_COLUMNS)
+
+    @staticmethod
+    def _compact(frame: pd.DataFrame) -> pd.DataFrame:
+        """Convert a raw frame to compact dtypes."""
+        for column in DATETIME_COLUMNS:
+            frame[column] = pd.to_datetime(frame[column], errors='coerce')
+        for column in INTEGER_COLUMNS:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').astype('Int64')
+        for column in CATEGORICAL_COLUMNS:
+            frame[column] = frame[column].astype('category')
+        # Precomputed so per-request filters don't re-scan the justification text
+        justification = frame['sentiment_justification']
+        frame['ai_processed'] = justification.notna() & (justification.astype(str).str.strip() != '')
+        return frame
+
+    @staticmethod
+    def _merge(base: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+        """Replace rows of base with the same entry_id as delta and append new ones."""
+        if delta.empty:
+            return base
+        kept = base[~base['entry_id'].isin(delta['entry_id'])]
+        merged = pd.concat([kept.astype({c: object for c in CATEGORICAL_COLUMNS}),
+                            delta.astype({c: object for c in CATEGORICAL_COLUMNS})], ignore_index=True)
+        return merged
+
+    @staticmethod
+    def _order(frame: pd.DataFrame) -> pd.DataFrame:
+        """Newest first by date, as the endpoints expect."""
+        return frame.sort_values(['date', 'entry_id'], ascending=False, na_position='last', kind='stable').reset_index(drop=True)
+
+    def _watermarks(self, frame: pd.DataFrame, now: datetime) -> Tuple[int, Optional[datetime]]:
+        """Compute the entry_id floor and run_timestamp watermark after a refresh."""
+        if frame.empty:
+            return 0, None
+        max_entry_id = int(frame['entry_id'].max())
+        unanalyzed = ~frame['ai_processed']
+        recent = frame['created_at'].isna() | (frame['created_at'] >= now - self.pending_window)
+        pending = frame.loc[unanalyzed & recent, 'entry_id']
+        floor = int(pending.min()) - 1 if not pending.empty else max_entry_id
+        return floor, frame['run_timestamp'].max()
+
+    def _full_load(self, db: Session, user_id: Optional[Any]) -> UserSnapshot:
+        """Load a user's snapshot from scratch."""
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        frame = self._order(self._compact(self._query_rows(db, user_id)))
+        floor, run_watermark = self._watermarks(frame, now)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self._timings.full_refreshes += 1
+        self._timings.last_full_refresh_ms = elapsed_ms
+        self._timings.total_full_refresh_ms += elapsed_ms
+        logger.info(f"Cache full load for {self._cache_key(user_id)} completed in {elapsed_ms:.0f}ms - {len(frame)} records")
+        return UserSnapshot(
+            frame=frame, loaded_at=datetime.now(), full_loaded_at=datetime.now(),
+            entry_id_floor=floor, run_timestamp_watermark=run_watermark,
+            nbytes=int(frame.memory_usage(deep=True).sum())
+        )
+
+    def _incremental_refresh(self, db: Session, user_id: Optional[Any], snapshot: UserSnapshot) -> UserSnapshot:
+        """Pull rows above the entry_id floor or touched since (just under) the run_timestamp watermark."""
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        criteria = [models.SentimentData.entry_id > snapshot.entry_id_floor]
+        if snapshot.run_timestamp_watermark is not None and not pd.isna(snapshot.run_timestamp_watermark):
+            criteria.append(models.SentimentData.run_timestamp >
+                            snapshot.run_timestamp_watermark.to_pydatetime() - self.watermark_overlap)
+        delta = self._compact(self._query_rows(db, user_id, or_(*criteria)))
+
+        frame = self._order(self._compact(self._merge(snapshot.frame, delta)))
+        floor, run_watermark = self._watermarks(frame, now)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self._timings.incremental_refreshes += 1
+        self._timings.last_incremental_refresh_ms = elapsed_ms
+        self._timings.total_incremental_refresh_ms += elapsed_ms
+        logger.info(f"Cache incremental refresh for {self._cache_key(user_id)} in {elapsed_ms:.0f}ms - {len(delta)} rows changed, {len(frame)} total")
+        return UserSnapshot(
+            frame=frame, loaded_at=datetime.now(), full_loaded_at=snapshot.full_loaded_at,
+            entry_id_floor=floor, run_timestamp_watermark=run_watermark,
+            nbytes=int(frame.memory_usage(deep=True).sum())
+        )
+
+    def _store(self, key: str, snapshot: UserSnapshot):
+        """Insert a snapshot as most recently used and evict others over the memory cap."""
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            total = sum(entry.nbytes for entry in self._snapshots.values())
+            while total > self.max_memory_bytes and len(self._snapshots) > 1:
+                evicted_key, evicted = self._snapshots.popitem(last=False)
+                total -= evicted.nbytes
+                self._timings.evictions += 1
+                logger.info(f"Evicted cache snapshot for {evicted_key} ({evicted.nbytes / 1024 / 1024:.1f} MB)")
+
+    def _refresh(self, user_id: Optional[Any], snapshot: UserSnapshot, db: Optional[Session] = None):
+        """Refresh a snapshot (full or incremental) and store it; used inline and from the background thread."""
+        key = self._cache_key(user_id)
+        own_session = db is None
+        db = db or SessionLocal()
         try:
-            logger.info("Loading all sentiment data from database...")
-            results = db.query(models.SentimentData).order_by(models.SentimentData.date.desc()).all()
-            logger.info(f"Loaded {len(results)} records from database")
-            return results
+            if datetime.now() - snapshot.full_loaded_at > self.full_refresh_interval:
+                refreshed = self._full_load(db, user_id)
+            else:
+                refreshed = self._incremental_refresh(db, user_id, snapshot)
+            self._store(key, refreshed)
         except Exception as e:
-            logger.error(f"Error loading data from database: {e}")
-            return []
-    
-    def _load_ai_processed_data_from_db(self, db: Session) -> List[models.SentimentData]:
-        """Load only AI processed data (with justification)"""
+            self._timings.refresh_errors += 1
+            logger.error(f"Error refreshing cache for {key}: {e}", exc_info=True)
+        finally:
+            snapshot.refreshing = False
+            if own_session:
+                db.close()
+
+    def _revalidate_in_background(self, user_id: Optional[Any], snapshot: UserSnapshot):
+        """Start at most one background refresh per snapshot."""
+        with snapshot.lock:
+            if snapshot.refreshing:
+                return
+            snapshot.refreshing = True
+        threading.Thread(target=self._refresh, args=(user_id, snapshot), daemon=True,
+                         name=f"cache-refresh-{self._cache_key(user_id)}").start()
+
+    def _get_frame(self, db: Session, user_id: Optional[Any], force_refresh: bool = False) -> pd.DataFrame:
+        """Return the user's snapshot frame, loading on miss and revalidating when stale."""
+        key = self._cache_key(user_id)
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._snapshots.move_to_end(key)
+
+        if snapshot is None:
+            start = time.perf_counter()
+            snapshot = self._full_load(db, user_id)
+            self._store(key, snapshot)
+            self._timings.misses += 1
+            self._timings.total_miss_wait_ms += (time.perf_counter() - start) * 1000
+            return snapshot.frame
+
+        if force_refresh:
+            self._refresh(user_id, snapshot, db)
+            with self._lock:
+                snapshot = self._snapshots.get(key, snapshot)
+            self._timings.hits += 1
+            return snapshot.frame
+
+        if snapshot.stale or datetime.now() - snapshot.loaded_at > self.ttl:
+            self._timings.stale_hits += 1
+            self._revalidate_in_background(user_id, snapshot)
+        else:
+            self._timings.hits += 1
+        return snapshot.frame
+
+    # ------------------------------------------------------------------ public API
+
+    def refresh_cache(self, db: Session, force: bool = False, user_id: Optional[Any] = None) -> bool:
+        """Refresh a user's snapshot inline (full load if not cached yet)"""
         try:
-            logger.info("Loading AI processed data from database...")
-            results = db.query(models.SentimentData)\
-                        .filter(models.SentimentData.sentiment_justification.isnot(None))\
-                        .filter(models.SentimentData.sentiment_justification != "")\
-                        .order_by(models.SentimentData.date.desc()).all()
-            logger.info(f"Loaded {len(results)} AI processed records from database")
-            return results
+            self._get_frame(db, user_id, force_refresh=force)
+            return True
         except Exception as e:
-            logger.error(f"Error loading AI processed data: {e}")
-            return []
-    
-    def _generate_stats(self, data: List[models.SentimentData]) -> DataCacheStats:
-        """Generate statistics from data"""
-        if not data:
+            logger.error(f"Error refreshing cache: {e}")
+            return False
+
+    def get_all_frame(self, db: Session, user_id: Optional[Any] = None, force_refresh: bool = False) -> pd.DataFrame:
+        """Get a user's sentiment data as a frame (newest first)"""
+        return self._get_frame(db, user_id, force_refresh)
+
+    def get_ai_processed_frame(self, db: Session, user_id: Optional[Any] = None, force_refresh: bool = False) -> pd.DataFrame:
+        """Get a user's AI processed rows (with justification) as a frame (newest first)"""
+        frame = self._get_frame(db, user_id, force_refresh)
+        return frame[frame['ai_processed']]
+
+    def get_all_data(self, db: Session, force_refresh: bool = False, user_id: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Get all sentiment data as SentimentData.to_dict-shaped records"""
+        return self.to_records(self.get_all_frame(db, user_id, force_refresh))
+
+    def get_ai_processed_data(self, db: Session, force_refresh: bool = False, user_id: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Get AI processed data as SentimentData.to_dict-shaped records"""
+        return self.to_records(self.get_ai_processed_frame(db, user_id, force_refresh))
+
+    def get_stats(self, db: Session, user_id: Optional[Any] = None) -> DataCacheStats:
+        """Get data statistics"""
+        frame = self._get_frame(db, user_id)
+        if frame.empty:
             return DataCacheStats()
-        
-        platforms = list(set(record.platform for record in data if record.platform))
-        sources = list(set(record.source_name for record in data if record.source_name))
-        
-        dates = [record.date for record in data if record.date]
-        date_range = (min(dates), max(dates)) if dates else (None, None)
-        
-        ai_processed_count = sum(1 for record in data 
-                               if record.sentiment_justification and record.sentiment_justification.strip())
-        
         return DataCacheStats(
-            total_records=len(data),
-            last_updated=datetime.now(),
-            ai_processed_count=ai_processed_count,
-            platforms=platforms,
-            sources=sources,
-            date_range=date_range
+            total_records=len(frame),
+            last_updated=self._snapshots.get(self._cache_key(user_id)).loaded_at if self._cache_key(user_id) in self._snapshots else None,
+            ai_processed_count=int(frame['ai_processed'].sum()),
+            platforms=[str(value) for value in frame['platform'].dropna().unique()],
+            sources=[str(value) for value in frame['source_name'].dropna().unique()],
+            date_range=(frame['date'].min(), frame['date'].max())
         )
-    
-    def refresh_cache(self, db: Session, force: bool = False) -> bool:
-        """Refresh cache data from database"""
-        with self._lock:
+
+    @staticmethod
+    def to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Convert snapshot rows to dictionaries shaped like SentimentData.to_dict()"""
+        if frame.empty:
+            return []
+        out = frame.drop(columns=[column for column in INTERNAL_COLUMNS if column in frame.columns])
+        return frame_to_records(out.rename(columns={'original_id': 'id'}))
+
+    def filter_by_target_config(self, data: Union[pd.DataFrame, List[Any]],
+                               target_config: models.TargetIndividualConfiguration,
+                               db: Optional[Session] = None) -> Union[pd.DataFrame, List[Any]]:
+        """
+        Filter data by target individual configuration - matches if ANY word from search terms is found.
+
+        With a session, precomputed matches from target_matches are used and only records newer than
+        the match watermark are scanned; otherwise (or while matches are being rebuilt) every record is scanned.
+        """
+        if target_config is None or data is None or len(data) == 0:
+            return data
+
+        if db is not None:
             try:
-                # Check if refresh is needed
-                if not force:
-                    all_data_entry = self._cache.get(self.ALL_DATA_KEY)
-                    if all_data_entry and not all_data_entry.is_expired():
-                        logger.debug("Cache is still fresh, skipping refresh")
-                        return True
-                
-                logger.info("Refreshing sentiment data cache...")
-                start_time = datetime.now()
-                
-                # Load all data
-                all_data = self._load_all_data_from_db(db)
-                if not all_data:
-                    logger.warning("No data loaded from database")
-                    return False
-                
-                # Load AI processed data subset
-                ai_processed_data = [record for record in all_data 
-                                   if record.sentiment_justification and record.sentiment_justification.strip()]
-                
-                # Generate statistics
-                stats = self._generate_stats(all_data)
-                
-                # Update cache
-                self._cache[self.ALL_DATA_KEY] = CacheEntry(
-                    data=all_data, 
-                    timestamp=datetime.now(),
-                    ttl_minutes=15
-                )
-                
-                self._cache[self.AI_PROCESSED_KEY] = CacheEntry(
-                    data=ai_processed_data,
-                    timestamp=datetime.now(),
-                    ttl_minutes=15
-                )
-                
-                self._cache[self.STATS_KEY] = CacheEntry(
-                    data=stats,
-                    timestamp=datetime.now(),
-                    ttl_minutes=30
-                )
-                
-                self._stats = stats
-                
-                duration = (datetime.now() - start_time).total_seconds()
-                logger.info(f"Cache refresh completed in {duration:.2f}s - {len(all_data)} total, {len(ai_processed_data)} AI processed")
-                
-                return True
-                
+                if isinstance(data, pd.DataFrame):
+                    filtered_data = filter_frame_by_matches(db, data, target_config)
+                else:
+                    filtered_data = filter_records_by_matches(db, data, target_config)
+                if filtered_data is not None:
+                    logger.info(f"Filtered {len(data)} records to {len(filtered_data)} for target: "
+                                f"{target_config.individual_name} (precomputed matches)")
+                    return filtered_data
             except Exception as e:
-                logger.error(f"Error refreshing cache: {e}")
-                return False
-    
-    def get_all_data(self, db: Session, force_refresh: bool = False) -> List[models.SentimentData]:
-        """Get all sentiment data with caching"""
-        entry = self._cache.get(self.ALL_DATA_KEY)
-        
-        if not entry or entry.is_expired() or force_refresh:
-            if not self.refresh_cache(db, force=force_refresh):
-                # Fallback to direct database query
-                logger.warning("Cache refresh failed, falling back to direct database query")
-                return self._load_all_data_from_db(db)
-            entry = self._cache.get(self.ALL_DATA_KEY)
-        
-        return entry.data if entry else []
-    
-    def get_ai_processed_data(self, db: Session, force_refresh: bool = False) -> List[models.SentimentData]:
-        """Get AI processed data with caching"""
-        entry = self._cache.get(self.AI_PROCESSED_KEY)
-        
-        if not entry or entry.is_expired() or force_refresh:
-            if not self.refresh_cache(db, force=force_refresh):
-                # Fallback to direct database query
-                logger.warning("Cache refresh failed, falling back to direct database query")
-                return self._load_ai_processed_data_from_db(db)
-            entry = self._cache.get(self.AI_PROCESSED_KEY)
-        
-        return entry.data if entry else []
-    
-    def get_stats(self, db: Session) -> DataCacheStats:
-        """Get data statistics"""
-        entry = self._cache.get(self.STATS_KEY)
-        
-        if not entry or entry.is_expired():
-            self.refresh_cache(db)
-            entry = self._cache.get(self.STATS_KEY)
-        
-        return entry.data if entry else DataCacheStats()
-    
-    def filter_by_target_config(self, data: List[models.SentimentData], 
-                               target_config: models.TargetIndividualConfiguration) -> List[models.SentimentData]:
-        """Filter data by target individual configuration - matches if ANY word from search terms is found"""
-        if not target_config or not data:
-            return data
-        
-        search_terms = [target_config.individual_name] + target_config.query_variations
-        
-        # Extract all individual words from search terms (filtering out very short words)
-        search_words = set()
-        for term in search_terms:
-            if term and term.strip():
-                # Split by whitespace and filter words that are at least 3 characters
-                words = [word.strip().lower() for word in term.split() if len(word.strip()) >= 3]
-                search_words.update(words)
-        
+                logger.warning(f"Precomputed target matches unavailable, scanning records: {e}")
+                db.rollback()
+
+        search_words = target_search_words(target_config)
         logger.info(f"Searching for any of these words: {search_words}")
-        
-        filtered_data = []
-        for record in data:
-            text_content = ((record.text or "") + " " + (record.title or "") + " " + (record.content or "")).lower()
-            
-            # Check if any search word appears in the content
-            for word in search_words:
-                if word in text_content:
-                    filtered_data.append(record)
-                    break
-        
+        if not search_words:
+            return data.iloc[0:0] if isinstance(data, pd.DataFrame) else []
+        pattern = compile_target_pattern(search_words)
+
+        if isinstance(data, pd.DataFrame):
+            filtered_data = data[match_mask(data, pattern)]
+        else:
+            filtered_data = [
+                record for record in data
+                if pattern.search(((record.text or "") + " " + (record.title or "") + " " + (record.content or "")).lower())
+            ]
+
         logger.info(f"Filtered {len(data)} records to {len(filtered_data)} for target: {target_config.individual_name}")
         return filtered_data
-    
-    def filter_by_platform_keywords(self, data: List[models.SentimentData], 
-                                   keywords: List[str], 
+
+    def filter_by_platform_keywords(self, data: List[models.SentimentData],
+                                   keywords: List[str],
                                    exclude_keywords: List[str] = None) -> List[models.SentimentData]:
         """Filter data by platform/source keywords"""
         if not keywords or not data:
             return data
-        
+
         filtered_data = []
         exclude_keywords = exclude_keywords or []
-        
+
         for record in data:
             source_text = (record.source_name or "") + (record.source or "") + (record.platform or "")
             source_text_lower = source_text.lower()
-            
+
             # Check for inclusion keywords
             has_keyword = any(keyword.lower() in source_text_lower for keyword in keywords)
-            
+
             # Check for exclusion keywords
             has_exclude = any(exclude.lower() in source_text_lower for exclude in exclude_keywords)
-            
+
             if has_keyword and not has_exclude:
                 filtered_data.append(record)
-        
+
         logger.info(f"Platform filtered {len(data)} records to {len(filtered_data)}")
         return filtered_data
-    
-    def deduplicate_data(self, data: List[models.SentimentData]) -> List[models.SentimentData]:
+
+    def deduplicate_data(self, data):
         """Remove duplicate records based on content similarity"""
-        if not data:
+        if data is None or len(data) == 0:
             return data
-        
+
         # TEMPORARILY DISABLED - returning all records without deduplication
         logger.info(f"Deduplication DISABLED - returning all {len(data)} records")
         return data
-        
-        # This is a simplified deduplication - could be enhanced
-        # seen_content = set()
-        # unique_data = []
-        # 
-        # for record in data:
-        #     content_key = (record.title or "") + (record.url or "")
-        #     content_hash = hash(content_key.lower())
-        #     
-        #     if content_hash not in seen_content:
-        #         seen_content.add(content_hash)
-        #         unique_data.append(record)
-        # 
-        # logger.info(f"Deduplicated {len(data)} records to {len(unique_data)}")
-        # return unique_data
-    
+
+    def invalidate(self, user_id: Optional[Any] = None):
+        """Mark snapshots stale so the next read revalidates incrementally (all users if user_id is None)"""
+        with self._lock:
+            keys = [self._cache_key(user_id), ALL_USERS_KEY] if user_id else list(self._snapshots)
+            for key in keys:
+                if key in self._snapshots:
+                    self._snapshots[key].stale = True
+        logger.info(f"Cache marked stale for {user_id or 'all users'}")
+
     def clear_cache(self):
-        """Clear all cached data"""
+        """Drop all cached snapshots"""
         with self._lock:
-            self._cache.clear()
-            self._stats = DataCacheStats()
+            self._snapshots.clear()
             logger.info("Cache cleared")
-    
+
     def get_cache_info(self) -> Dict[str, Any]:
         """Get information about current cache state"""
         with self._lock:
+            timings = self._timings
+            lookups = timings.hits + timings.stale_hits + timings.misses
             info = {
-                "cached_entries": len(self._cache),
-                "stats": {
-                    "total_records": self._stats.total_records,
-                    "last_updated": self._stats.last_updated.isoformat() if self._stats.last_updated else None,
-                    "ai_processed_count": self._stats.ai_processed_count,
-                    "platforms_count": len(self._stats.platforms),
-                    "sources_count": len(self._stats.sources)
-                },
+                "cached_entries": len(self._snapshots),
+                "memory_bytes": sum(entry.nbytes for entry in self._snapshots.values()),
+                "memory_cap_bytes": self.max_memory_bytes,
+                "hits": timings.hits,
+                "stale_hits": timings.stale_hits,
+                "misses": timings.misses,
+                "hit_ratio": round((timings.hits + timings.stale_hits) / lookups, 4) if lookups else None,
+                "evictions": timings.evictions,
+                "refresh_errors": timings.refresh_errors,
+                "full_refreshes": timings.full_refreshes,
+                "incremental_refreshes": timings.incremental_refreshes,
+                "last_full_refresh_ms": timings.last_full_refresh_ms,
+                "last_incremental_refresh_ms": timings.last_incremental_refresh_ms,
+                "avg_full_refresh_ms": timings.total_full_refresh_ms / timings.full_refreshes if timings.full_refreshes else None,
+                "avg_incremental_refresh_ms": timings.total_incremental_refresh_ms / timings.incremental_refreshes if timings.incremental_refreshes else None,
+                "avg_miss_wait_ms": timings.total_miss_wait_ms / timings.misses if timings.misses else None,
                 "entries": {}
             }
-            
-            for key, entry in self._cache.items():
+
+            for key, entry in self._snapshots.items():
                 info["entries"][key] = {
-                    "timestamp": entry.timestamp.isoformat(),
-                    "expired": entry.is_expired(),
-                    "ttl_minutes": entry.ttl_minutes,
-                    "data_size": len(entry.data) if isinstance(entry.data, list) else 1
+                    "loaded_at": entry.loaded_at.isoformat(),
+                    "full_loaded_at": entry.full_loaded_at.isoformat(),
+                    "expired": entry.stale or datetime.now() - entry.loaded_at > self.ttl,
+                    "refreshing": entry.refreshing,
+                    "data_size": len(entry.frame),
+                    "memory_bytes": entry.nbytes,
+                    "entry_id_floor": entry.entry_id_floor
                 }
-            
+
             return info
 
 # Global cache instance
 sentiment_cache = SentimentDataCache()
 
-def get_cached_data(data_type: str = "ai_processed", db: Session = None, 
-                   force_refresh: bool = False) -> List[models.SentimentData]:
+def get_cached_data(data_type: str = "ai_processed", db: Session = None,
+                   force_refresh: bool = False, user_id: Optional[Any] = None) -> List[Dict[str, Any]]:
     """Convenience function to get cached data"""
     if db is None:
         # This should be called from an endpoint with dependency injection
         raise ValueError("Database session is required")
-    
+
     if data_type == "all":
-        return sentiment_cache.get_all_data(db, force_refresh)
+        return sentiment_cache.get_all_data(db, force_refresh, user_id=user_id)
     elif data_type == "ai_processed":
-        return sentiment_cache.get_ai_processed_data(db, force_refresh)
+        return sentiment_cache.get_ai_processed_data(db, force_refresh, user_id=user_id)
     else:
         raise ValueError(f"Unknown data type: {data_type}")
 
-def invalidate_cache():
+def invalidate_cache(user_id: Optional[Any] = None):
     """Invalidate cache (to be called when new data is added)"""
-    sentiment_cache.clear_cache()
+    sentiment_cache.invalidate(user_id)
     logger.info("Cache invalidated due to new data")
-
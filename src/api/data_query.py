@@ -0,0 +1,262 @@
+"""
+Shared filtering, projection, keyset pagination and streaming export for sentiment data endpoints
+Filters apply either to a SQLAlchemy query (pushed into SQL) or to a cached snapshot frame
+"""
+
+import base64
+import csv
+import io
+import json
+import logging
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple, Callable, Iterable, Iterator
+
+import pandas as pd
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# Public field names (as in SentimentData.to_dict) -> model column names
+FIELD_COLUMNS = {
+    "title": "title", "description": "description", "content": "content", "url": "url",
+    "published_date": "published_date", "source": "source", "source_url": "source_url", "query": "query",
+    "language": "language", "platform": "platform", "date": "date", "text": "text", "file_source": "file_source",
+    "id": "original_id", "alert_id": "alert_id", "published_at": "published_at", "source_type": "source_type",
+    "country": "country", "favorite": "favorite", "tone": "tone", "source_name": "source_name",
+    "parent_url": "parent_url", "parent_id": "parent_id", "children": "children", "direct_reach": "direct_reach",
+    "cumulative_reach": "cumulative_reach", "domain_reach": "domain_reach", "tags": "tags", "score": "score",
+    "alert_name": "alert_name", "type": "type", "post_id": "post_id", "retweets": "retweets", "likes": "likes",
+    "user_location": "user_location", "comments": "comments", "user_name": "user_name",
+    "user_handle": "user_handle", "user_avatar": "user_avatar", "sentiment_label": "sentiment_label",
+    "sentiment_score": "sentiment_score", "sentiment_justification": "sentiment_justification",
+    "location_label": "location_label", "location_confidence": "location_confidence",
+    "issue_label": "issue_label", "issue_slug": "issue_slug", "issue_confidence": "issue_confidence",
+    "issue_keywords": "issue_keywords", "ministry_hint": "ministry_hint",
+    # Internal key, useful to clients paging through results
+    "entry_id": "entry_id",
+}
+DEFAULT_FIELDS = [name for name in FIELD_COLUMNS if name != "entry_id"]
+MAX_PAGE_SIZE = 5000
+
+
+def _split(value: Optional[str]) -> List[str]:
+    """Split a comma-separated query parameter."""
+    if not value:
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a fields= projection; defaults to every to_dict field."""
+    requested = _split(fields)
+    if not requested:
+        return list(DEFAULT_FIELDS)
+    unknown = [name for name in requested if name not in FIELD_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+@dataclass
+class DataFilters:
+    """Filters shared by /latest-data and the export endpoint."""
+    user_id: Optional[Any] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    platforms: List[str] = field(default_factory=list)
+    sentiments: List[str] = field(default_factory=list)
+    ministries: List[str] = field(default_factory=list)
+    issues: List[str] = field(default_factory=list)      # issue_slug values
+    ai_processed_only: bool = True
+
+    @classmethod
+    def from_params(cls, user_id: Optional[Any] = None, start_date: Optional[datetime] = None,
+                    end_date: Optional[datetime] = None, platform: Optional[str] = None,
+                    sentiment: Optional[str] = None, ministry: Optional[str] = None,
+                    issue: Optional[str] = None, ai_processed_only: bool = True) -> "DataFilters":
+        """Build filters from comma-separated query parameters."""
+        return cls(
+            user_id=user_id, start_date=start_date, end_date=end_date,
+            platforms=_split(platform), sentiments=_split(sentiment),
+            ministries=_split(ministry), issues=_split(issue),
+            ai_processed_only=ai_processed_only
+        )
+
+    def _user_uuid(self):
+        from uuid import UUID
+        return UUID(self.user_id) if isinstance(self.user_id, str) else self.user_id
+
+    def apply_to_query(self, query):
+        """Push the filters into a SQLAlchemy query over SentimentData."""
+        data = models.SentimentData
+        if self.user_id:
+            query = query.filter(data.user_id == self._user_uuid())
+        if self.ai_processed_only:
+            query = query.filter(data.sentiment_justification.isnot(None), data.sentiment_justification != "")
+        if self.start_date:
+            query = query.filter(data.date >= self.start_date)
+        if self.end_date:
+            query = query.filter(data.date <= self.end_date)
+        if self.platforms:
+            query = query.filter(data.platform.in_(self.platforms))
+        if self.sentiments:
+            query = query.filter(data.sentiment_label.in_(self.sentiments))
+        if self.ministries:
+            query = query.filter(data.ministry_hint.in_(self.ministries))
+        if self.issues:
+            query = query.filter(data.issue_slug.in_(self.issues))
+        return query
+
+    def apply_to_frame(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Apply the filters to a cached snapshot frame (the frame is already scoped to the user)."""
+        mask = pd.Series(True, index=frame.index)
+        if self.ai_processed_only:
+            if "ai_processed" in frame.columns:
+                mask &= frame["ai_processed"]
+            else:
+                justification = frame["sentiment_justification"]
+                mask &= justification.notna() & (justification.astype(str).str.strip() != "")
+        if self.start_date:
+            mask &= frame["date"] >= pd.Timestamp(self.start_date)
+        if self.end_date:
+            mask &= frame["date"] <= pd.Timestamp(self.end_date)
+        if self.platforms:
+            mask &= frame["platform"].isin(self.platforms)
+        if self.sentiments:
+            mask &= frame["sentiment_label"].isin(self.sentiments)
+        if self.ministries:
+            mask &= frame["ministry_hint"].isin(self.ministries)
+        if self.issues:
+            mask &= frame["issue_slug"].isin(self.issues)
+        return frame[mask]
+
+
+def encode_cursor(date_value: Any, entry_id: int) -> str:
+    """Encode the (date, entry_id) position of the last row of a page."""
+    date_iso = None if date_value is None or pd.isna(date_value) else pd.Timestamp(date_value).isoformat()
+    payload = json.dumps({"d": date_iso, "e": int(entry_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        date_value = datetime.fromisoformat(payload["d"]) if payload.get("d") else None
+        return date_value, int(payload["e"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def page_frame(frame: pd.DataFrame, cursor: Optional[str], limit: Optional[int]) -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    Take one keyset page from a frame ordered by (date DESC NULLS LAST, entry_id DESC).
+
+    Returns:
+        (page rows, cursor for the next page or None when exhausted)
+    """
+    if cursor:
+        cursor_date, cursor_entry_id = decode_cursor(cursor)
+        if cursor_date is None:
+            frame = frame[frame["date"].isna() & (frame["entry_id"] < cursor_entry_id)]
+        else:
+            cursor_ts = pd.Timestamp(cursor_date)
+            frame = frame[(frame["date"] < cursor_ts)
+                          | ((frame["date"] == cursor_ts) & (frame["entry_id"] < cursor_entry_id))
+                          | frame["date"].isna()]
+    if not limit:
+        return frame, None
+
+    page = frame.iloc[:limit]
+    next_cursor = None
+    if len(frame) > limit:
+        last = page.iloc[-1]
+        next_cursor = encode_cursor(last["date"], last["entry_id"])
+    return page, next_cursor
+
+
+def project_frame(frame: pd.DataFrame, fields: List[str]) -> pd.DataFrame:
+    """Select the requested public fields from a snapshot frame (renaming original_id to id)."""
+    projected = frame[[FIELD_COLUMNS[name] for name in fields]]
+    projected.columns = fields
+    return projected
+
+
+def serialize_row(row: Any, fields: List[str]) -> Dict[str, Any]:
+    """Serialize a SQL row selected in `fields` order like SentimentData.to_dict."""
+    return {
+        name: value.isoformat() if isinstance(value, datetime) else value
+        for name, value in zip(fields, row)
+    }
+
+
+def frame_to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert frame rows to JSON-ready dictionaries (ISO datetimes, None for missing values)."""
+    if frame.empty:
+        return []
+    out = frame.astype(object)
+    for column in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[column]):
+            out[column] = [value.isoformat() if not pd.isna(value) else None for value in out[column]]
+    out = out.where(out.notna(), None)
+    return out.to_dict("records")
+
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_CHUNK_ROWS = 1000
+
+
+def iter_export_chunks(db_factory: Callable[[], Any], filters: DataFilters, fields: List[str],
+                       export_format: str = "ndjson", chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Stream matching rows as NDJSON or CSV byte chunks from a server-side cursor.
+
+    Rows are fetched with yield_per in entry_id order and written in chunks of
+    chunk_rows, so memory stays bounded by one chunk regardless of result size.
+    The session is opened here and closed when the stream ends or is abandoned.
+    """
+    data = models.SentimentData
+    columns = [getattr(data, FIELD_COLUMNS[name]) for name in fields]
+    db = db_factory()
+    try:
+        query = filters.apply_to_query(db.query(*columns)).order_by(data.entry_id)
+        rows = query.execution_options(yield_per=chunk_rows, stream_results=True)
+
+        buffer = io.StringIO()
+        writer = None
+        if export_format == "csv":
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+        pending = 0
+        for row in rows:
+            record = serialize_row(row, fields)
+            if writer is not None:
+                writer.writerow([json.dumps(value) if isinstance(value, (list, dict)) else value
+                                 for value in record.values()])
+            else:
+                buffer.write(json.dumps(record, default=str))
+                buffer.write("\n")
+            pending += 1
+            if pending >= chunk_rows:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate(0)
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        db.close()
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
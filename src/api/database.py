@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 import os
@@ -50,6 +51,80 @@ def get_db():
     finally:
         db.close()
 
+# --- Async access for endpoints running on the event loop ---
+# Sync DATABASE_URL driver -> asyncio driver (asyncpg / aiosqlite)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+# Worker threads available to sync endpoints/dependencies (FastAPI runs `def` endpoints in this pool)
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", "40"))
+
+_async_engine = None
+_async_session_factory = None
+
+
+def async_database_url(url: str):
+    """Translate DATABASE_URL to its asyncio driver (psycopg2's sslmode becomes asyncpg's ssl)."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    parsed = parsed.set(drivername=drivername)
+    if drivername == "postgresql+asyncpg" and "sslmode" in parsed.query:
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed
+
+
+def get_async_engine():
+    """Create the asyncio engine on first use (requires asyncpg or aiosqlite)."""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        url = async_database_url(DATABASE_URL)
+        pool_args = {} if url.drivername.startswith("sqlite") else {
+            "pool_pre_ping": True, "pool_recycle": 3600, "pool_size": 10, "max_overflow": 10, "pool_timeout": 60
+        }
+        _async_engine = create_async_engine(url, echo=False, **pool_args)
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+# Dependency to get an async DB session (for endpoints that query without blocking the event loop)
+async def get_async_db():
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+
+async def run_in_db_thread(fn, *args, **kwargs):
+    """Run fn(db, *args, **kwargs) with its own sync session on the worker threadpool."""
+    from starlette.concurrency import run_in_threadpool
+
+    def call():
+        db = SessionLocal()
+        try:
+            return fn(db, *args, **kwargs)
+        finally:
+            db.close()
+    return await run_in_threadpool(call)
+
+
+def configure_threadpool(size: int = DB_THREADPOOL_SIZE):
+    """Size the worker threadpool used for sync endpoints (call from the running event loop)."""
+    import anyio.to_thread
+    anyio.to_thread.current_default_thread_limiter().total_tokens = size
+
+
+async def dispose_async_engine():
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
 # Function to create tables (optional - use Alembic for migrations)
 def create_tables():
     # Import your models here before calling create_all
@@ -0,0 +1,154 @@
+from fastapi import FastAPI, HTTPException, Depends, Query
+import logging
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+# Import database dependencies
+from . import models
+from .database import get_db
+from .auth import get_current_user_id
+from src.utils.engagement_tracker import load_engagement_config
+
+logger = logging.getLogger("engagement_service")
+
+# Velocity windows maintained by the agent (engagement_tracking.velocity_windows_hours)
+SUPPORTED_WINDOWS_HOURS = sorted(set(load_engagement_config()["velocity_windows_hours"]))
+DEFAULT_WINDOW_HOURS = 6 if 6 in SUPPORTED_WINDOWS_HOURS else SUPPORTED_WINDOWS_HOURS[0]
+
+
+def _velocity_to_dict(velocity: models.EngagementVelocity) -> Dict[str, Any]:
+    """Serialize a pre-aggregated velocity row."""
+    return {
+        "window_hours": velocity.window_hours,
+        "likes_delta": velocity.likes_delta,
+        "retweets_delta": velocity.retweets_delta,
+        "comments_delta": velocity.comments_delta,
+        "views_delta": velocity.views_delta,
+        "engagement_delta": velocity.engagement_delta,
+        "latest_engagement": velocity.latest_engagement,
+        "velocity_per_hour": velocity.velocity_per_hour,
+        "computed_at": velocity.computed_at.isoformat() if velocity.computed_at else None
+    }
+
+
+def get_top_rising(user_id: UUID, db: Session, window_hours: int, limit: int,
+                   platform: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get the fastest-rising mentions for a user from the pre-aggregated velocity windows.
+
+    Velocity rows are only recomputed for records re-collected in a cycle, so rows computed
+    longer ago than the window are stale (the record stopped appearing) and are left out.
+    """
+    if window_hours not in SUPPORTED_WINDOWS_HOURS:
+        raise HTTPException(status_code=400, detail=f"window_hours must be one of {SUPPORTED_WINDOWS_HOURS}")
+    try:
+        query = db.query(
+            models.EngagementVelocity,
+            models.SentimentData.title,
+            models.SentimentData.text,
+            models.SentimentData.url,
+            models.SentimentData.platform,
+            models.SentimentData.source,
+            models.SentimentData.sentiment_label,
+            models.SentimentData.issue_label,
+            models.SentimentData.published_at
+        ).join(
+            models.SentimentData, models.SentimentData.entry_id == models.EngagementVelocity.entry_id
+        ).filter(
+            models.EngagementVelocity.user_id == user_id,
+            models.EngagementVelocity.window_hours == window_hours,
+            models.EngagementVelocity.engagement_delta > 0,
+            # computed_at is naive UTC, as written by refresh_velocity
+            models.EngagementVelocity.computed_at >= datetime.utcnow() - timedelta(hours=window_hours)
+        )
+        if platform:
+            query = query.filter(models.SentimentData.platform == platform)
+        rows = query.order_by(models.EngagementVelocity.velocity_per_hour.desc()).limit(limit).all()
+
+        mentions = []
+        for velocity, title, text, url, row_platform, source, sentiment_label, issue_label, published_at in rows:
+            mentions.append({
+                "entry_id": velocity.entry_id,
+                "title": title,
+                "text": text,
+                "url": url,
+                "platform": row_platform,
+                "source": source,
+                "sentiment_label": sentiment_label,
+                "issue_label": issue_label,
+                "published_at": published_at.isoformat() if published_at else None,
+                **_velocity_to_dict(velocity)
+            })
+
+        return {
+            "status": "success",
+            "window_hours": window_hours,
+            "data": mentions,
+            "record_count": len(mentions),
+            "generated_at": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error getting top rising mentions for user {user_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Top rising retrieval failed: {str(e)}")
+
+
+def get_entry_velocity(entry_id: int, user_id: UUID, db: Session, snapshot_limit: int) -> Dict[str, Any]:
+    """
+    Get velocity windows and the recent snapshot series for one record.
+    """
+    record = db.query(models.SentimentData.entry_id).filter(
+        models.SentimentData.entry_id == entry_id,
+        models.SentimentData.user_id == user_id
+    ).first()
+    if not record:
+        raise HTTPException(status_code=404, detail="Record not found")
+
+    try:
+        windows = db.query(models.EngagementVelocity).filter(
+            models.EngagementVelocity.entry_id == entry_id,
+            models.EngagementVelocity.window_hours.in_(SUPPORTED_WINDOWS_HOURS)
+        ).order_by(models.EngagementVelocity.window_hours).all()
+
+        snapshots = db.query(models.EngagementSnapshot).filter(
+            models.EngagementSnapshot.entry_id == entry_id
+        ).order_by(models.EngagementSnapshot.ts.desc()).limit(snapshot_limit).all()
+
+        return {
+            "status": "success",
+            "entry_id": entry_id,
+            "velocity": [_velocity_to_dict(window) for window in windows],
+            "snapshots": [{
+                "ts": snapshot.ts.isoformat(),
+                "likes": snapshot.likes,
+                "retweets": snapshot.retweets,
+                "comments": snapshot.comments,
+                "views": snapshot.views
+            } for snapshot in reversed(snapshots)]
+        }
+    except Exception as e:
+        logger.error(f"Error getting engagement velocity for entry {entry_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Engagement velocity retrieval failed: {str(e)}")
+
+
+# Helper function to integrate with existing service
+def add_engagement_endpoints(app: FastAPI):
+    """
+    Add engagement time-series endpoints to the main FastAPI app.
+    """
+
+    @app.get("/engagement/top-rising")
+    def top_rising(window_hours: int = Query(DEFAULT_WINDOW_HOURS), limit: int = Query(20, ge=1, le=200),
+                   platform: Optional[str] = None,
+                   db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
+        """Get the authenticated user's fastest-rising mentions over a velocity window."""
+        return get_top_rising(user_id, db, window_hours, limit, platform)
+
+    @app.get("/engagement/{entry_id}/velocity")
+    def entry_velocity(entry_id: int, snapshot_limit: int = Query(100, ge=1, le=1000),
+                       db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
+        """Get velocity windows and engagement snapshots for one of the authenticated user's records."""
+        return get_entry_velocity(entry_id, user_id, db, snapshot_limit)
+
+    logger.debug("Engagement endpoints added to FastAPI app")
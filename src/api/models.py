@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, MetaData, Index, Text, Boolean, ForeignKey, UniqueConstraint, JSON, UUID
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Float, Date, DateTime, MetaData, Index, Text, Boolean, ForeignKey, UniqueConstraint, JSON, UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship, declarative_base
 import datetime
@@ -206,6 +206,21 @@ class UserSystemUsage(Base):
     # Relationship with User
     user = relationship("User")
 
+# Completed days of user_system_usage aggregated per user (filled by src/api/usage_rollup.py)
+class UserUsageDaily(Base):
+    __tablename__ = 'user_usage_daily'
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    execution_time_sum_ms = Column(BigInteger, nullable=False, default=0)
+    execution_time_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_user_usage_daily_day', 'day'),
+    )
+
 # Model for sentiment embeddings
 class SentimentEmbedding(Base):
     __tablename__ = 'sentiment_embeddings'
@@ -216,4 +231,86 @@ class SentimentEmbedding(Base):
     created_at = Column(DateTime(timezone=False), server_default=func.now())
     
     # Relationship with SentimentData
-    sentiment_data = relationship("SentimentData", back_populates="embedding") 
\ No newline at end of file
+    sentiment_data = relationship("SentimentData", back_populates="embedding") 
+
+# Append-only engagement time series (one row per record per collection cycle)
+class EngagementSnapshot(Base):
+    __tablename__ = 'engagement_snapshots'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entry_id = Column(Integer, ForeignKey('sentiment_data.entry_id'), nullable=False)
+    ts = Column(DateTime(timezone=False), nullable=False, index=True)
+    likes = Column(Integer, nullable=True)
+    retweets = Column(Integer, nullable=True)
+    comments = Column(Integer, nullable=True)
+    views = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index('ix_engagement_snapshots_entry_ts', 'entry_id', 'ts'),
+    )
+
+# Pre-aggregated engagement deltas per record and window, refreshed when snapshots are written
+class EngagementVelocity(Base):
+    __tablename__ = 'engagement_velocity'
+
+    entry_id = Column(Integer, ForeignKey('sentiment_data.entry_id'), primary_key=True)
+    window_hours = Column(Integer, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
+    likes_delta = Column(Integer, nullable=True)
+    retweets_delta = Column(Integer, nullable=True)
+    comments_delta = Column(Integer, nullable=True)
+    views_delta = Column(Integer, nullable=True)
+    engagement_delta = Column(Integer, nullable=True)  # likes + retweets + comments
+    latest_engagement = Column(Integer, nullable=True)
+    velocity_per_hour = Column(Float, nullable=True)
+    computed_at = Column(DateTime(timezone=False), nullable=False)
+
+    __table_args__ = (
+        Index('ix_engagement_velocity_user_window', 'user_id', 'window_hours', 'velocity_per_hour'),
+    )
+
+# Precomputed target-term matches: one row per record matching a target configuration's search words
+class TargetMatch(Base):
+    __tablename__ = 'target_matches'
+
+    target_config_id = Column(Integer, ForeignKey('target_individual_configurations.id', ondelete='CASCADE'), primary_key=True)
+    entry_id = Column(Integer, ForeignKey('sentiment_data.entry_id', ondelete='CASCADE'), primary_key=True)
+
+    __table_args__ = (
+        Index('ix_target_matches_entry', 'entry_id'),
+    )
+
+# Re-match progress per target configuration: rows up to matched_through_entry_id are matched for terms_signature
+class TargetMatchState(Base):
+    __tablename__ = 'target_match_state'
+
+    target_config_id = Column(Integer, ForeignKey('target_individual_configurations.id', ondelete='CASCADE'), primary_key=True)
+    terms_signature = Column(String(64), nullable=False)
+    matched_through_entry_id = Column(Integer, nullable=False, default=0)
+    match_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=False), nullable=False)
+
+# Pre-aggregated dashboard counts per user, time bucket (day or hour, by created_at) and dimension combination
+class SentimentRollup(Base):
+    __tablename__ = 'sentiment_rollups'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
+    granularity = Column(String(4), nullable=False)  # 'day' or 'hour'
+    bucket_start = Column(DateTime(timezone=False), nullable=False)
+    platform = Column(String, nullable=True)
+    sentiment_label = Column(String, nullable=True)
+    ministry_hint = Column(String(50), nullable=True)
+    issue_slug = Column(String, nullable=True)
+    location_label = Column(String, nullable=True)
+    record_count = Column(Integer, nullable=False, default=0)
+    sentiment_score_sum = Column(Float, nullable=False, default=0.0)
+    sentiment_score_count = Column(Integer, nullable=False, default=0)
+    likes_sum = Column(BigInteger, nullable=False, default=0)
+    retweets_sum = Column(BigInteger, nullable=False, default=0)
+    comments_sum = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=False), nullable=False)
+
+    __table_args__ = (
+        Index('ix_sentiment_rollups_user_bucket', 'user_id', 'granularity', 'bucket_start'),
+    )
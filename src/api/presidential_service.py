@@ -2,12 +2,14 @@ from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.responses import JSONResponse
 import json
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+import threading
+import time
 import pandas as pd
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, and_
 import csv
 import os
 from pathlib import Path
@@ -31,6 +33,13 @@ logger = logging.getLogger("presidential_service")
 presidential_analyzer = PresidentialSentimentAnalyzer("President Bola Tinubu", "Nigeria")
 presidential_processor = PresidentialDataProcessor("President Bola Tinubu", "Nigeria")
 
+# Time windows accepted by /presidential/metrics and /presidential/report (filtered on SentimentData.date)
+METRIC_WINDOWS = {"24h": timedelta(hours=24), "7d": timedelta(days=7), "30d": timedelta(days=30), "90d": timedelta(days=90)}
+# Cached responses per (kind, user, window); dropped on new analysis, expired as a backstop
+AGGREGATE_CACHE_TTL_SECONDS = 300
+_aggregate_cache: Dict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]] = {}
+_aggregate_cache_lock = threading.Lock()
+
 def save_presidential_analysis_to_csv(processed_records: List[Dict], user_id: str) -> str:
     """
     Save presidential analysis results to CSV file as backup.
@@ -93,7 +102,7 @@ class PresidentialPrioritiesUpdate(BaseModel):
     user_id: str
 
 # Presidential analysis endpoints
-async def analyze_presidential_sentiment(request: PresidentialAnalysisRequest) -> PresidentialAnalysisResponse:
+def analyze_presidential_sentiment(request: PresidentialAnalysisRequest) -> PresidentialAnalysisResponse:
     """
     Analyze a single text from the President's strategic perspective.
     """
@@ -116,7 +125,7 @@ async def analyze_presidential_sentiment(request: PresidentialAnalysisRequest) -
         logger.error(f"Error in presidential sentiment analysis: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Presidential analysis failed: {str(e)}")
 
-async def batch_analyze_presidential_sentiment(request: PresidentialBatchRequest) -> List[PresidentialAnalysisResponse]:
+def batch_analyze_presidential_sentiment(request: PresidentialBatchRequest) -> List[PresidentialAnalysisResponse]:
     """
     Analyze multiple texts from the President's strategic perspective.
     """
@@ -142,7 +151,7 @@ async def batch_analyze_presidential_sentiment(request: PresidentialBatchRequest
         logger.error(f"Error in batch presidential sentiment analysis: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Batch presidential analysis failed: {str(e)}")
 
-async def get_presidential_insights(request: PresidentialInsightsRequest, db: Session = Depends(get_db)) -> Dict[str, Any]:
+def get_presidential_insights(request: PresidentialInsightsRequest, db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     Get strategic insights from presidential sentiment analysis of stored data.
     """
@@ -207,7 +216,7 @@ async def get_presidential_insights(request: PresidentialInsightsRequest, db: Se
         logger.error(f"Error generating presidential insights: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Presidential insights generation failed: {str(e)}")
 
-async def update_presidential_priorities(request: PresidentialPrioritiesUpdate) -> Dict[str, Any]:
+def update_presidential_priorities(request: PresidentialPrioritiesUpdate) -> Dict[str, Any]:
     """
     Update the presidential priorities and keywords for analysis.
     """
@@ -231,22 +240,94 @@ async def update_presidential_priorities(request: PresidentialPrioritiesUpdate)
         logger.error(f"Error updating presidential priorities: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Presidential priorities update failed: {str(e)}")
 
-async def generate_presidential_report(user_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
+def _window_start(window: Optional[str]) -> Optional[datetime]:
+    """Start of a named time window (None for all time)."""
+    if not window or window == "all":
+        return None
+    if window not in METRIC_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {['all'] + list(METRIC_WINDOWS)}")
+    return datetime.now() - METRIC_WINDOWS[window]
+
+
+def _analyzed_filter(user_uuid: UUID, start: Optional[datetime]) -> List[Any]:
+    """Criteria for a user's analyzed records, optionally limited to a time window."""
+    criteria = [models.SentimentData.user_id == user_uuid, models.SentimentData.sentiment_label.isnot(None)]
+    if start is not None:
+        criteria.append(models.SentimentData.date >= start)
+    return criteria
+
+
+def _get_cached(kind: str, user_id: str, window: Optional[str]) -> Optional[Dict[str, Any]]:
+    key = (kind, user_id, window or "all")
+    with _aggregate_cache_lock:
+        entry = _aggregate_cache.get(key)
+        if entry is None:
+            return None
+        cached_at, value = entry
+        if time.monotonic() - cached_at > AGGREGATE_CACHE_TTL_SECONDS:
+            del _aggregate_cache[key]
+            return None
+        return value
+
+
+def _set_cached(kind: str, user_id: str, window: Optional[str], value: Dict[str, Any]):
+    with _aggregate_cache_lock:
+        _aggregate_cache[(kind, user_id, window or "all")] = (time.monotonic(), value)
+
+
+def invalidate_presidential_cache(user_id: Optional[Any] = None):
+    """Drop cached metrics and reports for a user (or everyone) after new analysis results are written."""
+    with _aggregate_cache_lock:
+        if user_id is None:
+            _aggregate_cache.clear()
+            return
+        for key in [key for key in _aggregate_cache if key[1] == str(user_id)]:
+            del _aggregate_cache[key]
+
+
+def _label_counts(db: Session, criteria: List[Any]) -> Dict[str, Dict[str, int]]:
+    """Counts per sentiment label with high-priority (negative, score > 0.8) and high-impact (score < -0.2) counts."""
+    data = models.SentimentData
+    is_negative = data.sentiment_label == 'negative'
+    rows = db.query(
+        data.sentiment_label,
+        func.count(),
+        func.sum(case((and_(is_negative, data.sentiment_score > 0.8), 1), else_=0)),
+        func.sum(case((and_(is_negative, data.sentiment_score < -0.2), 1), else_=0))
+    ).filter(*criteria).group_by(data.sentiment_label).all()
+    return {
+        label: {"count": count, "high_priority": int(high_priority or 0), "high_impact": int(high_impact or 0)}
+        for label, count, high_priority, high_impact in rows
+    }
+
+
+def _top_issues(db: Session, criteria: List[Any], limit: int = 5) -> List[Tuple[str, int]]:
+    """Most frequent persisted issue labels."""
+    data = models.SentimentData
+    count = func.count().label("mentions")
+    return db.query(data.issue_label, count).filter(
+        *criteria, data.issue_label.isnot(None), data.issue_label != ""
+    ).group_by(data.issue_label).order_by(count.desc()).limit(limit).all()
+
+
+def generate_presidential_report(user_id: str, db: Session = Depends(get_db), window: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate a comprehensive presidential strategic report.
     """
     try:
         logger.info(f"Generating presidential report for user: {user_id}")
+        start = _window_start(window)
+        cached = _get_cached("report", user_id, window)
+        if cached is not None:
+            return cached
         
-        # Query database for sentiment data with presidential analysis
-        from uuid import UUID
+        # Aggregate the user's analyzed records in SQL
         user_uuid = UUID(user_id)
-        sentiment_records = db.query(models.SentimentData).filter(
-            models.SentimentData.user_id == user_uuid,
-            models.SentimentData.sentiment_label.isnot(None)
-        ).all()
+        criteria = _analyzed_filter(user_uuid, start)
+        label_counts = _label_counts(db, criteria)
+        total_items = sum(counts["count"] for counts in label_counts.values())
         
-        if not sentiment_records:
+        if not total_items:
             return {
                 "error": "No presidential analysis data found",
                 "user_id": user_id,
@@ -254,95 +335,76 @@ async def generate_presidential_report(user_id: str, db: Session = Depends(get_d
                 "report_type": "presidential_strategic_analysis"
             }
         
-        # Convert to DataFrame for analysis
-        data_list = []
-        for record in sentiment_records:
-            data_list.append({
-                'sentiment_label': record.sentiment_label,
-                'sentiment_score': record.sentiment_score,
-                'sentiment_justification': record.sentiment_justification,
-                'source': record.source,
-                'text': record.text,
-                'title': record.title
-            })
-        
-        data_df = pd.DataFrame(data_list)
-        report = presidential_processor.generate_presidential_report(data_df)
+        insights = {
+            "total_items": total_items,
+            "sentiment_distribution": {
+                label: counts["count"] for label, counts in sorted(label_counts.items(), key=lambda item: -item[1]["count"])
+            },
+            "high_impact_count": sum(counts["high_impact"] for counts in label_counts.values()),
+            "priority_topics": dict(_top_issues(db, criteria))
+        }
+        report = presidential_processor.format_presidential_report(insights)
         
         response = {
             "report": report,
             "generated_at": datetime.now().isoformat(),
             "user_id": user_id,
+            "window": window or "all",
             "report_type": "presidential_strategic_analysis",
-            "total_records_analyzed": len(sentiment_records)
+            "total_records_analyzed": total_items
         }
+        _set_cached("report", user_id, window, response)
         
-        logger.info(f"Presidential report generated successfully for {len(sentiment_records)} records")
+        logger.info(f"Presidential report generated successfully for {total_items} records")
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating presidential report: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Presidential report generation failed: {str(e)}")
 
-async def get_presidential_metrics(user_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
+def get_presidential_metrics(user_id: str, db: Session = Depends(get_db), window: Optional[str] = None) -> Dict[str, Any]:
     """
     Get key presidential metrics and KPIs.
     """
     try:
         logger.info(f"Getting presidential metrics for user: {user_id}")
+        start = _window_start(window)
+        cached = _get_cached("metrics", user_id, window)
+        if cached is not None:
+            return cached
         
-        # Query database for presidential analysis data
-        from uuid import UUID
+        # Counts by label and high-priority alerts (negative with high confidence) in one grouped query
         user_uuid = UUID(user_id)
-        sentiment_records = db.query(models.SentimentData).filter(
-            models.SentimentData.user_id == user_uuid,
-            models.SentimentData.sentiment_label.isnot(None)
-        ).all()
+        criteria = _analyzed_filter(user_uuid, start)
+        label_counts = _label_counts(db, criteria)
+        total_items = sum(counts["count"] for counts in label_counts.values())
         
-        if not sentiment_records:
+        if not total_items:
             return {
                 "error": "No presidential analysis data found",
                 "user_id": user_id,
                 "last_updated": datetime.now().isoformat()
             }
         
-        # Calculate metrics
-        total_items = len(sentiment_records)
-        positive_count = len([r for r in sentiment_records if r.sentiment_label == 'positive'])
-        negative_count = len([r for r in sentiment_records if r.sentiment_label == 'negative'])
-        neutral_count = len([r for r in sentiment_records if r.sentiment_label == 'neutral'])
-        
-        # High priority alerts (negative with high confidence)
-        high_priority = len([r for r in sentiment_records 
-                           if r.sentiment_label == 'negative' 
-                           and r.sentiment_score and r.sentiment_score > 0.8])
+        positive_count = label_counts.get('positive', {}).get("count", 0)
+        negative_count = label_counts.get('negative', {}).get("count", 0)
+        neutral_count = label_counts.get('neutral', {}).get("count", 0)
+        high_priority = label_counts.get('negative', {}).get("high_priority", 0)
         
-        # Top topics (extract from justification)
-        all_topics = []
-        for record in sentiment_records:
-            if record.sentiment_justification:
-                # Extract topics from justification text
-                topics = self._extract_topics_from_justification(record.sentiment_justification)
-                all_topics.extend(topics)
-        
-        topic_counts = {}
-        for topic in all_topics:
-            topic_counts[topic] = topic_counts.get(topic, 0) + 1
-        
-        top_topics = sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        # Most supportive sources
-        source_sentiment = {}
-        for record in sentiment_records:
-            if record.source:
-                if record.source not in source_sentiment:
-                    source_sentiment[record.source] = {'positive': 0, 'negative': 0, 'neutral': 0}
-                source_sentiment[record.source][record.sentiment_label] += 1
+        # Top threatening topics from the persisted issue labels of negative content
+        top_topics = _top_issues(db, criteria + [models.SentimentData.sentiment_label == 'negative'])
         
-        most_supportive_sources = []
-        for source, counts in source_sentiment.items():
-            if counts['positive'] > counts['negative']:
-                most_supportive_sources.append(source)
+        # Most supportive sources: more positive than negative mentions
+        data = models.SentimentData
+        positive = func.sum(case((data.sentiment_label == 'positive', 1), else_=0))
+        negative = func.sum(case((data.sentiment_label == 'negative', 1), else_=0))
+        most_supportive_sources = [
+            source for source, in db.query(data.source).filter(*criteria, data.source.isnot(None))
+            .group_by(data.source).having(positive > negative)
+            .order_by((positive - negative).desc()).limit(5).all()
+        ]
         
         metrics = {
             "total_items_analyzed": total_items,
@@ -351,25 +413,29 @@ async def get_presidential_metrics(user_id: str, db: Session = Depends(get_db))
             "neutral_content": neutral_count,
             "high_priority_alerts": high_priority,
             "top_threatening_topics": [topic for topic, count in top_topics],
-            "most_supportive_sources": most_supportive_sources[:5],
+            "most_supportive_sources": most_supportive_sources,
             "strategic_recommendations": [
                 f"Immediate response required to {negative_count} negative content pieces" if negative_count > 0 else "No immediate threats detected",
                 f"Amplify {positive_count} positive content pieces" if positive_count > 0 else "No positive content to amplify",
                 f"Monitor {neutral_count} neutral items closely" if neutral_count > 0 else "No neutral items to monitor"
             ],
+            "window": window or "all",
             "last_updated": datetime.now().isoformat(),
             "user_id": user_id
         }
+        _set_cached("metrics", user_id, window, metrics)
         
         logger.info(f"Presidential metrics retrieved successfully for {total_items} records")
         return metrics
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting presidential metrics: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Presidential metrics retrieval failed: {str(e)}")
 
 # Add this function to integrate presidential analysis with existing data processing
-async def process_existing_data_with_presidential_analysis(user_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
+def process_existing_data_with_presidential_analysis(user_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     Process existing sentiment data with presidential analysis.
     This function analyzes all existing sentiment data that doesn't have presidential analysis yet.
@@ -409,6 +475,7 @@ async def process_existing_data_with_presidential_analysis(user_id: str, db: Ses
                 record.sentiment_label = analysis_result['sentiment_label']
                 record.sentiment_score = analysis_result['sentiment_score']
                 record.sentiment_justification = analysis_result['sentiment_justification']
+                record.run_timestamp = datetime.utcnow()  # Lets the API cache pick up the rewrite
                 
                 processed_count += 1
                 
@@ -418,6 +485,7 @@ async def process_existing_data_with_presidential_analysis(user_id: str, db: Ses
         
         # Commit changes to database
         db.commit()
+        invalidate_presidential_cache(user_id)
         
         response = {
             "message": f"Successfully processed {processed_count} records with presidential analysis",
@@ -557,7 +625,7 @@ def remove_similar_content(records: List[models.SentimentData], similarity_thres
     # Return only the records we decided to keep
     return [records_data[i]['record'] for i in indices_to_keep if i < len(records_data)]
 
-async def update_latest_data_with_presidential_analysis(user_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
+def update_latest_data_with_presidential_analysis(user_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     Get data from latest-data endpoint and update the 3 existing fields with presidential analysis.
     This function fetches the latest data and updates sentiment_label, sentiment_score, and sentiment_justification.
@@ -681,6 +749,7 @@ async def update_latest_data_with_presidential_analysis(user_id: str, db: Sessio
                 record.sentiment_label = analysis_result['sentiment_label']
                 record.sentiment_score = analysis_result['sentiment_score']
                 record.sentiment_justification = analysis_result['sentiment_justification']
+                record.run_timestamp = datetime.utcnow()  # Lets the API cache pick up the rewrite
                 
                 processed_count += 1
                 
@@ -758,6 +827,7 @@ async def update_latest_data_with_presidential_analysis(user_id: str, db: Sessio
         
         # Commit any remaining changes
         db.commit()
+        invalidate_presidential_cache(user_id)
         
         # Save processed data to CSV as backup
         csv_filepath = save_presidential_analysis_to_csv(processed_data_for_csv, user_id)
@@ -790,7 +860,7 @@ async def update_latest_data_with_presidential_analysis(user_id: str, db: Sessio
         raise HTTPException(status_code=500, detail=f"Presidential analysis update failed: {str(e)}")
 
 # Add this function to get presidential analysis for specific records
-async def get_presidential_analysis_for_records(record_ids: List[int], db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
+def get_presidential_analysis_for_records(record_ids: List[int], db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
     """
     Get presidential analysis for specific sentiment data records.
     """
@@ -823,6 +893,7 @@ async def get_presidential_analysis_for_records(record_ids: List[int], db: Sessi
                     record.sentiment_label = analysis_result['sentiment_label']
                     record.sentiment_score = analysis_result['sentiment_score']
                     record.sentiment_justification = analysis_result['sentiment_justification']
+                    record.run_timestamp = datetime.utcnow()  # Lets the API cache pick up the rewrite
                     
                     results.append({
                         "entry_id": record.entry_id,
@@ -835,6 +906,8 @@ async def get_presidential_analysis_for_records(record_ids: List[int], db: Sessi
         
         # Commit changes
         db.commit()
+        for record_user_id in {record.user_id for record in records if record.user_id}:
+            invalidate_presidential_cache(record_user_id)
         
         logger.info(f"Presidential analysis retrieved for {len(results)} records")
         return results
@@ -848,52 +921,53 @@ async def get_presidential_analysis_for_records(record_ids: List[int], db: Sessi
 def add_presidential_endpoints(app: FastAPI):
     """
     Add presidential analysis endpoints to the main FastAPI app.
+    Endpoints are sync so FastAPI runs their DB and model work on the worker threadpool.
     """
     
     @app.post("/presidential/analyze")
-    async def analyze_single(request: PresidentialAnalysisRequest):
+    def analyze_single(request: PresidentialAnalysisRequest):
         """Analyze a single text from the President's perspective."""
-        return await analyze_presidential_sentiment(request)
+        return analyze_presidential_sentiment(request)
     
     @app.post("/presidential/batch-analyze")
-    async def analyze_batch(request: PresidentialBatchRequest):
+    def analyze_batch(request: PresidentialBatchRequest):
         """Analyze multiple texts from the President's perspective."""
-        return await batch_analyze_presidential_sentiment(request)
+        return batch_analyze_presidential_sentiment(request)
     
     @app.post("/presidential/insights")
-    async def get_insights(request: PresidentialInsightsRequest, db: Session = Depends(get_db)):
+    def get_insights(request: PresidentialInsightsRequest, db: Session = Depends(get_db)):
         """Get strategic insights from presidential analysis."""
-        return await get_presidential_insights(request)
+        return get_presidential_insights(request)
     
     @app.post("/presidential/priorities")
-    async def update_priorities(request: PresidentialPrioritiesUpdate):
+    def update_priorities(request: PresidentialPrioritiesUpdate):
         """Update presidential priorities and keywords."""
-        return await update_presidential_priorities(request)
+        return update_presidential_priorities(request)
     
     @app.get("/presidential/report")
-    async def generate_report(db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
-        """Generate a comprehensive presidential strategic report for the authenticated user."""
-        return await generate_presidential_report(str(user_id), db)
+    def generate_report(window: Optional[str] = None, db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
+        """Generate a comprehensive presidential strategic report for the authenticated user (window: 24h, 7d, 30d, 90d or all)."""
+        return generate_presidential_report(str(user_id), db, window)
     
     @app.get("/presidential/metrics")
-    async def get_metrics(db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
-        """Get key presidential metrics and KPIs for the authenticated user."""
-        return await get_presidential_metrics(str(user_id), db)
+    def get_metrics(window: Optional[str] = None, db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
+        """Get key presidential metrics and KPIs for the authenticated user (window: 24h, 7d, 30d, 90d or all)."""
+        return get_presidential_metrics(str(user_id), db, window)
     
     @app.post("/presidential/process-existing")
-    async def process_existing_data(db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
+    def process_existing_data(db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
         """Process existing sentiment data with presidential analysis for the authenticated user."""
-        return await process_existing_data_with_presidential_analysis(str(user_id), db)
+        return process_existing_data_with_presidential_analysis(str(user_id), db)
     
     @app.post("/presidential/update-latest")
-    async def update_latest_data(db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
+    def update_latest_data(db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
         """Get data from latest-data endpoint and update the 3 existing fields with presidential analysis for the authenticated user."""
-        return await update_latest_data_with_presidential_analysis(str(user_id), db)
+        return update_latest_data_with_presidential_analysis(str(user_id), db)
     
     @app.post("/presidential/analyze-records")
-    async def analyze_specific_records(record_ids: List[int], db: Session = Depends(get_db)):
+    def analyze_specific_records(record_ids: List[int], db: Session = Depends(get_db)):
         """Get presidential analysis for specific sentiment data records."""
-        return await get_presidential_analysis_for_records(record_ids, db)
+        return get_presidential_analysis_for_records(record_ids, db)
     
     logger.debug("Presidential analysis endpoints added to FastAPI app")
 
@@ -0,0 +1,127 @@
+from fastapi import FastAPI, HTTPException, Depends, Query
+import logging
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+# Import database dependencies
+from . import models
+from .database import get_db
+from .auth import get_current_user_id
+from .data_query import _split
+# Dimensions and granularities as the agent maintains them
+from src.utils.sentiment_rollups import ROLLUP_DIMENSIONS, GRANULARITIES
+
+logger = logging.getLogger("rollup_service")
+
+
+def query_rollups(db: Session, user_id: UUID, granularity: str, group_by: List[str],
+                  start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                  dimension_filters: Optional[Dict[str, List[str]]] = None,
+                  by_bucket: bool = False) -> List[Dict[str, Any]]:
+    """
+    Sum pre-aggregated rollup rows for a user, grouped by the requested dimensions
+    (and by bucket_start for time series).
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {list(GRANULARITIES)}")
+    unknown = [name for name in group_by if name not in ROLLUP_DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by dimensions: {', '.join(unknown)}")
+
+    rollup = models.SentimentRollup
+    keys = ([rollup.bucket_start] if by_bucket else []) + [getattr(rollup, name) for name in group_by]
+    score_sum = func.sum(rollup.sentiment_score_sum)
+    score_count = func.sum(rollup.sentiment_score_count)
+    query = db.query(
+        *keys,
+        func.sum(rollup.record_count),
+        score_sum,
+        score_count,
+        func.sum(rollup.likes_sum),
+        func.sum(rollup.retweets_sum),
+        func.sum(rollup.comments_sum)
+    ).filter(rollup.user_id == user_id, rollup.granularity == granularity)
+    if start_date:
+        query = query.filter(rollup.bucket_start >= start_date)
+    if end_date:
+        query = query.filter(rollup.bucket_start <= end_date)
+    for name, values in (dimension_filters or {}).items():
+        if values:
+            query = query.filter(getattr(rollup, name).in_(values))
+    if keys:
+        query = query.group_by(*keys).order_by(*keys)
+
+    names = (["bucket_start"] if by_bucket else []) + group_by
+    groups = []
+    for row in query.all():
+        key_values, (count, total_score, scored, likes, retweets, comments) = row[:len(keys)], row[len(keys):]
+        group = {
+            name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in zip(names, key_values)
+        }
+        group.update({
+            "record_count": int(count or 0),
+            "avg_sentiment_score": (total_score / scored) if scored else None,
+            "likes": int(likes or 0),
+            "retweets": int(retweets or 0),
+            "comments": int(comments or 0)
+        })
+        groups.append(group)
+    return groups
+
+
+def _dimension_filters(platform: Optional[str], sentiment: Optional[str], ministry: Optional[str],
+                       issue: Optional[str], location: Optional[str]) -> Dict[str, List[str]]:
+    return {
+        "platform": _split(platform), "sentiment_label": _split(sentiment), "ministry_hint": _split(ministry),
+        "issue_slug": _split(issue), "location_label": _split(location)
+    }
+
+
+# Helper function to integrate with existing service
+def add_rollup_endpoints(app: FastAPI):
+    """
+    Add dashboard rollup endpoints to the main FastAPI app.
+    """
+
+    @app.get("/rollups/summary")
+    def rollup_summary(group_by: str = Query("sentiment_label"), granularity: str = Query("day"),
+                       start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                       platform: Optional[str] = None, sentiment: Optional[str] = None,
+                       ministry: Optional[str] = None, issue: Optional[str] = None,
+                       location: Optional[str] = None,
+                       db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
+        """Dashboard totals (sentiment split, ministry/issue/platform/regional breakdowns) from the rollup tables."""
+        try:
+            groups = query_rollups(db, user_id, granularity, _split(group_by), start_date, end_date,
+                                   _dimension_filters(platform, sentiment, ministry, issue, location))
+            return {"status": "success", "group_by": _split(group_by), "data": groups}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error reading rollup summary for user {user_id}: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Rollup summary failed: {str(e)}")
+
+    @app.get("/rollups/timeseries")
+    def rollup_timeseries(group_by: Optional[str] = None, granularity: str = Query("day"),
+                          start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                          platform: Optional[str] = None, sentiment: Optional[str] = None,
+                          ministry: Optional[str] = None, issue: Optional[str] = None,
+                          location: Optional[str] = None,
+                          db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
+        """Per-bucket (day or hour) totals from the rollup tables, optionally split by dimensions."""
+        try:
+            groups = query_rollups(db, user_id, granularity, _split(group_by), start_date, end_date,
+                                   _dimension_filters(platform, sentiment, ministry, issue, location),
+                                   by_bucket=True)
+            return {"status": "success", "granularity": granularity, "group_by": _split(group_by), "data": groups}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error reading rollup time series for user {user_id}: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Rollup time series failed: {str(e)}")
+
+    logger.debug("Rollup endpoints added to FastAPI app")
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, WebSocket, HTTPException, BackgroundTasks, Depends, Response, status, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
 import json
 import asyncio
@@ -16,8 +17,18 @@ from uuid import UUID
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from . import models, database, admin
-from .database import SessionLocal, engine, get_db
+from .database import (
+    SessionLocal, engine, get_db, get_async_db, run_in_db_thread, configure_threadpool, dispose_async_engine
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .middlewares import UsageTrackingMiddleware
+from .usage_sink import usage_sink
+from starlette.concurrency import run_in_threadpool
+from .data_query import (
+    DataFilters, parse_fields, page_frame, project_frame, frame_to_records, MAX_PAGE_SIZE,
+    iter_export_chunks, gzip_chunks, EXPORT_FORMATS
+)
 from sqlalchemy import text
 # Import the agent
 import sys
@@ -28,7 +39,12 @@ from utils.mail_sender import MailSender
 from utils.scheduled_reports import ReportScheduler
 
 # Import presidential analysis service
-from .presidential_service import add_presidential_endpoints
+from .presidential_service import add_presidential_endpoints, invalidate_presidential_cache
+# Import engagement time-series endpoints
+from .engagement_service import add_engagement_endpoints
+# Import dashboard rollup endpoints
+from .rollup_service import add_rollup_endpoints
+from .target_matching import schedule_rematch
 
 # Import the auth dependency
 from .auth import get_current_user_id
@@ -102,9 +118,17 @@ app.include_router(admin.router)
 # Add presidential analysis endpoints
 add_presidential_endpoints(app)
 
+# Add engagement velocity endpoints
+add_engagement_endpoints(app)
+
+# Add dashboard rollup endpoints
+add_rollup_endpoints(app)
+
 # Initialize agent
 try:
     agent = SentimentAnalysisAgent(db_factory=SessionLocal)
+    # Drop cached presidential metrics/reports once a cycle writes new analysis
+    agent.add_analysis_listener(invalidate_presidential_cache)
 except Exception as e:
     logger.error(f"Failed to initialize SentimentAnalysisAgent: {e}", exc_info=True)
     # Decide how to handle this error - exit, run without agent?
@@ -278,7 +302,7 @@ def parse_datetime(dt_input: Optional[Any]) -> Optional[datetime]:
     return parsed_dt
 
 @app.post("/data/update")
-async def update_data(request: DataUpdateRequest, db: Session = Depends(get_db)):
+def update_data(request: DataUpdateRequest, db: Session = Depends(get_db)):
     try:
         user_id = request.user_id  # Get user_id from request
         new_records = request.data
@@ -347,7 +371,8 @@ async def update_data(request: DataUpdateRequest, db: Session = Depends(get_db))
             # Invalidate cache when new data is added
             try:
                 from .data_cache import sentiment_cache
-                sentiment_cache.clear_cache()
+                sentiment_cache.invalidate(user_id)
+                invalidate_presidential_cache(user_id)
                 logger.info("Cache invalidated due to new data")
             except Exception as cache_error:
                 logger.warning(f"Failed to invalidate cache: {cache_error}")
@@ -362,12 +387,32 @@ async def update_data(request: DataUpdateRequest, db: Session = Depends(get_db))
         raise HTTPException(status_code=500, detail=f"Error updating database: {e}")
 
 @app.get("/latest-data")
-async def get_latest_data(db: Session = Depends(get_db), user_id: Optional[str] = None):
-    """Get processed data with AI justification (any content) with optional target individual filtering."""
+def get_latest_data(db: Session = Depends(get_db), user_id: Optional[str] = None,
+                    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                    cursor: Optional[str] = None, fields: Optional[str] = None,
+                    start_date: Optional[str] = None, end_date: Optional[str] = None,
+                    platform: Optional[str] = None, sentiment: Optional[str] = None,
+                    ministry: Optional[str] = None, issue: Optional[str] = None):
+    """
+    Get processed data with AI justification (any content) with optional target individual filtering.
+
+    Pass `limit` (and the returned `next_cursor` as `cursor`) for keyset pagination on (date, entry_id),
+    `fields` (comma-separated) to project the response, and date/platform/sentiment/ministry/issue
+    (comma-separated values) to filter on the user's cached snapshot before anything is serialized.
+    """
     try:
         logger.info(f"Latest data endpoint called with user_id: {user_id}")
         from .data_cache import sentiment_cache
         
+        try:
+            selected_fields = parse_fields(fields)
+            filters = DataFilters.from_params(
+                user_id=user_id, start_date=parse_datetime(start_date), end_date=parse_datetime(end_date),
+                platform=platform, sentiment=sentiment, ministry=ministry, issue=issue
+            )
+        except ValueError as param_error:
+            raise HTTPException(status_code=400, detail=str(param_error))
+        
         # Test database connection first
         try:
             db.execute(text("SELECT 1"))
@@ -376,11 +421,11 @@ async def get_latest_data(db: Session = Depends(get_db), user_id: Optional[str]
             logger.error(f"Database connection failed: {str(db_error)}")
             return {"status": "error", "message": f"Database connection failed: {str(db_error)}"}
         
-        # Get AI processed data from cache
+        # Get the user's cached snapshot and apply filters as column masks
         logger.info("Loading AI processed data from cache...")
-        results = sentiment_cache.get_ai_processed_data(db)
+        results = filters.apply_to_frame(sentiment_cache.get_all_frame(db, user_id=user_id))
         
-        if not results:
+        if results.empty and not cursor:
             return {"status": "error", "message": "No data with AI justification available."}
         
         # Target individual filtering
@@ -401,7 +446,7 @@ async def get_latest_data(db: Session = Depends(get_db), user_id: Optional[str]
                     logger.info(f"Found target config for user {user_id}: {target_config.individual_name} with {len(target_config.query_variations)} variations")
                     
                     # Apply target filtering using cache
-                    results = sentiment_cache.filter_by_target_config(results, target_config)
+                    results = sentiment_cache.filter_by_target_config(results, target_config, db=db)
                     logger.info(f"Applied target individual filtering for user {user_id}")
                 else:
                     logger.info(f"No target config found for user {user_id}, returning general data")
@@ -417,20 +462,63 @@ async def get_latest_data(db: Session = Depends(get_db), user_id: Optional[str]
         deduplicated_results = sentiment_cache.deduplicate_data(results)
         logger.info(f"After deduplication: {len(deduplicated_results)} unique records")
         
-        data_list = [row.to_dict() for row in deduplicated_results]
+        # Page and project before serializing
+        try:
+            page, next_cursor = page_frame(deduplicated_results, cursor, limit)
+        except ValueError as cursor_error:
+            raise HTTPException(status_code=400, detail=str(cursor_error))
+        data_list = frame_to_records(project_frame(page, selected_fields))
 
-        return {
+        # Encode and render here, on the worker thread; a returned dict would be encoded on the event loop
+        return JSONResponse(content=jsonable_encoder({
             "status": "success",
             "data": data_list,
             "record_count": len(data_list),
+            "total_count": len(deduplicated_results),
+            "next_cursor": next_cursor,
             "user_id": user_id,
             "target_individual": target_config.individual_name if target_config else "No target configured",
             "note": f"Data with AI justification - Target filtering {'ENABLED' if target_config else 'DISABLED'}, Deduplication ENABLED, Cache ENABLED"
-        }
+        }))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching data from cache: {str(e)}", exc_info=True)
         return {"status": "error", "message": f"Error fetching data: {str(e)}"}
 
+@app.get("/data/export")
+async def export_data(request: Request, format: str = Query("ndjson"), fields: Optional[str] = None,
+                      start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      platform: Optional[str] = None, sentiment: Optional[str] = None,
+                      ministry: Optional[str] = None, issue: Optional[str] = None,
+                      ai_processed_only: bool = True, compress: bool = True,
+                      user_id: UUID = Depends(get_current_user_id)):
+    """
+    Stream the authenticated user's data as NDJSON (or CSV) straight from a server-side cursor.
+
+    Memory stays bounded by one chunk of rows regardless of result size. The body is gzipped
+    on the fly when the client accepts gzip (disable with compress=false). Filters match /latest-data.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {sorted(EXPORT_FORMATS)}")
+    try:
+        selected_fields = parse_fields(fields)
+        filters = DataFilters.from_params(
+            user_id=user_id, start_date=parse_datetime(start_date), end_date=parse_datetime(end_date),
+            platform=platform, sentiment=sentiment, ministry=ministry, issue=issue,
+            ai_processed_only=ai_processed_only
+        )
+    except ValueError as param_error:
+        raise HTTPException(status_code=400, detail=str(param_error))
+
+    logger.info(f"Streaming {format} export for user {user_id} with fields: {selected_fields}")
+    chunks = iter_export_chunks(SessionLocal, filters, selected_fields, format)
+    headers = {"Content-Disposition": f'attachment; filename="sentiment_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{format}"'}
+    if compress and "gzip" in request.headers.get("accept-encoding", ""):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=EXPORT_FORMATS[format], headers=headers)
+
 @app.get("/config")
 async def get_config():
     """Get current agent configuration"""
@@ -450,16 +538,18 @@ class TargetIndividualConfig(BaseModel):
     query_variations: List[str]
 
 @app.get("/target")
-async def get_target_individual(db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
+async def get_target_individual(db: AsyncSession = Depends(get_async_db), user_id: UUID = Depends(get_current_user_id)):
     """Get the target individual configuration for the authenticated user."""
     # --- Added detailed logging --- 
     try:
         # Filter by user_id
         logger.debug(f"get_target_individual: Querying DB for TargetIndividualConfiguration with user_id = {user_id}")
-        config = db.query(models.TargetIndividualConfiguration)\
-                 .filter(models.TargetIndividualConfiguration.user_id == user_id)\
-                 .order_by(models.TargetIndividualConfiguration.created_at.desc())\
-                 .first()
+        config = (await db.execute(
+            select(models.TargetIndividualConfiguration)
+            .where(models.TargetIndividualConfiguration.user_id == user_id)
+            .order_by(models.TargetIndividualConfiguration.created_at.desc())
+            .limit(1)
+        )).scalars().first()
         
         logger.debug(f"get_target_individual: DB query result: {config}") # Log query result
         # --- End added logging ---
@@ -486,25 +576,27 @@ from uuid import UUID
 from .models import User
 
 @app.post("/target")
-async def update_target_individual(target_config: TargetIndividualConfig, db: Session = Depends(get_db), user_id: UUID = Depends(get_current_user_id)):
+async def update_target_individual(target_config: TargetIndividualConfig, db: AsyncSession = Depends(get_async_db), user_id: UUID = Depends(get_current_user_id)):
     """Update or create the target individual configuration for the authenticated user."""
     logger.debug(f"Updating target config for user: {user_id}")
     try:
         # Check if a config already exists for this user
         # user = db.query(models.User).filter(models.User.id == user_id).first()
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        existing_config = db.query(models.TargetIndividualConfiguration)\
-                            .filter(models.TargetIndividualConfiguration.user_id == user_id)\
-                            .first()
+        existing_config = (await db.execute(
+            select(models.TargetIndividualConfiguration)
+            .where(models.TargetIndividualConfiguration.user_id == user_id)
+            .limit(1)
+        )).scalars().first()
        
         if existing_config:
             # Update existing config
             existing_config.individual_name = target_config.individual_name
             existing_config.query_variations = target_config.query_variations
-            db.commit()
-            db.refresh(existing_config)
+            await db.commit()
+            await db.refresh(existing_config)
             config_id = existing_config.id
         else:
             new_config = models.TargetIndividualConfiguration(\
@@ -515,11 +607,14 @@ async def update_target_individual(target_config: TargetIndividualConfig, db: Se
             )
             db.add(new_config)
             logger.info(f"Attempting to commit new target config for user {user_id}...") # Log before commit
-            db.commit()
+            await db.commit()
             logger.info(f"Successfully committed new target config for user {user_id}.") # Log after commit
-            db.refresh(new_config)
+            await db.refresh(new_config)
             config_id = new_config.id
         
+        # Re-match stored records against the new search words in the background
+        schedule_rematch(config_id)
+        
         # Broadcast the update via websocket
         await broadcast_update({
             'type': 'target_update',
@@ -533,7 +628,7 @@ async def update_target_individual(target_config: TargetIndividualConfig, db: Se
             "data": target_config.dict()
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating target config: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to update target individual configuration: {str(e)}")
 
@@ -770,10 +865,12 @@ class SupabaseSignupPayload(BaseModel):
     is_admin: Optional[bool] = False
 
 @app.post("/user/register")
-async def register_user(payload: SupabaseSignupPayload, db: Session = Depends(get_db)):
+async def register_user(payload: SupabaseSignupPayload, db: AsyncSession = Depends(get_async_db)):
     print(f"📥 Received register request for: {payload.email}")
 
-    existing_user = db.query(models.User).filter(models.User.email == payload.email).first()
+    existing_user = (await db.execute(
+        select(models.User).where(models.User.email == payload.email).limit(1)
+    )).scalars().first()
     if existing_user:
         print("⚠️ User already exists")
         return {"status": "success", "message": "User already exists"}
@@ -793,13 +890,13 @@ async def register_user(payload: SupabaseSignupPayload, db: Session = Depends(ge
         )
 
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
 
         print(f"✅ New user created: {new_user.email}")
         return {"status": "success", "message": "User registered"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"❌ DB error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -818,12 +915,39 @@ async def sync_users_from_supabase(db: Session = Depends(get_db), _: str = Depen
         logger.error(f"Error syncing users: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+def _ensure_admin_user(db: Session):
+    """Create the first admin user when none exists."""
+    admin_user = db.query(models.User).filter(models.User.is_admin == True).first()
+    if not admin_user:
+        try:
+            # Create first admin user
+            admin_id = uuid.uuid4()
+            admin_email = "admin@example.com"  # You should change this in production
+            admin_user = models.User(
+                id=admin_id,
+                email=admin_email,
+                is_admin=True
+            )
+            logger.info("Creating initial admin user")
+            db.add(admin_user)
+            db.commit()
+            logger.info(f"Created initial admin user with ID: {admin_id}")
+        except Exception as e:
+            logger.error(f"Failed to create admin user: {e}")
+            db.rollback()
+
 @app.on_event("startup")
 async def startup_event():
     global report_scheduler
     logger.info("=" * 60)
     logger.info("API Service Starting Up")
     logger.info("=" * 60)
+
+    # Size the worker threadpool that runs sync endpoints and DB dependencies off the event loop
+    configure_threadpool()
+
+    # Start the background writer for request usage logging
+    usage_sink.start()
     
     # Log database connection pool info (from database.py configuration)
     logger.info(f"Database Connection Pool:")
@@ -859,28 +983,9 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to initialize report scheduler at startup: {e}", exc_info=True)
         
-    # Set up initial admin user if none exists
+    # Set up initial admin user if none exists (sync session on the worker threadpool)
     try:
-        db = SessionLocal()
-        admin_user = db.query(models.User).filter(models.User.is_admin == True).first()
-        if not admin_user:
-            try:
-                # Create first admin user
-                admin_id = uuid.uuid4()
-                admin_email = "admin@example.com"  # You should change this in production
-                admin_user = models.User(
-                    id=admin_id,
-                    email=admin_email,
-                    is_admin=True
-                )
-                logger.info("Creating initial admin user")
-                db.add(admin_user)
-                db.commit()
-                logger.info(f"Created initial admin user with ID: {admin_id}")
-            except Exception as e:
-                logger.error(f"Failed to create admin user: {e}")
-                db.rollback()
-        db.close()
+        await run_in_db_thread(_ensure_admin_user)
     except Exception as e:
         logger.error(f"Error checking/creating admin user: {e}")
 
@@ -920,6 +1025,15 @@ async def startup_event():
     logger.info("API Service startup complete - Ready to accept requests")
     logger.info("=" * 60)
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Write buffered usage before exiting (joins the flusher off the event loop)
+    try:
+        await run_in_threadpool(usage_sink.stop)
+    except Exception as e:
+        logger.error(f"Error flushing usage sink on shutdown: {e}", exc_info=True)
+    await dispose_async_engine()
+
 def apply_target_filtering_to_media_data(db: Session, all_data: List, user_id: Optional[str], endpoint_name: str) -> List:
     """Helper function to apply target individual filtering to media data"""
     if not user_id:
@@ -936,7 +1050,7 @@ def apply_target_filtering_to_media_data(db: Session, all_data: List, user_id: O
         if target_config:
             from .data_cache import sentiment_cache
             logger.info(f"Applying target filtering for {endpoint_name}: {target_config.individual_name}")
-            filtered_data = sentiment_cache.filter_by_target_config(all_data, target_config)
+            filtered_data = sentiment_cache.filter_by_target_config(all_data, target_config, db=db)
             logger.info(f"Filtered {len(all_data)} to {len(filtered_data)} records for target individual")
             return filtered_data
         else:
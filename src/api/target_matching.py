@@ -0,0 +1,268 @@
+"""
+Precomputed target-term matching
+Records are matched against a target configuration's search words once, at ingest or when the
+configuration changes, and stored in target_matches so request-time filtering is an indexed lookup
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+MATCH_CHUNK_ROWS = 5000
+# Keep bound parameters per statement well below PostgreSQL's 65535 limit
+MAX_ROWS_PER_STATEMENT = 1000
+# Unmatched rows above the watermark that trigger a background catch-up from the request path
+CATCH_UP_THRESHOLD_ROWS = 2000
+
+_running_rematches: Set[int] = set()
+_running_lock = threading.Lock()
+
+
+def target_search_words(target_config: models.TargetIndividualConfiguration) -> List[str]:
+    """Lowercased words of at least 3 characters from the individual name and query variations."""
+    search_words = set()
+    for term in [target_config.individual_name] + list(target_config.query_variations or []):
+        if term and term.strip():
+            search_words.update(word.strip().lower() for word in term.split() if len(word.strip()) >= 3)
+    return sorted(search_words)
+
+
+def terms_signature(words: Iterable[str]) -> str:
+    """Stable hash of a search word set; a changed signature invalidates stored matches."""
+    return hashlib.sha1("\n".join(sorted(words)).encode("utf-8")).hexdigest()
+
+
+def compile_target_pattern(words: List[str]) -> Optional[re.Pattern]:
+    """Alternation of the search words (substring, already lowercase) or None when there are none."""
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(word) for word in words))
+
+
+def match_mask(frame: pd.DataFrame, pattern: Optional[re.Pattern]) -> pd.Series:
+    """Boolean mask of rows whose text, title or content contains any search word."""
+    if pattern is None or frame.empty:
+        return pd.Series(False, index=frame.index)
+    haystack = (frame['text'].fillna('').astype(str) + " " + frame['title'].fillna('').astype(str) + " "
+                + frame['content'].fillna('').astype(str)).str.lower()
+    return haystack.str.contains(pattern, regex=True)
+
+
+def _user_scope(query, target_config: models.TargetIndividualConfiguration):
+    if target_config.user_id is not None:
+        query = query.filter(models.SentimentData.user_id == target_config.user_id)
+    return query
+
+
+def _insert_matches(db: Session, config_id: int, entry_ids: List[int]):
+    table = models.TargetMatch.__table__
+    for start in range(0, len(entry_ids), MAX_ROWS_PER_STATEMENT):
+        db.execute(insert(table), [
+            {'target_config_id': config_id, 'entry_id': int(entry_id)}
+            for entry_id in entry_ids[start:start + MAX_ROWS_PER_STATEMENT]
+        ])
+
+
+def _text_frame(rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=['entry_id', 'text', 'title', 'content'])
+
+
+def get_match_state(db: Session, target_config: models.TargetIndividualConfiguration) -> Optional[models.TargetMatchState]:
+    """Match state for the configuration, or None when matches are missing or built for older terms."""
+    state = db.get(models.TargetMatchState, target_config.id)
+    if state is None or state.terms_signature != terms_signature(target_search_words(target_config)):
+        return None
+    return state
+
+
+def sync_target_matches(db: Session, target_config: models.TargetIndividualConfiguration,
+                        chunk_rows: int = MATCH_CHUNK_ROWS) -> int:
+    """
+    Incrementally match the configuration's records above the stored watermark.
+
+    When the search words changed since the last run, stored matches are dropped and matching
+    restarts from the first record. Each chunk is committed with the advanced watermark, so an
+    interrupted re-match resumes where it stopped.
+
+    Returns:
+        Number of matches inserted
+    """
+    words = target_search_words(target_config)
+    signature = terms_signature(words)
+    pattern = compile_target_pattern(words)
+    data = models.SentimentData
+
+    state = db.get(models.TargetMatchState, target_config.id)
+    if state is None or state.terms_signature != signature:
+        if state is not None:
+            logger.info(f"Search words changed for target config {target_config.id}, rebuilding matches")
+        db.execute(delete(models.TargetMatch.__table__).where(
+            models.TargetMatch.__table__.c.target_config_id == target_config.id))
+        if state is None:
+            state = models.TargetMatchState(target_config_id=target_config.id)
+            db.add(state)
+        state.terms_signature = signature
+        state.matched_through_entry_id = 0
+        state.match_count = 0
+        state.updated_at = datetime.utcnow()
+        db.commit()
+
+    inserted = 0
+    scanned = 0
+    while True:
+        rows = _user_scope(
+            db.query(data.entry_id, data.text, data.title, data.content), target_config
+        ).filter(
+            data.entry_id > state.matched_through_entry_id
+        ).order_by(data.entry_id).limit(chunk_rows).all()
+        if not rows:
+            break
+
+        frame = _text_frame(rows)
+        matched_ids = frame.loc[match_mask(frame, pattern).to_numpy(), 'entry_id'].tolist()
+        _insert_matches(db, target_config.id, matched_ids)
+        state.matched_through_entry_id = int(frame['entry_id'].iloc[-1])
+        state.match_count += len(matched_ids)
+        state.updated_at = datetime.utcnow()
+        db.commit()
+
+        inserted += len(matched_ids)
+        scanned += len(frame)
+        if len(rows) < chunk_rows:
+            break
+
+    if scanned:
+        logger.info(f"Target config {target_config.id}: matched {inserted} of {scanned} records "
+                    f"(watermark {state.matched_through_entry_id}, {state.match_count} total matches)")
+    return inserted
+
+
+def rematch_entries(db: Session, target_config: models.TargetIndividualConfiguration, entry_ids: Iterable[int]) -> int:
+    """
+    Re-match records already below the watermark whose text changed (caller commits).
+
+    Records above the watermark are left to sync_target_matches.
+
+    Returns:
+        Number of matches after re-matching
+    """
+    state = get_match_state(db, target_config)
+    if state is None:
+        return 0
+    entry_ids = sorted({int(entry_id) for entry_id in entry_ids if int(entry_id) <= state.matched_through_entry_id})
+    if not entry_ids:
+        return 0
+
+    data = models.SentimentData
+    table = models.TargetMatch.__table__
+    pattern = compile_target_pattern(target_search_words(target_config))
+    matched_total = 0
+    for start in range(0, len(entry_ids), MAX_ROWS_PER_STATEMENT):
+        batch = entry_ids[start:start + MAX_ROWS_PER_STATEMENT]
+        removed = db.execute(delete(table).where(
+            table.c.target_config_id == target_config.id, table.c.entry_id.in_(batch))).rowcount or 0
+        frame = _text_frame(db.query(data.entry_id, data.text, data.title, data.content)
+                            .filter(data.entry_id.in_(batch)).all())
+        matched_ids = frame.loc[match_mask(frame, pattern).to_numpy(), 'entry_id'].tolist()
+        _insert_matches(db, target_config.id, matched_ids)
+        state.match_count += len(matched_ids) - removed
+        matched_total += len(matched_ids)
+    state.updated_at = datetime.utcnow()
+    return matched_total
+
+
+def matched_entry_ids(db: Session, target_config_id: int) -> np.ndarray:
+    """Entry ids matching a configuration, read from the (target_config_id, entry_id) primary key."""
+    rows = db.query(models.TargetMatch.entry_id).filter(
+        models.TargetMatch.target_config_id == target_config_id).all()
+    return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+
+def filter_frame_by_matches(db: Session, frame: pd.DataFrame,
+                            target_config: models.TargetIndividualConfiguration) -> Optional[pd.DataFrame]:
+    """
+    Filter a snapshot frame to records matching the configuration using stored matches.
+
+    Only records newer than the watermark (ingested after the last match run) are scanned.
+    Returns None when matches have not been built for the current search words yet.
+    """
+    state = get_match_state(db, target_config)
+    if state is None:
+        schedule_rematch(target_config.id)
+        return None
+
+    mask = frame['entry_id'].isin(matched_entry_ids(db, target_config.id)).to_numpy(copy=True)
+    unmatched = (frame['entry_id'] > state.matched_through_entry_id).to_numpy()
+    if unmatched.any():
+        pattern = compile_target_pattern(target_search_words(target_config))
+        mask[unmatched] = match_mask(frame[unmatched], pattern).to_numpy()
+        if unmatched.sum() >= CATCH_UP_THRESHOLD_ROWS:
+            schedule_rematch(target_config.id)
+    return frame[mask]
+
+
+def filter_records_by_matches(db: Session, records: List, target_config: models.TargetIndividualConfiguration) -> Optional[List]:
+    """List counterpart of filter_frame_by_matches for SentimentData objects (or anything with entry_id)."""
+    state = get_match_state(db, target_config)
+    if state is None:
+        schedule_rematch(target_config.id)
+        return None
+
+    matched = set(matched_entry_ids(db, target_config.id).tolist())
+    pattern = compile_target_pattern(target_search_words(target_config))
+    filtered = []
+    for record in records:
+        entry_id = getattr(record, 'entry_id', None)
+        if entry_id is None:
+            return None
+        if entry_id > state.matched_through_entry_id:
+            haystack = ((record.text or "") + " " + (record.title or "") + " " + (record.content or "")).lower()
+            if pattern is not None and pattern.search(haystack):
+                filtered.append(record)
+        elif entry_id in matched:
+            filtered.append(record)
+    return filtered
+
+
+def _run_rematch(target_config_id: int):
+    from .database import SessionLocal
+    db = SessionLocal()
+    try:
+        target_config = db.get(models.TargetIndividualConfiguration, target_config_id)
+        if target_config is not None:
+            sync_target_matches(db, target_config)
+    except Exception as e:
+        logger.error(f"Background re-match failed for target config {target_config_id}: {e}", exc_info=True)
+        db.rollback()
+    finally:
+        db.close()
+        with _running_lock:
+            _running_rematches.discard(target_config_id)
+
+
+def schedule_rematch(target_config_id: int) -> bool:
+    """
+    Start an incremental re-match for a configuration on a background thread.
+
+    Returns:
+        False when a re-match for the configuration is already running
+    """
+    with _running_lock:
+        if target_config_id in _running_rematches:
+            return False
+        _running_rematches.add(target_config_id)
+    threading.Thread(target=_run_rematch, args=(target_config_id,), daemon=True,
+                     name=f"target-rematch-{target_config_id}").start()
+    return True
@@ -0,0 +1,168 @@
+"""
+Daily usage rollup for the admin endpoints
+Completed days of user_system_usage are folded into user_usage_daily; admin statistics combine
+those rows with one grouped query over the recent raw tail, so each request runs a fixed number of queries
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional, Any, Tuple
+
+from sqlalchemy import func, case, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# Days that stay in the raw tail before being rolled up (covers late, buffered usage writes)
+ROLLUP_LAG_DAYS = 1
+
+
+@dataclass
+class UsageTotals:
+    """Per-user request counters combined from the daily rollup and the raw tail."""
+    requests: int = 0
+    recent_requests: int = 0
+    errors: int = 0
+    execution_time_sum_ms: int = 0
+    execution_time_count: int = 0
+
+    @property
+    def avg_execution_time(self) -> Optional[float]:
+        return self.execution_time_sum_ms / self.execution_time_count if self.execution_time_count else None
+
+    @property
+    def error_rate(self) -> float:
+        return (self.errors / self.requests) * 100 if self.requests else 0
+
+
+def _as_date(value: Any) -> date:
+    """func.date() returns a date on PostgreSQL and an ISO string on SQLite."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def rollup_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Start of the raw tail: usage before this instant lives in user_usage_daily."""
+    today = (now or datetime.utcnow()).date()
+    return datetime.combine(today - timedelta(days=ROLLUP_LAG_DAYS), datetime.min.time())
+
+
+def refresh_usage_rollup(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Roll completed days of user_system_usage into user_usage_daily (one grouped INSERT per new day range).
+
+    Returns:
+        Number of (user, day) rows added
+    """
+    usage = models.UserSystemUsage
+    cutoff = rollup_cutoff(now)
+    last_day = db.query(func.max(models.UserUsageDaily.day)).scalar()
+    start = datetime.combine(_as_date(last_day) + timedelta(days=1), datetime.min.time()) if last_day else None
+    if start is not None and start >= cutoff:
+        return 0
+
+    day = func.date(usage.timestamp)
+    query = db.query(
+        usage.user_id, day,
+        func.count(usage.id),
+        func.sum(case((usage.is_error == True, 1), else_=0)),
+        func.coalesce(func.sum(usage.execution_time_ms), 0),
+        func.count(usage.execution_time_ms)
+    ).filter(usage.timestamp < cutoff)
+    if start is not None:
+        query = query.filter(usage.timestamp >= start)
+    rows = query.group_by(usage.user_id, day).all()
+    if not rows:
+        return 0
+
+    try:
+        db.execute(insert(models.UserUsageDaily.__table__), [{
+            'user_id': user_id, 'day': _as_date(row_day), 'request_count': requests,
+            'error_count': int(errors or 0), 'execution_time_sum_ms': int(time_sum or 0),
+            'execution_time_count': time_count
+        } for user_id, row_day, requests, errors, time_sum, time_count in rows])
+        db.commit()
+    except IntegrityError:
+        # Another request rolled up the same days first
+        db.rollback()
+        return 0
+    logger.info(f"Rolled up {len(rows)} user-days of usage before {cutoff.date()}")
+    return len(rows)
+
+
+def usage_totals_by_user(db: Session, recent_since: datetime, now: Optional[datetime] = None) -> Dict[Any, UsageTotals]:
+    """
+    Request, error and execution-time totals per user in at most three grouped queries.
+
+    recent_requests counts usage since recent_since: whole rolled-up days after its day,
+    plus the raw rows of its (partial) day and of the raw tail.
+    """
+    daily = models.UserUsageDaily
+    usage = models.UserSystemUsage
+    cutoff = rollup_cutoff(now)
+    totals: Dict[Any, UsageTotals] = {}
+
+    for user_id, requests, recent, errors, time_sum, time_count in db.query(
+        daily.user_id,
+        func.sum(daily.request_count),
+        func.sum(case((daily.day > recent_since.date(), daily.request_count), else_=0)),
+        func.sum(daily.error_count),
+        func.sum(daily.execution_time_sum_ms),
+        func.sum(daily.execution_time_count)
+    ).filter(daily.day < cutoff.date()).group_by(daily.user_id):
+        totals[user_id] = UsageTotals(int(requests or 0), int(recent or 0), int(errors or 0),
+                                      int(time_sum or 0), int(time_count or 0))
+
+    for user_id, requests, recent, errors, time_sum, time_count in db.query(
+        usage.user_id,
+        func.count(usage.id),
+        func.sum(case((usage.timestamp >= recent_since, 1), else_=0)),
+        func.sum(case((usage.is_error == True, 1), else_=0)),
+        func.coalesce(func.sum(usage.execution_time_ms), 0),
+        func.count(usage.execution_time_ms)
+    ).filter(usage.timestamp >= cutoff).group_by(usage.user_id):
+        user_totals = totals.setdefault(user_id, UsageTotals())
+        user_totals.requests += int(requests or 0)
+        user_totals.recent_requests += int(recent or 0)
+        user_totals.errors += int(errors or 0)
+        user_totals.execution_time_sum_ms += int(time_sum or 0)
+        user_totals.execution_time_count += int(time_count or 0)
+
+    # The partial first day of the recent window, when it is already rolled up
+    boundary_end = datetime.combine(recent_since.date() + timedelta(days=1), datetime.min.time())
+    if boundary_end <= cutoff:
+        for user_id, recent in db.query(usage.user_id, func.count(usage.id)).filter(
+            usage.timestamp >= recent_since, usage.timestamp < boundary_end
+        ).group_by(usage.user_id):
+            totals.setdefault(user_id, UsageTotals()).recent_requests += int(recent or 0)
+
+    return totals
+
+
+def daily_usage(db: Session, user_id: Any, start: datetime, now: Optional[datetime] = None) -> List[Tuple[date, int]]:
+    """Request counts per day for one user since start, oldest first."""
+    daily = models.UserUsageDaily
+    usage = models.UserSystemUsage
+    cutoff = rollup_cutoff(now)
+    counts: Dict[date, int] = {}
+
+    for row_day, requests in db.query(daily.day, daily.request_count).filter(
+        daily.user_id == user_id, daily.day >= start.date(), daily.day < cutoff.date()
+    ):
+        counts[_as_date(row_day)] = requests
+
+    day = func.date(usage.timestamp)
+    for row_day, requests in db.query(day, func.count(usage.id)).filter(
+        usage.user_id == user_id, usage.timestamp >= max(start, cutoff)
+    ).group_by(day):
+        row_day = _as_date(row_day)
+        counts[row_day] = counts.get(row_day, 0) + requests
+
+    return sorted(counts.items())
@@ -0,0 +1,176 @@
+"""
+Background usage sink for UsageTrackingMiddleware
+Requests append usage entries to a bounded in-memory ring buffer; a background thread drains it
+with one bulk INSERT into user_system_usage and one aggregated api_calls_count UPDATE per user per flush
+"""
+
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Any
+
+from sqlalchemy import insert, update, bindparam, func
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# Entries held in memory before the oldest are dropped (bounds memory and loss on crash)
+USAGE_BUFFER_CAPACITY = int(os.getenv("USAGE_BUFFER_CAPACITY", "10000"))
+# Seconds between flushes; at most this much usage is lost if the process dies
+USAGE_FLUSH_INTERVAL_SECONDS = float(os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "5"))
+# Buffered entries that wake the flusher before the interval elapses
+USAGE_FLUSH_BATCH_SIZE = int(os.getenv("USAGE_FLUSH_BATCH_SIZE", "500"))
+# Keep bound parameters per statement well below PostgreSQL's 65535 limit
+MAX_ROWS_PER_STATEMENT = 1000
+
+
+class UsageSink:
+    """
+    Buffered, batched writer for API usage rows and per-user call counters.
+
+    record() only appends to a deque under a lock, so it never touches the database from the
+    request path. When the buffer is full the oldest entries are dropped and counted.
+    """
+
+    def __init__(self, capacity: int = USAGE_BUFFER_CAPACITY,
+                 flush_interval: float = USAGE_FLUSH_INTERVAL_SECONDS,
+                 batch_size: int = USAGE_FLUSH_BATCH_SIZE, db_factory=None):
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._db_factory = db_factory
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+        self.written = 0
+
+    def _session(self):
+        if self._db_factory is None:
+            from .database import SessionLocal
+            self._db_factory = SessionLocal
+        return self._db_factory()
+
+    def record(self, user_id: str, endpoint: str, execution_time_ms: int,
+               status_code: Optional[int], is_error: bool, error_message: Optional[str]):
+        """Queue one usage entry; starts the flusher on first use."""
+        try:
+            user_uuid = user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id))
+        except ValueError:
+            logger.warning(f"Skipping usage entry with invalid user id: {user_id}")
+            return
+
+        entry = {
+            'user_id': user_uuid,
+            'endpoint': endpoint,
+            'timestamp': datetime.utcnow(),
+            'execution_time_ms': execution_time_ms,
+            'status_code': status_code,
+            'is_error': is_error,
+            'error_message': error_message
+        }
+        with self._lock:
+            if len(self._buffer) == self.capacity:
+                self.dropped += 1
+            self._buffer.append(entry)
+            pending = len(self._buffer)
+
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._buffer)
+            self._buffer.clear()
+        return entries
+
+    def flush(self) -> int:
+        """
+        Write everything buffered so far in one transaction.
+
+        Returns:
+            Number of usage rows inserted
+        """
+        with self._flush_lock:
+            entries = self._drain()
+            if not entries:
+                return 0
+
+            db = self._session()
+            try:
+                # Usage rows reference users.id; rows for unknown users would fail the whole batch
+                user_ids = list({entry['user_id'] for entry in entries})
+                known = {row[0] for row in db.query(models.User.id).filter(models.User.id.in_(user_ids)).all()}
+                entries = [entry for entry in entries if entry['user_id'] in known]
+                if not entries:
+                    return 0
+
+                table = models.UserSystemUsage.__table__
+                for start in range(0, len(entries), MAX_ROWS_PER_STATEMENT):
+                    db.execute(insert(table), entries[start:start + MAX_ROWS_PER_STATEMENT])
+
+                calls: Dict[uuid.UUID, int] = {}
+                for entry in entries:
+                    calls[entry['user_id']] = calls.get(entry['user_id'], 0) + 1
+                users = models.User.__table__
+                db.execute(
+                    update(users).where(users.c.id == bindparam('b_user_id')).values(
+                        api_calls_count=func.coalesce(users.c.api_calls_count, 0) + bindparam('b_calls')),
+                    [{'b_user_id': user_id, 'b_calls': count} for user_id, count in calls.items()]
+                )
+                db.commit()
+                self.written += len(entries)
+                logger.debug(f"Flushed {len(entries)} usage entries for {len(calls)} users")
+                return len(entries)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to flush {len(entries)} usage entries: {e}")
+                return 0
+            finally:
+                db.close()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def start(self):
+        """Start the background flusher thread (idempotent)."""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="usage-sink")
+            self._thread.start()
+        logger.debug(f"Usage sink started (interval {self.flush_interval}s, capacity {self.capacity})")
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the flusher and write what is still buffered."""
+        thread = self._thread
+        self._stopping.set()
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+        self.flush()
+        if self.dropped:
+            logger.warning(f"Usage sink dropped {self.dropped} entries because the buffer was full")
+
+
+usage_sink = UsageSink()
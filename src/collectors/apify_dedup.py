@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Recent items per actor judged for redundancy
+APIFY_DEDUP_WINDOW = int(os.getenv("APIFY_DEDUP_WINDOW", "100"))
+# A run whose recent items are less than this share new is stopped, while another actor still covers its queries
+APIFY_DEDUP_MIN_NEW_RATE = float(os.getenv("APIFY_DEDUP_MIN_NEW_RATE", "0.05"))
+# Leave out actors whose persisted history shows they (almost) only duplicate the other actors
+APIFY_SKIP_REDUNDANT_ACTORS = os.getenv("APIFY_SKIP_REDUNDANT_ACTORS", "false").lower() == "true"
+
+
+class ActorStreamStats:
+    """One actor's items in the current cycle: new, duplicates by who saw them first, and a recent window."""
+
+    def __init__(self, window: int):
+        self.items = 0
+        self.new = 0
+        self.overlap: Dict[str, int] = {}
+        self.recent = deque(maxlen=window)
+        self.stopped_early = False
+
+    @property
+    def recent_new_rate(self) -> float:
+        return sum(self.recent) / len(self.recent) if self.recent else 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'items': self.items, 'new': self.new, 'duplicates': self.items - self.new,
+                'overlap': dict(self.overlap), 'stopped_early': self.stopped_early}
+
+
+class StreamingDeduplicator:
+    """
+    Merges the item streams of actors collecting the same queries, keeping the first copy of each post.
+
+    Every item is checked against one running key set as it arrives. The marginal-new-item rate over
+    the last `window` items is tracked per actor and per stream (one run or batch of an actor); a
+    stream whose window is almost entirely duplicates is reported redundant so the caller can stop
+    that run. Per-actor overlap stats are accumulated across cycles in a JSON file, so the actor
+    list can be pruned from evidence.
+    """
+
+    def __init__(self, key: str = 'post_id', window: int = APIFY_DEDUP_WINDOW,
+                 min_new_rate: float = APIFY_DEDUP_MIN_NEW_RATE, stats_file: Path = None):
+        self.key = key
+        self.window = max(1, window)
+        self.min_new_rate = min_new_rate
+        self.stats_file = stats_file or Path(__file__).parent.parent.parent / "data" / "apify_actor_overlap.json"
+        self._first_seen_by: Dict[str, str] = {}
+        self.actors: Dict[str, ActorStreamStats] = {}
+        self._streams: Dict[str, deque] = {}
+        self._stopped_streams = set()
+
+    def _actor(self, actor_id: str) -> ActorStreamStats:
+        if actor_id not in self.actors:
+            self.actors[actor_id] = ActorStreamStats(self.window)
+        return self.actors[actor_id]
+
+    def _recent(self, actor_id: str, stream: Optional[str]) -> deque:
+        if stream is None:
+            return self._actor(actor_id).recent
+        return self._streams.setdefault(stream, deque(maxlen=self.window))
+
+    def add(self, actor_id: str, record: Dict[str, Any], stream: Optional[str] = None) -> bool:
+        """Count an actor's item; True when it is the first copy (records without a key are always kept)."""
+        stats = self._actor(actor_id)
+        stats.items += 1
+        key = record.get(self.key)
+        new = key in (None, '', 'unknown')
+        if not new:
+            key = str(key)
+            first_actor = self._first_seen_by.get(key)
+            if first_actor is None:
+                self._first_seen_by[key] = actor_id
+                new = True
+            else:
+                stats.overlap[first_actor] = stats.overlap.get(first_actor, 0) + 1
+        stats.new += int(new)
+        stats.recent.append(int(new))
+        if stream is not None:
+            self._recent(actor_id, stream).append(int(new))
+        return new
+
+    def recent_new_rate(self, actor_id: str, stream: Optional[str] = None) -> float:
+        """Share of new items in the recent window of a stream (of the whole actor when stream is None)."""
+        recent = self._recent(actor_id, stream)
+        return sum(recent) / len(recent) if recent else 1.0
+
+    def redundant(self, actor_id: str, stream: Optional[str] = None) -> bool:
+        """True once a stream's (or the whole actor's) full recent window falls below the minimum new-item rate."""
+        stopped = self._actor(actor_id).stopped_early if stream is None else stream in self._stopped_streams
+        return (not stopped and len(self._recent(actor_id, stream)) >= self.window
+                and self.recent_new_rate(actor_id, stream) < self.min_new_rate)
+
+    def stop(self, actor_id: str, stream: Optional[str] = None):
+        """Record that a stream (or the whole actor) was stopped early."""
+        self._actor(actor_id).stopped_early = True
+        if stream is not None:
+            self._stopped_streams.add(stream)
+
+    @property
+    def unique(self) -> int:
+        return sum(stats.new for stats in self.actors.values())
+
+    def save_stats(self, actor_names: Optional[Dict[str, str]] = None):
+        """Fold this cycle into the persisted per-actor totals (written atomically)."""
+        data = {'actors': {}}
+        try:
+            if self.stats_file.exists():
+                with open(self.stats_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load actor overlap stats: {e}")
+
+        now = datetime.now().isoformat()
+        for actor_id, stats in self.actors.items():
+            cycle = stats.to_dict()
+            totals = data.setdefault('actors', {}).setdefault(actor_id, {
+                'cycles': 0, 'items': 0, 'new': 0, 'duplicates': 0, 'overlap': {}, 'stopped_early': 0})
+            if actor_names and actor_id in actor_names:
+                totals['name'] = actor_names[actor_id]
+            totals['cycles'] += 1
+            for field in ('items', 'new', 'duplicates'):
+                totals[field] += cycle[field]
+            for other, count in cycle['overlap'].items():
+                totals['overlap'][other] = totals['overlap'].get(other, 0) + count
+            totals['stopped_early'] += int(cycle['stopped_early'])
+            totals['new_rate'] = round(totals['new'] / totals['items'], 4) if totals['items'] else None
+            totals['last_cycle'] = {**cycle, 'at': now}
+        data['updated_at'] = now
+
+        try:
+            self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.stats_file.with_suffix('.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_file, self.stats_file)
+        except Exception as e:
+            logger.warning(f"Failed to save actor overlap stats: {e}")
+
+
+def redundant_actors(min_new_rate: float = APIFY_DEDUP_MIN_NEW_RATE, min_items: int = 1000,
+                     stats_file: Path = None) -> List[str]:
+    """Actors whose persisted items were almost all collected first by another actor."""
+    stats_file = stats_file or Path(__file__).parent.parent.parent / "data" / "apify_actor_overlap.json"
+    try:
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            actors = json.load(f).get('actors', {})
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        logger.warning(f"Failed to load actor overlap stats: {e}")
+        return []
+    return [actor_id for actor_id, totals in actors.items()
+            if totals.get('items', 0) >= min_items and (totals.get('new_rate') or 0) < min_new_rate]
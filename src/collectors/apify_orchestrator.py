@@ -0,0 +1,390 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from queue import Empty, Full, Queue
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from apify_client import ApifyClient
+
+try:
+    import fcntl
+except ImportError:  # Windows: run budgets only hold within one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Actor runs in flight at once across all Apify collectors on this host. The agent starts each
+# collector as its own process, so the budget is held in lock files under APIFY_SLOTS_DIR
+APIFY_MAX_CONCURRENT_RUNS = int(os.getenv("APIFY_MAX_CONCURRENT_RUNS", "6"))
+# Runs of one actor in flight at once, across processes like the global budget
+APIFY_PER_ACTOR_CONCURRENCY = int(os.getenv("APIFY_PER_ACTOR_CONCURRENCY", "3"))
+# Seconds a run may take before it is aborted; items it produced until then are still read
+APIFY_TIMEOUT_SECONDS = int(os.getenv("APIFY_TIMEOUT_SECONDS", "180"))
+# Seconds between dataset reads while a run is still going
+APIFY_POLL_SECONDS = int(os.getenv("APIFY_POLL_SECONDS", "10"))
+# Pack query variations into multi-term runs where an actor allows it; "false" runs every query on its own
+APIFY_BATCH_QUERIES = os.getenv("APIFY_BATCH_QUERIES", "true").lower() == "true"
+# Lock files holding the run budgets, shared by every collector process on the host
+APIFY_SLOTS_DIR = Path(os.getenv("APIFY_SLOTS_DIR", str(Path(__file__).parent.parent.parent / "data" / "apify_slots")))
+
+TERMINAL_STATUSES = frozenset(['SUCCEEDED', 'FAILED', 'TIMED-OUT', 'ABORTED'])
+
+
+@dataclass
+class ApifyRunMetrics:
+    """Outcome, size and cost of one actor run."""
+    actor_id: str
+    label: str
+    run_id: Optional[str] = None
+    status: str = 'NOT_STARTED'
+    items: int = 0
+    duration_secs: float = 0.0
+    compute_units: float = 0.0
+    usage_usd: float = 0.0
+    timed_out: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class ApifyJob:
+    """One actor run to perform; context is caller data handed back with every item of the run."""
+    actor_id: str
+    run_input: Dict[str, Any]
+    label: str = ''
+    context: Any = None
+    max_items: Optional[int] = None
+    metrics: Optional[ApifyRunMetrics] = field(default=None, repr=False)
+    cancelled: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def cancel(self):
+        """Stop paging this run and abort it (or skip it if it hasn't started)."""
+        self.cancelled.set()
+
+
+class RunSlots:
+    """
+    A budget of `size` slots shared by every process on the host.
+
+    Each slot is a lock file held with flock; a slot is released when its handle is closed,
+    including when the holding process dies. Without fcntl the slots fall back to a
+    semaphore that only bounds the current process.
+    """
+
+    def __init__(self, name: str, size: int, slots_dir: Path = None):
+        self.size = max(1, size)
+        slots_dir = slots_dir or APIFY_SLOTS_DIR
+        self.paths = [slots_dir / f"{name}_{index}.lock" for index in range(self.size)]
+        self._local = threading.BoundedSemaphore(self.size)
+
+    def _try_acquire(self) -> Optional[Any]:
+        if fcntl is None:
+            return self if self._local.acquire(blocking=False) else None
+        self.paths[0].parent.mkdir(parents=True, exist_ok=True)
+        for path in self.paths:
+            handle = open(path, 'a')
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return handle
+            except OSError:
+                handle.close()
+        return None
+
+    def acquire(self, events: List[threading.Event]) -> Optional[Any]:
+        """Wait for a slot in short steps so cancellation is noticed; None when cancelled."""
+        while not any(event.is_set() for event in events):
+            handle = self._try_acquire()
+            if handle is not None:
+                return handle
+            time.sleep(0.5)
+        return None
+
+    def release(self, handle: Any):
+        if fcntl is None:
+            self._local.release()
+        else:
+            handle.close()
+
+
+class ApifyOrchestrator:
+    """
+    Runs Apify actors for all Apify collectors under one concurrency budget.
+
+    Runs are started without blocking (actor.start) and polled; their dataset is paged with
+    iterate_items while they run, so records reach the collector incrementally instead of after
+    the whole run. One ApifyClient (and its HTTP connection pool) is shared by every run in the
+    process, and the run budgets are RunSlots, so they also bound collectors the agent runs as
+    separate processes. A run still going after the timeout is aborted, and every run's status,
+    item count, compute units and cost are recorded.
+    """
+
+    def __init__(self, token: str, max_concurrent_runs: int = APIFY_MAX_CONCURRENT_RUNS,
+                 per_actor_concurrency: int = APIFY_PER_ACTOR_CONCURRENCY, timeout: float = APIFY_TIMEOUT_SECONDS,
+                 poll_interval: float = APIFY_POLL_SECONDS, metrics_file: Path = None, queue_size: int = 1000):
+        self.client = ApifyClient(token)
+        self.max_concurrent_runs = max(1, max_concurrent_runs)
+        self.per_actor_concurrency = max(1, per_actor_concurrency)
+        self.timeout = timeout
+        self.poll_interval = max(1, int(poll_interval))
+        self.queue_size = queue_size
+        data_dir = Path(__file__).parent.parent.parent / "data"
+        self.metrics_file = metrics_file or data_dir / "apify_run_metrics.jsonl"
+        self.cycle_metrics_file = self.metrics_file.with_name("apify_cycle_metrics.jsonl")
+
+        self._run_slots = RunSlots('runs', self.max_concurrent_runs)
+        self._actor_slots: Dict[str, RunSlots] = {}
+        self._lock = threading.Lock()
+        self.metrics: List[ApifyRunMetrics] = []
+
+    def _actor_slot(self, actor_id: str) -> RunSlots:
+        with self._lock:
+            if actor_id not in self._actor_slots:
+                self._actor_slots[actor_id] = RunSlots(f"actor_{actor_id}", self.per_actor_concurrency)
+            return self._actor_slots[actor_id]
+
+    def stream_run(self, job: ApifyJob, cancelled: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Run one job once the global and per-actor budgets allow it and yield its dataset items as they appear.
+
+        Closing the iterator early, setting cancelled or calling job.cancel() aborts the run.
+        Failures are recorded in job.metrics rather than raised.
+        """
+        job.metrics = metrics = ApifyRunMetrics(actor_id=job.actor_id, label=job.label)
+        events = [event for event in (cancelled, job.cancelled) if event is not None]
+        actor_slots = self._actor_slot(job.actor_id)
+        actor_slot = actor_slots.acquire(events)
+        if actor_slot is None:
+            metrics.status = 'CANCELLED'
+            return
+        run_slot = self._run_slots.acquire(events)
+        if run_slot is None:
+            actor_slots.release(actor_slot)
+            metrics.status = 'CANCELLED'
+            return
+
+        started = time.monotonic()
+        run = None
+        run_client = None
+        try:
+            start_options = {'max_items': job.max_items} if job.max_items else {}
+            run = self.client.actor(job.actor_id).start(run_input=job.run_input, timeout_secs=int(self.timeout),
+                                                         **start_options)
+            metrics.run_id = run['id']
+            run_client = self.client.run(run['id'])
+            dataset = self.client.dataset(run['defaultDatasetId'])
+            logger.info(f"Started Apify run {run['id']} ({job.actor_id}) for {job.label}")
+
+            while True:
+                finished = run.get('status') in TERMINAL_STATUSES
+                # Page everything stored since the last read; after the run finished this drains the rest
+                for item in dataset.iterate_items(offset=metrics.items):
+                    if any(event.is_set() for event in events):
+                        break
+                    metrics.items += 1
+                    yield item
+                if finished or any(event.is_set() for event in events):
+                    break
+                if not metrics.timed_out and time.monotonic() - started >= self.timeout:
+                    logger.warning(f"Apify run {run['id']} ({job.label}) exceeded {self.timeout}s, aborting")
+                    metrics.timed_out = True
+                    run_client.abort()
+                    # Read what the run stored before it stopped on the next pass
+                    run = run_client.wait_for_finish(wait_secs=30) or run
+                    continue
+                run = run_client.wait_for_finish(wait_secs=self.poll_interval) or run
+        except Exception as e:
+            metrics.error = str(e)
+            logger.warning(f"Apify run for {job.label} ({job.actor_id}) failed: {e}")
+        finally:
+            try:
+                if run_client is not None and run.get('status') not in TERMINAL_STATUSES:
+                    # Consumer stopped reading or an error interrupted paging: don't leave the run billing
+                    run = run_client.abort()
+                if run_client is not None:
+                    run = run_client.get() or run
+            except Exception as e:
+                logger.warning(f"Could not finalize Apify run {metrics.run_id}: {e}")
+            finally:
+                self._run_slots.release(run_slot)
+                actor_slots.release(actor_slot)
+            metrics.duration_secs = round(time.monotonic() - started, 1)
+            if run is not None:
+                metrics.status = run.get('status', metrics.status)
+                metrics.compute_units = float((run.get('stats') or {}).get('computeUnits') or 0.0)
+                metrics.usage_usd = float(run.get('usageTotalUsd') or 0.0)
+            elif metrics.error:
+                metrics.status = 'FAILED_TO_START'
+            self._record(metrics)
+
+    def iterate(self, jobs: Iterable[ApifyJob]) -> Iterator[Tuple[ApifyJob, Dict[str, Any]]]:
+        """
+        Run jobs concurrently within the budget and yield (job, item) pairs as items arrive from any run.
+
+        Items are handed over on the caller's thread, so callers need no locking. Closing the
+        iterator early aborts the runs still going and skips jobs not started yet; job.cancel()
+        does the same for one job (items it already queued may still be yielded).
+        """
+        jobs = self._interleave(list(jobs))
+        if not jobs:
+            return
+        items: Queue = Queue(maxsize=self.queue_size)
+        cancelled = threading.Event()
+        finished = object()
+
+        def put(entry) -> bool:
+            while not cancelled.is_set():
+                try:
+                    items.put(entry, timeout=0.5)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        def worker(job: ApifyJob):
+            try:
+                for item in self.stream_run(job, cancelled):
+                    if job.cancelled.is_set() or not put((job, item)):
+                        break
+            finally:
+                put(finished)
+
+        pool = ThreadPoolExecutor(max_workers=min(len(jobs), self.max_concurrent_runs), thread_name_prefix="apify-run")
+        try:
+            for job in jobs:
+                pool.submit(worker, job)
+            running = len(jobs)
+            while running:
+                try:
+                    entry = items.get(timeout=1)
+                except Empty:
+                    continue
+                if entry is finished:
+                    running -= 1
+                else:
+                    yield entry
+        finally:
+            cancelled.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _interleave(jobs: List[ApifyJob]) -> List[ApifyJob]:
+        """Order jobs round-robin across actors so one actor's budget never idles the worker pool."""
+        by_actor: Dict[str, List[ApifyJob]] = {}
+        for job in jobs:
+            by_actor.setdefault(job.actor_id, []).append(job)
+        queues = list(by_actor.values())
+        ordered = []
+        while queues:
+            ordered.extend(queue.pop(0) for queue in queues)
+            queues = [queue for queue in queues if queue]
+        return ordered
+
+    def _record(self, metrics: ApifyRunMetrics):
+        with self._lock:
+            self.metrics.append(metrics)
+            self._append(self.metrics_file, asdict(metrics))
+
+    def record_cycle(self, collector: str, jobs: List[ApifyJob], wall_secs: float, **details):
+        """Append one collection cycle's runs, items, compute units, cost and wall time (see scripts/apify_cycle_report.py)."""
+        started = [job.metrics for job in jobs if job.metrics is not None and job.metrics.run_id]
+        entry = {
+            'collector': collector,
+            'batched': APIFY_BATCH_QUERIES,
+            'wall_secs': round(wall_secs, 1),
+            'runs': len(started),
+            'items': sum(metrics.items for metrics in started),
+            'compute_units': round(sum(metrics.compute_units for metrics in started), 4),
+            'usage_usd': round(sum(metrics.usage_usd for metrics in started), 4),
+            **details
+        }
+        with self._lock:
+            self._append(self.cycle_metrics_file, entry)
+        return entry
+
+    @staticmethod
+    def _append(path: Path, entry: Dict[str, Any]):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({**entry, 'recorded_at': datetime.now().isoformat()}) + '\n')
+        except Exception as e:
+            logger.warning(f"Failed to write Apify metrics to {path}: {e}")
+
+
+def batch_queries(queries: List[str], max_terms: int) -> List[List[str]]:
+    """Split queries into as few runs as an actor's term limit allows (one query per run when batching is off)."""
+    size = max(1, max_terms) if APIFY_BATCH_QUERIES else 1
+    return [queries[i:i + size] for i in range(0, len(queries), size)]
+
+
+class QueryAttribution:
+    """
+    Maps the items of a multi-term actor run back to the queries they answer.
+
+    An item the actor labels with its search term goes to that term's query. Otherwise it goes to
+    every query whose words all occur in its text, and to the whole batch when none do (the actor
+    matched on something outside the text, such as a link or a quoted post).
+    """
+
+    def __init__(self, queries: List[str], search_terms: Dict[str, str] = None):
+        """
+        Args:
+            queries: Queries packed into the run, in collection order
+            search_terms: Search term sent to the actor -> query, where the term differs from the query
+        """
+        self.queries = list(queries)
+        self._by_term = {query.lower(): query for query in self.queries}
+        self._by_term.update({term.lower(): query for term, query in (search_terms or {}).items()})
+        self._words = [(query, [word for word in (part.strip('"\'#@').lower() for part in query.split()) if word])
+                       for query in self.queries]
+
+    def attribute(self, text: str, search_term: Optional[str] = None) -> List[str]:
+        """Queries an item belongs to, in collection order; never empty."""
+        if len(self.queries) == 1:
+            return list(self.queries)
+        if search_term and search_term.lower() in self._by_term:
+            return [self._by_term[search_term.lower()]]
+        text = (text or '').lower()
+        matched = [query for query, words in self._words if words and all(word in text for word in words)]
+        return matched or list(self.queries)
+
+
+def run_summary(jobs: Iterable[ApifyJob]) -> List[str]:
+    """One line per run plus a total line, for collectors to print after a collection."""
+    lines = []
+    totals = {'runs': 0, 'items': 0, 'compute_units': 0.0, 'usage_usd': 0.0}
+    for job in jobs:
+        metrics = job.metrics
+        if metrics is None:
+            lines.append(f"{job.label}: not run")
+            continue
+        totals['runs'] += 1
+        totals['items'] += metrics.items
+        totals['compute_units'] += metrics.compute_units
+        totals['usage_usd'] += metrics.usage_usd
+        line = (f"{job.label}: {metrics.status}, {metrics.items} items, {metrics.duration_secs}s, "
+                f"{metrics.compute_units:.4f} CU, ${metrics.usage_usd:.4f}")
+        if metrics.error:
+            line += f" (error: {metrics.error})"
+        lines.append(line)
+    lines.append(f"Total: {totals['runs']} runs, {totals['items']} items, "
+                 f"{totals['compute_units']:.4f} CU, ${totals['usage_usd']:.4f}")
+    return lines
+
+
+_orchestrator: Optional[ApifyOrchestrator] = None
+_orchestrator_lock = threading.Lock()
+
+
+def get_orchestrator(token: str) -> ApifyOrchestrator:
+    """The process-wide orchestrator, so collectors running side by side share its client (the budget is host-wide)."""
+    global _orchestrator
+    with _orchestrator_lock:
+        if _orchestrator is None:
+            _orchestrator = ApifyOrchestrator(token)
+        return _orchestrator
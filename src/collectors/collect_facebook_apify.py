@@ -59,8 +59,9 @@ from datetime import datetime, timezone
 from typing import List, Dict, Any, Tuple
 from urllib.parse import urlparse
 from dotenv import load_dotenv
-from apify_client import ApifyClient
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .apify_orchestrator import ApifyJob, get_orchestrator, run_summary
+from .raw_output import write_raw_shard
 
 # Define Facebook actor configurations
 FACEBOOK_ACTOR_CONFIGS: List[Dict] = [
@@ -187,9 +188,6 @@ def collect_facebook_apify(queries: List[str], output_file=None, max_posts=1000,
     if not api_token:
         raise ValueError("APIFY_API_TOKEN must be set in .env file")
     
-    # Initialize the ApifyClient
-    client = ApifyClient(api_token)
-    
     # Ensure output directory exists
     if output_file is None:
         today = datetime.now().strftime("%Y%m%d")
@@ -199,19 +197,16 @@ def collect_facebook_apify(queries: List[str], output_file=None, max_posts=1000,
     
     all_data = []
     total_collected_count = 0
+    jobs = []
 
-    # --- Run Actors --- 
+    # --- Prepare Actor Runs --- 
     for actor_config in FACEBOOK_ACTOR_CONFIGS:
         actor_id = actor_config["id"]
         actor_name = actor_config["name"]
         actor_type = actor_config["type"]
         
-        print(f"\n--- [Facebook Apify - {actor_name}] Starting collection ({actor_id}) ---")
-        
-        actor_collected_count = 0
-        runs_to_process = []
+        print(f"\n--- [Facebook Apify - {actor_name}] Preparing collection ({actor_id}) ---")
 
-        # --- Prepare and Run Actor --- 
         # Use provided Facebook URLs if available, otherwise generate from queries
         if facebook_urls:
             # Filter URLs to only include Facebook page URLs (not post-specific URLs)
@@ -241,92 +236,60 @@ def collect_facebook_apify(queries: List[str], output_file=None, max_posts=1000,
             print(f"[Facebook Apify - {actor_name}] To use this collector, you need to provide actual Facebook page URLs in your target configuration.")
             continue
         
-        # Helper function to process a single URL (runs in parallel)
-        def process_single_url(url: str, actor_config: Dict, api_token: str) -> Tuple[List[Dict], int]:
-            """Process a single URL for a given actor configuration. Returns (data_list, item_count)."""
-            # Create a client instance for this thread
-            thread_client = ApifyClient(api_token)
-            
-            actor_id = actor_config["id"]
-            actor_name = actor_config["name"]
-            actor_type = actor_config["type"]
+        # One actor run per page URL
+        for url in urls_to_scrape:
+            # Prepare actor input based on type
+            run_input = {
+                "startUrls": [{"url": url, "label": f"facebook_{actor_type}"}],
+                "resultsLimit": min(max_posts, actor_config.get("max_posts", 1000)),
+                "language": language
+            }
             
-            url_data = []
-            items_count = 0
-            query = queries[0] if queries else "unknown"
+            # Add type-specific options
+            if actor_type == "post":
+                run_input.update({
+                    "scrapeComments": include_comments,
+                    "scrapeReactions": include_reactions
+                })
             
-            try:
-                print(f"[Facebook Apify - {actor_name}] Starting parallel collection for URL: {url}")
-                
-                # Prepare actor input based on type
-                run_input = {
-                    "startUrls": [{"url": url, "label": f"facebook_{actor_type}"}],
-                    "resultsLimit": min(max_posts, actor_config.get("max_posts", 1000)),
-                    "language": language
-                }
-                
-                # Add type-specific options
-                if actor_type == "post":
-                    run_input.update({
-                        "scrapeComments": include_comments,
-                        "scrapeReactions": include_reactions
-                    })
-                
-                # Run the actor
-                print(f"[Facebook Apify - {actor_name}] Running Apify Actor ({actor_id}) with URL: {url}")
-                run = thread_client.actor(actor_id).call(run_input=run_input)
-                
-                # Fetch results from the Actor's dataset
-                dataset_id = run["defaultDatasetId"]
-                print(f"[Facebook Apify - {actor_name}] Actor run completed for URL '{url}'. Dataset ID: {dataset_id}")
-                
-                # Collect items from the dataset
-                for item in thread_client.dataset(dataset_id).iterate_items():
-                    try:
-                        if actor_type == "post":
-                            data = _extract_post_data(item, query, actor_id)
-                        else:
-                            continue
-                        
-                        if data:
-                            url_data.append(data)
-                            items_count += 1
-                            if items_count % 100 == 0:
-                                print(f"[Facebook Apify - {actor_name}] Processed {items_count} items for URL '{url}'...")
-                    except Exception as e:
-                        print(f"[Facebook Apify - {actor_name}] Error processing item for URL '{url}': {e}")
-                        continue
-                
-                print(f"[Facebook Apify - {actor_name}] Completed URL '{url}': Collected {items_count} items")
-                
-            except Exception as e:
-                print(f"[Facebook Apify - {actor_name}] Error running Actor ({actor_id}) for URL '{url}': {e}")
-            
-            return url_data, items_count
-        
-        # Process all URLs in parallel using ThreadPoolExecutor
-        print(f"\n--- [Facebook Apify - {actor_name}] Starting PARALLEL collection for {len(urls_to_scrape)} URLs ---")
-        
-        with ThreadPoolExecutor(max_workers=len(urls_to_scrape)) as executor:
-            # Submit all URL tasks in parallel
-            future_to_url = {
-                executor.submit(process_single_url, url, actor_config, api_token): url 
-                for url in urls_to_scrape
-            }
+            jobs.append(ApifyJob(
+                actor_id=actor_id,
+                run_input=run_input,
+                label=f"{actor_name}: {url}",
+                context={"actor_config": actor_config, "url": url, "items": 0}
+            ))
+
+    # --- Run Actors --- 
+    orchestrator = get_orchestrator(api_token)
+    query = queries[0] if queries else "unknown"
+    print(f"\n--- [Facebook Apify] Starting collection: {len(jobs)} actor runs "
+          f"(at most {orchestrator.max_concurrent_runs} at once, {orchestrator.per_actor_concurrency} per actor) ---")
+    
+    cycle_start = time.monotonic()
+    # Items arrive as the runs store them, from whichever run has new ones
+    for job, item in orchestrator.iterate(jobs):
+        actor_name = job.context["actor_config"]["name"]
+        url = job.context["url"]
+        try:
+            if job.context["actor_config"]["type"] == "post":
+                data = _extract_post_data(item, query, job.actor_id)
+            else:
+                continue
             
-            # Process completed tasks as they finish
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    url_data, items_count = future.result()
-                    all_data.extend(url_data)
-                    actor_collected_count += items_count
-                    print(f"[Facebook Apify - {actor_name}] URL '{url}' completed: {items_count} items")
-                except Exception as e:
-                    print(f"[Facebook Apify - {actor_name}] URL '{url}' generated an exception: {e}")
+            if data:
+                all_data.append(data)
+                job.context["items"] += 1
+                total_collected_count += 1
+                if job.context["items"] % 100 == 0:
+                    print(f"[Facebook Apify - {actor_name}] Processed {job.context['items']} items for URL '{url}'...")
+        except Exception as e:
+            print(f"[Facebook Apify - {actor_name}] Error processing item for URL '{url}': {e}")
 
-        print(f"--- [Facebook Apify - {actor_name}] Finished PARALLEL collection. Collected {actor_collected_count} items. ---")
-        total_collected_count += actor_collected_count
+    print(f"\n[Facebook Apify] Actor runs:")
+    for line in run_summary(jobs):
+        print(f"[Facebook Apify]   {line}")
+    cycle = orchestrator.record_cycle("facebook", jobs, time.monotonic() - cycle_start, queries=len(queries))
+    print(f"[Facebook Apify] Cycle: {cycle['runs']} runs in {cycle['wall_secs']}s, {cycle['compute_units']} CU, ${cycle['usage_usd']}")
     
     # --- Save Collected Data --- 
     if all_data:
@@ -341,22 +304,11 @@ def collect_facebook_apify(queries: List[str], output_file=None, max_posts=1000,
             final_count = len(df)
             print(f"[Facebook Apify] Deduplicated {initial_count - final_count} items based on {dedup_key}. Final count: {final_count}")
 
-        if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-            try:
-                existing_df = pd.read_csv(output_file)
-                df = pd.concat([existing_df, df], ignore_index=True)
-            except pd.errors.EmptyDataError:
-                print(f"[Facebook Apify] Warning: The file '{output_file}' is empty. Creating a new file.")
-        
-        df.to_csv(output_file, index=False)
-        print(f"\n[Facebook Apify] Collected {len(all_data)} total Facebook items. Saved to '{output_file}'.")
+        # Each run is its own shard; earlier runs' output is never re-read or rewritten
+        shard_file = write_raw_shard(output_file, df, kwargs.get('since_date'), kwargs.get('until_date'))
+        print(f"\n[Facebook Apify] Collected {len(all_data)} total Facebook items. Saved to '{shard_file}'.")
     else:
         print("\n[Facebook Apify] No Facebook items collected across all actors.")
-        # Create empty DataFrame with expected columns
-        df = pd.DataFrame(columns=["source", "platform", "type", "post_id", "date", "text", "title", 
-                                  "url", "image_url", "domain", "country", "query", "actor_id", "actor_type"])
-        df.to_csv(output_file, index=False)
-        print(f"[Facebook Apify] Created empty '{output_file}' with headers.")
 
 def _extract_page_data(item: Dict, query: str, actor_id: str) -> Dict[str, Any]:
     """Extract data from Facebook page scraping results."""
@@ -48,10 +48,11 @@ import json
 import time
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
-from apify_client import ApifyClient
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .apify_orchestrator import ApifyJob, get_orchestrator, run_summary
+from .raw_output import write_raw_shard
 
 # Define Instagram actor configurations
 INSTAGRAM_ACTOR_CONFIGS: List[Dict] = [
@@ -127,9 +128,6 @@ def collect_instagram_apify(queries: List[str], output_file=None, max_results=10
     if not api_token:
         raise ValueError("APIFY_API_TOKEN must be set in .env file")
     
-    # Initialize the ApifyClient
-    client = ApifyClient(api_token)
-    
     # Ensure output directory exists
     if output_file is None:
         today = datetime.now().strftime("%Y%m%d")
@@ -164,141 +162,87 @@ def collect_instagram_apify(queries: List[str], output_file=None, max_results=10
         invalid_chars = "!?.,:;\\-+=*&%$#@/\\~^|<>()[]{}'\"`"
         return not any(char in clean_query for char in invalid_chars)
     
-    # Helper function to process a single query (runs in parallel)
-    def process_single_query(query: str, actor_config: Dict, api_token: str) -> Tuple[List[Dict], int]:
-        """Process a single query for a given actor configuration. Returns (data_list, item_count)."""
-        # Create a client instance for this thread
-        thread_client = ApifyClient(api_token)
-        
-        actor_id = actor_config["id"]
+    # Helper function to build the actor input for a single query
+    def build_run_input(query: str, actor_config: Dict) -> Optional[Dict]:
+        """Actor input for one query, or None when the actor can't search for it."""
         actor_name = actor_config["name"]
         actor_type = actor_config["type"]
         max_actor_results = min(max_results, actor_config["max_results"])
         
-        query_data = []
-        items_count = 0
-        
-        try:
-            print(f"[Instagram Apify - {actor_name}] Starting parallel collection for query: {query}")
-            
-            # Prepare actor input based on type
-            if actor_type == "general":
-                run_input = {
-                    "search": query,
-                    "searchType": search_type,
-                    "searchLimit": 10,
-                    "resultsType": "posts",
-                    "resultsLimit": max_actor_results
-                }
-            elif actor_type == "hashtag":
-                # For multi-word queries, use only the first word as hashtag
-                if " " in query or not is_valid_hashtag(query):
-                    hashtag = extract_hashtag_from_query(query)
-                    if not hashtag:
-                        print(f"[Instagram Apify - {actor_name}] Skipping query '{query}' (no valid hashtag could be extracted)")
-                        return query_data, items_count
-                    print(f"[Instagram Apify - {actor_name}] Using first word '{hashtag}' from multi-word query '{query}' for hashtag search")
-                else:
-                    hashtag = query.replace("#", "").strip()
-                
+        # Prepare actor input based on type
+        if actor_type == "general":
+            return {
+                "search": query,
+                "searchType": search_type,
+                "searchLimit": 10,
+                "resultsType": "posts",
+                "resultsLimit": max_actor_results
+            }
+        elif actor_type == "hashtag":
+            # For multi-word queries, use only the first word as hashtag
+            if " " in query or not is_valid_hashtag(query):
+                hashtag = extract_hashtag_from_query(query)
                 if not hashtag:
-                    print(f"[Instagram Apify - {actor_name}] Skipping query '{query}' (empty hashtag)")
-                    return query_data, items_count
-                
-                run_input = {
-                    "hashtags": [hashtag],
-                    "resultsLimit": max_actor_results
-                }
+                    print(f"[Instagram Apify - {actor_name}] Skipping query '{query}' (no valid hashtag could be extracted)")
+                    return None
+                print(f"[Instagram Apify - {actor_name}] Using first word '{hashtag}' from multi-word query '{query}' for hashtag search")
             else:
-                return query_data, items_count
+                hashtag = query.replace("#", "").strip()
             
-            # Run the actor
-            print(f"[Instagram Apify - {actor_name}] Running Apify Actor ({actor_id}) with query: {query}")
-            run = thread_client.actor(actor_id).call(run_input=run_input)
+            if not hashtag:
+                print(f"[Instagram Apify - {actor_name}] Skipping query '{query}' (empty hashtag)")
+                return None
             
-            # Fetch results from the Actor's dataset
-            dataset_id = run["defaultDatasetId"]
-            print(f"[Instagram Apify - {actor_name}] Actor run completed for query '{query}'. Dataset ID: {dataset_id}")
-            
-            # Collect items from the dataset
-            for item in thread_client.dataset(dataset_id).iterate_items():
-                try:
-                    data = _extract_instagram_data(item, query, actor_id, actor_type)
-                    if data:
-                        query_data.append(data)
-                        items_count += 1
-                        if items_count % 100 == 0:
-                            print(f"[Instagram Apify - {actor_name}] Processed {items_count} items for query '{query}'...")
-                except Exception as e:
-                    print(f"[Instagram Apify - {actor_name}] Error processing item for query '{query}': {e}")
-                    continue
-            
-            print(f"[Instagram Apify - {actor_name}] Completed query '{query}': Collected {items_count} items")
-            
-        except Exception as e:
-            print(f"[Instagram Apify - {actor_name}] Error running Actor ({actor_id}) for query '{query}': {e}")
-        
-        return query_data, items_count
-    
-    # Helper function to process all queries for a single actor in parallel
-    def process_actor_queries(actor_config: Dict) -> Tuple[List[Dict], int]:
-        """Process all queries for a single actor in parallel. Returns (all_data_list, total_count)."""
-        actor_id = actor_config["id"]
-        actor_name = actor_config["name"]
-        
-        print(f"\n--- [Instagram Apify - {actor_name}] Starting PARALLEL collection for {len(queries)} queries ---")
-        
-        actor_data = []
-        actor_collected_count = 0
-        
-        # Process all queries in parallel using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
-            # Submit all query tasks in parallel
-            future_to_query = {
-                executor.submit(process_single_query, query, actor_config, api_token): query 
-                for query in queries
+            return {
+                "hashtags": [hashtag],
+                "resultsLimit": max_actor_results
             }
-            
-            # Process completed tasks as they finish
-            for future in as_completed(future_to_query):
-                query = future_to_query[future]
-                try:
-                    query_data, items_count = future.result()
-                    actor_data.extend(query_data)
-                    actor_collected_count += items_count
-                    print(f"[Instagram Apify - {actor_name}] Query '{query}' completed: {items_count} items")
-                except Exception as e:
-                    print(f"[Instagram Apify - {actor_name}] Query '{query}' generated an exception: {e}")
-
-        print(f"--- [Instagram Apify - {actor_name}] Finished PARALLEL collection. Collected {actor_collected_count} items. ---")
-        return actor_data, actor_collected_count
+        return None
+    
+    # One actor run per (actor, query); the orchestrator bounds how many run at once
+    jobs = []
+    for actor_config in INSTAGRAM_ACTOR_CONFIGS:
+        for query in queries:
+            run_input = build_run_input(query, actor_config)
+            if run_input is None:
+                continue
+            jobs.append(ApifyJob(
+                actor_id=actor_config["id"],
+                run_input=run_input,
+                label=f"{actor_config['name']}: {query}",
+                context={"actor_config": actor_config, "query": query, "items": 0}
+            ))
+    orchestrator = get_orchestrator(api_token)
     
-    # Process all actors in parallel, each with their queries running in parallel
     print(f"\n{'='*80}")
-    print(f"[Instagram Apify] Starting FULL PARALLEL collection:")
+    print(f"[Instagram Apify] Starting collection:")
     print(f"  - Actors: {len(INSTAGRAM_ACTOR_CONFIGS)}")
     print(f"  - Queries per actor: {len(queries)}")
-    print(f"  - Total parallel operations: {len(INSTAGRAM_ACTOR_CONFIGS) * len(queries)}")
+    print(f"  - Actor runs: {len(jobs)} (at most {orchestrator.max_concurrent_runs} at once, {orchestrator.per_actor_concurrency} per actor)")
     print(f"{'='*80}\n")
     
-    with ThreadPoolExecutor(max_workers=len(INSTAGRAM_ACTOR_CONFIGS)) as actor_executor:
-        # Submit all actor tasks in parallel
-        actor_futures = {
-            actor_executor.submit(process_actor_queries, actor_config): actor_config 
-            for actor_config in INSTAGRAM_ACTOR_CONFIGS
-        }
-        
-        # Process completed actors as they finish
-        for actor_future in as_completed(actor_futures):
-            actor_config = actor_futures[actor_future]
-            actor_name = actor_config["name"]
-            try:
-                actor_data, actor_count = actor_future.result()
-                all_data.extend(actor_data)
-                total_collected_count += actor_count
-                print(f"[Instagram Apify] Actor '{actor_name}' completed: {actor_count} items")
-            except Exception as e:
-                print(f"[Instagram Apify] Actor '{actor_name}' generated an exception: {e}")
+    cycle_start = time.monotonic()
+    # Items arrive as the runs store them, from whichever run has new ones
+    for job, item in orchestrator.iterate(jobs):
+        actor_config = job.context["actor_config"]
+        actor_name = actor_config["name"]
+        query = job.context["query"]
+        try:
+            data = _extract_instagram_data(item, query, job.actor_id, actor_config["type"])
+            if data:
+                all_data.append(data)
+                job.context["items"] += 1
+                total_collected_count += 1
+                if job.context["items"] % 100 == 0:
+                    print(f"[Instagram Apify - {actor_name}] Processed {job.context['items']} items for query '{query}'...")
+        except Exception as e:
+            print(f"[Instagram Apify - {actor_name}] Error processing item for query '{query}': {e}")
+    
+    print(f"\n[Instagram Apify] Actor runs:")
+    for line in run_summary(jobs):
+        print(f"[Instagram Apify]   {line}")
+    cycle = orchestrator.record_cycle("instagram", jobs, time.monotonic() - cycle_start, queries=len(queries))
+    print(f"[Instagram Apify] Cycle: {cycle['runs']} runs in {cycle['wall_secs']}s, {cycle['compute_units']} CU, ${cycle['usage_usd']}")
     
     # --- Save Collected Data --- 
     if all_data:
@@ -313,23 +257,11 @@ def collect_instagram_apify(queries: List[str], output_file=None, max_results=10
             final_count = len(df)
             print(f"[Instagram Apify] Deduplicated {initial_count - final_count} items based on {dedup_key}. Final count: {final_count}")
 
-        if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-            try:
-                existing_df = pd.read_csv(output_file)
-                df = pd.concat([existing_df, df], ignore_index=True)
-            except pd.errors.EmptyDataError:
-                print(f"[Instagram Apify] Warning: The file '{output_file}' is empty. Creating a new file.")
-        
-        df.to_csv(output_file, index=False)
-        print(f"\n[Instagram Apify] Collected {len(all_data)} total Instagram items. Saved to '{output_file}'.")
+        # Each run is its own shard; earlier runs' output is never re-read or rewritten
+        shard_file = write_raw_shard(output_file, df, kwargs.get('since_date'), kwargs.get('until_date'))
+        print(f"\n[Instagram Apify] Collected {len(all_data)} total Instagram items. Saved to '{shard_file}'.")
     else:
         print("\n[Instagram Apify] No Instagram items collected across all actors.")
-        # Create empty DataFrame with expected columns
-        df = pd.DataFrame(columns=["source", "platform", "type", "post_id", "date", "text", "title", 
-                                  "url", "image_url", "domain", "country", "query", "actor_id", "actor_type",
-                                  "username", "user_display_name", "likes", "comments", "location"])
-        df.to_csv(output_file, index=False)
-        print(f"[Instagram Apify] Created empty '{output_file}' with headers.")
 
 def _extract_instagram_data(item: Dict, query: str, actor_id: str, actor_type: str) -> Dict[str, Any]:
     """Extract data from Instagram scraping results."""
@@ -8,8 +8,9 @@ from datetime import datetime
 from typing import List, Dict, Tuple
 from urllib.parse import urlparse
 from dotenv import load_dotenv
-from apify_client import ApifyClient
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .apify_orchestrator import ApifyJob, get_orchestrator, run_summary
+from .raw_output import write_raw_shard
 
 # Define actor configurations
 NEWS_ACTOR_CONFIGS: List[Dict] = [
@@ -62,6 +63,58 @@ def determine_country_from_domain(domain: str) -> str:
              pass # Add more specific TLD checks here if required
     return country
 
+def _news_record(actor_id: str, source_name: str, url: str, title: str, published_date, image_url, domain: str,
+                 keyword: str) -> Dict:
+    return {
+        "source": "News",
+        "platform": source_name,
+        "type": "article",
+        "post_id": url.split("/")[-1] if url != "unknown" else f"news_{actor_id}_{title[:20]}", # Create a fallback ID
+        "date": published_date,
+        "text": title,
+        "title": title,
+        "url": url,
+        "image_url": image_url,
+        "domain": domain,
+        "country": determine_country_from_domain(domain),
+        "query": keyword,
+        "actor_id": actor_id
+    }
+
+def _extract_news_records(item: Dict, actor_id: str, actor_name: str, query_context: str) -> List[Dict]:
+    """Collector records for one dataset item (the Google News actor nests several articles per item)."""
+    # --- Data Extraction Logic based on Actor --- 
+    if actor_id == "v2y7x1v2Muk1NlPyZ": # Original News Scraper
+        title = item.get("title", "unknown")
+        url = item.get("link", "unknown")
+        # Use query_context if available, otherwise fallback
+        keyword = item.get("keyword", query_context if query_context != "all" else "unknown") 
+        return [_news_record(actor_id, item.get("source", "unknown"), url, title, item.get("published", "unknown"),
+                             item.get("image", "unknown"), item.get("domain", get_domain_from_url(url)), keyword)]
+
+    if actor_id == "glDODaA8QP0UaH0rq": # Google News Scraper
+        records = []
+        # This actor returns results nested under the original query terms
+        for query_key, results in item.items():
+            if isinstance(results, dict) and "googleNews" in results and isinstance(results["googleNews"], list):
+                for news_item in results["googleNews"]:
+                    url = news_item.get("link", "unknown")
+                    source_info = news_item.get("source", {})
+                    records.append(_news_record(
+                        actor_id, source_info.get("name", "unknown"), url, news_item.get("name", "unknown"),
+                        news_item.get("datetime", "unknown"),
+                        news_item.get("thumbnail", news_item.get("thumbnailSmall", "unknown")), # Prefer larger thumbnail
+                        get_domain_from_url(url),
+                        query_key # The key is the original query term
+                    ))
+            else:
+                # Handle cases where the structure might be different than expected
+                print(f"[News Apify - {actor_name}] Unexpected item structure for query key '{query_key}': {results}")
+        return records
+
+    print(f"[News Apify - {actor_name}] Skipping item due to unrecognized structure or actor ID: {item}")
+    return []
+
 def collect_news_apify(queries: List[str], output_file=None, language="US:en", sort_preference="relevance", max_items=1000, **kwargs):
     """
     Collect news data using multiple Apify News Actors for the given queries.
@@ -81,9 +134,6 @@ def collect_news_apify(queries: List[str], output_file=None, language="US:en", s
     if not api_token:
         raise ValueError("APIFY_API_TOKEN must be set in .env file")
     
-    # Initialize the ApifyClient
-    client = ApifyClient(api_token)
-    
     # Ensure output directory exists
     if output_file is None:
         today = datetime.now().strftime("%Y%m%d")
@@ -93,17 +143,13 @@ def collect_news_apify(queries: List[str], output_file=None, language="US:en", s
     
     all_data = []
     total_collected_count = 0
+    jobs = []
 
-    # --- Run Actors --- 
+    # --- Prepare Actor Runs --- 
     for actor_config in NEWS_ACTOR_CONFIGS:
         actor_id = actor_config["id"]
         actor_name = actor_config["name"]
-        print(f"\n--- [News Apify - {actor_name}] Starting collection ({actor_id}) ---")
-        
-        actor_collected_count = 0
-        runs_to_process = []
 
-        # --- Prepare and Run Actor --- 
         if actor_config["run_per_query"]:
             # Run this actor for each query individually
             for query in queries:
@@ -111,14 +157,8 @@ def collect_news_apify(queries: List[str], output_file=None, language="US:en", s
                     actor_config["query_key"]: [query], # Actor expects a list even for one query
                     actor_config["language_key"]: language if actor_config["language_format"] == "US:en" else language.split(':')[1] if ':' in language else language,
                 }
-                try:
-                    print(f"[News Apify - {actor_name}] Running for query: '{query}'")
-                    run = client.actor(actor_id).call(run_input=run_input)
-                    runs_to_process.append({"run": run, "query": query})
-                    print(f"[News Apify - {actor_name}] Run initiated for query '{query}'. Dataset ID: {run['defaultDatasetId']}")
-                    time.sleep(2) # Delay between individual query runs for this actor
-                except Exception as e:
-                    print(f"[News Apify - {actor_name}] Error running actor for query '{query}': {e}")
+                jobs.append(ApifyJob(actor_id=actor_id, run_input=run_input, label=f"{actor_name}: {query}",
+                                     context={"actor_config": actor_config, "query": query, "items": 0}))
         else:
             # Run this actor once with all queries
             run_input = {
@@ -127,119 +167,38 @@ def collect_news_apify(queries: List[str], output_file=None, language="US:en", s
             }
             if "sort_key" in actor_config:
                 run_input[actor_config["sort_key"]] = sort_preference
-            
-            try:
-                print(f"[News Apify - {actor_name}] Running for all queries: {queries}")
-                run = client.actor(actor_id).call(run_input=run_input)
-                runs_to_process.append({"run": run, "query": "all"}) # Mark as run for all queries
-                print(f"[News Apify - {actor_name}] Run initiated for all queries. Dataset ID: {run['defaultDatasetId']}")
-            except Exception as e:
-                print(f"[News Apify - {actor_name}] Error running actor for queries {queries}: {e}")
+            # Mark as run for all queries
+            jobs.append(ApifyJob(actor_id=actor_id, run_input=run_input, label=f"{actor_name}: all queries",
+                                 context={"actor_config": actor_config, "query": "all", "items": 0}))
 
-        # --- Process Results from Runs --- 
-        for run_info in runs_to_process:
-            run_data = run_info["run"]
-            query_context = run_info["query"] # The specific query or "all"
-            dataset_id = run_data["defaultDatasetId"]
-            print(f"[News Apify - {actor_name}] Fetching results for query context '{query_context}' (Dataset: {dataset_id})")
-            
-            try:
-                items_count_for_run = 0
-                for item in client.dataset(dataset_id).iterate_items():
-                    try:
-                        processed = False
-                        # --- Data Extraction Logic based on Actor --- 
-                        if actor_id == "v2y7x1v2Muk1NlPyZ": # Original News Scraper
-                            title = item.get("title", "unknown")
-                            url = item.get("link", "unknown")
-                            source_name = item.get("source", "unknown")
-                            domain = item.get("domain", get_domain_from_url(url))
-                            text = title
-                            published_date = item.get("published", "unknown")
-                            image_url = item.get("image", "unknown")
-                            # Use query_context if available, otherwise fallback
-                            keyword = item.get("keyword", query_context if query_context != "all" else "unknown") 
-                            country = determine_country_from_domain(domain)
-                            processed = True
-                            
-                        elif actor_id == "glDODaA8QP0UaH0rq": # Google News Scraper
-                            # This actor returns results nested under the original query terms
-                            for query_key, results in item.items():
-                                if isinstance(results, dict) and "googleNews" in results and isinstance(results["googleNews"], list):
-                                    for news_item in results["googleNews"]:
-                                        title = news_item.get("name", "unknown")
-                                        url = news_item.get("link", "unknown")
-                                        source_info = news_item.get("source", {})
-                                        source_name = source_info.get("name", "unknown")
-                                        domain = get_domain_from_url(url)
-                                        text = title
-                                        published_date = news_item.get("datetime", "unknown")
-                                        image_url = news_item.get("thumbnail", news_item.get("thumbnailSmall", "unknown")) # Prefer larger thumbnail
-                                        keyword = query_key # The key is the original query term
-                                        country = determine_country_from_domain(domain)
-                                        
-                                        # Append data for each article found under this query key
-                                        all_data.append({
-                                            "source": "News",
-                                            "platform": source_name,
-                                            "type": "article",
-                                            "post_id": url.split("/")[-1] if url != "unknown" else f"news_{actor_id}_{title[:20]}", # Create a fallback ID
-                                            "date": published_date,
-                                            "text": text,
-                                            "title": title,
-                                            "url": url,
-                                            "image_url": image_url,
-                                            "domain": domain,
-                                            "country": country,
-                                            "query": keyword,
-                                            "actor_id": actor_id
-                                        })
-                                        items_count_for_run += 1
-                                        processed = True # Mark as processed even if nested
-                                        if items_count_for_run % 10 == 0:
-                                            print(f"[News Apify - {actor_name}] Processed {items_count_for_run} items for context '{query_context}'...")
-                                else:
-                                    # Handle cases where the structure might be different than expected
-                                    print(f"[News Apify - {actor_name}] Unexpected item structure for query key '{query_key}': {results}")
-                            # Prevent appending the raw outer item for this actor
-                            continue # Go to next item from dataset iterator
+    # --- Run Actors and Process Items as They Arrive --- 
+    orchestrator = get_orchestrator(api_token)
+    print(f"\n--- [News Apify] Starting collection: {len(jobs)} actor runs "
+          f"(at most {orchestrator.max_concurrent_runs} at once, {orchestrator.per_actor_concurrency} per actor) ---")
 
-                        # --- Append Data (for actors processed item by item) --- 
-                        if processed and actor_id == "v2y7x1v2Muk1NlPyZ": 
-                             all_data.append({
-                                "source": "News",
-                                "platform": source_name,
-                                "type": "article",
-                                "post_id": url.split("/")[-1] if url != "unknown" else f"news_{actor_id}_{title[:20]}", # Create a fallback ID
-                                "date": published_date,
-                                "text": text,
-                                "title": title,
-                                "url": url,
-                                "image_url": image_url,
-                                "domain": domain,
-                                "country": country,
-                                "query": keyword,
-                                "actor_id": actor_id
-                            })
-                             items_count_for_run += 1
-                             if items_count_for_run % 10 == 0:
-                                 print(f"[News Apify - {actor_name}] Processed {items_count_for_run} items for context '{query_context}'...")
-                        elif not processed:
-                             print(f"[News Apify - {actor_name}] Skipping item due to unrecognized structure or actor ID: {item}")
+    cycle_start = time.monotonic()
+    for job, item in orchestrator.iterate(jobs):
+        actor_name = job.context["actor_config"]["name"]
+        query_context = job.context["query"] # The specific query or "all"
+        try:
+            records = _extract_news_records(item, job.actor_id, actor_name, query_context)
+            for record in records:
+                all_data.append(record)
+                job.context["items"] += 1
+                total_collected_count += 1
+                if job.context["items"] % 10 == 0:
+                    print(f"[News Apify - {actor_name}] Processed {job.context['items']} items for context '{query_context}'...")
+        except Exception as e:
+            print(f"[News Apify - {actor_name}] Error processing item from run '{job.label}': {str(e)} Item: {item}")
 
-                    except Exception as e:
-                        print(f"[News Apify - {actor_name}] Error processing item from dataset {dataset_id}: {str(e)} Item: {item}")
-                        continue
-                
-                print(f"[News Apify - {actor_name}] Collected {items_count_for_run} news items for context '{query_context}'.")
-                actor_collected_count += items_count_for_run
-            
-            except Exception as e:
-                 print(f"[News Apify - {actor_name}] Error fetching or processing dataset {dataset_id}: {str(e)}")
+    for job in jobs:
+        print(f"[News Apify - {job.context['actor_config']['name']}] Collected {job.context['items']} news items for context '{job.context['query']}'.")
 
-        print(f"--- [News Apify - {actor_name}] Finished collection. Collected {actor_collected_count} items from this actor. ---")
-        total_collected_count += actor_collected_count
-        time.sleep(5) # Delay between actors
+    print(f"\n[News Apify] Actor runs:")
+    for line in run_summary(jobs):
+        print(f"[News Apify]   {line}")
+    cycle = orchestrator.record_cycle("news", jobs, time.monotonic() - cycle_start, queries=len(queries))
+    print(f"[News Apify] Cycle: {cycle['runs']} runs in {cycle['wall_secs']}s, {cycle['compute_units']} CU, ${cycle['usage_usd']}")
     
     # --- Save Collected Data --- 
     if all_data:
@@ -252,20 +211,11 @@ def collect_news_apify(queries: List[str], output_file=None, language="US:en", s
         final_count = len(df)
         print(f"[News Apify] Deduplicated {initial_count - final_count} articles based on URL. Final count: {final_count}")
 
-        if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-            try:
-                existing_df = pd.read_csv(output_file)
-                df = pd.concat([existing_df, df], ignore_index=True)
-            except pd.errors.EmptyDataError:
-                print(f"[News Apify] Warning: The file '{output_file}' is empty. Creating a new file.")
-        df.to_csv(output_file, index=False)
-        print(f"\n[News Apify] Collected {len(all_data)} total news articles. Saved to '{output_file}'.")
+        # Each run is its own shard; earlier runs' output is never re-read or rewritten
+        shard_file = write_raw_shard(output_file, df, kwargs.get('since_date'), kwargs.get('until_date'))
+        print(f"\n[News Apify] Collected {len(all_data)} total news articles. Saved to '{shard_file}'.")
     else:
         print("\n[News Apify] No news articles collected across all actors.")
-        df = pd.DataFrame(columns=["source", "platform", "type", "post_id", "date", "text", "title", 
-                                  "url", "image_url", "domain", "country", "query", "actor_id"]) # Add actor_id
-        df.to_csv(output_file, index=False)
-        print(f"[News Apify] Created empty '{output_file}' with headers.")
     
     return len(all_data)  # Return count for tracking
 
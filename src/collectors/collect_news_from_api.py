@@ -8,6 +8,8 @@ import logging
 from typing import List, Dict, Any
 import sys
 
+from .raw_output import write_raw_shard
+
 # Force UTF-8 encoding for the entire script to prevent charmap codec errors
 if sys.platform.startswith('win'):
     # Windows-specific encoding fix
@@ -317,14 +319,8 @@ class NewsAPICollector:
             df = df.drop_duplicates(subset=['text'])
             final_count = len(df)
             
-            # Save to CSV
-            if os.path.exists(output_file):
-                existing_df = pd.read_csv(output_file)
-                df = pd.concat([existing_df, df], ignore_index=True)
-                df = df.drop_duplicates(subset=['url'])
-                df = df.drop_duplicates(subset=['text'])
-            
-            df.to_csv(output_file, index=False)
+            # Save this run as its own shard; duplicates of earlier runs are resolved at ingest
+            shard_file = write_raw_shard(output_file, df)
             
             target_name = self.target_config.name if self.target_config else "Default Target"
             logger.info(f"\nCollection Summary for {target_name}:")
@@ -334,7 +330,7 @@ class NewsAPICollector:
             logger.info(f"Initial article count: {initial_count}")
             logger.info(f"After URL deduplication: {url_dedup_count}")
             logger.info(f"After text deduplication: {final_count}")
-            logger.info(f"Saved {final_count} unique articles to {output_file}")
+            logger.info(f"Saved {final_count} unique articles to {shard_file}")
         else:
             # logger.warning("No articles collected from any source")
             pass # Added pass to avoid indentation error
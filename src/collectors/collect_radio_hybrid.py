@@ -15,6 +15,11 @@ from urllib.parse import urljoin, urlparse
 import random
 import feedparser
 import xml.etree.ElementTree as ET
+from functools import partial
+
+from .crawl_scheduler import CrawlScheduler, CrawlFrontier, CrawlCancelled, CRAWL_DOMAIN_DELAY_SECONDS
+from .crawl_state import CrawlStateStore, SourceCrawlState, PageVisit, CRAWL_INCREMENTAL
+from .html_extractor import ARTICLE_SELECTORS, PAGINATION_SELECTORS, ParsedPage, element_text, extract_fields
 
 # Force UTF-8 encoding for the entire script to prevent charmap codec errors
 if sys.platform.startswith('win'):
@@ -50,10 +55,22 @@ class HybridRadioCollector:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         
-        # Rate limiting
-        self.request_delay = 2  # seconds between requests
-        self.last_request_time = 0
+        # User agents tried in turn when a page fails to load
+        self.user_agents = [
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        ]
+        
+        # Rate limiting (per domain, enforced by the crawl scheduler)
+        self.request_delay = CRAWL_DOMAIN_DELAY_SECONDS  # seconds between requests to the same domain
         self.max_retries = 3
+        
+        # Runs stations and online sources concurrently over the shared session
+        self.crawler = CrawlScheduler(session=self.session, domain_delay=self.request_delay)
+        
+        # Items collected in earlier cycles, so stable pages are not re-extracted every cycle
+        self.crawl_state = CrawlStateStore() if CRAWL_INCREMENTAL else None
 
     def _load_radio_stations(self) -> Dict[str, Dict[str, Any]]:
         """Load radio station configuration with grouped URLs by station"""
@@ -261,14 +278,6 @@ class HybridRadioCollector:
         self.target_config = target_config
         logger.info(f"Set target config for: {target_config.name if target_config else 'None'}")
 
-    def _rate_limit(self):
-        """Implement rate limiting between requests"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.request_delay:
-            time.sleep(self.request_delay - time_since_last)
-        self.last_request_time = time.time()
-
     def _get_target_keywords(self) -> List[str]:
         """Get keywords to filter content based on target configuration"""
         if self.target_config and hasattr(self.target_config, 'keywords'):
@@ -321,49 +330,37 @@ class HybridRadioCollector:
         
         return has_target_keywords
 
-    def _find_pagination_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Find pagination links on the page"""
+    def _source_state(self, source_name: str) -> Optional[SourceCrawlState]:
+        """Incremental crawl state for a source, scoped to the current target"""
+        if not self.crawl_state:
+            return None
+        scope = self.target_config.name if self.target_config and hasattr(self.target_config, 'name') else 'default'
+        return self.crawl_state.source(scope, source_name)
+
+    def _save_crawl_state(self):
+        """Persist this cycle's crawl state unless the crawl hit its deadline"""
+        if not self.crawl_state:
+            return
+        if self.crawler.timed_out:
+            # Results of unfinished pages were dropped, so their items must not count as collected
+            logger.warning("Crawl timed out; keeping the previous crawl state so sources are fully re-scraped next cycle")
+            self.crawl_state.discard()
+        else:
+            self.crawl_state.save()
+
+    def _pagination_urls(self, selector_hrefs: List[str], links: List[tuple], base_url: str) -> List[str]:
+        """Absolute pagination URLs from selector matches and numbered (2-10) links, at most 5"""
         pagination_links = []
         
-        # Common pagination selectors
-        pagination_selectors = [
-            'a[href*="page="]',  # ?page=2, ?page=3
-            'a[href*="/page/"]',  # /page/2/, /page/3/
-            'a[href*="p="]',  # ?p=2, ?p=3
-            '.pagination a',  # .pagination class
-            '.pager a',  # .pager class
-            '.page-numbers a',  # WordPress pagination
-            '.pagination-links a',  # Custom pagination
-            'a[rel="next"]',  # Next page link
-            'a[title*="Next"]',  # Next page by title
-            'a[title*="next"]',  # Next page by title (lowercase)
-            'a:contains("Next")',  # Next page by text
-            'a:contains("2")',  # Page 2
-            'a:contains("3")',  # Page 3
-            'a:contains("4")',  # Page 4
-            'a:contains("5")',  # Page 5
-        ]
-        
-        for selector in pagination_selectors:
-            try:
-                links = soup.select(selector)
-                for link in links:
-                    href = link.get('href', '')
-                    if href:
-                        # Convert relative URLs to absolute
-                        full_url = urljoin(base_url, href)
-                        if full_url not in pagination_links and full_url != base_url:
-                            pagination_links.append(full_url)
-            except Exception as e:
-                logger.debug(f"Pagination selector {selector} failed: {e}")
-                continue
+        for href in selector_hrefs:
+            if href:
+                # Convert relative URLs to absolute
+                full_url = urljoin(base_url, href)
+                if full_url not in pagination_links and full_url != base_url:
+                    pagination_links.append(full_url)
         
         # Also look for numbered pagination (1, 2, 3, 4, 5)
-        numbered_links = soup.find_all('a', href=True)
-        for link in numbered_links:
-            text = link.get_text(strip=True)
-            href = link.get('href', '')
-            
+        for href, text in links:
             # Check if it's a numbered page link
             if text.isdigit() and 2 <= int(text) <= 10:  # Pages 2-10
                 full_url = urljoin(base_url, href)
@@ -372,17 +369,25 @@ class HybridRadioCollector:
         
         return pagination_links[:5]  # Limit to 5 pages
 
-    def _find_section_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Find section-specific links like 'More from Fact Check', 'More from Hot Tori', etc."""
-        section_links = []
+    def _find_pagination_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
+        """Find pagination links on the page"""
+        selector_hrefs = []
+        for selector in PAGINATION_SELECTORS:
+            try:
+                selector_hrefs.extend(link.get('href', '') for link in soup.select(selector))
+            except Exception as e:
+                logger.debug(f"Pagination selector {selector} failed: {e}")
+                continue
         
-        # Look for "More from..." links
-        more_links = soup.find_all('a', href=True, string=lambda text: text and 'More from' in text)
+        links = [(link.get('href', ''), link.get_text(strip=True)) for link in soup.find_all('a', href=True)]
+        return self._pagination_urls(selector_hrefs, links, base_url)
+
+    def _section_urls(self, more_links: List[tuple], base_url: str) -> List[str]:
+        """Absolute section URLs from 'More from...' links plus known site sections"""
+        section_links = []
         logger.info(f"Found {len(more_links)} 'More from' links")
         
-        for link in more_links:
-            href = link.get('href', '')
-            text = link.get_text(strip=True)
+        for href, text in more_links:
             if href:
                 # Convert relative URLs to absolute
                 full_url = urljoin(base_url, href)
@@ -406,9 +411,124 @@ class HybridRadioCollector:
         
         return section_links
 
+    def _find_section_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
+        """Find section-specific links like 'More from Fact Check', 'More from Hot Tori', etc."""
+        # Look for "More from..." links
+        more_links = soup.find_all('a', href=True, string=lambda text: text and 'More from' in text)
+        return self._section_urls([(link.get('href', ''), link.get_text(strip=True)) for link in more_links], base_url)
+
+    def _is_news_link(self, href: str, text: str) -> bool:
+        """Whether a bare link looks like a news article (used when a page has no article containers)"""
+        # More lenient filtering - accept if it looks like news content
+        news_keywords = [
+            'news', 'politics', 'government', 'policy', 'economy', 'business', 
+            'national', 'public', 'official', 'announcement', 'statement', 'press', 
+            'briefing', 'minister', 'president', 'governor', 'senate', 'house', 
+            'assembly', 'election', 'vote', 'campaign', 'budget', 'revenue', 'tax', 
+            'infrastructure', 'development', 'security', 'military', 'police', 'court', 
+            'judge', 'law', 'bill', 'act', 'regulation', 'commission', 'agency', 
+            'department', 'ministry', 'tinubu', 'shettima', 'apc', 'pdp', 'labour',
+            'protest', 'workers', 'minimum wage', 'cost of living', 'lagos', 'abuja', 'nigeria',
+            'update', 'latest', 'breaking', 'report', 'story', 'article', 'post'
+        ]
+        
+        # Only skip obvious non-news content
+        skip_keywords = [
+            'masturbate', 'sex', 'drunk', 'alcohol', 'piss', 'bed', 'belle', 
+            'husband', 'wife', 'girlfriend', 'sister', 'divorce', 'marriage', 'dating', 
+            'love', 'romance', 'kiss', 'kissing', 'wakeup', 'show', 'backyard', 'marketrunz', 
+            'kulele', 'nightjolly', 'hottori', 'stories', 'exclusive-interviews', 'editorial',
+            'burna', 'tiwa', 'savage', 'bayanni', 'davido', 'ayra', 'starr', '2baba',
+            'billboard', 'mobo', 'awards', 'album', 'song', 'concert', 'artist',
+            'super eagles', 'football', 'basketball', 'boxing', 'athlete', 'player',
+            'team', 'match', 'game', 'sport', 'fitness', 'health', 'medical',
+            'hiv', 'zobo', 'blood', 'kidnap', 'pikin', 'shop', 'sell'
+        ]
+        
+        # Check if it has news keywords OR looks like a news URL
+        has_news_keywords = any(keyword in href.lower() or keyword in text.lower() for keyword in news_keywords)
+        has_skip_keywords = any(skip in href.lower() or skip in text.lower() for skip in skip_keywords)
+        looks_like_news_url = any(term in href.lower() for term in ['news', 'article', 'story', 'post', 'update', 'latest'])
+        
+        # Accept if it has news keywords OR looks like news URL, and doesn't have skip keywords
+        return len(text) > 15 and (has_news_keywords or looks_like_news_url) and not has_skip_keywords
+
+    def _is_news_heading(self, text: str) -> bool:
+        """Whether a heading looks like a news title"""
+        if len(text) <= 15:
+            return False
+        
+        # More lenient news keyword checking
+        news_keywords = ['news', 'politics', 'government', 'policy', 'economy', 'business', 
+                       'national', 'public', 'official', 'announcement', 'statement', 'press', 
+                       'briefing', 'minister', 'president', 'governor', 'senate', 'house', 
+                       'assembly', 'election', 'vote', 'campaign', 'budget', 'revenue', 'tax', 
+                       'infrastructure', 'development', 'security', 'military', 'police', 'court', 
+                       'judge', 'law', 'bill', 'act', 'regulation', 'commission', 'agency', 
+                       'department', 'ministry', 'tinubu', 'shettima', 'apc', 'pdp', 'labour',
+                       'protest', 'workers', 'minimum wage', 'cost of living', 'lagos', 'abuja', 'nigeria',
+                       'update', 'latest', 'breaking', 'report', 'story', 'article', 'post']
+        
+        # Only skip obvious non-news content
+        skip_keywords = ['masturbate', 'sex', 'drunk', 'alcohol', 'piss', 'bed', 'belle', 
+                       'husband', 'wife', 'girlfriend', 'sister', 'divorce', 'marriage', 'dating', 
+                       'love', 'romance', 'kiss', 'kissing', 'wakeup', 'show', 'backyard', 'marketrunz', 
+                       'kulele', 'nightjolly', 'hottori', 'stories', 'exclusive-interviews', 'editorial',
+                       'burna', 'tiwa', 'savage', 'bayanni', 'davido', 'ayra', 'starr', '2baba',
+                       'billboard', 'mobo', 'awards', 'album', 'song', 'concert', 'artist',
+                       'super eagles', 'football', 'basketball', 'boxing', 'athlete', 'player',
+                       'team', 'match', 'game', 'sport', 'fitness', 'health', 'medical',
+                       'hiv', 'zobo', 'blood', 'kidnap', 'pikin', 'shop', 'sell']
+        
+        has_news_keywords = any(keyword in text.lower() for keyword in news_keywords)
+        has_skip_keywords = any(skip in text.lower() for skip in skip_keywords)
+        
+        # Accept if it has news keywords and doesn't have skip keywords
+        return has_news_keywords and not has_skip_keywords
+
+    def _build_featured_article(self, title: str, href: str, description: str, station_name: str, url: str) -> Optional[Dict[str, Any]]:
+        """Article from a site's featured-link layout (Wazobia FM .gm-sec-title links)"""
+        if not (title and len(title) > 10):
+            return None
+        return {
+            'title': title,
+            'text': description or title,
+            'url': urljoin(url, href) if href else '',
+            'source': station_name,
+            'source_url': url,
+            'source_type': 'radio',
+            'platform': 'radio_website',
+            'language': 'English',
+            'country': 'Nigeria',
+            'region': self.radio_stations[station_name]['region'],
+            'location': self.radio_stations[station_name]['location'],
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'published_date': datetime.now().strftime('%Y-%m-%d'),
+            'query': 'radio_collection',
+            'file_source': 'radio_hybrid',
+            'description': description[:200] + '...' if len(description) > 200 else description,
+            'content': description or title,
+            'id': f"radio_web_{hash(title + description)}_{int(time.time())}",
+            'favorite': False,
+            'tone': 'neutral',
+            'source_name': station_name,
+            'parent_url': url,
+            'parent_id': f"web_{station_name.replace(' ', '_').lower()}",
+            'children': [],
+            'direct_reach': 0,
+            'cumulative_reach': 0,
+            'domain_reach': 0,
+            'tags': ['radio', 'web', self.radio_stations[station_name]['region'].lower()]
+        }
+
+    def _accept_article(self, article_data: Optional[Dict[str, Any]], visit: Optional[PageVisit]) -> bool:
+        """Keep an extracted article if it is new for this source and matches the target"""
+        return bool(article_data) and (visit is None or visit.record(article_data)) \
+            and self._should_include_content(article_data.get('text', ''))
 
-    def _extract_articles_from_soup(self, soup: BeautifulSoup, station_name: str, url: str) -> List[Dict[str, Any]]:
-        """Extract articles from a BeautifulSoup object"""
+    def _extract_articles_from_soup(self, soup: BeautifulSoup, station_name: str, url: str,
+                                    visit: Optional[PageVisit] = None) -> List[Dict[str, Any]]:
+        """Extract articles from a BeautifulSoup object, skipping items collected in earlier cycles when a visit is given"""
         articles = []
         
         # Look for Wazobia FM specific structure first
@@ -421,6 +541,8 @@ class HybridRadioCollector:
                 try:
                     title = article_link.get_text(strip=True)
                     href = article_link.get('href', '')
+                    if href and visit and visit.skip(urljoin(url, href)):
+                        continue
                     
                     # Get description from parent element
                     parent = article_link.find_parent('li')
@@ -430,59 +552,21 @@ class HybridRadioCollector:
                         if desc_elem:
                             description = desc_elem.get_text(strip=True)
                     
-                    if title and len(title) > 10:
-                        article_data = {
-                            'title': title,
-                            'text': description or title,
-                            'url': urljoin(url, href) if href else '',
-                            'source': station_name,
-                            'source_url': url,
-                            'source_type': 'radio',
-                            'platform': 'radio_website',
-                            'language': 'English',
-                            'country': 'Nigeria',
-                            'region': self.radio_stations[station_name]['region'],
-                            'location': self.radio_stations[station_name]['location'],
-                            'date': datetime.now().strftime('%Y-%m-%d'),
-                            'published_date': datetime.now().strftime('%Y-%m-%d'),
-                            'query': 'radio_collection',
-                            'file_source': 'radio_hybrid',
-                            'description': description[:200] + '...' if len(description) > 200 else description,
-                            'content': description or title,
-                            'id': f"radio_web_{hash(title + description)}_{int(time.time())}",
-                            'favorite': False,
-                            'tone': 'neutral',
-                            'source_name': station_name,
-                            'parent_url': url,
-                            'parent_id': f"web_{station_name.replace(' ', '_').lower()}",
-                            'children': [],
-                            'direct_reach': 0,
-                            'cumulative_reach': 0,
-                            'domain_reach': 0,
-                            'tags': ['radio', 'web', self.radio_stations[station_name]['region'].lower()]
-                        }
-                        
-                        if self._should_include_content(article_data.get('text', '')):
-                            articles.append(article_data)
+                    article_data = self._build_featured_article(title, href, description, station_name, url)
+                    if self._accept_article(article_data, visit):
+                        articles.append(article_data)
                             
                 except Exception as e:
                     logger.warning(f"Error processing Wazobia FM article: {e}")
                     continue
             
-            if articles:
+            if articles or (visit and visit.seen):
                 return articles
         
         # Fallback to general article extraction
         # Look for common news/article patterns with comprehensive selectors
-        article_selectors = [
-            'article', '.article', '.news-item', '.post', '.story',
-            '.content', '.news-content', '.blog-post', '.entry',
-            '.news', '.headline', '.title', 'h1', 'h2', 'h3',
-            '.item', '.card', '.tile', '.block', '.section'
-        ]
-        
         found_articles = []
-        for selector in article_selectors:
+        for selector in ARTICLE_SELECTORS:
             try:
                 elements = soup.select(selector)
                 found_articles.extend(elements)
@@ -493,85 +577,23 @@ class HybridRadioCollector:
         # If no specific article elements found, look for links that might be articles
         if not found_articles:
             logger.info(f"No article elements found, searching all links for {url}")
-            links = soup.find_all('a', href=True)
-            for link in links:
-                href = link.get('href', '')
-                text = link.get_text(strip=True)
-                
-                # More lenient filtering - accept if it looks like news content
-                news_keywords = [
-                    'news', 'politics', 'government', 'policy', 'economy', 'business', 
-                    'national', 'public', 'official', 'announcement', 'statement', 'press', 
-                    'briefing', 'minister', 'president', 'governor', 'senate', 'house', 
-                    'assembly', 'election', 'vote', 'campaign', 'budget', 'revenue', 'tax', 
-                    'infrastructure', 'development', 'security', 'military', 'police', 'court', 
-                    'judge', 'law', 'bill', 'act', 'regulation', 'commission', 'agency', 
-                    'department', 'ministry', 'tinubu', 'shettima', 'apc', 'pdp', 'labour',
-                    'protest', 'workers', 'minimum wage', 'cost of living', 'lagos', 'abuja', 'nigeria',
-                    'update', 'latest', 'breaking', 'report', 'story', 'article', 'post'
-                ]
-                
-                # Only skip obvious non-news content
-                skip_keywords = [
-                    'masturbate', 'sex', 'drunk', 'alcohol', 'piss', 'bed', 'belle', 
-                    'husband', 'wife', 'girlfriend', 'sister', 'divorce', 'marriage', 'dating', 
-                    'love', 'romance', 'kiss', 'kissing', 'wakeup', 'show', 'backyard', 'marketrunz', 
-                    'kulele', 'nightjolly', 'hottori', 'stories', 'exclusive-interviews', 'editorial',
-                    'burna', 'tiwa', 'savage', 'bayanni', 'davido', 'ayra', 'starr', '2baba',
-                    'billboard', 'mobo', 'awards', 'album', 'song', 'concert', 'artist',
-                    'super eagles', 'football', 'basketball', 'boxing', 'athlete', 'player',
-                    'team', 'match', 'game', 'sport', 'fitness', 'health', 'medical',
-                    'hiv', 'zobo', 'blood', 'kidnap', 'pikin', 'shop', 'sell'
-                ]
-                
-                # Check if it has news keywords OR looks like a news URL
-                has_news_keywords = any(keyword in href.lower() or keyword in text.lower() for keyword in news_keywords)
-                has_skip_keywords = any(skip in href.lower() or skip in text.lower() for skip in skip_keywords)
-                looks_like_news_url = any(term in href.lower() for term in ['news', 'article', 'story', 'post', 'update', 'latest'])
-                
-                # Accept if it has news keywords OR looks like news URL, and doesn't have skip keywords
-                if (len(text) > 15 and (has_news_keywords or looks_like_news_url) and not has_skip_keywords):
+            for link in soup.find_all('a', href=True):
+                if self._is_news_link(link.get('href', ''), link.get_text(strip=True)):
                     found_articles.append(link)
         
         # Also look for headings that might be news titles
-        headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-        for heading in headings:
-            text = heading.get_text(strip=True)
-            if len(text) > 15:
-                # More lenient news keyword checking
-                news_keywords = ['news', 'politics', 'government', 'policy', 'economy', 'business', 
-                               'national', 'public', 'official', 'announcement', 'statement', 'press', 
-                               'briefing', 'minister', 'president', 'governor', 'senate', 'house', 
-                               'assembly', 'election', 'vote', 'campaign', 'budget', 'revenue', 'tax', 
-                               'infrastructure', 'development', 'security', 'military', 'police', 'court', 
-                               'judge', 'law', 'bill', 'act', 'regulation', 'commission', 'agency', 
-                               'department', 'ministry', 'tinubu', 'shettima', 'apc', 'pdp', 'labour',
-                               'protest', 'workers', 'minimum wage', 'cost of living', 'lagos', 'abuja', 'nigeria',
-                               'update', 'latest', 'breaking', 'report', 'story', 'article', 'post']
-                
-                # Only skip obvious non-news content
-                skip_keywords = ['masturbate', 'sex', 'drunk', 'alcohol', 'piss', 'bed', 'belle', 
-                               'husband', 'wife', 'girlfriend', 'sister', 'divorce', 'marriage', 'dating', 
-                               'love', 'romance', 'kiss', 'kissing', 'wakeup', 'show', 'backyard', 'marketrunz', 
-                               'kulele', 'nightjolly', 'hottori', 'stories', 'exclusive-interviews', 'editorial',
-                               'burna', 'tiwa', 'savage', 'bayanni', 'davido', 'ayra', 'starr', '2baba',
-                               'billboard', 'mobo', 'awards', 'album', 'song', 'concert', 'artist',
-                               'super eagles', 'football', 'basketball', 'boxing', 'athlete', 'player',
-                               'team', 'match', 'game', 'sport', 'fitness', 'health', 'medical',
-                               'hiv', 'zobo', 'blood', 'kidnap', 'pikin', 'shop', 'sell']
-                
-                has_news_keywords = any(keyword in text.lower() for keyword in news_keywords)
-                has_skip_keywords = any(skip in text.lower() for skip in skip_keywords)
-                
-                # Accept if it has news keywords and doesn't have skip keywords
-                if has_news_keywords and not has_skip_keywords:
-                    found_articles.append(heading)
+        for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+            if self._is_news_heading(heading.get_text(strip=True)):
+                found_articles.append(heading)
         
         # Process found articles
         for element in found_articles[:25]:  # Limit to 25 articles per page
             try:
+                # Linked items from earlier cycles are skipped before the costly extraction
+                if visit and visit.skip(self._element_link(element, url)):
+                    continue
                 article_data = self._extract_article_data(element, station_name, url)
-                if article_data and self._should_include_content(article_data.get('text', '')):
+                if self._accept_article(article_data, visit):
                     articles.append(article_data)
             except Exception as e:
                 logger.warning(f"Error processing article from {url}: {e}")
@@ -579,91 +601,171 @@ class HybridRadioCollector:
         
         return articles
 
-    def _scrape_web_page(self, url: str, station_name: str) -> List[Dict[str, Any]]:
-        """Scrape content from a regular web page with pagination support"""
+    def _extract_articles_from_page(self, page: ParsedPage, station_name: str, url: str,
+                                    visit: Optional[PageVisit] = None) -> List[Dict[str, Any]]:
+        """lxml counterpart of _extract_articles_from_soup: same candidates, order and filters"""
         articles = []
         
-        try:
-            self._rate_limit()
-            logger.info(f"Scraping web page: {url}")
-            
-            # Try multiple user agents to avoid blocking
-            user_agents = [
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            ]
-            
-            # Try with different user agents if first attempt fails
-            for i, user_agent in enumerate(user_agents):
+        featured = page.featured_items()
+        if page.selectors.featured_links is not None:
+            logger.info(f"Found {len(featured)} featured articles on {url}")
+            for title, href, description in featured:
                 try:
-                    self.session.headers.update({'User-Agent': user_agent})
-                    response = self.session.get(url, timeout=15, allow_redirects=True)
-                    response.raise_for_status()
-                    break
+                    if href and visit and visit.skip(urljoin(url, href)):
+                        continue
+                    article_data = self._build_featured_article(title, href, description, station_name, url)
+                    if self._accept_article(article_data, visit):
+                        articles.append(article_data)
                 except Exception as e:
-                    if i == len(user_agents) - 1:  # Last attempt
-                        raise e
-                    logger.warning(f"Attempt {i+1} failed for {url}: {e}")
-                    time.sleep(2)  # Wait before retry
+                    logger.warning(f"Error processing featured article: {e}")
+                    continue
             
-            # Parse with different parsers if needed
+            if articles or (visit and visit.seen):
+                return articles
+        
+        found_articles = page.article_elements()
+        
+        if not found_articles:
+            logger.info(f"No article elements found, searching all links for {url}")
+            found_articles = [link for link in page.selectors.links(page.root)
+                              if self._is_news_link(link.get('href', ''), element_text(link))]
+        
+        # Only the first 25 candidates are processed, so headings matter only when there are fewer
+        if len(found_articles) < 25:
+            found_articles.extend(heading for heading, text in page.heading_texts() if self._is_news_heading(text))
+        
+        for element in found_articles[:25]:  # Limit to 25 articles per page
             try:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                fields = extract_fields(element, url)
+                if visit and visit.skip(fields.link):
+                    continue
+                article_data = self._build_article(fields.title, fields.text, fields.link, fields.raw_text, station_name, url)
+                if self._accept_article(article_data, visit):
+                    articles.append(article_data)
+            except Exception as e:
+                logger.warning(f"Error processing article from {url}: {e}")
+                continue
+        
+        return articles
+
+    def _parse_page(self, content: bytes, station_name: str, url: str, visit: Optional[PageVisit] = None,
+                    find_links: bool = False):
+        """
+        Parse a page once and extract its articles, with lxml when it can handle the page
+        and BeautifulSoup otherwise.
+        
+        Returns:
+            (articles, section links, pagination links); the link lists are empty unless find_links
+        """
+        page = ParsedPage.parse(content, url)
+        if page is not None:
+            articles = self._extract_articles_from_page(page, station_name, url, visit)
+            if not find_links:
+                return articles, [], []
+            section_links = self._section_urls(page.more_from_links(), url)
+            pagination_links = self._pagination_urls(page.pagination_hrefs(), page.links(), url)
+            return articles, section_links, pagination_links
+        
+        logger.debug(f"Falling back to BeautifulSoup for {url}")
+        # Parse with different parsers if needed
+        try:
+            soup = BeautifulSoup(content, 'html.parser')
+        except Exception:
+            try:
+                soup = BeautifulSoup(content, 'lxml')
             except Exception:
-                try:
-                    soup = BeautifulSoup(response.content, 'lxml')
-                except Exception:
-                    soup = BeautifulSoup(response.content, 'html.parser')
+                soup = BeautifulSoup(content, 'html.parser')
+        
+        articles = self._extract_articles_from_soup(soup, station_name, url, visit)
+        if not find_links:
+            return articles, [], []
+        return articles, self._find_section_links(soup, url), self._find_pagination_links(soup, url)
+
+    def _fetch_page(self, url: str) -> requests.Response:
+        """Fetch a page through the crawl scheduler, retrying with other user agents if it fails"""
+        for i, user_agent in enumerate(self.user_agents):
+            try:
+                response = self.crawler.fetch(url, headers={'User-Agent': user_agent})
+                response.raise_for_status()
+                return response
+            except CrawlCancelled:
+                raise
+            except Exception as e:
+                if i == len(self.user_agents) - 1:  # Last attempt
+                    raise e
+                logger.warning(f"Attempt {i+1} failed for {url}: {e}")
+    
+    def _scrape_listing_page(self, url: str, station_name: str, visit: Optional[PageVisit] = None) -> List[Dict[str, Any]]:
+        """Scrape a section or pagination page found on a seed page"""
+        response = self.crawler.fetch(url)
+        response.raise_for_status()
+        
+        articles, _, _ = self._parse_page(response.content, station_name, url, visit)
+        logger.info(f"Found {len(articles)} articles on: {url}" + (f" ({visit.seen} already collected)" if visit else ""))
+        return articles
+
+    def _scrape_pagination(self, links: List[str], station_name: str, frontier: CrawlFrontier,
+                           source_state: Optional[SourceCrawlState] = None) -> List[Dict[str, Any]]:
+        """Scrape pagination pages in order, stopping at the first page with nothing new"""
+        articles = []
+        for link in links:
+            if not frontier.add(link, 1):
+                continue
+            visit = source_state.visit(link) if source_state else None
+            try:
+                articles.extend(self._scrape_listing_page(link, station_name, visit))
+            except CrawlCancelled:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to scrape {link}: {e}")
+                continue
+            if visit and visit.exhausted:
+                logger.info(f"Stopping pagination for {station_name} at {link}: no new items")
+                break
+        return articles
+
+    def _scrape_web_page(self, url: str, station_name: str, frontier: Optional[CrawlFrontier] = None,
+                         source_state: Optional[SourceCrawlState] = None) -> List[Dict[str, Any]]:
+        """Scrape content from a regular web page with section and pagination support"""
+        articles = []
+        frontier = frontier or self.crawler.frontier()
+        
+        if not frontier.add(url, 0):
+            logger.debug(f"Skipping {url}: already crawled or page limit reached for {station_name}")
+            return articles
+        
+        try:
+            logger.info(f"Scraping web page: {url}")
+            response = self._fetch_page(url)
             
-            # First, scrape the main page
-            page_articles = self._extract_articles_from_soup(soup, station_name, url)
+            # First, scrape the main page along with its section-specific "More from..." links
+            # (especially for Wazobia FM) and pagination links (up to 3 additional pages are followed)
+            visit = source_state.visit(url) if source_state else None
+            page_articles, section_links, pagination_links = self._parse_page(
+                response.content, station_name, url, visit, find_links=True)
             articles.extend(page_articles)
-            logger.info(f"Found {len(page_articles)} articles on main page: {url}")
-            
-            # Look for section-specific "More from..." links (especially for Wazobia FM)
-            section_links = self._find_section_links(soup, url)
+            logger.info(f"Found {len(page_articles)} articles on main page: {url}" + (f" ({visit.seen} already collected)" if visit else ""))
             logger.info(f"Found {len(section_links)} section links for {url}")
-            
-            # Scrape each section
-            for i, section_url in enumerate(section_links):
-                try:
-                    self._rate_limit()
-                    logger.info(f"Scraping section {i+1}: {section_url}")
-                    
-                    section_response = self.session.get(section_url, timeout=15, allow_redirects=True)
-                    section_response.raise_for_status()
-                    
-                    section_soup = BeautifulSoup(section_response.content, 'html.parser')
-                    section_articles = self._extract_articles_from_soup(section_soup, station_name, section_url)
-                    articles.extend(section_articles)
-                    logger.info(f"Found {len(section_articles)} articles in section: {section_url}")
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to scrape section {section_url}: {e}")
-                    continue
-            
-            # Look for pagination links and scrape additional pages
-            pagination_links = self._find_pagination_links(soup, url)
             logger.info(f"Found {len(pagination_links)} pagination links for {url}")
             
-            # Scrape up to 3 additional pages to avoid overwhelming the site
-            for i, page_url in enumerate(pagination_links[:3]):
-                try:
-                    self._rate_limit()
-                    logger.info(f"Scraping pagination page {i+2}: {page_url}")
-                    
-                    page_response = self.session.get(page_url, timeout=15, allow_redirects=True)
-                    page_response.raise_for_status()
-                    
-                    page_soup = BeautifulSoup(page_response.content, 'html.parser')
-                    page_articles = self._extract_articles_from_soup(page_soup, station_name, page_url)
-                    articles.extend(page_articles)
-                    logger.info(f"Found {len(page_articles)} articles on page {i+2}: {page_url}")
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to scrape pagination page {page_url}: {e}")
+            # Fetch sections concurrently with the pagination chain (per-domain limits still apply);
+            # pagination is walked in order so it can stop once a page has nothing new
+            tasks = {}
+            for link in section_links:
+                if frontier.add(link, 1):
+                    tasks[link] = partial(self._scrape_listing_page, link, station_name,
+                                          source_state.visit(link) if source_state else None)
+            if visit and visit.exhausted:
+                logger.info(f"Skipping pagination for {url}: no new items on the main page")
+            elif pagination_links:
+                tasks[f"pagination of {url}"] = partial(self._scrape_pagination, pagination_links[:3], station_name,
+                                                        frontier, source_state)
+            results = self.crawler.map(lambda task: task(), tasks.values())
+            for page_url, result in zip(tasks, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to scrape {page_url}: {result}")
                     continue
+                articles.extend(result)
             
             logger.info(f"Found {len(articles)} relevant articles from web page: {url}")
             
@@ -671,6 +773,8 @@ class HybridRadioCollector:
             if len(articles) < 5:
                 logger.info(f"Found {len(articles)} articles with regular scraping for {url}")
             
+        except CrawlCancelled:
+            logger.warning(f"Crawl deadline reached while scraping {url}")
         except requests.exceptions.Timeout:
             logger.error(f"Timeout scraping {url}")
         except requests.exceptions.ConnectionError:
@@ -682,16 +786,18 @@ class HybridRadioCollector:
         
         return articles
 
-    def _scrape_rss_feed(self, url: str, station_name: str) -> List[Dict[str, Any]]:
+    def _scrape_rss_feed(self, url: str, station_name: str, source_state: Optional[SourceCrawlState] = None) -> List[Dict[str, Any]]:
         """Scrape content from an RSS feed"""
         articles = []
+        visit = source_state.visit(url) if source_state else None
         
         try:
-            self._rate_limit()
             logger.info(f"Scraping RSS feed: {url}")
             
-            # Parse RSS feed
-            feed = feedparser.parse(url)
+            # Fetch through the scheduler (shared session, per-domain limits), then parse
+            response = self.crawler.fetch(url)
+            response.raise_for_status()
+            feed = feedparser.parse(response.content)
             
             if feed.bozo:
                 logger.warning(f"RSS feed may have issues: {url}")
@@ -703,6 +809,8 @@ class HybridRadioCollector:
                     link = getattr(entry, 'link', '')
                     description = getattr(entry, 'description', '')
                     published = getattr(entry, 'published', '')
+                    if link and visit and visit.skip(link):
+                        continue
                     
                     # Try to get content
                     content = description
@@ -785,20 +893,30 @@ class HybridRadioCollector:
                             'tags': ['radio', 'rss', self.radio_stations[station_name]['region'].lower()]
                         }
                         
-                        if self._should_include_content(article_data.get('text', '')):
+                        if (visit is None or visit.record(article_data)) and self._should_include_content(article_data.get('text', '')):
                             articles.append(article_data)
                 
                 except Exception as e:
                     logger.warning(f"Error processing RSS entry from {url}: {e}")
                     continue
             
-            logger.info(f"Found {len(articles)} relevant articles from RSS feed: {url}")
+            logger.info(f"Found {len(articles)} relevant articles from RSS feed: {url}" + (f" ({visit.seen} already collected)" if visit else ""))
             
         except Exception as e:
             logger.error(f"Error scraping RSS feed {url}: {e}")
         
         return articles
 
+    def _element_link(self, element, base_url: str) -> str:
+        """Absolute URL an article element links to (the element itself or its first link)"""
+        if element.name == 'a' and element.get('href'):
+            return urljoin(base_url, element.get('href'))
+        # Look for link within the element
+        link_element = element.find('a', href=True)
+        if link_element:
+            return urljoin(base_url, link_element.get('href'))
+        return ""
+
     def _extract_article_data(self, element, station_name: str, base_url: str) -> Optional[Dict[str, Any]]:
         """Extract article data from a DOM element"""
         try:
@@ -820,6 +938,18 @@ class HybridRadioCollector:
             elif element.name == 'a':
                 text = element.get_text(strip=True)
             
+            return self._build_article(title, text, self._element_link(element, base_url), element.get_text(),
+                                       station_name, base_url)
+        
+        except Exception as e:
+            logger.warning(f"Error extracting article data: {e}")
+        
+        return None
+
+    def _build_article(self, title: str, text: str, url: str, date_text: str, station_name: str,
+                       base_url: str) -> Optional[Dict[str, Any]]:
+        """Build an article record from an element's title, text, link and date text"""
+        try:
             # More lenient content filtering - only reject obvious non-news content
             skip_content_keywords = [
                 'masturbate', 'sex', 'drunk', 'alcohol', 'piss', 'bed', 'belle', 
@@ -854,19 +984,8 @@ class HybridRadioCollector:
             if has_skip_content:
                 return None
             
-            # Extract URL
-            url = ""
-            if element.name == 'a' and element.get('href'):
-                url = urljoin(base_url, element.get('href'))
-            else:
-                # Look for link within the element
-                link_element = element.find('a', href=True)
-                if link_element:
-                    url = urljoin(base_url, link_element.get('href'))
-            
             # Extract date (look for common date patterns)
             date = datetime.now().strftime('%Y-%m-%d')
-            date_text = element.get_text()
             date_patterns = [
                 r'(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
                 r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})',
@@ -999,6 +1118,8 @@ class HybridRadioCollector:
     def collect_from_station(self, station_name: str, station_config: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Collect content from a single radio station using both web and RSS scraping"""
         all_articles = []
+        frontier = self.crawler.frontier()
+        source_state = self._source_state(station_name)
         
         logger.info(f"Collecting from {station_name}")
         
@@ -1006,7 +1127,7 @@ class HybridRadioCollector:
         web_urls = station_config.get('urls', {}).get('web', [])
         for url in web_urls:
             try:
-                articles = self._scrape_web_page(url, station_name)
+                articles = self._scrape_web_page(url, station_name, frontier, source_state)
                 all_articles.extend(articles)
                 logger.info(f"Collected {len(articles)} articles from web page: {url}")
             except Exception as e:
@@ -1014,13 +1135,13 @@ class HybridRadioCollector:
         
         # Scrape RSS feeds
         rss_urls = station_config.get('urls', {}).get('rss', [])
-        for url in rss_urls:
-            try:
-                articles = self._scrape_rss_feed(url, station_name)
-                all_articles.extend(articles)
-                logger.info(f"Collected {len(articles)} articles from RSS feed: {url}")
-            except Exception as e:
-                logger.error(f"Failed to scrape RSS feed {url}: {e}")
+        results = self.crawler.map(partial(self._scrape_rss_feed, station_name=station_name, source_state=source_state), rss_urls)
+        for url, result in zip(rss_urls, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to scrape RSS feed {url}: {result}")
+                continue
+            all_articles.extend(result)
+            logger.info(f"Collected {len(result)} articles from RSS feed: {url}")
         
         logger.info(f"Total collected {len(all_articles)} articles from {station_name}")
         return all_articles
@@ -1028,6 +1149,8 @@ class HybridRadioCollector:
     def _scrape_online_source(self, source_name: str, source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Scrape content from a single online source"""
         all_articles = []
+        frontier = self.crawler.frontier()
+        source_state = self._source_state(source_name)
         
         logger.info(f"Collecting from online source: {source_name}")
         
@@ -1036,7 +1159,7 @@ class HybridRadioCollector:
         
         for url in urls:
             try:
-                articles = self._scrape_web_page(url, source_name)
+                articles = self._scrape_web_page(url, source_name, frontier, source_state)
                 all_articles.extend(articles)
                 logger.info(f"Collected {len(articles)} articles from {source_name}: {url}")
             except Exception as e:
@@ -1045,22 +1168,30 @@ class HybridRadioCollector:
         logger.info(f"Total collected {len(all_articles)} articles from {source_name}")
         return all_articles
 
+    def _gather_results(self, names: List[str], results: Dict[str, Any], key_prefix: str):
+        """Combine crawl results in configuration order; returns (articles, successful source count)"""
+        articles = []
+        successful = 0
+        for name in names:
+            result = results[f"{key_prefix}:{name}"]
+            if isinstance(result, Exception):
+                logger.error(f"Failed to collect from {name}: {result}")
+                continue
+            articles.extend(result)
+            successful += 1
+            logger.info(f"Collected {len(result)} articles from {name}")
+        return articles, successful
+
     def collect_from_online_sources(self) -> List[Dict[str, Any]]:
-        """Collect content from all configured online sources"""
+        """Collect content from all configured online sources (call _save_crawl_state once they are persisted)"""
         logger.info("Starting online sources collection...")
         
-        all_articles = []
-        successful_sources = 0
         total_sources = len(self.online_sources)
-        
-        for source_name, source_config in self.online_sources.items():
-            try:
-                articles = self._scrape_online_source(source_name, source_config)
-                all_articles.extend(articles)
-                successful_sources += 1
-                logger.info(f"Collected {len(articles)} articles from {source_name}")
-            except Exception as e:
-                logger.error(f"Failed to collect from {source_name}: {e}")
+        results = self.crawler.run({
+            f"online:{source_name}": partial(self._scrape_online_source, source_name, source_config)
+            for source_name, source_config in self.online_sources.items()
+        })
+        all_articles, successful_sources = self._gather_results(list(self.online_sources), results, "online")
         
         logger.info(f"Online sources collection complete: {len(all_articles)} articles from {successful_sources}/{total_sources} sources")
         return all_articles
@@ -1069,30 +1200,26 @@ class HybridRadioCollector:
         """Collect content from all configured radio stations and online sources"""
         logger.info("Starting hybrid radio station and online sources collection...")
         
-        all_articles = []
+        # Radio stations and online sources are crawled together; wall time follows the slowest source
+        logger.info(f"=== COLLECTING FROM {len(self.radio_stations)} RADIO STATIONS AND {len(self.online_sources)} ONLINE SOURCES ===")
+        jobs = {
+            f"radio:{station_name}": partial(self.collect_from_station, station_name, station_config)
+            for station_name, station_config in self.radio_stations.items()
+        }
+        jobs.update({
+            f"online:{source_name}": partial(self._scrape_online_source, source_name, source_config)
+            for source_name, source_config in self.online_sources.items()
+        })
+        results = self.crawler.run(jobs)
         
-        # First, collect from radio stations
-        logger.info("=== COLLECTING FROM RADIO STATIONS ===")
-        radio_articles = []
-        successful_stations = 0
         total_stations = len(self.radio_stations)
-        
-        for station_name, station_config in self.radio_stations.items():
-            try:
-                articles = self.collect_from_station(station_name, station_config)
-                radio_articles.extend(articles)
-                successful_stations += 1
-                logger.info(f"Collected {len(articles)} articles from {station_name}")
-            except Exception as e:
-                logger.error(f"Failed to collect from {station_name}: {e}")
-        
-        all_articles.extend(radio_articles)
+        radio_articles, successful_stations = self._gather_results(list(self.radio_stations), results, "radio")
         logger.info(f"Radio collection complete: {len(radio_articles)} articles from {successful_stations}/{total_stations} stations")
         
-        # Then, collect from online sources
-        logger.info("=== COLLECTING FROM ONLINE SOURCES ===")
-        online_articles = self.collect_from_online_sources()
-        all_articles.extend(online_articles)
+        online_articles, successful_online_sources = self._gather_results(list(self.online_sources), results, "online")
+        logger.info(f"Online sources collection complete: {len(online_articles)} articles from {successful_online_sources}/{len(self.online_sources)} sources")
+        
+        all_articles = radio_articles + online_articles
         
         # Save to CSV if output file specified
         if output_file and all_articles:
@@ -1100,13 +1227,16 @@ class HybridRadioCollector:
             df.to_csv(output_file, index=False, encoding='utf-8')
             logger.info(f"Saved {len(all_articles)} articles to {output_file}")
         
+        # Items only count as seen once they are on disk; a failed write leaves them to be collected again
+        self._save_crawl_state()
+        
         results = {
             'total_articles': len(all_articles),
             'radio_articles': len(radio_articles),
             'online_articles': len(online_articles),
             'successful_stations': successful_stations,
             'total_stations': total_stations,
-            'successful_online_sources': len([s for s in self.online_sources.keys()]),
+            'successful_online_sources': successful_online_sources,
             'total_online_sources': len(self.online_sources),
             'articles': all_articles
         }
@@ -13,6 +13,10 @@ from bs4 import BeautifulSoup
 import re
 from urllib.parse import urljoin, urlparse
 import random
+from functools import partial
+
+from .crawl_scheduler import CrawlScheduler, CrawlCancelled, CRAWL_DOMAIN_DELAY_SECONDS
+from .html_extractor import ARTICLE_SELECTORS, ParsedPage, element_text, extract_fields
 
 # Force UTF-8 encoding for the entire script to prevent charmap codec errors
 if sys.platform.startswith('win'):
@@ -45,10 +49,12 @@ class RadioStationCollector:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         
-        # Rate limiting
-        self.request_delay = 2  # seconds between requests
-        self.last_request_time = 0
+        # Rate limiting (per domain, enforced by the crawl scheduler)
+        self.request_delay = CRAWL_DOMAIN_DELAY_SECONDS  # seconds between requests to the same domain
         self.max_retries = 3
+        
+        # Crawls stations concurrently over the shared session
+        self.crawler = CrawlScheduler(session=self.session, domain_delay=self.request_delay)
 
     def _load_radio_stations(self) -> Dict[str, List[Dict]]:
         """Load radio station configuration from the comprehensive media sources"""
@@ -111,14 +117,6 @@ class RadioStationCollector:
         self.target_config = target_config
         logger.info(f"Set target config for: {target_config.name if target_config else 'None'}")
 
-    def _rate_limit(self):
-        """Implement rate limiting between requests"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.request_delay:
-            time.sleep(self.request_delay - time_since_last)
-        self.last_request_time = time.time()
-
     def _get_target_keywords(self) -> List[str]:
         """Get keywords to filter content based on target configuration"""
         if self.target_config and hasattr(self.target_config, 'keywords'):
@@ -168,7 +166,6 @@ class RadioStationCollector:
             return articles
         
         try:
-            self._rate_limit()
             logger.info(f"Scraping {station_name} at {website_url}")
             
             # Try multiple user agents to avoid blocking
@@ -181,123 +178,23 @@ class RadioStationCollector:
             # Try with different user agents if first attempt fails
             for i, user_agent in enumerate(user_agents):
                 try:
-                    self.session.headers.update({'User-Agent': user_agent})
-                    response = self.session.get(website_url, timeout=15, allow_redirects=True)
+                    # The scheduler spaces out retries along with every other request to the domain
+                    response = self.crawler.fetch(website_url, headers={'User-Agent': user_agent})
                     response.raise_for_status()
                     break
+                except CrawlCancelled:
+                    raise
                 except Exception as e:
                     if i == len(user_agents) - 1:  # Last attempt
                         raise e
                     logger.warning(f"Attempt {i+1} failed for {station_name}: {e}")
-                    time.sleep(2)  # Wait before retry
-            
-            # Parse with different parsers if needed
-            try:
-                soup = BeautifulSoup(response.content, 'html.parser')
-            except Exception:
-                # Try with lxml if available
-                try:
-                    soup = BeautifulSoup(response.content, 'lxml')
-                except Exception:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Look for common news/article patterns with more comprehensive selectors
-            article_selectors = [
-                'article', '.article', '.news-item', '.post', '.story',
-                '.content', '.news-content', '.blog-post', '.entry',
-                '.news', '.headline', '.title', 'h1', 'h2', 'h3',
-                '.item', '.card', '.tile', '.block', '.section'
-            ]
-            
-            found_articles = []
-            for selector in article_selectors:
-                try:
-                    elements = soup.select(selector)
-                    found_articles.extend(elements)
-                except Exception as e:
-                    logger.debug(f"Selector {selector} failed: {e}")
-                    continue
-            
-            # If no specific article elements found, look for links that might be articles
-            if not found_articles:
-                logger.info(f"No article elements found, searching all links for {station_name}")
-                links = soup.find_all('a', href=True)
-                for link in links:
-                    href = link.get('href', '')
-                    text = link.get_text(strip=True)
-                    
-                    # STRICT filtering for news and political content only
-                    news_keywords = [
-                        'news', 'politics', 'government', 'policy', 'economy', 'business', 
-                        'national', 'public', 'official', 'announcement', 'statement', 'press', 
-                        'briefing', 'minister', 'president', 'governor', 'senate', 'house', 
-                        'assembly', 'election', 'vote', 'campaign', 'budget', 'revenue', 'tax', 
-                        'infrastructure', 'development', 'security', 'military', 'police', 'court', 
-                        'judge', 'law', 'bill', 'act', 'regulation', 'commission', 'agency', 
-                        'department', 'ministry', 'tinubu', 'shettima', 'apc', 'pdp', 'labour',
-                        'protest', 'workers', 'minimum wage', 'cost of living', 'lagos', 'abuja', 'nigeria'
-                    ]
-                    
-                    skip_keywords = [
-                        'entertainment', 'music', 'sports', 'showbiz', 'lifestyle', 'relationship', 
-                        'caller', 'confession', 'personal', 'advice', 'gossip', 'celebrity', 'movie', 
-                        'song', 'album', 'concert', 'match', 'game', 'player', 'team', 'football', 
-                        'basketball', 'boxing', 'athlete', 'advertisement', 'ad', 'sponsor', 'promotion', 
-                        'commercial', 'masturbate', 'sex', 'drunk', 'alcohol', 'piss', 'bed', 'belle', 
-                        'husband', 'wife', 'girlfriend', 'sister', 'divorce', 'marriage', 'dating', 
-                        'love', 'romance', 'kiss', 'kissing', 'wakeup', 'show', 'backyard', 'marketrunz', 
-                        'kulele', 'nightjolly', 'hottori', 'stories', 'exclusive-interviews', 'editorial'
-                    ]
-                    
-                    # Must have news keywords AND not have skip keywords
-                    has_news_keywords = any(keyword in href.lower() or keyword in text.lower() for keyword in news_keywords)
-                    has_skip_keywords = any(skip in href.lower() or skip in text.lower() for skip in skip_keywords)
-                    
-                    if (len(text) > 20 and has_news_keywords and not has_skip_keywords):
-                        found_articles.append(link)
-            
-            # Also look for headings that might be news titles
-            headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-            for heading in headings:
-                text = heading.get_text(strip=True)
-                if len(text) > 20:
-                    # Check if it's news-related
-                    news_keywords = ['news', 'politics', 'government', 'policy', 'economy', 'business', 
-                                   'national', 'public', 'official', 'announcement', 'statement', 'press', 
-                                   'briefing', 'minister', 'president', 'governor', 'senate', 'house', 
-                                   'assembly', 'election', 'vote', 'campaign', 'budget', 'revenue', 'tax', 
-                                   'infrastructure', 'development', 'security', 'military', 'police', 'court', 
-                                   'judge', 'law', 'bill', 'act', 'regulation', 'commission', 'agency', 
-                                   'department', 'ministry', 'tinubu', 'shettima', 'apc', 'pdp', 'labour',
-                                   'protest', 'workers', 'minimum wage', 'cost of living', 'lagos', 'abuja', 'nigeria']
-                    
-                    skip_keywords = ['entertainment', 'music', 'sports', 'showbiz', 'lifestyle', 'relationship', 
-                                   'caller', 'confession', 'personal', 'advice', 'gossip', 'celebrity', 'movie', 
-                                   'song', 'album', 'concert', 'match', 'game', 'player', 'team', 'football', 
-                                   'basketball', 'boxing', 'athlete', 'advertisement', 'ad', 'sponsor', 'promotion', 
-                                   'commercial', 'masturbate', 'sex', 'drunk', 'alcohol', 'piss', 'bed', 'belle', 
-                                   'husband', 'wife', 'girlfriend', 'sister', 'divorce', 'marriage', 'dating', 
-                                   'love', 'romance', 'kiss', 'kissing', 'wakeup', 'show', 'backyard', 'marketrunz', 
-                                   'kulele', 'nightjolly', 'hottori', 'stories', 'exclusive-interviews', 'editorial']
-                    
-                    has_news_keywords = any(keyword in text.lower() for keyword in news_keywords)
-                    has_skip_keywords = any(skip in text.lower() for skip in skip_keywords)
-                    
-                    if has_news_keywords and not has_skip_keywords:
-                        found_articles.append(heading)
             
-            # Process found articles
-            for element in found_articles[:25]:  # Limit to 25 articles per station
-                try:
-                    article_data = self._extract_article_data(element, station, website_url)
-                    if article_data and self._should_include_content(article_data.get('text', '')):
-                        articles.append(article_data)
-                except Exception as e:
-                    logger.warning(f"Error processing article from {station_name}: {e}")
-                    continue
+            articles = self._parse_page(response.content, station, website_url)
             
             logger.info(f"Found {len(articles)} relevant articles from {station_name}")
             
+        except CrawlCancelled:
+            logger.warning(f"Crawl deadline reached before scraping {station_name}")
         except requests.exceptions.Timeout:
             logger.error(f"Timeout scraping {station_name}")
         except requests.exceptions.ConnectionError:
@@ -309,6 +206,151 @@ class RadioStationCollector:
         
         return articles
 
+    def _is_news_link(self, href: str, text: str) -> bool:
+        """Whether a bare link looks like a news article (used when a page has no article containers)"""
+        # STRICT filtering for news and political content only
+        news_keywords = [
+            'news', 'politics', 'government', 'policy', 'economy', 'business', 
+            'national', 'public', 'official', 'announcement', 'statement', 'press', 
+            'briefing', 'minister', 'president', 'governor', 'senate', 'house', 
+            'assembly', 'election', 'vote', 'campaign', 'budget', 'revenue', 'tax', 
+            'infrastructure', 'development', 'security', 'military', 'police', 'court', 
+            'judge', 'law', 'bill', 'act', 'regulation', 'commission', 'agency', 
+            'department', 'ministry', 'tinubu', 'shettima', 'apc', 'pdp', 'labour',
+            'protest', 'workers', 'minimum wage', 'cost of living', 'lagos', 'abuja', 'nigeria'
+        ]
+        
+        skip_keywords = [
+            'entertainment', 'music', 'sports', 'showbiz', 'lifestyle', 'relationship', 
+            'caller', 'confession', 'personal', 'advice', 'gossip', 'celebrity', 'movie', 
+            'song', 'album', 'concert', 'match', 'game', 'player', 'team', 'football', 
+            'basketball', 'boxing', 'athlete', 'advertisement', 'ad', 'sponsor', 'promotion', 
+            'commercial', 'masturbate', 'sex', 'drunk', 'alcohol', 'piss', 'bed', 'belle', 
+            'husband', 'wife', 'girlfriend', 'sister', 'divorce', 'marriage', 'dating', 
+            'love', 'romance', 'kiss', 'kissing', 'wakeup', 'show', 'backyard', 'marketrunz', 
+            'kulele', 'nightjolly', 'hottori', 'stories', 'exclusive-interviews', 'editorial'
+        ]
+        
+        # Must have news keywords AND not have skip keywords
+        has_news_keywords = any(keyword in href.lower() or keyword in text.lower() for keyword in news_keywords)
+        has_skip_keywords = any(skip in href.lower() or skip in text.lower() for skip in skip_keywords)
+        
+        return len(text) > 20 and has_news_keywords and not has_skip_keywords
+
+    def _is_news_heading(self, text: str) -> bool:
+        """Whether a heading looks like a news title"""
+        if len(text) <= 20:
+            return False
+        
+        # Check if it's news-related
+        news_keywords = ['news', 'politics', 'government', 'policy', 'economy', 'business', 
+                       'national', 'public', 'official', 'announcement', 'statement', 'press', 
+                       'briefing', 'minister', 'president', 'governor', 'senate', 'house', 
+                       'assembly', 'election', 'vote', 'campaign', 'budget', 'revenue', 'tax', 
+                       'infrastructure', 'development', 'security', 'military', 'police', 'court', 
+                       'judge', 'law', 'bill', 'act', 'regulation', 'commission', 'agency', 
+                       'department', 'ministry', 'tinubu', 'shettima', 'apc', 'pdp', 'labour',
+                       'protest', 'workers', 'minimum wage', 'cost of living', 'lagos', 'abuja', 'nigeria']
+        
+        skip_keywords = ['entertainment', 'music', 'sports', 'showbiz', 'lifestyle', 'relationship', 
+                       'caller', 'confession', 'personal', 'advice', 'gossip', 'celebrity', 'movie', 
+                       'song', 'album', 'concert', 'match', 'game', 'player', 'team', 'football', 
+                       'basketball', 'boxing', 'athlete', 'advertisement', 'ad', 'sponsor', 'promotion', 
+                       'commercial', 'masturbate', 'sex', 'drunk', 'alcohol', 'piss', 'bed', 'belle', 
+                       'husband', 'wife', 'girlfriend', 'sister', 'divorce', 'marriage', 'dating', 
+                       'love', 'romance', 'kiss', 'kissing', 'wakeup', 'show', 'backyard', 'marketrunz', 
+                       'kulele', 'nightjolly', 'hottori', 'stories', 'exclusive-interviews', 'editorial']
+        
+        has_news_keywords = any(keyword in text.lower() for keyword in news_keywords)
+        has_skip_keywords = any(skip in text.lower() for skip in skip_keywords)
+        
+        return has_news_keywords and not has_skip_keywords
+
+    def _extract_articles_from_soup(self, soup: BeautifulSoup, station: Dict[str, Any], website_url: str) -> List[Dict[str, Any]]:
+        """Extract articles from a BeautifulSoup object"""
+        articles = []
+        station_name = station.get('name', 'Unknown Station')
+        
+        # Look for common news/article patterns with more comprehensive selectors
+        found_articles = []
+        for selector in ARTICLE_SELECTORS:
+            try:
+                elements = soup.select(selector)
+                found_articles.extend(elements)
+            except Exception as e:
+                logger.debug(f"Selector {selector} failed: {e}")
+                continue
+        
+        # If no specific article elements found, look for links that might be articles
+        if not found_articles:
+            logger.info(f"No article elements found, searching all links for {station_name}")
+            for link in soup.find_all('a', href=True):
+                if self._is_news_link(link.get('href', ''), link.get_text(strip=True)):
+                    found_articles.append(link)
+        
+        # Also look for headings that might be news titles
+        for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+            if self._is_news_heading(heading.get_text(strip=True)):
+                found_articles.append(heading)
+        
+        # Process found articles
+        for element in found_articles[:25]:  # Limit to 25 articles per station
+            try:
+                article_data = self._extract_article_data(element, station, website_url)
+                if article_data and self._should_include_content(article_data.get('text', '')):
+                    articles.append(article_data)
+            except Exception as e:
+                logger.warning(f"Error processing article from {station_name}: {e}")
+                continue
+        
+        return articles
+
+    def _extract_articles_from_page(self, page: ParsedPage, station: Dict[str, Any], website_url: str) -> List[Dict[str, Any]]:
+        """lxml counterpart of _extract_articles_from_soup: same candidates, order and filters"""
+        articles = []
+        station_name = station.get('name', 'Unknown Station')
+        
+        found_articles = page.article_elements()
+        
+        if not found_articles:
+            logger.info(f"No article elements found, searching all links for {station_name}")
+            found_articles = [link for link in page.selectors.links(page.root)
+                              if self._is_news_link(link.get('href', ''), element_text(link))]
+        
+        # Only the first 25 candidates are processed, so headings matter only when there are fewer
+        if len(found_articles) < 25:
+            found_articles.extend(heading for heading, text in page.heading_texts() if self._is_news_heading(text))
+        
+        for element in found_articles[:25]:  # Limit to 25 articles per station
+            try:
+                fields = extract_fields(element, website_url)
+                article_data = self._build_article(fields.title, fields.text, fields.link, fields.raw_text, station, website_url)
+                if article_data and self._should_include_content(article_data.get('text', '')):
+                    articles.append(article_data)
+            except Exception as e:
+                logger.warning(f"Error processing article from {station_name}: {e}")
+                continue
+        
+        return articles
+
+    def _parse_page(self, content: bytes, station: Dict[str, Any], website_url: str) -> List[Dict[str, Any]]:
+        """Parse a page once and extract its articles, with lxml when it can handle the page and BeautifulSoup otherwise"""
+        page = ParsedPage.parse(content, website_url)
+        if page is not None:
+            return self._extract_articles_from_page(page, station, website_url)
+        
+        logger.debug(f"Falling back to BeautifulSoup for {website_url}")
+        # Parse with different parsers if needed
+        try:
+            soup = BeautifulSoup(content, 'html.parser')
+        except Exception:
+            # Try with lxml if available
+            try:
+                soup = BeautifulSoup(content, 'lxml')
+            except Exception:
+                soup = BeautifulSoup(content, 'html.parser')
+        return self._extract_articles_from_soup(soup, station, website_url)
+
     def _extract_article_data(self, element, station: Dict[str, Any], base_url: str) -> Optional[Dict[str, Any]]:
         """Extract article data from a DOM element"""
         try:
@@ -330,6 +372,27 @@ class RadioStationCollector:
             elif element.name == 'a':
                 text = element.get_text(strip=True)
             
+            # Extract URL
+            url = ""
+            if element.name == 'a' and element.get('href'):
+                url = urljoin(base_url, element.get('href'))
+            else:
+                # Look for link within the element
+                link_element = element.find('a', href=True)
+                if link_element:
+                    url = urljoin(base_url, link_element.get('href'))
+            
+            return self._build_article(title, text, url, element.get_text(), station, base_url)
+        
+        except Exception as e:
+            logger.warning(f"Error extracting article data: {e}")
+        
+        return None
+
+    def _build_article(self, title: str, text: str, url: str, date_text: str, station: Dict[str, Any],
+                       base_url: str) -> Optional[Dict[str, Any]]:
+        """Build an article record from an element's title, text, link and date text"""
+        try:
             # STRICT content filtering - reject anything that's not clearly news/political
             skip_content_keywords = [
                 'masturbate', 'sex', 'relationship', 'caller', 'confession', 
@@ -365,19 +428,8 @@ class RadioStationCollector:
             if has_skip_content or not has_news_content:
                 return None
             
-            # Extract URL
-            url = ""
-            if element.name == 'a' and element.get('href'):
-                url = urljoin(base_url, element.get('href'))
-            else:
-                # Look for link within the element
-                link_element = element.find('a', href=True)
-                if link_element:
-                    url = urljoin(base_url, link_element.get('href'))
-            
             # Extract date (look for common date patterns)
             date = datetime.now().strftime('%Y-%m-%d')
-            date_text = element.get_text()
             date_patterns = [
                 r'(\d{1,2}[/-]\d{1,2}[/-]\d{4})',
                 r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})',
@@ -457,22 +509,27 @@ class RadioStationCollector:
             if hasattr(radio_config, 'regions') and radio_config.regions:
                 regions_to_collect = list(radio_config.regions.keys())
         
+        stations = []
         for region in regions_to_collect:
             if region not in self.radio_stations:
                 continue
-                
-            stations = self.radio_stations[region]
-            logger.info(f"Collecting from {len(stations)} stations in {region}")
             
-            for station in stations:
-                total_stations += 1
-                try:
-                    articles = self.collect_from_station(station)
-                    all_articles.extend(articles)
-                    successful_stations += 1
-                    logger.info(f"Collected {len(articles)} articles from {station.get('name', 'Unknown')}")
-                except Exception as e:
-                    logger.error(f"Failed to collect from {station.get('name', 'Unknown')}: {e}")
+            logger.info(f"Collecting from {len(self.radio_stations[region])} stations in {region}")
+            stations.extend(self.radio_stations[region])
+        
+        # Crawl all stations concurrently; results are combined in region/station order
+        total_stations = len(stations)
+        results = self.crawler.run({
+            str(i): partial(self.collect_from_station, station) for i, station in enumerate(stations)
+        })
+        for i, station in enumerate(stations):
+            result = results[str(i)]
+            if isinstance(result, Exception):
+                logger.error(f"Failed to collect from {station.get('name', 'Unknown')}: {result}")
+                continue
+            all_articles.extend(result)
+            successful_stations += 1
+            logger.info(f"Collected {len(result)} articles from {station.get('name', 'Unknown')}")
         
         # Save to CSV if output file specified
         if output_file and all_articles:
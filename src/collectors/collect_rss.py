@@ -9,7 +9,6 @@ from typing import List, Dict, Any
 import time
 from urllib.parse import quote
 import re
-import socket
 from urllib.error import URLError, HTTPError
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import threading
@@ -22,6 +21,9 @@ import chardet
 import warnings
 from urllib3.exceptions import InsecureRequestWarning
 
+from .rss_query_matcher import RSSQueryMatcher
+from .rss_fetch_engine import RSSFetchEngine, FeedFetchResult
+
 # Suppress SSL warnings for cleaner output
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 warnings.filterwarnings('ignore', category=InsecureRequestWarning)
@@ -52,6 +54,9 @@ class RSSFeedCollector:
             'Connection': 'keep-alive'
         }
         
+        # Concurrent fetcher with conditional GET caching and per-host limits
+        self.fetch_engine = RSSFetchEngine(timeout=self.feed_timeout, headers=self.headers)
+        
         # Track failed sources
         self.failed_sources = set()
         self.source_failures = {}  # Track number of failures per source
@@ -180,139 +185,6 @@ class RSSFeedCollector:
         text = ' '.join(text.split())
         return text
 
-    def _is_relevant_article(self, title: str, description: str, query: str) -> bool:
-        """
-        Check if the article is relevant based on title and description
-        """
-        text = (title + " " + description).lower()
-        
-        # Check if any of the custom queries are present
-        for keyword in self.custom_queries:
-            if keyword.lower() in text:
-                return True
-                
-        # Also check the original query if it's not in the custom queries
-        if query.lower() not in [var.lower() for var in self.custom_queries]:
-            return query.lower() in text
-            
-        return False
-
-    def _clean_xml(self, xml_content: str) -> str:
-        """Clean problematic XML content"""
-        if not xml_content:
-            return None
-            
-        try:
-            # Detect encoding if not UTF-8
-            detected = chardet.detect(xml_content.encode())
-            if detected['encoding'] and detected['encoding'].lower() != 'utf-8':
-                xml_content = xml_content.encode(detected['encoding']).decode('utf-8', errors='ignore')
-            
-            # Remove invalid XML characters
-            xml_content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', xml_content)
-            
-            # Fix common HTML entities
-            xml_content = html.unescape(xml_content)
-            
-            # Fix unclosed CDATA sections
-            xml_content = re.sub(r'<!\[CDATA\[([^\]]*)(?!\]\])>', r'<![CDATA[\1]]>', xml_content)
-            
-            # Fix malformed tags
-            soup = BeautifulSoup(xml_content, 'xml')
-            xml_content = str(soup)
-            
-            return xml_content
-        except Exception as e:
-            logger.warning(f"Error cleaning XML: {str(e)}")
-            return None
-
-    def _fetch_feed_with_requests(self, feed_url: str) -> str:
-        """Fetch feed content using requests with better error handling and SSL verification"""
-        try:
-            # Try different variations of the URL if initial one fails
-            urls_to_try = [
-                feed_url,
-                feed_url.rstrip('/') + '/feed',
-                feed_url.rstrip('/') + '/rss',
-                feed_url.replace('feed', 'rss')
-            ]
-            
-            for url in urls_to_try:
-                try:
-                    # First try with SSL verification enabled
-                    try:
-                        response = requests.get(
-                            url,
-                            headers=self.headers,
-                            timeout=self.feed_timeout,
-                            verify=True  # Try with SSL verification first
-                        )
-                    except (requests.exceptions.SSLError, requests.exceptions.ConnectionError):
-                        # If SSL verification fails, try without it
-                        logger.debug(f"SSL verification failed for {url}, trying without verification")
-                        response = requests.get(
-                            url,
-                            headers=self.headers,
-                            timeout=self.feed_timeout,
-                            verify=False  # Fallback to unverified
-                        )
-                    
-                    if response.status_code == 200:
-                        content_type = response.headers.get('content-type', '').lower()
-                        if any(t in content_type for t in ['xml', 'rss', 'atom']):
-                            return response.text
-                        
-                        # If content type is HTML, try to find RSS link
-                        if 'html' in content_type:
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            rss_link = soup.find('link', type='application/rss+xml')
-                            if rss_link and rss_link.get('href'):
-                                return self._fetch_feed_with_requests(rss_link['href'])
-                                
-                except requests.RequestException:
-                    continue
-                    
-            return None
-        except Exception as e:
-            logger.warning(f"Request failed for {feed_url}: {str(e)}")
-            return None
-
-    def _parse_feed_with_timeout(self, feed_url: str) -> Any:
-        """Parse feed with timeout handling and multiple parsing attempts"""
-        # Set socket timeout for the request
-        original_timeout = socket.getdefaulttimeout()
-        socket.setdefaulttimeout(self.feed_timeout)
-        
-        try:
-            # First try: Direct feedparser approach with SSL context
-            try:
-                feed = feedparser.parse(feed_url, handlers=[], request_headers=self.headers)
-            except (socket.timeout, ssl.SSLError, URLError, OSError) as e:
-                logger.debug(f"Direct feedparser failed for {feed_url}: {str(e)}")
-                feed = None
-            
-            # If failed or empty, try with requests
-            if not feed or feed.get('bozo', 0) == 1 or not feed.get('entries', []):
-                xml_content = self._fetch_feed_with_requests(feed_url)
-                if xml_content:
-                    # Clean the XML content
-                    cleaned_content = self._clean_xml(xml_content)
-                    if cleaned_content:
-                        # Try parsing the cleaned content
-                        try:
-                            feed = feedparser.parse(cleaned_content)
-                        except Exception as e:
-                            logger.debug(f"Failed to parse cleaned XML for {feed_url}: {str(e)}")
-                            feed = None
-            
-            return feed
-        except Exception as e:
-            logger.debug(f"Error in _parse_feed_with_timeout for {feed_url}: {str(e)}")
-            return None
-        finally:
-            # Restore original timeout
-            socket.setdefaulttimeout(original_timeout)
-
     def _should_retry_source(self, feed_url: str, error: Exception) -> bool:
         """Determine if we should retry a failed source"""
         # Initialize failure count if not exists
@@ -332,15 +204,23 @@ class RSSFeedCollector:
                 
         return True
 
-    def _parse_feed(self, feed_url: str, query: str) -> List[Dict[Any, Any]]:
-        """Parse a single RSS feed and return relevant articles"""
+    def _parse_feed(self, feed_url: str, result: FeedFetchResult, matcher: RSSQueryMatcher) -> List[Dict[Any, Any]]:
+        """Extract the articles relevant to any of the matcher's queries from a fetched feed"""
         if feed_url in self.failed_sources:
             logger.debug(f"Skipping previously failed source: {feed_url}")
             return []
             
         try:
-            # Try to parse the feed with timeout and better error handling
-            feed = self._parse_feed_with_timeout(feed_url)
+            if result.error is not None:
+                raise result.error
+            
+            # Unchanged since the last run for these queries: its articles were already collected
+            if result.not_modified:
+                logger.debug(f"Feed not modified since last run: {feed_url}")
+                self.source_failures.pop(feed_url, None)
+                return []
+            
+            feed = result.feed
             
             # Additional validation for feed structure
             if not feed or not hasattr(feed, 'entries'):
@@ -365,7 +245,8 @@ class RSSFeedCollector:
                 title = entry.get('title', '')
                 description = entry.get('description', '')
                 
-                if self._is_relevant_article(title, description, query):
+                query_index, matched_queries = matcher.match(title, description)
+                if query_index is not None:
                     # Get the full content if available
                     content = entry.get('content', [{}])[0].get('value', '') if 'content' in entry else ''
                     if not content:
@@ -379,7 +260,8 @@ class RSSFeedCollector:
                         'published_date': entry.get('published', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
                         'source': feed.feed.get('title', feed_url),
                         'source_url': feed_url,
-                        'query': query,
+                        'query': matcher.queries[query_index],
+                        'matched_queries': '; '.join(matched_queries),
                         'language': entry.get('language', 'en')
                     }
                     articles.append(article)
@@ -399,21 +281,25 @@ class RSSFeedCollector:
                 
             return []
 
-    def collect_from_feeds(self, query: str) -> List[Dict[Any, Any]]:
-        """Collect news from all RSS feeds for a given query"""
-        all_articles = []
+    def collect_from_feeds(self, queries: List[str]) -> List[Dict[Any, Any]]:
+        """
+        Collect news from all RSS feeds for a list of queries, fetching each feed once
+
+        Articles are returned grouped by their attributed query, in query order,
+        so de-duplication keeps the same rows as collecting query by query.
+        """
+        matcher = RSSQueryMatcher(queries, self.custom_queries)
+        articles_by_query = [[] for _ in matcher.queries]
         
-        for feed_url in self.rss_feeds:
-            if feed_url in self.failed_sources:
-                continue
-                
+        feed_urls = [feed_url for feed_url in self.rss_feeds if feed_url not in self.failed_sources]
+        logger.info(f"Collecting from {len(feed_urls)} feeds")
+        results = self.fetch_engine.fetch_all(
+            feed_urls, scope=self.fetch_engine.scope_key(type(self).__name__, matcher.queries, self.custom_queries))
+        
+        for feed_url in feed_urls:
             try:
-                logger.info(f"Collecting from {feed_url}")
-                articles = self._parse_feed(feed_url, query)
-                all_articles.extend(articles)
-                
-                # Be nice to the servers
-                time.sleep(1)
+                for article in self._parse_feed(feed_url, results[feed_url], matcher):
+                    articles_by_query[matcher.queries.index(article['query'])].append(article)
             except Exception as e:
                 logger.error(f"Error collecting from {feed_url}: {str(e)}")
                 continue
@@ -424,7 +310,7 @@ class RSSFeedCollector:
             for failed_url in self.failed_sources:
                 logger.warning(f"Failed source: {failed_url}")
         
-        return all_articles
+        return [article for articles in articles_by_query for article in articles]
 
     def collect_all(self, queries: List[str] = None, output_file: str = None, target_name: str = None) -> None:
         """
@@ -435,8 +321,6 @@ class RSSFeedCollector:
             output_file: Optional output file path. If not provided, will use default path.
             target_name: Name of the target individual for file naming
         """
-        all_articles = []
-        
         # Use custom queries as the base if available, otherwise use empty list
         search_queries = self.custom_queries.copy() if self.custom_queries else []
         
@@ -455,10 +339,8 @@ class RSSFeedCollector:
         # Remove duplicates while preserving order
         search_queries = list(dict.fromkeys(search_queries))
         
-        for query in search_queries:
-            logger.info(f"Collecting RSS feed news for query: {query}")
-            articles = self.collect_from_feeds(query)
-            all_articles.extend(articles)
+        logger.info(f"Collecting RSS feed news for {len(search_queries)} queries: {search_queries}")
+        all_articles = self.collect_from_feeds(search_queries)
         
         if all_articles:
             df = pd.DataFrame(all_articles)
@@ -483,6 +365,9 @@ class RSSFeedCollector:
             logger.info(f"Saved {len(df)} articles to {output_file}")
         else:
             logger.warning("No articles found for any query")
+        
+        # Only now that the articles are on disk may the feeds answer 304 next time
+        self.fetch_engine.commit_state()
 
 def main(target_and_variations: List[str] = None, user_id: str = None):
     """
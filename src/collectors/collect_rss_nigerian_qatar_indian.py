@@ -7,7 +7,6 @@ from typing import List, Dict, Any
 import time
 from urllib.parse import quote
 import re
-import socket
 from urllib.error import URLError, HTTPError
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import threading
@@ -24,7 +23,8 @@ import json
 # Import our new modules
 from .rss_feed_health_monitor import RSSFeedHealthMonitor
 from .rss_feed_validator import RSSFeedValidator
-from .rss_ssl_handler import RSSSSLHandler
+from .rss_query_matcher import RSSQueryMatcher
+from .rss_fetch_engine import RSSFetchEngine, FeedFetchResult, is_usable_feed
 
 # Suppress SSL warnings for cleaner output
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
@@ -48,7 +48,6 @@ class NigerianQatarIndianRSSCollector:
         # Initialize new components
         self.health_monitor = RSSFeedHealthMonitor()
         self.feed_validator = RSSFeedValidator()
-        self.ssl_handler = RSSSSLHandler()
         
         # Headers for requests to avoid blocking
         self.headers = {
@@ -58,6 +57,9 @@ class NigerianQatarIndianRSSCollector:
             'Connection': 'keep-alive'
         }
         
+        # Concurrent fetcher with conditional GET caching and per-host limits
+        self.fetch_engine = RSSFetchEngine(timeout=self.feed_timeout, headers=self.headers)
+        
         # Track failed sources
         self.failed_sources = set()
         self.source_failures = {}  # Track number of failures per source
@@ -242,130 +244,6 @@ class NigerianQatarIndianRSSCollector:
         text = ' '.join(text.split())
         return text
 
-    def _is_relevant_article(self, title: str, description: str, query: str) -> bool:
-        """
-        Check if the article is relevant based on title and description
-        """
-        text = (title + " " + description).lower()
-        
-        # Check if any of the custom queries are present
-        for keyword in self.custom_queries:
-            if keyword.lower() in text:
-                return True
-                
-        # Also check the original query if it's not in the custom queries
-        if query.lower() not in [var.lower() for var in self.custom_queries]:
-            if query.lower() in text:
-                return True
-            
-        # If no custom queries, accept all articles from these specific sources
-        if not self.custom_queries:
-            return True
-            
-        return False
-
-    def _clean_xml(self, xml_content: str) -> str:
-        """Clean problematic XML content"""
-        if not xml_content:
-            return None
-            
-        try:
-            # Detect encoding if not UTF-8
-            detected = chardet.detect(xml_content.encode())
-            if detected['encoding'] and detected['encoding'].lower() != 'utf-8':
-                xml_content = xml_content.encode(detected['encoding']).decode('utf-8', errors='ignore')
-            
-            # Remove invalid XML characters
-            xml_content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', xml_content)
-            
-            # Fix common HTML entities
-            xml_content = html.unescape(xml_content)
-            
-            # Fix unclosed CDATA sections
-            xml_content = re.sub(r'<!\[CDATA\[([^\]]*)(?!\]\])>', r'<![CDATA[\1]]>', xml_content)
-            
-            # Fix malformed tags
-            soup = BeautifulSoup(xml_content, 'xml')
-            xml_content = str(soup)
-            
-            return xml_content
-        except Exception as e:
-            logger.warning(f"Error cleaning XML: {str(e)}")
-            return None
-
-    def _fetch_feed_with_requests(self, feed_url: str) -> str:
-        """Fetch feed content using improved SSL handler and multiple approaches"""
-        try:
-            # Try different variations of the URL if initial one fails
-            urls_to_try = [
-                feed_url,
-                feed_url.rstrip('/') + '/feed',
-                feed_url.rstrip('/') + '/rss',
-                feed_url.replace('feed', 'rss')
-            ]
-            
-            for url in urls_to_try:
-                try:
-                    # Use SSL handler for automatic SSL strategy selection
-                    response = self.ssl_handler.fetch_with_auto_ssl(url, self.feed_timeout)
-                    
-                    if response and response.status_code == 200:
-                        content_type = response.headers.get('content-type', '').lower()
-                        if any(t in content_type for t in ['xml', 'rss', 'atom']):
-                            return response.text
-                        
-                        # If content type is HTML, try to find RSS link
-                        if 'html' in content_type:
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            rss_link = soup.find('link', type='application/rss+xml')
-                            if rss_link and rss_link.get('href'):
-                                return self._fetch_feed_with_requests(rss_link['href'])
-                                
-                except Exception as e:
-                    logger.debug(f"Failed to fetch {url}: {str(e)}")
-                    continue
-                    
-            return None
-        except Exception as e:
-            logger.warning(f"Request failed for {feed_url}: {str(e)}")
-            return None
-
-    def _parse_feed_with_timeout(self, feed_url: str) -> Any:
-        """Parse feed with timeout handling and multiple parsing attempts"""
-        # Set socket timeout for the request
-        original_timeout = socket.getdefaulttimeout()
-        socket.setdefaulttimeout(self.feed_timeout)
-        
-        try:
-            # First try: Direct feedparser approach with SSL context
-            try:
-                feed = feedparser.parse(feed_url, handlers=[], request_headers=self.headers)
-            except (socket.timeout, ssl.SSLError, URLError, OSError) as e:
-                logger.debug(f"Direct feedparser failed for {feed_url}: {str(e)}")
-                feed = None
-            
-            # If failed or empty, try with requests
-            if not feed or feed.get('bozo', 0) == 1 or not feed.get('entries', []):
-                xml_content = self._fetch_feed_with_requests(feed_url)
-                if xml_content:
-                    # Clean the XML content
-                    cleaned_content = self._clean_xml(xml_content)
-                    if cleaned_content:
-                        # Try parsing the cleaned content
-                        try:
-                            feed = feedparser.parse(cleaned_content)
-                        except Exception as e:
-                            logger.debug(f"Failed to parse cleaned XML for {feed_url}: {str(e)}")
-                            feed = None
-            
-            return feed
-        except Exception as e:
-            logger.debug(f"Error in _parse_feed_with_timeout for {feed_url}: {str(e)}")
-            return None
-        finally:
-            # Restore original timeout
-            socket.setdefaulttimeout(original_timeout)
-
     def _should_retry_source(self, feed_url: str, error: Exception) -> bool:
         """Determine if we should retry a failed source"""
         # Initialize failure count if not exists
@@ -385,15 +263,23 @@ class NigerianQatarIndianRSSCollector:
                 
         return True
 
-    def _parse_feed(self, feed_url: str, query: str) -> List[Dict[Any, Any]]:
-        """Parse a single RSS feed and return relevant articles"""
+    def _parse_feed(self, feed_url: str, result: FeedFetchResult, matcher: RSSQueryMatcher) -> List[Dict[Any, Any]]:
+        """Extract the articles relevant to any of the matcher's queries from a fetched feed"""
         if feed_url in self.failed_sources:
             logger.debug(f"Skipping previously failed source: {feed_url}")
             return []
             
         try:
-            # Try to parse the feed with timeout and better error handling
-            feed = self._parse_feed_with_timeout(feed_url)
+            if result.error is not None:
+                raise result.error
+            
+            # Unchanged since the last run for these queries: its articles were already collected
+            if result.not_modified:
+                logger.debug(f"Feed not modified since last run: {feed_url}")
+                self.source_failures.pop(feed_url, None)
+                return []
+            
+            feed = result.feed
             
             # Additional validation for feed structure
             if not feed or not hasattr(feed, 'entries'):
@@ -418,7 +304,8 @@ class NigerianQatarIndianRSSCollector:
                 title = entry.get('title', '')
                 description = entry.get('description', '')
                 
-                if self._is_relevant_article(title, description, query):
+                query_index, matched_queries = matcher.match(title, description)
+                if query_index is not None:
                     # Get the full content if available
                     content = entry.get('content', [{}])[0].get('value', '') if 'content' in entry else ''
                     if not content:
@@ -436,7 +323,8 @@ class NigerianQatarIndianRSSCollector:
                         'source': feed.feed.get('title', feed_url),
                         'source_url': feed_url,
                         'source_region': source_region,
-                        'query': query,
+                        'query': matcher.queries[query_index],
+                        'matched_queries': '; '.join(matched_queries),
                         'language': entry.get('language', 'en')
                     }
                     articles.append(article)
@@ -471,53 +359,42 @@ class NigerianQatarIndianRSSCollector:
         else:
             return 'International'
 
-    def collect_from_feeds(self, query: str) -> List[Dict[Any, Any]]:
-        """Collect news from healthy RSS feeds for a given query"""
-        all_articles = []
+    def collect_from_feeds(self, queries: List[str]) -> List[Dict[Any, Any]]:
+        """
+        Collect news from healthy RSS feeds for a list of queries, fetching each feed once
+
+        Articles are returned grouped by their attributed query, in query order,
+        so de-duplication keeps the same rows as collecting query by query.
+        """
+        # If no custom queries, accept all articles from these specific sources
+        matcher = RSSQueryMatcher(queries, self.custom_queries, accept_all_without_custom=True)
+        articles_by_query = [[] for _ in matcher.queries]
         
         # Get healthy feeds using health monitoring
         healthy_feeds = self._get_healthy_feeds()
         
-        logger.info(f"Collecting from {len(healthy_feeds)} healthy feeds for query: {query}")
+        logger.info(f"Collecting from {len(healthy_feeds)} healthy feeds for {len(matcher.queries)} queries")
         
-        # Add overall timeout for the entire collection process (10 minutes)
+        # Overall timeout for the entire collection process (10 minutes); each request has its own timeout
         overall_timeout = 600  # 10 minutes
-        start_time = time.time()
+        feed_urls = [feed_url for feed_url in healthy_feeds if feed_url not in self.failed_sources]
+        results = self.fetch_engine.fetch_all(
+            feed_urls, scope=self.fetch_engine.scope_key(type(self).__name__, matcher.queries, self.custom_queries),
+            overall_timeout=overall_timeout)
         
-        for i, feed_url in enumerate(healthy_feeds):
-            # Check if we've exceeded the overall timeout
-            if time.time() - start_time > overall_timeout:
-                logger.warning(f"Overall collection timeout ({overall_timeout}s) reached. Processed {i}/{len(healthy_feeds)} feeds.")
-                break
-                
-            if feed_url in self.failed_sources:
-                continue
-                
+        for feed_url in feed_urls:
+            result = results[feed_url]
             try:
-                logger.info(f"Collecting from {feed_url}")
-                
-                # Add individual feed timeout with threading
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(self._parse_feed, feed_url, query)
-                    try:
-                        articles = future.result(timeout=self.feed_timeout + 5)  # Extra 5s buffer
-                        all_articles.extend(articles)
-                        
-                        # Record successful collection in health monitor
-                        self.health_monitor.validate_feed(feed_url)
-                        
-                    except FutureTimeoutError:
-                        logger.warning(f"Timeout collecting from {feed_url}, skipping...")
-                        self.failed_sources.add(feed_url)
-                        continue
-                
-                # Be nice to the servers
-                time.sleep(1)
+                for article in self._parse_feed(feed_url, result, matcher):
+                    articles_by_query[matcher.queries.index(article['query'])].append(article)
             except Exception as e:
                 logger.error(f"Error collecting from {feed_url}: {str(e)}")
-                # Record failure in health monitor
-                self.health_monitor.validate_feed(feed_url)
-                continue
+            
+            # Record the outcome in the health monitor (no second fetch)
+            error = result.error
+            if error is None and not result.not_modified and not is_usable_feed(result.feed):
+                error = ValueError("Feed parsing failed or returned no entries")
+            self.health_monitor.record_result(feed_url, result.response_time, error)
         
         # Log summary of failed sources
         if self.failed_sources:
@@ -535,7 +412,7 @@ class NigerianQatarIndianRSSCollector:
         except Exception as e:
             logger.warning(f"Failed to generate health report: {e}")
         
-        return all_articles
+        return [article for articles in articles_by_query for article in articles]
 
     def validate_feeds_before_collection(self) -> Dict:
         """Validate all feeds before starting collection."""
@@ -584,8 +461,6 @@ class NigerianQatarIndianRSSCollector:
         if validate_first:
             self.validate_feeds_before_collection()
         
-        all_articles = []
-        
         # Use custom queries as the base if available, otherwise use empty list
         search_queries = self.custom_queries.copy() if self.custom_queries else []
         
@@ -605,10 +480,8 @@ class NigerianQatarIndianRSSCollector:
         # Remove duplicates while preserving order
         search_queries = list(dict.fromkeys(search_queries))
         
-        for query in search_queries:
-            logger.info(f"Collecting RSS feed news for query: {query}")
-            articles = self.collect_from_feeds(query)
-            all_articles.extend(articles)
+        logger.info(f"Collecting RSS feed news for {len(search_queries)} queries: {search_queries}")
+        all_articles = self.collect_from_feeds(search_queries)
         
         if all_articles:
             df = pd.DataFrame(all_articles)
@@ -640,6 +513,9 @@ class NigerianQatarIndianRSSCollector:
                     logger.info(f"  {region}: {count} articles")
         else:
             logger.warning("No articles found for any query")
+        
+        # Only now that the articles are on disk may the feeds answer 304 next time
+        self.fetch_engine.commit_state()
 
 def main(target_and_variations: List[str] = None, user_id: str = None):
     """
@@ -67,7 +67,9 @@ from pathlib import Path
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
-from apify_client import ApifyClient
+
+from .apify_orchestrator import ApifyJob, get_orchestrator, run_summary
+from .raw_output import write_raw_shard
 
 # Define TikTok actor configurations (UPDATED WITH WORKING ACTORS)
 TIKTOK_ACTOR_CONFIGS: List[Dict] = [
@@ -190,9 +192,6 @@ def collect_tiktok_apify(queries: List[str], output_file=None, max_results=100,
     if not api_token:
         raise ValueError("APIFY_API_TOKEN must be set in .env file")
     
-    # Initialize the ApifyClient
-    client = ApifyClient(api_token)
-    
     # Ensure output directory exists
     if output_file is None:
         today = datetime.now().strftime("%Y%m%d")
@@ -202,8 +201,9 @@ def collect_tiktok_apify(queries: List[str], output_file=None, max_results=100,
     
     all_data = []
     total_collected_count = 0
+    jobs = []
 
-    # --- Run Actors --- 
+    # --- Prepare Actor Runs --- 
     for actor_config in TIKTOK_ACTOR_CONFIGS:
         actor_id = actor_config["id"]
         actor_name = actor_config["name"]
@@ -211,185 +211,155 @@ def collect_tiktok_apify(queries: List[str], output_file=None, max_results=100,
         supports_filters = actor_config["supports_filters"]
         max_actor_results = min(max_results, actor_config["max_results"])
         
-        print(f"\n--- [TikTok Apify - {actor_name}] Starting collection ({actor_id}) ---")
-        
-        actor_collected_count = 0
-        runs_to_process = []
+        print(f"\n--- [TikTok Apify - {actor_name}] Preparing collection ({actor_id}) ---")
 
-        # --- Prepare and Run Actor --- 
         for query in queries:
-            try:
-                print(f"[TikTok Apify - {actor_name}] Running for query: {query}")
+            # Prepare actor input based on actor's expected format
+            input_format = actor_config.get("input_format", "hashtags")
+            
+            if input_format == "hashtags":
+                # clockworks/tiktok-scraper actual parameters:
+                # hashtags (array), resultsPerPage (integer), oldestPostDateUnified, newestPostDate
+                clean_query = query.replace("#", "").strip()
                 
-                # Prepare actor input based on actor's expected format
-                input_format = actor_config.get("input_format", "hashtags")
+                run_input = {
+                    "hashtags": [clean_query],  # Array of hashtags (without # symbol)
+                    "resultsPerPage": max_actor_results  # Number of videos per hashtag
+                }
                 
-                if input_format == "hashtags":
-                    # clockworks/tiktok-scraper actual parameters:
-                    # hashtags (array), resultsPerPage (integer), oldestPostDateUnified, newestPostDate
-                    clean_query = query.replace("#", "").strip()
+                # Add date filters if supported and dates are provided
+                if supports_filters:
+                    # Date filtering using oldestPostDateUnified and newestPostDate
+                    # oldestPostDateUnified: scrape videos published after this date
+                    # newestPostDate: scrape videos published before this date
+                    # Format: Must be date string (YYYY-MM-DD) OR number with unit (e.g., "1 day", "2 days", "1 week")
+                    # Regex pattern: ^(\d{4})-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])(T[0-2]\d:[0-5]\d(:[0-5]\d)?(\.\d+)?Z?)?$|^(\d+)\s*(minute|hour|day|week|month|year)s?$
                     
-                    run_input = {
-                        "hashtags": [clean_query],  # Array of hashtags (without # symbol)
-                        "resultsPerPage": max_actor_results  # Number of videos per hashtag
-                    }
+                    # Use "1 day" format (not just "1") to match the required pattern
+                    # This means: scrape videos from the last 1 day (today)
+                    run_input["oldestPostDateUnified"] = "1 day"
                     
-                    # Add date filters if supported and dates are provided
-                    if supports_filters:
-                        # Date filtering using oldestPostDateUnified and newestPostDate
-                        # oldestPostDateUnified: scrape videos published after this date
+                    if until_datetime:
                         # newestPostDate: scrape videos published before this date
-                        # Format: Must be date string (YYYY-MM-DD) OR number with unit (e.g., "1 day", "2 days", "1 week")
-                        # Regex pattern: ^(\d{4})-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])(T[0-2]\d:[0-5]\d(:[0-5]\d)?(\.\d+)?Z?)?$|^(\d+)\s*(minute|hour|day|week|month|year)s?$
-                        
-                        # Use "1 day" format (not just "1") to match the required pattern
-                        # This means: scrape videos from the last 1 day (today)
-                        run_input["oldestPostDateUnified"] = "1 day"
-                        
-                        if until_datetime:
-                            # newestPostDate: scrape videos published before this date
-                            run_input["newestPostDate"] = until_datetime.strftime("%Y-%m-%d")
-                        
-                        if since_datetime or until_datetime:
-                            print(f"[TikTok Apify - {actor_name}] Using date filters: oldestPostDateUnified='1 day' (last 24 hours), newestPostDate={run_input.get('newestPostDate', 'N/A')} - date filtering will be applied post-collection")
-                        else:
-                            print(f"[TikTok Apify - {actor_name}] Using date filter: oldestPostDateUnified='1 day' (last 24 hours)")
-                        
-                else:
-                    # Legacy format (for any other actors)
-                    run_input = {
-                        "searchTerms": [query],
-                        "resultsLimit": max_actor_results,
-                        "searchType": search_type,
-                        "includeComments": include_comments,
-                        "includeShares": include_shares,
-                        "downloadVideos": False
-                    }
-
-                # Run the actor with timeout
-                timeout_secs = int(os.getenv('APIFY_TIMEOUT_SECONDS', '180'))
-                wait_secs = int(os.getenv('APIFY_WAIT_SECONDS', '180'))
-
-                print(f"[TikTok Apify - {actor_name}] Running actor with timeout={timeout_secs}s, wait={wait_secs}s")
-
-                try:
-                    run = client.actor(actor_id).call(
-                        run_input=run_input,
-                        timeout_secs=timeout_secs,
-                        wait_secs=wait_secs
-                    )
-                    runs_to_process.append({"run": run, "query": query, "actor_type": actor_type})
-                    print(f"[TikTok Apify - {actor_name}] Run initiated for query '{query}'. Dataset ID: {run['defaultDatasetId']}")
-                    time.sleep(3)  # Delay between runs
+                        run_input["newestPostDate"] = until_datetime.strftime("%Y-%m-%d")
+                    
+                    if since_datetime or until_datetime:
+                        print(f"[TikTok Apify - {actor_name}] Using date filters: oldestPostDateUnified='1 day' (last 24 hours), newestPostDate={run_input.get('newestPostDate', 'N/A')} - date filtering will be applied post-collection")
+                    else:
+                        print(f"[TikTok Apify - {actor_name}] Using date filter: oldestPostDateUnified='1 day' (last 24 hours)")
+                    
+            else:
+                # Legacy format (for any other actors)
+                run_input = {
+                    "searchTerms": [query],
+                    "resultsLimit": max_actor_results,
+                    "searchType": search_type,
+                    "includeComments": include_comments,
+                    "includeShares": include_shares,
+                    "downloadVideos": False
+                }
 
-                except Exception as actor_error:
-                    if "timeout" in str(actor_error).lower():
-                        print(f"[TikTok Apify - {actor_name}] ⏱️ TIMEOUT after {timeout_secs}s for query '{query}'")
-                    raise  # Re-raise to outer exception handler
+            jobs.append(ApifyJob(
+                actor_id=actor_id,
+                run_input=run_input,
+                label=f"{actor_name}: {query}",
+                context={"actor_config": actor_config, "query": query, "collected": 0, "skipped": 0, "seen": 0}
+            ))
 
-            except Exception as e:
-                print(f"[TikTok Apify - {actor_name}] Error running actor for query '{query}': {e}")
-                print(f"[TikTok Apify - {actor_name}] This might be due to:")
-                print(f"[TikTok Apify - {actor_name}] - Invalid query format")
-                print(f"[TikTok Apify - {actor_name}] - Actor not found or access denied")
-                print(f"[TikTok Apify - {actor_name}] - Invalid input parameters")
-                continue
+    # --- Run Actors and Process Items as They Arrive --- 
+    orchestrator = get_orchestrator(api_token)
+    print(f"\n--- [TikTok Apify] Starting collection: {len(jobs)} actor runs "
+          f"(at most {orchestrator.max_concurrent_runs} at once, {orchestrator.per_actor_concurrency} per actor, "
+          f"timeout {orchestrator.timeout}s) ---")
 
-        # --- Process Results from Runs --- 
-        for run_info in runs_to_process:
-            run_data = run_info["run"]
-            query = run_info["query"]
-            actor_type = run_info["actor_type"]
-            dataset_id = run_data["defaultDatasetId"]
-            
-            print(f"[TikTok Apify - {actor_name}] Fetching results for query '{query}' (Dataset: {dataset_id})")
-            
-            try:
-                items_count_for_run = 0
-                items_skipped = 0
-                items_in_dataset = 0
+    cycle_start = time.monotonic()
+    for job, item in orchestrator.iterate(jobs):
+        run_stats = job.context
+        actor_name = run_stats["actor_config"]["name"]
+        actor_type = run_stats["actor_config"]["type"]
+        query = run_stats["query"]
+        run_stats["seen"] += 1
+        try:
+            # Extract data based on actor type
+            if actor_type in ["general", "hashtag"]:
+                # Debug: Print the first item to see its structure
+                if run_stats["collected"] == 0:
+                    print(f"[TikTok Apify - {actor_name}] DEBUG: First item structure: {json.dumps(item, indent=2, default=str)}")
                 
-                for item in client.dataset(dataset_id).iterate_items():
-                    items_in_dataset += 1
-                    try:
-                        # Extract data based on actor type
-                        if actor_type in ["general", "hashtag"]:
-                            # Debug: Print the first item to see its structure
-                            if items_count_for_run == 0:
-                                print(f"[TikTok Apify - {actor_name}] DEBUG: First item structure: {json.dumps(item, indent=2, default=str)}")
-                            
-                            data = _extract_tiktok_data(item, query, actor_id, actor_type, download_subtitles)
-                        else:
-                            data = None
-                            print(f"[TikTok Apify - {actor_name}] Skipping item - actor_type '{actor_type}' not supported")
-                        
-                        if data:
-                            # Apply date filtering if dates are provided
-                            should_include = True
-                            if since_datetime or until_datetime:
-                                # Extract date from data (createTimeISO field)
-                                item_date_str = data.get('date', '')
-                                if item_date_str and item_date_str != 'unknown':
-                                    try:
-                                        # Parse the date (could be ISO format or timestamp)
-                                        if isinstance(item_date_str, str):
-                                            if 'T' in item_date_str:
-                                                # ISO format: "2025-08-02T18:45:03.000Z"
-                                                item_datetime = datetime.fromisoformat(item_date_str.replace('Z', '+00:00'))
-                                            elif item_date_str.isdigit():
-                                                # Unix timestamp
-                                                item_datetime = datetime.fromtimestamp(int(item_date_str), tz=timezone.utc)
-                                            else:
-                                                # Try other formats
-                                                item_datetime = datetime.fromisoformat(item_date_str.replace('Z', '+00:00'))
-                                        else:
-                                            # Already a datetime object
-                                            item_datetime = item_date_str
-                                        
-                                        # Apply date filters
-                                        if since_datetime and item_datetime < since_datetime:
-                                            should_include = False
-                                        if until_datetime and item_datetime > until_datetime:
-                                            should_include = False
-                                    except Exception as e:
-                                        # If date parsing fails, include the item (better to have it than miss it)
-                                        print(f"[TikTok Apify - {actor_name}] Warning: Could not parse date '{item_date_str}': {e}")
-                            
-                            if should_include:
-                                all_data.append(data)
-                                items_count_for_run += 1
+                data = _extract_tiktok_data(item, query, job.actor_id, actor_type, download_subtitles)
+            else:
+                data = None
+                print(f"[TikTok Apify - {actor_name}] Skipping item - actor_type '{actor_type}' not supported")
+            
+            if data:
+                # Apply date filtering if dates are provided
+                should_include = True
+                if since_datetime or until_datetime:
+                    # Extract date from data (createTimeISO field)
+                    item_date_str = data.get('date', '')
+                    if item_date_str and item_date_str != 'unknown':
+                        try:
+                            # Parse the date (could be ISO format or timestamp)
+                            if isinstance(item_date_str, str):
+                                if 'T' in item_date_str:
+                                    # ISO format: "2025-08-02T18:45:03.000Z"
+                                    item_datetime = datetime.fromisoformat(item_date_str.replace('Z', '+00:00'))
+                                elif item_date_str.isdigit():
+                                    # Unix timestamp
+                                    item_datetime = datetime.fromtimestamp(int(item_date_str), tz=timezone.utc)
+                                else:
+                                    # Try other formats
+                                    item_datetime = datetime.fromisoformat(item_date_str.replace('Z', '+00:00'))
                             else:
-                                items_skipped += 1
+                                # Already a datetime object
+                                item_datetime = item_date_str
                             
-                            if items_count_for_run % 10 == 0:
-                                print(f"[TikTok Apify - {actor_name}] Processed {items_count_for_run} items...")
-                        else:
-                            items_skipped += 1
-                            if items_skipped <= 3:  # Only log first few skips
-                                print(f"[TikTok Apify - {actor_name}] Warning: Item {items_in_dataset} returned None (skipped)")
-                            
-                    except Exception as e:
-                        items_skipped += 1
-                        print(f"[TikTok Apify - {actor_name}] Error processing item {items_in_dataset}: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        continue
+                            # Apply date filters
+                            if since_datetime and item_datetime < since_datetime:
+                                should_include = False
+                            if until_datetime and item_datetime > until_datetime:
+                                should_include = False
+                        except Exception as e:
+                            # If date parsing fails, include the item (better to have it than miss it)
+                            print(f"[TikTok Apify - {actor_name}] Warning: Could not parse date '{item_date_str}': {e}")
                 
-                print(f"[TikTok Apify - {actor_name}] Dataset had {items_in_dataset} total items")
-                if since_datetime or until_datetime:
-                    print(f"[TikTok Apify - {actor_name}] Date filtering applied: {items_count_for_run} items within date range, {items_skipped} filtered out")
+                if should_include:
+                    all_data.append(data)
+                    run_stats["collected"] += 1
+                    total_collected_count += 1
                 else:
-                    print(f"[TikTok Apify - {actor_name}] Successfully processed: {items_count_for_run}, Skipped/Failed: {items_skipped}")
+                    run_stats["skipped"] += 1
                 
-                print(f"[TikTok Apify - {actor_name}] Collected {items_count_for_run} items for query '{query}'")
-                actor_collected_count += items_count_for_run
+                if run_stats["collected"] % 10 == 0:
+                    print(f"[TikTok Apify - {actor_name}] Processed {run_stats['collected']} items...")
+            else:
+                run_stats["skipped"] += 1
+                if run_stats["skipped"] <= 3:  # Only log first few skips
+                    print(f"[TikTok Apify - {actor_name}] Warning: Item {run_stats['seen']} returned None (skipped)")
                 
-            except Exception as e:
-                print(f"[TikTok Apify - {actor_name}] Error fetching dataset {dataset_id}: {e}")
+        except Exception as e:
+            run_stats["skipped"] += 1
+            print(f"[TikTok Apify - {actor_name}] Error processing item {run_stats['seen']}: {e}")
+            import traceback
+            traceback.print_exc()
+            continue
+
+    for job in jobs:
+        run_stats = job.context
+        actor_name = run_stats["actor_config"]["name"]
+        print(f"[TikTok Apify - {actor_name}] Dataset for query '{run_stats['query']}' had {run_stats['seen']} total items")
+        if since_datetime or until_datetime:
+            print(f"[TikTok Apify - {actor_name}] Date filtering applied: {run_stats['collected']} items within date range, {run_stats['skipped']} filtered out")
+        else:
+            print(f"[TikTok Apify - {actor_name}] Successfully processed: {run_stats['collected']}, Skipped/Failed: {run_stats['skipped']}")
+        if job.metrics and job.metrics.timed_out:
+            print(f"[TikTok Apify - {actor_name}] ⏱️ TIMEOUT after {orchestrator.timeout}s for query '{run_stats['query']}'")
 
-        print(f"--- [TikTok Apify - {actor_name}] Finished collection. Collected {actor_collected_count} items. ---")
-        total_collected_count += actor_collected_count
-        time.sleep(5)  # Delay between actors
+    print(f"\n[TikTok Apify] Actor runs:")
+    for line in run_summary(jobs):
+        print(f"[TikTok Apify]   {line}")
+    cycle = orchestrator.record_cycle("tiktok", jobs, time.monotonic() - cycle_start, queries=len(queries))
+    print(f"[TikTok Apify] Cycle: {cycle['runs']} runs in {cycle['wall_secs']}s, {cycle['compute_units']} CU, ${cycle['usage_usd']}")
     
     # --- Save Collected Data --- 
     if all_data:
@@ -404,26 +374,11 @@ def collect_tiktok_apify(queries: List[str], output_file=None, max_results=100,
             final_count = len(df)
             print(f"[TikTok Apify] Deduplicated {initial_count - final_count} items based on {dedup_key}. Final count: {final_count}")
 
-        if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-            try:
-                existing_df = pd.read_csv(output_file)
-                df = pd.concat([existing_df, df], ignore_index=True)
-            except pd.errors.EmptyDataError:
-                print(f"[TikTok Apify] Warning: The file '{output_file}' is empty. Creating a new file.")
-        
-        df.to_csv(output_file, index=False)
-        print(f"\n[TikTok Apify] Collected {len(all_data)} total TikTok items. Saved to '{output_file}'.")
+        # Each run is its own shard; earlier runs' output is never re-read or rewritten
+        shard_file = write_raw_shard(output_file, df, kwargs.get('since_date'), kwargs.get('until_date'))
+        print(f"\n[TikTok Apify] Collected {len(all_data)} total TikTok items. Saved to '{shard_file}'.")
     else:
         print("\n[TikTok Apify] No TikTok items collected across all actors.")
-        # Create empty DataFrame with expected columns
-        df = pd.DataFrame(columns=["source", "platform", "type", "post_id", "date", "text", 
-                                  "url", "image_url", "country", "query", "actor_id",
-                                  "username", "user_display_name", "user_verified", "user_followers",
-                                  "likes", "comments", "shares", "views", "collects",
-                                  "video_duration", "music_name", "music_original", "hashtags",
-                                  "subtitle_language", "subtitle_text"])
-        df.to_csv(output_file, index=False)
-        print(f"[TikTok Apify] Created empty '{output_file}' with headers.")
 
 def _download_subtitle_content(subtitle_url: str) -> str:
     """
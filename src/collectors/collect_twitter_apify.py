@@ -4,18 +4,27 @@ import json
 import time
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
+from collections import Counter
 from typing import List, Dict, Tuple
 from dotenv import load_dotenv
-from apify_client import ApifyClient
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .apify_dedup import APIFY_SKIP_REDUNDANT_ACTORS, StreamingDeduplicator, redundant_actors
+from .apify_orchestrator import ApifyJob, QueryAttribution, batch_queries, get_orchestrator, run_summary
+from .raw_output import RawShardWriter
 
 # Define actor configurations
+TWEET_COLUMNS = ["source", "platform", "type", "post_id", "date", "text", "retweets", "likes",
+                 "user_location", "country", "comments", "user_display_name", "user_name",
+                 "user_avatar", "reply_count", "quote_count", "view_count", "is_reply",
+                 "is_retweet", "is_quote", "url", "query", "actor_id", "matched_queries"]
+
 ACTOR_CONFIGS: List[Dict] = [
     {
         "id": "CJdippxWmn9uRfooo",  # Original actor ID (kaitoeasyapi)
         "input_type_key": "queryType",
         "supports_filters": True,
         "date_param_format": "since_until",  # Uses "since" and "until" parameters
+        "max_search_terms": 10,  # searchTerms entries per run (1 = one run per query)
         "name": "Original Actor"
     },
     {
@@ -23,10 +32,148 @@ ACTOR_CONFIGS: List[Dict] = [
         "input_type_key": "sort",
         "supports_filters": True,
         "date_param_format": "start_end",  # Uses "start" and "end" parameters
+        "max_search_terms": 10,  # searchTerms entries per run (1 = one run per query)
         "name": "New Actor"
     }
 ]
 
+def _build_run_input(queries: List[str], actor_config: Dict, max_items: int, query_type: str, language: str,
+                     since_date: str, until_date: str) -> Tuple[Dict, Dict[str, str]]:
+    """
+    Actor input for a batch of queries, using the parameter names and date format the actor expects.
+
+    Returns:
+        (run input, search term -> query for terms that differ from their query)
+    """
+    actor_name = actor_config["name"]
+    search_terms = {}
+    
+    # Prepare the base Actor input; maxItems caps the whole run, not each term, so it scales with the
+    # batch and the collector holds every query to its own max_items (see collect_twitter_apify)
+    run_input = {
+        "searchTerms": list(queries),
+        "maxItems": max_items * len(queries),
+        actor_config["input_type_key"]: query_type, # Use the correct key for this actor
+        "lang": language,
+    }
+
+    # Add filter parameters only if the actor supports them
+    if actor_config["supports_filters"]:
+        date_param_format = actor_config.get("date_param_format", "since_until")
+        
+        if date_param_format == "start_end":
+            # For apidojo/twitter-scraper-lite: use "start" and "end" parameters
+            # Convert date format from "YYYY-MM-DD_HH:MM:SS_UTC" to YYYY-MM-DD format
+            # The actor expects String format in YYYY-MM-DD format
+            start_date_formatted = since_date.split("_")[0] if "_" in since_date else since_date.split("T")[0]
+            end_date_formatted = until_date.split("_")[0] if "_" in until_date else until_date.split("T")[0]
+            
+            run_input.update({
+                "start": start_date_formatted,  # Format: YYYY-MM-DD
+                "end": end_date_formatted,      # Format: YYYY-MM-DD
+            })
+            print(f"[Twitter Apify - {actor_name}] Using date parameters: start={start_date_formatted}, end={end_date_formatted}")
+        else:
+            # For original actor: use "since" and "until" parameters
+            run_input.update({
+                "since": since_date,
+                "until": until_date,
+                "filter:verified": False,
+                "filter:blue_verified": False,
+                "filter:nativeretweets": False,
+                "include:nativeretweets": False,
+                "filter:replies": False,
+                "filter:quote": False,
+                "min_retweets": 0,
+                "min_faves": 0,
+                "min_replies": 0,
+                "filter:media": False,
+                "filter:images": False,
+                "filter:videos": False,
+            })
+            # Update search terms for actors supporting date filters
+            search_terms = {f"{query} since:{since_date} until:{until_date}": query for query in queries}
+            run_input["searchTerms"] = list(search_terms)
+    
+    return run_input, search_terms
+
+def _extract_tweet_data(item: Dict, query: str, actor_id: str) -> Dict:
+    """Map one actor dataset item to a collector record."""
+    # Extract relevant information - updated based on actual API response structure
+    tweet_id = item.get("id", "unknown")
+    
+    # Get user information
+    author = item.get("author", {})
+    user_name = author.get("userName", "unknown")
+    user_display_name = author.get("name", "unknown")
+    user_avatar = author.get("profilePicture", "unknown")
+    user_location = author.get("location", "unknown")
+    
+    # Get tweet content
+    text = item.get("text", item.get("fullText", "unknown")) # Try both text and fullText
+    created_at = item.get("createdAt", "unknown")
+    
+    # Get engagement metrics
+    retweets = item.get("retweetCount", 0)
+    likes = item.get("likeCount", 0)
+    reply_count = item.get("replyCount", 0)
+    quote_count = item.get("quoteCount", 0)
+    view_count = item.get("viewCount", 0)
+    
+    # Get tweet URL
+    url = item.get("url", item.get("twitterUrl", "unknown")) # Try both url and twitterUrl
+    
+    # Get tweet type information (handle variations)
+    is_reply = item.get("isReply", False)
+    # Check for both structures for retweet/quote status
+    is_retweet = item.get("isRetweet", "retweeted_tweet" in item and item.get("retweeted_tweet") is not None)
+    is_quote = item.get("isQuote", "quoted_tweet" in item and item.get("quoted_tweet") is not None)
+
+    # Determine country (basic heuristic based on location)
+    country = "unknown"
+    if user_location and "qatar" in user_location.lower():
+        country = "qatar"
+    elif user_location and any(country in user_location.lower() for country in ["usa", "united states"]):
+        country = "us"
+    elif user_location and any(country in user_location.lower() for country in ["uk", "united kingdom"]):
+        country = "uk"
+    elif user_location and any(country in user_location.lower() for country in ["nigeria"]):
+        country = "nigeria"
+    elif user_location and any(country in user_location.lower() for country in ["india"]):
+        country = "india"
+    
+    return {
+        "source": "X",
+        "platform": "X",
+        "type": "post",
+        "post_id": tweet_id,
+        "date": created_at,
+        "text": text,
+        "retweets": retweets,
+        "likes": likes,
+        "user_location": user_location,
+        "country": country,
+        "comments": reply_count,  # Using reply count as comments
+        "user_display_name": user_display_name,
+        "user_name": user_name,
+        "user_avatar": user_avatar,
+        "reply_count": reply_count,
+        "quote_count": quote_count,
+        "view_count": view_count,
+        "is_reply": is_reply,
+        "is_retweet": is_retweet,
+        "is_quote": is_quote,
+        "url": url,
+        "query": query,
+        "actor_id": actor_id # Add actor ID for tracking
+    }
+
+def _covered_elsewhere(job: ApifyJob, jobs: List[ApifyJob]) -> bool:
+    """Whether another actor has a run for one of this run's queries that wasn't stopped as redundant, so stopping it loses no query."""
+    queries = set(job.context["attribution"].queries)
+    return any(other.actor_id != job.actor_id and not other.context["redundant"]
+               and queries & set(other.context["attribution"].queries) for other in jobs)
+
 def collect_twitter_apify(queries: List[str], output_file=None, max_items=100, query_type="Latest", language="en", **kwargs):
     """
     Collect Twitter/X data using the Apify API for the given queries, trying multiple actors.
@@ -47,9 +194,6 @@ def collect_twitter_apify(queries: List[str], output_file=None, max_items=100, q
     if not api_token:
         raise ValueError("APIFY_API_TOKEN must be set in .env file")
     
-    # Initialize the ApifyClient
-    client = ApifyClient(api_token)
-    
     # Ensure output directory exists
     if output_file is None:
         today = datetime.now().strftime("%Y%m%d")
@@ -67,251 +211,119 @@ def collect_twitter_apify(queries: List[str], output_file=None, max_items=100, q
         since_date = kwargs.get('since_date', "2021-01-01_00:00:00_UTC")
         until_date = kwargs.get('until_date', datetime.now(timezone.utc).strftime("%Y-%m-%d_%H:%M:%S_UTC"))
     
-    all_data = []
     total_collected_count = 0
     
-    # Helper function to process a single query (runs in parallel)
-    def process_single_query(query: str, actor_config: Dict, since_date: str, until_date: str, api_token: str) -> Tuple[List[Dict], int]:
-        """Process a single query for a given actor configuration. Returns (data_list, item_count)."""
-        # Create a client instance for this thread
-        thread_client = ApifyClient(api_token)
-        
-        actor_id = actor_config["id"]
-        actor_name = actor_config["name"]
-        input_type_key = actor_config["input_type_key"]
-        supports_filters = actor_config["supports_filters"]
-        
-        query_data = []
-        items_count = 0
-        
-        try:
-            print(f"[Twitter Apify - {actor_name}] Starting parallel collection for query: {query}")
-            
-            # Create search terms (base query)
-            search_terms = [query]
-            
-            # Prepare the base Actor input
-            run_input = {
-                "searchTerms": search_terms,
-                "maxItems": max_items,
-                input_type_key: query_type, # Use the correct key for this actor
-                "lang": language,
-            }
-
-            # Add filter parameters only if the actor supports them
-            if supports_filters:
-                date_param_format = actor_config.get("date_param_format", "since_until")
-                
-                if date_param_format == "start_end":
-                    # For apidojo/twitter-scraper-lite: use "start" and "end" parameters
-                    # Convert date format from "YYYY-MM-DD_HH:MM:SS_UTC" to YYYY-MM-DD format
-                    # The actor expects String format in YYYY-MM-DD format
-                    start_date_formatted = since_date.split("_")[0] if "_" in since_date else since_date.split("T")[0]
-                    end_date_formatted = until_date.split("_")[0] if "_" in until_date else until_date.split("T")[0]
-                    
-                    run_input.update({
-                        "start": start_date_formatted,  # Format: YYYY-MM-DD
-                        "end": end_date_formatted,      # Format: YYYY-MM-DD
-                    })
-                    print(f"[Twitter Apify - {actor_name}] Using date parameters: start={start_date_formatted}, end={end_date_formatted}")
-                else:
-                    # For original actor: use "since" and "until" parameters
-                    run_input.update({
-                        "since": since_date,
-                        "until": until_date,
-                        "filter:verified": False,
-                        "filter:blue_verified": False,
-                        "filter:nativeretweets": False,
-                        "include:nativeretweets": False,
-                        "filter:replies": False,
-                        "filter:quote": False,
-                        "min_retweets": 0,
-                        "min_faves": 0,
-                        "min_replies": 0,
-                        "filter:media": False,
-                        "filter:images": False,
-                        "filter:videos": False,
-                    })
-                    # Update search terms for actors supporting date filters
-                    run_input["searchTerms"] = [f"{query} since:{since_date} until:{until_date}"]
-            
-            print(f"[Twitter Apify - {actor_name}] Running Apify Actor ({actor_id}) with query: {query}")
-            # Run the Actor and wait for it to finish
-            run = thread_client.actor(actor_id).call(run_input=run_input)
-            
-            # Fetch results from the Actor's dataset
-            dataset_id = run["defaultDatasetId"]
-            print(f"[Twitter Apify - {actor_name}] Actor run completed for query '{query}'. Dataset ID: {dataset_id}")
-            
-            # Collect items from the dataset
-            for item in thread_client.dataset(dataset_id).iterate_items():
-                try:
-                    # Extract relevant information - updated based on actual API response structure
-                    tweet_id = item.get("id", "unknown")
-                    
-                    # Get user information
-                    author = item.get("author", {})
-                    user_name = author.get("userName", "unknown")
-                    user_display_name = author.get("name", "unknown")
-                    user_avatar = author.get("profilePicture", "unknown")
-                    user_location = author.get("location", "unknown")
-                    
-                    # Get tweet content
-                    text = item.get("text", item.get("fullText", "unknown")) # Try both text and fullText
-                    created_at = item.get("createdAt", "unknown")
-                    
-                    # Get engagement metrics
-                    retweets = item.get("retweetCount", 0)
-                    likes = item.get("likeCount", 0)
-                    reply_count = item.get("replyCount", 0)
-                    quote_count = item.get("quoteCount", 0)
-                    view_count = item.get("viewCount", 0)
-                    
-                    # Get tweet URL
-                    url = item.get("url", item.get("twitterUrl", "unknown")) # Try both url and twitterUrl
-                    
-                    # Get tweet type information (handle variations)
-                    is_reply = item.get("isReply", False)
-                    # Check for both structures for retweet/quote status
-                    is_retweet = item.get("isRetweet", "retweeted_tweet" in item and item.get("retweeted_tweet") is not None)
-                    is_quote = item.get("isQuote", "quoted_tweet" in item and item.get("quoted_tweet") is not None)
-
-                    # Determine country (basic heuristic based on location)
-                    country = "unknown"
-                    if user_location and "qatar" in user_location.lower():
-                        country = "qatar"
-                    elif user_location and any(country in user_location.lower() for country in ["usa", "united states"]):
-                        country = "us"
-                    elif user_location and any(country in user_location.lower() for country in ["uk", "united kingdom"]):
-                        country = "uk"
-                    elif user_location and any(country in user_location.lower() for country in ["nigeria"]):
-                        country = "nigeria"
-                    elif user_location and any(country in user_location.lower() for country in ["india"]):
-                        country = "india"
-                    
-                    # Append to data collection
-                    query_data.append({
-                        "source": "X",
-                        "platform": "X",
-                        "type": "post",
-                        "post_id": tweet_id,
-                        "date": created_at,
-                        "text": text,
-                        "retweets": retweets,
-                        "likes": likes,
-                        "user_location": user_location,
-                        "country": country,
-                        "comments": reply_count,  # Using reply count as comments
-                        "user_display_name": user_display_name,
-                        "user_name": user_name,
-                        "user_avatar": user_avatar,
-                        "reply_count": reply_count,
-                        "quote_count": quote_count,
-                        "view_count": view_count,
-                        "is_reply": is_reply,
-                        "is_retweet": is_retweet,
-                        "is_quote": is_quote,
-                        "url": url,
-                        "query": query,
-                        "actor_id": actor_id # Add actor ID for tracking
-                    })
-                    
-                    items_count += 1
-                    if items_count % 100 == 0:
-                        print(f"[Twitter Apify - {actor_name}] Processed {items_count} items for query '{query}'...")
-                    
-                except Exception as e:
-                    print(f"[Twitter Apify - {actor_name}] Error processing item for query '{query}': {e}")
-                    continue
-            
-            print(f"[Twitter Apify - {actor_name}] Completed query '{query}': Collected {items_count} items")
-            
-        except Exception as e:
-            print(f"[Twitter Apify - {actor_name}] Error running Actor ({actor_id}) for query '{query}': {e}")
-        
-        return query_data, items_count
+    actor_configs = ACTOR_CONFIGS
+    if APIFY_SKIP_REDUNDANT_ACTORS:
+        # Actors that earlier cycles found (almost) only duplicating the others; the first actor always runs
+        skipped = set(redundant_actors())
+        actor_configs = [config for config in ACTOR_CONFIGS if config["id"] not in skipped] or ACTOR_CONFIGS[:1]
+        for config in ACTOR_CONFIGS:
+            if config not in actor_configs:
+                print(f"[Twitter Apify - {config['name']}] Skipped: earlier cycles found its tweets already collected by other actors")
     
-    # Helper function to process all queries for a single actor in parallel
-    def process_actor_queries(actor_config: Dict) -> Tuple[List[Dict], int]:
-        """Process all queries for a single actor in parallel. Returns (all_data_list, total_count)."""
-        actor_id = actor_config["id"]
-        actor_name = actor_config["name"]
-        
-        print(f"\n--- [Twitter Apify - {actor_name}] Starting PARALLEL collection for {len(queries)} queries ---")
-        
-        actor_data = []
-        actor_collected_count = 0
-        
-        # Process all queries in parallel using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
-            # Submit all query tasks in parallel
-            future_to_query = {
-                executor.submit(process_single_query, query, actor_config, since_date, until_date, api_token): query 
-                for query in queries
-            }
-            
-            # Process completed tasks as they finish
-            for future in as_completed(future_to_query):
-                query = future_to_query[future]
-                try:
-                    query_data, items_count = future.result()
-                    actor_data.extend(query_data)
-                    actor_collected_count += items_count
-                    print(f"[Twitter Apify - {actor_name}] Query '{query}' completed: {items_count} items")
-                except Exception as e:
-                    print(f"[Twitter Apify - {actor_name}] Query '{query}' generated an exception: {e}")
+    def make_job(actor_config: Dict, batch: List[str], collected: Dict[str, int] = None) -> ApifyJob:
+        run_input, search_terms = _build_run_input(batch, actor_config, max_items, query_type, language,
+                                                   since_date, until_date)
+        return ApifyJob(
+            actor_id=actor_config["id"],
+            run_input=run_input,
+            label=f"{actor_config['name']}: {', '.join(batch)}",
+            context={"actor_config": actor_config, "attribution": QueryAttribution(batch, search_terms), "items": 0,
+                     "per_query": Counter(collected or {}), "redundant": False}
+        )
 
-        print(f"--- [Twitter Apify - {actor_name}] Finished PARALLEL collection. Collected {actor_collected_count} items. ---")
-        return actor_data, actor_collected_count
+    # Query variations packed into as few runs per actor as its searchTerms limit allows
+    jobs = [make_job(actor_config, batch) for actor_config in actor_configs
+            for batch in batch_queries(queries, actor_config.get("max_search_terms", 1))]
+    orchestrator = get_orchestrator(api_token)
     
-    # Process all actors in parallel, each with their queries running in parallel
     print(f"\n{'='*80}")
-    print(f"[Twitter Apify] Starting FULL PARALLEL collection:")
-    print(f"  - Actors: {len(ACTOR_CONFIGS)}")
+    print(f"[Twitter Apify] Starting collection:")
+    print(f"  - Actors: {len(actor_configs)}")
     print(f"  - Queries per actor: {len(queries)}")
-    print(f"  - Total parallel operations: {len(ACTOR_CONFIGS) * len(queries)}")
+    print(f"  - Actor runs: {len(jobs)} (at most {orchestrator.max_concurrent_runs} at once, {orchestrator.per_actor_concurrency} per actor)")
     print(f"{'='*80}\n")
     
-    with ThreadPoolExecutor(max_workers=len(ACTOR_CONFIGS)) as actor_executor:
-        # Submit all actor tasks in parallel
-        actor_futures = {
-            actor_executor.submit(process_actor_queries, actor_config): actor_config 
-            for actor_config in ACTOR_CONFIGS
-        }
-        
-        # Process completed actors as they finish
-        for actor_future in as_completed(actor_futures):
-            actor_config = actor_futures[actor_future]
-            actor_name = actor_config["name"]
+    # Items arrive as the runs store them, from whichever run has new ones; the first copy of each
+    # tweet is written straight away to this run's shard and actors that only repeat what others found are stopped
+    dedup = StreamingDeduplicator(key='post_id')
+    writer = RawShardWriter(output_file, TWEET_COLUMNS, window_start=since_date, window_end=until_date)
+    cycle_start = time.monotonic()
+
+    def consume(batch_jobs: List[ApifyJob]):
+        nonlocal total_collected_count
+        for job, item in orchestrator.iterate(batch_jobs):
+            if job.cancelled.is_set():
+                continue  # Queued before its actor was stopped
+            actor_name = job.context["actor_config"]["name"]
+            per_query = job.context["per_query"]
             try:
-                actor_data, actor_count = actor_future.result()
-                all_data.extend(actor_data)
-                total_collected_count += actor_count
-                print(f"[Twitter Apify] Actor '{actor_name}' completed: {actor_count} items")
+                tweet = _extract_tweet_data(item, None, job.actor_id)
+                # Multi-term runs don't say which term found a tweet unless the actor labels it
+                matched = job.context["attribution"].attribute(f"{tweet['text']} {tweet['user_name']}",
+                                                               item.get("searchTerm") or item.get("searchQuery"))
+                tweet["query"] = matched[0]
+                tweet["matched_queries"] = "; ".join(matched)
+                job.context["items"] += 1
+                if job.context["items"] % 100 == 0:
+                    print(f"[Twitter Apify - {actor_name}] Processed {job.context['items']} items for run '{job.label}'...")
+                # maxItems is pooled over the batch; each query still gets no more than max_items of it
+                if all(per_query[query] >= max_items for query in matched):
+                    continue
+                for query in matched:
+                    per_query[query] += 1
+                if dedup.add(job.actor_id, tweet, stream=job.label):
+                    writer.write(tweet)
+                    total_collected_count += 1
             except Exception as e:
-                print(f"[Twitter Apify] Actor '{actor_name}' generated an exception: {e}")
+                print(f"[Twitter Apify - {actor_name}] Error processing item for run '{job.label}': {e}")
+                continue
 
-    # Save the collected data
-    if all_data:
-        df = pd.DataFrame(all_data)
-        df.drop_duplicates(subset=['post_id'], keep='first', inplace=True) # Deduplicate based on tweet ID
-        
-        if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-            try:
-                existing_df = pd.read_csv(output_file)
-                df = pd.concat([existing_df, df], ignore_index=True)
-            except pd.errors.EmptyDataError:
-                print(f"Warning: The file '{output_file}' is empty. Creating a new file.")
-        df.to_csv(output_file, index=False)
-        print(f"[Twitter Apify] Collected {total_collected_count} total tweets. Saved to '{output_file}'.")
+            if all(per_query[query] >= max_items for query in job.context["attribution"].queries):
+                job.cancel()  # Every query in the batch has its budget; the rest of the run is surplus
+            elif dedup.redundant(job.actor_id, stream=job.label) and _covered_elsewhere(job, jobs):
+                # Only this run is stopped: its actor's other batches may still find what the rest miss
+                dedup.stop(job.actor_id, stream=job.label)
+                job.context["redundant"] = True
+                print(f"[Twitter Apify - {actor_name}] Stopping run '{job.label}': only "
+                      f"{dedup.recent_new_rate(job.actor_id, job.label):.0%} of its last {dedup.window} tweets were new")
+                job.cancel()
+
+    consume(jobs)
+    # A batched run that reached its pooled maxItems may have been filled by its busiest terms;
+    # the queries it left short of max_items get a run of their own
+    top_ups = []
+    for job in list(jobs):
+        batch = job.context["attribution"].queries
+        if len(batch) < 2 or job.cancelled.is_set() or job.metrics is None or job.metrics.items < job.run_input["maxItems"]:
+            continue
+        per_query = job.context["per_query"]
+        top_ups.extend(make_job(job.context["actor_config"], [query], {query: per_query[query]})
+                       for query in batch if per_query[query] < max_items)
+    if top_ups:
+        print(f"[Twitter Apify] {len(top_ups)} queries got less than {max_items} tweets from a full batched run; "
+              f"running them on their own")
+        jobs.extend(top_ups)
+        consume(top_ups)
+    
+    writer.close()
+    dedup.save_stats({config["id"]: config["name"] for config in ACTOR_CONFIGS})
+    for actor_id, stats in dedup.actors.items():
+        print(f"[Twitter Apify] Actor {actor_id}: {stats.items} tweets, {stats.new} new, "
+              f"{stats.items - stats.new} duplicates{' (stopped early)' if stats.stopped_early else ''}")
+    
+    print(f"\n[Twitter Apify] Actor runs:")
+    for line in run_summary(jobs):
+        print(f"[Twitter Apify]   {line}")
+    cycle = orchestrator.record_cycle("twitter", jobs, time.monotonic() - cycle_start, queries=len(queries))
+    print(f"[Twitter Apify] Cycle: {cycle['runs']} runs for {len(queries)} queries in {cycle['wall_secs']}s, "
+          f"{cycle['compute_units']} CU, ${cycle['usage_usd']} (batching {'on' if cycle['batched'] else 'off'})")
+
+    if total_collected_count:
+        print(f"[Twitter Apify] Collected {total_collected_count} unique tweets. Saved to '{writer.shard_file}'.")
     else:
         print("[Twitter Apify] No tweets collected.")
-        df = pd.DataFrame(columns=["source", "platform", "type", "post_id", "date", "text", "retweets", "likes", 
-                                  "user_location", "country", "comments", "user_display_name", "user_name", 
-                                  "user_avatar", "reply_count", "quote_count", "view_count", "is_reply", 
-                                  "is_retweet", "is_quote", "url", "query", "actor_id"]) # Add actor_id to empty df
-        df.to_csv(output_file, index=False)
-        print(f"[Twitter Apify] Created empty '{output_file}' with headers.")
     
     return total_collected_count  # Return count for tracking
 
@@ -4,10 +4,14 @@ Collects data from YouTube channels for Qatar and Nigeria TV news channels.
 """
 
 import os
+import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional
+from zoneinfo import ZoneInfo
 import pandas as pd
 from dotenv import load_dotenv
 from googleapiclient.discovery import build
@@ -18,6 +22,93 @@ import time
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Daily YouTube Data API quota of the project behind YOUTUBE_API_KEY
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+# Units kept unspent so other users of the key (and retries) still have room before the limit
+YOUTUBE_QUOTA_RESERVE = int(os.getenv("YOUTUBE_QUOTA_RESERVE", "500"))
+# Channels collected at once
+YOUTUBE_MAX_CONCURRENT_CHANNELS = int(os.getenv("YOUTUBE_MAX_CONCURRENT_CHANNELS", "4"))
+# Search results per channel and keyword; every search page of 50 costs 100 units
+YOUTUBE_SEARCH_MAX_RESULTS = int(os.getenv("YOUTUBE_SEARCH_MAX_RESULTS", "50"))
+
+# Quota cost of each API method used here (search is the expensive one)
+QUOTA_COSTS = {'channels': 1, 'playlistItems': 1, 'videos': 1, 'search': 100}
+# Most ids or results one list call accepts/returns
+API_PAGE_SIZE = 50
+
+
+class QuotaBudgetExhausted(Exception):
+    """Raised instead of making a call the remaining daily quota budget can't cover."""
+
+
+class YouTubeQuotaBudget:
+    """
+    Tracks quota units spent today across collector runs (data/youtube_quota.json) and refuses
+    calls that would go past the daily quota minus a reserve. The API's quota day resets at
+    midnight Pacific time, so usage is keyed by that date.
+    """
+
+    def __init__(self, daily_quota: int = YOUTUBE_DAILY_QUOTA, reserve: int = YOUTUBE_QUOTA_RESERVE,
+                 state_file: Path = None):
+        self.limit = max(0, daily_quota - reserve)
+        self.state_file = state_file or Path(__file__).parent.parent.parent / "data" / "youtube_quota.json"
+        self._lock = threading.Lock()
+        self.day = self._quota_day()
+        self.used = self._load()
+        self.spent_this_run = 0
+        self.exhausted = False
+
+    @staticmethod
+    def _quota_day() -> str:
+        return datetime.now(ZoneInfo("America/Los_Angeles")).strftime("%Y-%m-%d")
+
+    def _load(self) -> int:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return int(state.get('used', 0)) if state.get('day') == self.day else 0
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.warning(f"Failed to load YouTube quota state: {e}")
+            return 0
+
+    def save(self):
+        with self._lock:
+            state = {'day': self.day, 'used': self.used, 'limit': self.limit,
+                     'exhausted': self.exhausted, 'updated_at': datetime.now().isoformat()}
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.state_file.with_suffix('.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(temp_file, self.state_file)
+        except Exception as e:
+            logger.warning(f"Failed to save YouTube quota state: {e}")
+
+    def spend(self, method: str):
+        """Reserve the cost of one call, or raise QuotaBudgetExhausted if it doesn't fit."""
+        cost = QUOTA_COSTS[method]
+        with self._lock:
+            day = self._quota_day()
+            if day != self.day:
+                self.day, self.used, self.exhausted = day, 0, False
+            if self.exhausted or self.used + cost > self.limit:
+                self.exhausted = True
+                raise QuotaBudgetExhausted(f"YouTube quota budget reached ({self.used}/{self.limit} units used today)")
+            self.used += cost
+            self.spent_this_run += cost
+
+    def mark_exhausted(self):
+        """The API itself reported the quota used up (e.g. other clients share the key)."""
+        with self._lock:
+            self.exhausted = True
+            self.used = max(self.used, self.limit)
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+
 # Add this after the imports, around line 20
 _configured_instance = None
 
@@ -66,8 +157,10 @@ class YouTubeAPICollector:
                 logger.warning("No YouTube-related environment variables found")
             raise ValueError("YOUTUBE_API_KEY not found in environment variables")
         
-        # Initialize YouTube API client
+        # Initialize YouTube API client (channel workers build their own; the HTTP client isn't thread-safe)
         self.youtube = build('youtube', 'v3', developerKey=self.youtube_api_key)
+        self._local = threading.local()
+        self.quota = YouTubeQuotaBudget()
         
         # Target-specific configuration
         self.target_config = None
@@ -233,161 +326,150 @@ class YouTubeAPICollector:
         
         return has_target_keywords
 
+    def _client(self):
+        """The API client of the calling thread."""
+        if threading.current_thread() is threading.main_thread():
+            return self.youtube
+        if getattr(self._local, 'youtube', None) is None:
+            self._local.youtube = build('youtube', 'v3', developerKey=self.youtube_api_key)
+        return self._local.youtube
+
+    def _execute(self, method: str, **params) -> Dict[str, Any]:
+        """Make one list call, charging its quota cost to the budget first."""
+        self.quota.spend(method)
+        try:
+            return getattr(self._client(), method)().list(**params).execute()
+        except HttpError as e:
+            if e.resp.status == 403 and 'quotaExceeded' in str(e):
+                self.quota.mark_exhausted()
+                raise QuotaBudgetExhausted(f"YouTube API quota exceeded: {e}") from e
+            raise
+
+    def _get_video_details(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Statistics and content details for many videos, up to 50 ids per videos().list call."""
+        details = {}
+        for i in range(0, len(video_ids), API_PAGE_SIZE):
+            batch = video_ids[i:i + API_PAGE_SIZE]
+            try:
+                response = self._execute('videos', part='snippet,statistics,contentDetails',
+                                         id=','.join(batch), maxResults=API_PAGE_SIZE)
+            except QuotaBudgetExhausted as e:
+                logger.warning(f"Skipped details for {len(video_ids) - i} videos: {e}")
+                break
+            except HttpError as e:
+                logger.warning(f"Error getting video details for {len(batch)} videos: {e}")
+                continue
+            for video_info in response.get('items', []):
+                details[video_info['id']] = video_info
+        return details
+
+    def _video_records(self, listed: List[tuple], channel_id: str, query: str = None) -> List[Dict[str, Any]]:
+        """Build video records from (video_id, listing snippet) pairs plus their batched details."""
+        details = self._get_video_details(list(dict.fromkeys(video_id for video_id, _ in listed)))
+        videos = []
+        for video_id, snippet in listed:
+            video_info = details.get(video_id)
+            if not video_info:
+                continue
+            video_data = {
+                'video_id': video_id,
+                'title': snippet.get('title', 'Unknown Title'),
+                'description': snippet.get('description', ''),
+                'channel_title': snippet.get('channelTitle', 'Unknown Channel'),
+                'channel_id': channel_id,
+                'published_at': snippet.get('publishedAt', ''),
+                'view_count': video_info.get('statistics', {}).get('viewCount', 0),
+                'like_count': video_info.get('statistics', {}).get('likeCount', 0),
+                'comment_count': video_info.get('statistics', {}).get('commentCount', 0),
+                'duration': video_info.get('contentDetails', {}).get('duration', ''),
+                'url': f"https://www.youtube.com/watch?v={video_id}",
+                'thumbnail': self._get_thumbnail_url(snippet.get('thumbnails', {}))
+            }
+            if query is not None:
+                video_data['search_query'] = query
+            videos.append(video_data)
+        return videos
+
     def _get_channel_videos(self, channel_id: str, max_results: int = 1000) -> List[Dict[str, Any]]:
         """Get videos from a specific YouTube channel"""
+        listed = []
         try:
             # Get channel's uploads playlist
-            channels_response = self.youtube.channels().list(
-                part='contentDetails',
-                id=channel_id
-            ).execute()
+            channels_response = self._execute('channels', part='contentDetails', id=channel_id)
             
-            if not channels_response['items']:
+            if not channels_response.get('items'):
                 logger.warning(f"No channel found for ID: {channel_id}")
                 return []
             
             uploads_playlist_id = channels_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
             
-            # Get videos from uploads playlist
-            playlist_response = self.youtube.playlistItems().list(
-                part='snippet,contentDetails',
-                playlistId=uploads_playlist_id,
-                maxResults=max_results
-            ).execute()
-            
-            videos = []
-            for item in playlist_response['items']:
-                try:
+            # Page through the uploads playlist (newest first), 50 items per call
+            page_token = None
+            while len(listed) < max_results:
+                params = {'part': 'snippet,contentDetails', 'playlistId': uploads_playlist_id,
+                          'maxResults': min(API_PAGE_SIZE, max_results - len(listed))}
+                if page_token:
+                    params['pageToken'] = page_token
+                playlist_response = self._execute('playlistItems', **params)
+                
+                for item in playlist_response.get('items', []):
                     # Validate that required fields exist
                     if 'contentDetails' not in item or 'videoId' not in item['contentDetails']:
                         logger.warning(f"Missing videoId in playlist item: {item}")
                         continue
-                    
                     if 'snippet' not in item:
                         logger.warning(f"Missing snippet in playlist item: {item}")
                         continue
-                    
-                    video_id = item['contentDetails']['videoId']
-                    snippet = item['snippet']
-                    
-                    # Get additional video details
-                    try:
-                        video_response = self.youtube.videos().list(
-                            part='snippet,statistics,contentDetails',
-                            id=video_id
-                        ).execute()
-                        
-                        if video_response['items']:
-                            video_info = video_response['items'][0]
-                            video_data = {
-                                'video_id': video_id,
-                                'title': snippet.get('title', 'Unknown Title'),
-                                'description': snippet.get('description', ''),
-                                'channel_title': snippet.get('channelTitle', 'Unknown Channel'),
-                                'channel_id': channel_id,
-                                'published_at': snippet.get('publishedAt', ''),
-                                'view_count': video_info['statistics'].get('viewCount', 0),
-                                'like_count': video_info['statistics'].get('likeCount', 0),
-                                'comment_count': video_info['statistics'].get('commentCount', 0),
-                                'duration': video_info['contentDetails'].get('duration', ''),
-                                'url': f"https://www.youtube.com/watch?v={video_id}",
-                                'thumbnail': self._get_thumbnail_url(snippet.get('thumbnails', {}))
-                            }
-                            videos.append(video_data)
-                    
-                    except HttpError as e:
-                        logger.warning(f"Error getting video details for {video_id}: {e}")
-                        continue
-                    
-                except KeyError as e:
-                    logger.warning(f"Missing required field in playlist item: {e}, item: {item}")
-                    continue
-                except Exception as e:
-                    logger.warning(f"Unexpected error processing playlist item: {e}, item: {item}")
-                    continue
+                    listed.append((item['contentDetails']['videoId'], item['snippet']))
                 
-                # Rate limiting
-                time.sleep(0.1)
-            
-            return videos
+                page_token = playlist_response.get('nextPageToken')
+                if not page_token:
+                    break
             
+        except QuotaBudgetExhausted as e:
+            logger.warning(f"Stopped listing channel {channel_id} after {len(listed)} videos: {e}")
         except HttpError as e:
             logger.error(f"Error getting videos from channel {channel_id}: {e}")
-            return []
+            if not listed:
+                return []
+        
+        return self._video_records(listed[:max_results], channel_id)
 
     def _search_channel_videos(self, channel_id: str, query: str, max_results: int = 1000) -> List[Dict[str, Any]]:
         """Search for videos within a specific channel using keywords"""
+        listed = []
         try:
-            # Search for videos in the channel
-            search_response = self.youtube.search().list(
-                part='snippet',
-                channelId=channel_id,
-                q=query,
-                type='video',
-                order='date',
-                maxResults=max_results
-            ).execute()
-            
-            videos = []
-            for item in search_response['items']:
-                try:
+            # Page through the search results, 50 per call (100 quota units each)
+            page_token = None
+            while len(listed) < max_results:
+                params = {'part': 'snippet', 'channelId': channel_id, 'q': query, 'type': 'video',
+                          'order': 'date', 'maxResults': min(API_PAGE_SIZE, max_results - len(listed))}
+                if page_token:
+                    params['pageToken'] = page_token
+                search_response = self._execute('search', **params)
+                
+                for item in search_response.get('items', []):
                     # Validate that required fields exist
                     if 'id' not in item or 'videoId' not in item['id']:
                         logger.warning(f"Missing videoId in search item: {item}")
                         continue
-                    
                     if 'snippet' not in item:
                         logger.warning(f"Missing snippet in search item: {item}")
                         continue
-                    
-                    video_id = item['id']['videoId']
-                    snippet = item['snippet']
-                    
-                    # Get additional video details
-                    try:
-                        video_response = self.youtube.videos().list(
-                            part='snippet,statistics,contentDetails',
-                            id=video_id
-                        ).execute()
-                        
-                        if video_response['items']:
-                            video_info = video_response['items'][0]
-                            video_data = {
-                                'video_id': video_id,
-                                'title': snippet.get('title', 'Unknown Title'),
-                                'description': snippet.get('description', ''),
-                                'channel_title': snippet.get('channelTitle', 'Unknown Channel'),
-                                'channel_id': channel_id,
-                                'published_at': snippet.get('publishedAt', ''),
-                                'view_count': video_info['statistics'].get('viewCount', 0),
-                                'like_count': video_info['statistics'].get('likeCount', 0),
-                                'comment_count': video_info['statistics'].get('commentCount', 0),
-                                'duration': video_info['contentDetails'].get('duration', ''),
-                                'url': f"https://www.youtube.com/watch?v={video_id}",
-                                'thumbnail': self._get_thumbnail_url(snippet.get('thumbnails', {})),
-                                'search_query': query
-                            }
-                            videos.append(video_data)
-                    
-                    except HttpError as e:
-                        logger.warning(f"Error getting video details for {video_id}: {e}")
-                        continue
-                    
-                except KeyError as e:
-                    logger.warning(f"Missing required field in search item: {e}, item: {item}")
-                    continue
-                except Exception as e:
-                    logger.warning(f"Unexpected error processing search item: {e}, item: {item}")
-                    continue
+                    listed.append((item['id']['videoId'], item['snippet']))
                 
-                # Rate limiting
-                time.sleep(0.1)
-            
-            return videos
+                page_token = search_response.get('nextPageToken')
+                if not page_token:
+                    break
             
+        except QuotaBudgetExhausted as e:
+            logger.warning(f"Stopped searching '{query}' in channel {channel_id} after {len(listed)} videos: {e}")
         except HttpError as e:
             logger.error(f"Error searching videos in channel {channel_id}: {e}")
-            return []
+            if not listed:
+                return []
+        
+        return self._video_records(listed[:max_results], channel_id, query)
 
     def _get_thumbnail_url(self, thumbnails: Dict[str, Any]) -> str:
         """Safely get the highest resolution thumbnail URL or a default."""
@@ -415,6 +497,7 @@ class YouTubeAPICollector:
             'total_videos': 0,
             'channels_searched': 0,
             'videos_filtered': 0,
+            'channels_skipped': 0,
             'errors': 0
         }
         
@@ -432,6 +515,9 @@ class YouTubeAPICollector:
         logger.info(f"Searching channels in countries: {countries_to_search}")
         logger.info(f"Using target keywords: {target_keywords}")
         
+        # Each channel id once, even if the config lists it under two names
+        channels = []
+        seen_channel_ids = set()
         for country in countries_to_search:
             if country not in self.tv_channels:
                 logger.warning(f"Country {country} not found in TV channels configuration")
@@ -439,56 +525,42 @@ class YouTubeAPICollector:
             
             country_channels = self.tv_channels[country]
             logger.info(f"Searching {len(country_channels)} channels in {country}")
-            
             for channel_name, channel_id in country_channels.items():
+                if channel_id in seen_channel_ids:
+                    logger.info(f"Skipping {channel_name}: channel {channel_id} is already being collected")
+                    continue
+                seen_channel_ids.add(channel_id)
+                channels.append((country, channel_name, channel_id))
+        
+        logger.info(f"Collecting {len(channels)} channels, {YOUTUBE_MAX_CONCURRENT_CHANNELS} at a time; "
+                    f"quota budget left today: {self.quota.remaining} units")
+        
+        # Channels run concurrently; results are merged in configuration order
+        with ThreadPoolExecutor(max_workers=max(1, YOUTUBE_MAX_CONCURRENT_CHANNELS),
+                                thread_name_prefix="youtube-channel") as pool:
+            futures = [pool.submit(self._collect_channel, country, channel_name, channel_id, target_keywords)
+                       for country, channel_name, channel_id in channels]
+            for (country, channel_name, channel_id), future in zip(channels, futures):
                 try:
-                    logger.info(f"Processing channel: {channel_name} ({channel_id})")
-                    collection_stats['channels_searched'] += 1
-                    
-                    # Method 1: Get recent videos from channel
-                    recent_videos = self._get_channel_videos(channel_id, max_results=1000)
-                    
-                    # Method 2: Search for videos using target keywords
-                    keyword_videos = []
-                    for keyword in target_keywords:
-                        keyword_results = self._search_channel_videos(channel_id, keyword, max_results=1000)
-                        keyword_videos.extend(keyword_results)
-                    
-                    # Combine and deduplicate videos
-                    all_channel_videos = recent_videos + keyword_videos
-                    unique_videos = {}
-                    for video in all_channel_videos:
-                        if video['video_id'] not in unique_videos:
-                            unique_videos[video['video_id']] = video
-                    
-                    # Filter videos based on target configuration
-                    filtered_videos = []
-                    for video in unique_videos.values():
-                        if self._should_include_video(video['title'], video['description']):
-                            # Add metadata
-                            video['country'] = country
-                            video['source_type'] = 'youtube_tv'
-                            video['collected_at'] = datetime.now().isoformat()
-                            video['target_keywords_matched'] = [
-                                kw for kw in target_keywords 
-                                if kw.lower() in f"{video['title']} {video['description']}".lower()
-                            ]
-                            
-                            filtered_videos.append(video)
-                            collection_stats['videos_filtered'] += 1
-                    
-                    all_videos.extend(filtered_videos)
-                    collection_stats['total_videos'] += len(filtered_videos)
-                    
-                    logger.info(f"Found {len(filtered_videos)} relevant videos from {channel_name}")
-                    
+                    filtered_videos = future.result()
                 except Exception as e:
                     logger.error(f"Error processing channel {channel_name}: {e}")
                     collection_stats['errors'] += 1
                     continue
-                
-                # Rate limiting between channels
-                time.sleep(1)
+                if filtered_videos is None:
+                    collection_stats['channels_skipped'] += 1
+                    continue
+                collection_stats['channels_searched'] += 1
+                collection_stats['videos_filtered'] += len(filtered_videos)
+                all_videos.extend(filtered_videos)
+                collection_stats['total_videos'] += len(filtered_videos)
+        
+        self.quota.save()
+        collection_stats['quota_units_used'] = self.quota.spent_this_run
+        collection_stats['quota_exhausted'] = self.quota.exhausted
+        if self.quota.exhausted:
+            logger.warning(f"YouTube quota budget reached: {collection_stats['channels_skipped']} channels skipped, "
+                           f"{self.quota.used} units used today")
         
         # Save collected data
         if all_videos:
@@ -508,6 +580,46 @@ class YouTubeAPICollector:
             'videos': all_videos
         }
 
+    def _collect_channel(self, country: str, channel_name: str, channel_id: str,
+                         target_keywords: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Recent and keyword-matched videos of one channel that pass the target filter; None if skipped for quota."""
+        if self.quota.exhausted:
+            return None
+        logger.info(f"Processing channel: {channel_name} ({channel_id})")
+        
+        # Method 1: Get recent videos from channel
+        recent_videos = self._get_channel_videos(channel_id, max_results=1000)
+        
+        # Method 2: Search for videos using target keywords
+        keyword_videos = []
+        for keyword in target_keywords:
+            if self.quota.exhausted:
+                break
+            keyword_videos.extend(self._search_channel_videos(channel_id, keyword, max_results=YOUTUBE_SEARCH_MAX_RESULTS))
+        
+        # Combine and deduplicate videos
+        unique_videos = {}
+        for video in recent_videos + keyword_videos:
+            if video['video_id'] not in unique_videos:
+                unique_videos[video['video_id']] = video
+        
+        # Filter videos based on target configuration
+        filtered_videos = []
+        for video in unique_videos.values():
+            if self._should_include_video(video['title'], video['description']):
+                # Add metadata
+                video['country'] = country
+                video['source_type'] = 'youtube_tv'
+                video['collected_at'] = datetime.now().isoformat()
+                video['target_keywords_matched'] = [
+                    kw for kw in target_keywords 
+                    if kw.lower() in f"{video['title']} {video['description']}".lower()
+                ]
+                filtered_videos.append(video)
+        
+        logger.info(f"Found {len(filtered_videos)} relevant videos from {channel_name}")
+        return filtered_videos
+
     def _save_data(self, videos: List[Dict[str, Any]]) -> None:
         """Save collected video data to CSV file"""
         try:
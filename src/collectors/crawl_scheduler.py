@@ -0,0 +1,204 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Sources (stations, online sites) crawled at the same time
+CRAWL_MAX_WORKERS = int(os.getenv("CRAWL_MAX_WORKERS", "8"))
+# Follow-up pages (sections, pagination, feeds) fetched at the same time across all sources
+CRAWL_PAGE_WORKERS = int(os.getenv("CRAWL_PAGE_WORKERS", "16"))
+# Requests in flight to one domain
+CRAWL_PER_DOMAIN_CONCURRENCY = int(os.getenv("CRAWL_PER_DOMAIN_CONCURRENCY", "2"))
+# Minimum seconds between request starts to one domain
+CRAWL_DOMAIN_DELAY_SECONDS = float(os.getenv("CRAWL_DOMAIN_DELAY_SECONDS", "2"))
+# Pages visited per source, seeds included
+CRAWL_MAX_PAGES_PER_SOURCE = int(os.getenv("CRAWL_MAX_PAGES_PER_SOURCE", "20"))
+# Link hops followed from a seed page (1 = sections and pagination of the seed only)
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "1"))
+# Whole-crawl deadline; below the configurable collector's 1800s so results are still written
+CRAWL_TIMEOUT_SECONDS = float(os.getenv("CRAWL_TIMEOUT_SECONDS", "1500"))
+
+
+class CrawlCancelled(Exception):
+    """Raised by fetches once the crawl deadline has passed."""
+
+
+class CrawlFrontier:
+    """Pages queued for one source: each URL once, bounded in count and link depth."""
+
+    def __init__(self, max_pages: int = CRAWL_MAX_PAGES_PER_SOURCE, max_depth: int = CRAWL_MAX_DEPTH):
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def add(self, url: str, depth: int) -> bool:
+        """Reserve a page; False when it was already queued or a limit is reached."""
+        with self._lock:
+            if not url or depth > self.max_depth or url in self._seen or len(self._seen) >= self.max_pages:
+                return False
+            self._seen.add(url)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class CrawlScheduler:
+    """
+    Concurrent, politeness-aware crawl scheduler for the radio and online source collectors.
+
+    Sources run concurrently on one pool and their follow-up pages on a second pool (so a source
+    waiting on its pages never starves them of workers). Every request goes through fetch(), which
+    shares one pooled requests.Session and enforces a per-domain delay and concurrency limit, so
+    stations hosted on the same domain are still spaced out. Once the crawl deadline passes,
+    waiting and new fetches raise CrawlCancelled and unfinished sources are reported as failed.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, max_workers: int = CRAWL_MAX_WORKERS,
+                 page_workers: int = CRAWL_PAGE_WORKERS, per_domain_concurrency: int = CRAWL_PER_DOMAIN_CONCURRENCY,
+                 domain_delay: float = CRAWL_DOMAIN_DELAY_SECONDS, timeout: float = CRAWL_TIMEOUT_SECONDS,
+                 request_timeout: float = 15):
+        self.max_workers = max(1, max_workers)
+        self.page_workers = max(1, page_workers)
+        self.per_domain_concurrency = max(1, per_domain_concurrency)
+        self.domain_delay = domain_delay
+        self.timeout = timeout
+        self.request_timeout = request_timeout
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers + self.page_workers,
+                              pool_maxsize=self.per_domain_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._domains: Dict[str, Dict[str, Any]] = {}
+        self._cancelled = threading.Event()
+        self._deadline: Optional[float] = None
+        self._page_pool: Optional[ThreadPoolExecutor] = None
+        self.requests_made = 0
+        self.timed_out = False
+
+    def frontier(self) -> CrawlFrontier:
+        return CrawlFrontier()
+
+    def _remaining(self) -> Optional[float]:
+        return None if self._deadline is None else self._deadline - time.monotonic()
+
+    def _check_cancelled(self):
+        remaining = self._remaining()
+        if self._cancelled.is_set() or (remaining is not None and remaining <= 0):
+            if remaining is not None and remaining <= 0:
+                self.timed_out = True
+            self._cancelled.set()
+            raise CrawlCancelled("Crawl deadline reached")
+
+    def _domain(self, domain: str) -> Dict[str, Any]:
+        with self._lock:
+            if domain not in self._domains:
+                self._domains[domain] = {
+                    'slots': threading.BoundedSemaphore(self.per_domain_concurrency),
+                    'next_start': 0.0
+                }
+            return self._domains[domain]
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """GET a URL once its domain has a free slot and its politeness delay has passed."""
+        self._check_cancelled()
+        domain = self._domain(urlparse(url).netloc.lower())
+
+        # Wait for a domain slot in short steps so cancellation is noticed
+        while not domain['slots'].acquire(timeout=0.5):
+            self._check_cancelled()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, domain['next_start'])
+                domain['next_start'] = start_at + self.domain_delay
+            if start_at > now and self._cancelled.wait(start_at - now):
+                raise CrawlCancelled("Crawl deadline reached")
+            self._check_cancelled()
+
+            remaining = self._remaining()
+            timeout = self.request_timeout if remaining is None else max(1.0, min(self.request_timeout, remaining))
+            with self._lock:
+                self.requests_made += 1
+            return self.session.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+        finally:
+            domain['slots'].release()
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """
+        Apply fn to items on the page pool and return results in item order.
+
+        Failed items, and items still running at the deadline, return their exception.
+        Outside run() the items are processed one after another.
+        """
+        items = list(items)
+        if self._page_pool is None:
+            results = []
+            for item in items:
+                try:
+                    results.append(fn(item))
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        futures = [self._page_pool.submit(fn, item) for item in items]
+        wait(futures, timeout=self._remaining())
+        return [self._outcome(future) for future in futures]
+
+    def _outcome(self, future) -> Any:
+        if not future.done():
+            # Only the deadline leaves futures unfinished; stop the work still running
+            self.timed_out = True
+            self._cancelled.set()
+            future.cancel()
+            return CrawlCancelled("Crawl deadline reached")
+        try:
+            return future.result()
+        except Exception as e:
+            return e
+
+    def run(self, jobs: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """
+        Run one job per source concurrently under the crawl deadline.
+
+        Returns:
+            Job name -> job result, or the exception for jobs that failed or did not finish in time
+        """
+        self._cancelled.clear()
+        self._deadline = time.monotonic() + self.timeout if self.timeout else None
+        self.requests_made = 0
+        self.timed_out = False
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.page_workers, thread_name_prefix="crawl-page") as page_pool, \
+                ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crawl-source") as source_pool:
+            self._page_pool = page_pool
+            try:
+                futures = {name: source_pool.submit(job) for name, job in jobs.items()}
+                done, not_done = wait(futures.values(), timeout=self._remaining())
+                if not_done:
+                    logger.warning(f"Crawl timeout ({self.timeout}s) reached with {len(not_done)}/{len(futures)} sources unfinished")
+                    self.timed_out = True
+                    self._cancelled.set()
+                results = {name: self._outcome(future) for name, future in futures.items()}
+            finally:
+                # Let running fetches bail out before the pools join their threads
+                self._cancelled.set()
+                self._page_pool = None
+
+        self._deadline = None
+        self._cancelled.clear()
+        logger.info(f"Crawled {len(jobs)} sources with {self.requests_made} requests in {time.monotonic() - start:.1f}s")
+        return results
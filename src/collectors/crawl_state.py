@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urldefrag
+
+logger = logging.getLogger(__name__)
+
+# Skip items earlier cycles already collected; "false" re-scrapes everything every cycle
+CRAWL_INCREMENTAL = os.getenv("CRAWL_INCREMENTAL", "true").lower() == "true"
+# Item hashes remembered per source (most recently seen kept)
+CRAWL_SEEN_MAX_PER_SOURCE = int(os.getenv("CRAWL_SEEN_MAX_PER_SOURCE", "5000"))
+
+
+def item_key(url: str = '', title: str = '') -> str:
+    """Compact 64-bit hash identifying an item by URL (fragment dropped), or by title without one."""
+    key = urldefrag(url.strip())[0].rstrip('/') if url and url.strip() else title.strip().lower()
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest() if key else ''
+
+
+class PageVisit:
+    """Counts new and already-seen items on one listing page or feed during a crawl."""
+
+    def __init__(self, state: 'SourceCrawlState', url: str):
+        self.state = state
+        self.url = url
+        self.new = 0
+        self.seen = 0
+        self.fresh = 0
+
+    def skip(self, url: str) -> bool:
+        """True when an item link was collected in an earlier cycle (its extraction can be skipped)."""
+        if self.state.seen_before(item_key(url)):
+            self.seen += 1
+            return True
+        return False
+
+    def record(self, article: Dict[str, Any]) -> bool:
+        """Remember an extracted item; False when an earlier cycle already collected it."""
+        key = item_key(article.get('url', ''), article.get('title', ''))
+        if self.state.seen_before(key):
+            self.seen += 1
+            return False
+        self.new += 1
+        if self.state.is_fresh(article.get('published_date')):
+            self.fresh += 1
+        self.state.add(key, article.get('published_date'))
+        return True
+
+    @property
+    def exhausted(self) -> bool:
+        """Every item on the page was seen before or predates the source's last publish date."""
+        return self.seen + self.new > 0 and self.fresh == 0
+
+
+class SourceCrawlState:
+    """Seen-item hashes and last publish date for one source, shared by its concurrent page fetches."""
+
+    def __init__(self, seen: Iterable[str] = (), last_published: Optional[str] = None):
+        self._previous = frozenset(seen)
+        self._seen = dict.fromkeys(seen)  # insertion order: least recently seen first
+        self._previous_last_published = last_published
+        self.last_published = last_published
+        self._lock = threading.Lock()
+
+    def visit(self, url: str) -> PageVisit:
+        return PageVisit(self, url)
+
+    def seen_before(self, key: str) -> bool:
+        """True when an earlier cycle saw the item; refreshes it so it stays in the bounded set."""
+        if not key or key not in self._previous:
+            return False
+        with self._lock:
+            self._seen.pop(key, None)
+            self._seen[key] = None
+        return True
+
+    def is_fresh(self, published_date: Optional[str]) -> bool:
+        """Items without a date, or dated on/after the last publish date seen before this cycle, are fresh."""
+        return not (published_date and self._previous_last_published
+                    and published_date < self._previous_last_published)
+
+    def add(self, key: str, published_date: Optional[str] = None):
+        with self._lock:
+            if key:
+                self._seen.pop(key, None)
+                self._seen[key] = None
+            if published_date and (not self.last_published or published_date > self.last_published):
+                self.last_published = published_date
+
+    def to_dict(self, max_seen: int) -> Dict[str, Any]:
+        with self._lock:
+            seen = list(self._seen)[-max_seen:] if max_seen > 0 else []
+        return {'seen': seen, 'last_published': self.last_published, 'last_crawled': datetime.now().isoformat()}
+
+
+class CrawlStateStore:
+    """
+    Persisted incremental crawl state for the radio and online source collectors.
+
+    Each source keeps the hashes of items collected in earlier cycles and its latest publish date,
+    so listing pages only yield new items and pagination stops at the first page with nothing new.
+    State is kept per scope (the target a collector filters for), like the RSS fetch validators:
+    items another target already collected are still new for this one.
+    """
+
+    def __init__(self, state_file: Path = None, max_seen_per_source: int = CRAWL_SEEN_MAX_PER_SOURCE):
+        self.state_file = state_file or Path(__file__).parent.parent.parent / "data" / "crawl_state.json"
+        self.max_seen_per_source = max_seen_per_source
+        self.state = self._load_state()
+        self._sources: Dict[str, SourceCrawlState] = {}
+        self._lock = threading.Lock()
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('sources', {})
+        except Exception as e:
+            logger.warning(f"Failed to load crawl state: {e}")
+        return {}
+
+    def source(self, scope: str, name: str) -> SourceCrawlState:
+        """State for one source in this cycle (loaded from disk on first use)."""
+        key = f"{scope}:{name}"
+        with self._lock:
+            if key not in self._sources:
+                saved = self.state.get(key, {})
+                self._sources[key] = SourceCrawlState(saved.get('seen', []), saved.get('last_published'))
+            return self._sources[key]
+
+    def save(self):
+        """Write this cycle's state atomically so a crash never leaves a truncated file."""
+        with self._lock:
+            for key, source_state in self._sources.items():
+                self.state[key] = source_state.to_dict(self.max_seen_per_source)
+            self._sources = {}
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.state_file.with_suffix('.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'sources': self.state, 'updated_at': datetime.now().isoformat()}, f)
+            os.replace(temp_file, self.state_file)
+        except Exception as e:
+            logger.warning(f"Failed to save crawl state: {e}")
+
+    def discard(self):
+        """Drop this cycle's changes (e.g. after a timed-out crawl whose results were partly lost)."""
+        with self._lock:
+            self._sources = {}
@@ -0,0 +1,299 @@
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import UnicodeDammit
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# Article containers the web scrapers look for, in priority order
+ARTICLE_SELECTORS = [
+    'article', '.article', '.news-item', '.post', '.story',
+    '.content', '.news-content', '.blog-post', '.entry',
+    '.news', '.headline', '.title', 'h1', 'h2', 'h3',
+    '.item', '.card', '.tile', '.block', '.section'
+]
+
+PAGINATION_SELECTORS = [
+    'a[href*="page="]',  # ?page=2, ?page=3
+    'a[href*="/page/"]',  # /page/2/, /page/3/
+    'a[href*="p="]',  # ?p=2, ?p=3
+    '.pagination a',  # .pagination class
+    '.pager a',  # .pager class
+    '.page-numbers a',  # WordPress pagination
+    '.pagination-links a',  # Custom pagination
+    'a[rel="next"]',  # Next page link
+    'a[title*="Next"]',  # Next page by title
+    'a[title*="next"]',  # Next page by title (lowercase)
+    'a:contains("Next")',  # Next page by text
+    'a:contains("2")',  # Page 2
+    'a:contains("3")',  # Page 3
+    'a:contains("4")',  # Page 4
+    'a:contains("5")',  # Page 5
+]
+
+# Site-specific layouts, keyed by a domain fragment of the page URL
+SITE_SELECTORS = {
+    'wazobiafm.com': {
+        'featured_links': 'a.gm-sec-title',
+        'featured_container': 'li',
+        'featured_description': 'p.gm-sec-description',
+    },
+}
+
+HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+# Elements whose text BeautifulSoup's get_text() leaves out
+NON_TEXT_TAGS = frozenset(['script', 'style', 'template'])
+
+_SIMPLE_SELECTOR = re.compile(
+    r'(?P<tag>[a-zA-Z][\w-]*)'
+    r'|\.(?P<cls>[\w-]+)'
+    r'|\[(?P<attr>[\w-]+)(?:(?P<op>\*?=)"(?P<value>[^"]*)")?\]'
+    r'|:contains\("(?P<text>[^"]*)"\)'
+)
+_XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+def css_to_xpath(selector: str, relative: bool = False) -> str:
+    """
+    Translate the simple CSS selectors the scrapers use to XPath.
+
+    Supports tag, .class, [attr], [attr="v"], [attr*="v"] and :contains("text") compounds joined by
+    descendant combinators; anything else raises ValueError.
+    """
+    steps = []
+    for compound in selector.split():
+        tag, conditions, pos = '*', [], 0
+        while pos < len(compound):
+            match = _SIMPLE_SELECTOR.match(compound, pos)
+            if not match:
+                raise ValueError(f"Unsupported selector: {selector}")
+            if match.group('tag'):
+                tag = match.group('tag').lower()
+            elif match.group('cls'):
+                conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {match.group('cls')} ')")
+            elif match.group('attr'):
+                attr, op, value = match.group('attr'), match.group('op'), match.group('value')
+                if op is None:
+                    conditions.append(f"@{attr}")
+                elif op == '=':
+                    conditions.append(f'@{attr}="{value}"')
+                else:
+                    conditions.append(f'contains(@{attr}, "{value}")')
+            else:
+                conditions.append(f'contains(string(.), "{match.group("text")}")')
+            pos = match.end()
+        steps.append(tag + ''.join(f'[{condition}]' for condition in conditions))
+    return ('.//' if relative else '//') + '//'.join(steps)
+
+
+def compile_selector(selector: str, relative: bool = False) -> etree.XPath:
+    return etree.XPath(css_to_xpath(selector, relative))
+
+
+class SiteSelectors:
+    """Selectors for one site, compiled to XPath once and reused for every page of that site."""
+
+    def __init__(self, featured_links: str = None, featured_container: str = None,
+                 featured_description: str = None, article_selectors: List[str] = None):
+        self.articles = [compile_selector(selector) for selector in (article_selectors or ARTICLE_SELECTORS)]
+        self.pagination = [compile_selector(selector) for selector in PAGINATION_SELECTORS]
+        self.links = etree.XPath('//a[@href]')
+        self.headings = etree.XPath('//h1|//h2|//h3|//h4|//h5|//h6')
+        self.featured_links = compile_selector(featured_links) if featured_links else None
+        self.featured_container = featured_container
+        self.featured_description = compile_selector(featured_description, relative=True) if featured_description else None
+
+
+@lru_cache(maxsize=None)
+def _compiled_site_selectors(site: str) -> SiteSelectors:
+    return SiteSelectors(**SITE_SELECTORS.get(site, {}))
+
+
+def site_selectors(url: str) -> SiteSelectors:
+    """Precompiled selectors for the site a page URL belongs to (generic ones for unknown sites)."""
+    for site in SITE_SELECTORS:
+        if site in url:
+            return _compiled_site_selectors(site)
+    return _compiled_site_selectors('')
+
+
+def parse_html(content: bytes) -> Optional[etree._Element]:
+    """
+    Parse a page with lxml, or return None when lxml can't handle it (callers then fall back to BeautifulSoup).
+    Bytes are decoded as UTF-8 when valid, otherwise with BeautifulSoup's encoding detection.
+    """
+    try:
+        try:
+            markup = content.decode('utf-8')
+        except UnicodeDecodeError:
+            markup = UnicodeDammit(content, is_html=True).unicode_markup
+        if not markup or not markup.strip():
+            return None
+        # lxml refuses str input that carries an XML encoding declaration
+        return etree.fromstring(_XML_DECLARATION.sub('', markup, count=1), etree.HTMLParser())
+    except Exception as e:
+        logger.debug(f"lxml could not parse page: {e}")
+        return None
+
+
+def _collect_strings(node, strings: List[str]):
+    """Text strings under node in document order, skipping comments and script/style/template content."""
+    if not isinstance(node.tag, str) or node.tag in NON_TEXT_TAGS:
+        return
+    if node.text:
+        strings.append(node.text)
+    for child in node:
+        _collect_strings(child, strings)
+        if child.tail:
+            strings.append(child.tail)
+
+
+def element_text(node, separator: str = '') -> str:
+    """Equivalent of BeautifulSoup's get_text(separator, strip=True)."""
+    strings = []
+    _collect_strings(node, strings)
+    return separator.join(stripped for stripped in (string.strip() for string in strings) if stripped)
+
+
+def element_string(node) -> Optional[str]:
+    """Equivalent of BeautifulSoup's .string: the only string inside node, else None."""
+    children = list(node)
+    if not children:
+        return node.text
+    if len(children) == 1 and not node.text and not children[0].tail:
+        child = children[0]
+        return child.text if not isinstance(child.tag, str) else element_string(child)
+    return None
+
+
+@dataclass
+class ItemFields:
+    """What the scrapers read from an article element."""
+    tag: str
+    title: str  # text of the first heading inside the element, or the link text for <a> elements
+    text: str  # body text for article/div/section, link text for <a>, empty otherwise
+    link: str  # absolute URL of the element's own href, or of the first link inside it
+    raw_text: str  # unstripped text, searched for publish dates
+
+
+def _walk_item(node, strings: List[str], found: dict):
+    """One pass over an element: gathers its strings plus the first heading span and first link."""
+    if not isinstance(node.tag, str) or node.tag in NON_TEXT_TAGS:
+        return
+    heading_start = None
+    if found['heading'] is None and node.tag in HEADING_TAGS:
+        heading_start = len(strings)
+    if found['link'] is None and node.tag == 'a' and node.get('href') is not None:
+        found['link'] = node.get('href')
+    if node.text:
+        strings.append(node.text)
+    for child in node:
+        _walk_item(child, strings, found)
+        if child.tail:
+            strings.append(child.tail)
+    if heading_start is not None and found['heading'] is None:
+        found['heading'] = (heading_start, len(strings))
+
+
+def extract_fields(element, base_url: str) -> ItemFields:
+    """Title, text, link and date text of an article element in a single traversal."""
+    tag = element.tag if isinstance(element.tag, str) else ''
+    strings = []
+    found = {'heading': None, 'link': None}
+    # Root text first; descendants are walked so the element itself never counts as its own heading/link
+    if tag not in NON_TEXT_TAGS and element.text:
+        strings.append(element.text)
+    if tag not in NON_TEXT_TAGS:
+        for child in element:
+            _walk_item(child, strings, found)
+            if child.tail:
+                strings.append(child.tail)
+
+    stripped = [string.strip() for string in strings]
+    if found['heading'] is not None:
+        start, end = found['heading']
+        title = ''.join(stripped[start:end])
+    elif tag == 'a':
+        title = ''.join(stripped)
+    else:
+        title = ''
+
+    if tag in ('article', 'div', 'section'):
+        text = ' '.join(string for string in stripped if string)
+    elif tag == 'a':
+        text = ''.join(stripped)
+    else:
+        text = ''
+
+    if tag == 'a' and element.get('href'):
+        link = urljoin(base_url, element.get('href'))
+    elif found['link'] is not None:
+        link = urljoin(base_url, found['link'])
+    else:
+        link = ''
+
+    return ItemFields(tag=tag, title=title, text=text, link=link, raw_text=''.join(strings))
+
+
+class ParsedPage:
+    """A page parsed once with lxml and queried with its site's precompiled selectors."""
+
+    def __init__(self, root: etree._Element, selectors: SiteSelectors):
+        self.root = root
+        self.selectors = selectors
+
+    @classmethod
+    def parse(cls, content: bytes, url: str) -> Optional['ParsedPage']:
+        root = parse_html(content)
+        return cls(root, site_selectors(url)) if root is not None else None
+
+    def article_elements(self) -> List[etree._Element]:
+        """Matches of every article selector, concatenated in selector order (like repeated soup.select)."""
+        elements = []
+        for xpath in self.selectors.articles:
+            elements.extend(xpath(self.root))
+        return elements
+
+    def featured_items(self) -> List[Tuple[str, str, str]]:
+        """(title, href, description) for the site's featured article links, if it has a known layout."""
+        if self.selectors.featured_links is None:
+            return []
+        items = []
+        for link in self.selectors.featured_links(self.root):
+            description = ''
+            container = next(link.iterancestors(self.selectors.featured_container), None) \
+                if self.selectors.featured_container else None
+            if container is not None and self.selectors.featured_description is not None:
+                matches = self.selectors.featured_description(container)
+                if matches:
+                    description = element_text(matches[0])
+            items.append((element_text(link), link.get('href', ''), description))
+        return items
+
+    def links(self) -> List[Tuple[str, str]]:
+        """(href, text) of every link with an href, in document order."""
+        return [(link.get('href', ''), element_text(link)) for link in self.selectors.links(self.root)]
+
+    def heading_texts(self) -> List[Tuple[etree._Element, str]]:
+        return [(heading, element_text(heading)) for heading in self.selectors.headings(self.root)]
+
+    def pagination_hrefs(self) -> List[str]:
+        """Hrefs matched by the pagination selectors, in selector order."""
+        hrefs = []
+        for xpath in self.selectors.pagination:
+            hrefs.extend(link.get('href', '') for link in xpath(self.root))
+        return hrefs
+
+    def more_from_links(self) -> List[Tuple[str, str]]:
+        """(href, text) of links whose only string mentions 'More from' (section index links)."""
+        links = []
+        for link in self.selectors.links(self.root):
+            string = element_string(link)
+            if string and 'More from' in string:
+                links.append((link.get('href', ''), element_text(link)))
+        return links
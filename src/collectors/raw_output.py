@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Records buffered before they are appended to the output file
+RAW_OUTPUT_FLUSH_ROWS = int(os.getenv("RAW_OUTPUT_FLUSH_ROWS", "200"))
+# Days a consumed shard's manifest entry is kept before it is pruned
+RAW_MANIFEST_RETENTION_DAYS = int(os.getenv("RAW_MANIFEST_RETENTION_DAYS", "7"))
+
+RAW_DIR = Path(__file__).parent.parent.parent / "data" / "raw"
+
+
+class IncrementalCsvWriter:
+    """
+    Appends collector records to a raw CSV in small chunks as they arrive, so a collection never
+    holds its whole result set in memory. Records from earlier cycles in the same file are kept;
+    if that file has different columns it is rewritten once with the union of both.
+    """
+
+    def __init__(self, output_file: str, columns: List[str], flush_rows: int = RAW_OUTPUT_FLUSH_ROWS):
+        self.output_file = output_file
+        self.columns = list(columns)
+        self.flush_rows = max(1, flush_rows)
+        self.rows_written = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._header_written = False
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        self._align_existing_file()
+
+    def _align_existing_file(self):
+        if not os.path.exists(self.output_file) or os.path.getsize(self.output_file) == 0:
+            return
+        try:
+            existing_columns = list(pd.read_csv(self.output_file, nrows=0).columns)
+        except pd.errors.EmptyDataError:
+            return
+        if existing_columns != self.columns:
+            existing_df = pd.read_csv(self.output_file)
+            self.columns = existing_columns + [column for column in self.columns if column not in existing_columns]
+            existing_df.reindex(columns=self.columns).to_csv(self.output_file, index=False)
+        self._header_written = True
+
+    def write(self, record: Dict[str, Any]):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.flush_rows:
+            self.flush()
+
+    def write_frame(self, df: pd.DataFrame):
+        """Append a whole frame of records at once."""
+        self.flush()
+        self._append(df.reindex(columns=self.columns))
+
+    def flush(self):
+        if not self._buffer and self._header_written:
+            return
+        self._append(pd.DataFrame(self._buffer, columns=self.columns))
+        self._buffer = []
+
+    def _append(self, df: pd.DataFrame):
+        df.to_csv(self.output_file, mode='a' if self._header_written else 'w', header=not self._header_written, index=False)
+        self._header_written = True
+        self.rows_written += len(df)
+
+    def close(self) -> int:
+        """Write the remaining records (or just the header for an empty new file); returns records written."""
+        self.flush()
+        return self.rows_written
+
+
+class RawShardManifest:
+    """
+    Index of the raw shards under data/raw: one small JSON entry per shard in data/raw/manifest,
+    holding its source, run id, row count, byte size and time window.
+
+    Collectors register a shard only after it is complete, so a reader never sees a half-written
+    file. The agent consumes pending shards and marks them done; every entry change is a
+    temp-file write plus os.replace, so concurrent collectors and the agent never see a partial entry.
+    """
+
+    def __init__(self, raw_dir: Path = RAW_DIR):
+        self.raw_dir = Path(raw_dir)
+        self.entries_dir = self.raw_dir / "manifest"
+
+    def _write(self, entry: Dict[str, Any]):
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        entry_file = self.entries_dir / f"{entry['shard_id']}.json"
+        temp_file = entry_file.with_suffix('.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, indent=2)
+        os.replace(temp_file, entry_file)
+
+    def register(self, entry: Dict[str, Any]):
+        self._write({**entry, 'status': 'pending'})
+
+    def entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        if not self.entries_dir.exists():
+            return entries
+        for entry_file in self.entries_dir.glob('*.json'):
+            try:
+                with open(entry_file, 'r', encoding='utf-8') as f:
+                    entries.append(json.load(f))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable manifest entry {entry_file.name}: {e}")
+        return sorted(entries, key=lambda entry: entry.get('created_at', ''))
+
+    def shard_path(self, entry: Dict[str, Any]) -> Path:
+        return self.raw_dir / entry['path']
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Registered shards not consumed yet, oldest first."""
+        pending = []
+        for entry in self.entries():
+            if entry.get('status') != 'pending':
+                continue
+            if not self.shard_path(entry).exists():
+                logger.warning(f"Raw shard {entry['path']} is in the manifest but missing on disk")
+                continue
+            pending.append(entry)
+        return pending
+
+    def mark_done(self, entries: List[Dict[str, Any]]):
+        """Record shards as consumed, then remove their files; old done entries are pruned."""
+        consumed_at = datetime.now().isoformat()
+        for entry in entries:
+            try:
+                self._write({**entry, 'status': 'done', 'consumed_at': consumed_at})
+            except Exception as e:
+                logger.warning(f"Failed to mark raw shard {entry['path']} done: {e}")
+                continue
+            try:
+                self.shard_path(entry).unlink(missing_ok=True)
+            except Exception as e:
+                logger.warning(f"Could not remove consumed raw shard {entry['path']}: {e}")
+        self.prune()
+
+    def prune(self, retention_days: int = RAW_MANIFEST_RETENTION_DAYS):
+        cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+        for entry in self.entries():
+            if entry.get('status') == 'done' and entry.get('consumed_at', '') < cutoff:
+                (self.entries_dir / f"{entry['shard_id']}.json").unlink(missing_ok=True)
+
+
+class RawShardWriter(IncrementalCsvWriter):
+    """
+    Writes one collector run as an immutable shard next to output_file (data/raw/shards/<stem>_<run id>.csv)
+    instead of rewriting the daily file. The shard is written under a .part name and registered in the
+    manifest once closed; a run that collected nothing leaves no shard.
+    """
+
+    def __init__(self, output_file: str, columns: List[str], window_start: Optional[str] = None,
+                 window_end: Optional[str] = None, flush_rows: int = RAW_OUTPUT_FLUSH_ROWS):
+        output_path = Path(output_file)
+        self.source = output_path.stem
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.manifest = RawShardManifest(output_path.parent)
+        self.shard_file = output_path.parent / "shards" / f"{self.source}_{self.run_id}.csv"
+        self.window_start = window_start
+        self.window_end = window_end
+        self.created_at = datetime.now().isoformat()
+        super().__init__(str(self.shard_file) + '.part', columns, flush_rows)
+
+    def close(self) -> int:
+        rows = super().close()
+        if not rows:
+            Path(self.output_file).unlink(missing_ok=True)
+            return 0
+        os.replace(self.output_file, self.shard_file)
+        self.manifest.register({
+            'shard_id': f"{self.source}_{self.run_id}",
+            'source': self.source,
+            'run_id': self.run_id,
+            'path': self.shard_file.relative_to(self.manifest.raw_dir).as_posix(),
+            'rows': rows,
+            'bytes': self.shard_file.stat().st_size,
+            'window_start': self.window_start,
+            'window_end': self.window_end,
+            'created_at': self.created_at,
+            'closed_at': datetime.now().isoformat(),
+        })
+        return rows
+
+
+def write_raw_shard(output_file: str, df: pd.DataFrame, window_start: Optional[str] = None,
+                    window_end: Optional[str] = None) -> Optional[Path]:
+    """Write a run's collected frame as one shard and register it; returns the shard path (None if empty)."""
+    writer = RawShardWriter(output_file, list(df.columns), window_start, window_end)
+    writer.write_frame(df)
+    return writer.shard_file if writer.close() else None
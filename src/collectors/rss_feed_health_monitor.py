@@ -138,7 +138,6 @@ class RSSFeedHealthMonitor:
             Tuple of (is_valid, error_message, response_time)
         """
         start_time = time.time()
-        health = self._get_feed_health(feed_url)
         
         try:
             # Try multiple approaches for better reliability
@@ -207,6 +206,19 @@ class RSSFeedHealthMonitor:
             if not feed.get('entries', []):
                 raise ValueError("No entries found in feed")
             
+            self.record_result(feed_url, response_time)
+            return True, "Feed is valid", response_time
+            
+        except Exception as e:
+            response_time = time.time() - start_time
+            self.record_result(feed_url, response_time, e)
+            return False, f"{type(e).__name__}: {str(e)}", response_time
+    
+    def record_result(self, feed_url: str, response_time: float, error: Optional[Exception] = None):
+        """Record the outcome of a fetch made elsewhere (e.g. by a collector) without fetching again."""
+        health = self._get_feed_health(feed_url)
+        
+        if error is None:
             # Record success
             health['success_count'] += 1
             health['last_success'] = datetime.now().isoformat()
@@ -216,30 +228,25 @@ class RSSFeedHealthMonitor:
             # Keep only last 10 response times
             if len(health['response_times']) > 10:
                 health['response_times'] = health['response_times'][-10:]
-            
-            return True, "Feed is valid", response_time
-            
-        except Exception as e:
-            response_time = time.time() - start_time
-            error_msg = str(e)
-            error_type = type(e).__name__
-            
-            # Record failure
-            health['failure_count'] += 1
-            health['last_failure'] = datetime.now().isoformat()
-            health['last_error'] = f"{error_type}: {error_msg}"
-            
-            # Categorize error types
-            if 'SSL' in error_type or 'certificate' in error_msg.lower():
-                health['ssl_issues'] += 1
-            elif 'timeout' in error_msg.lower():
-                health['timeout_issues'] += 1
-            elif 'xml' in error_msg.lower() or 'parse' in error_msg.lower():
-                health['xml_issues'] += 1
-            elif 'network' in error_msg.lower() or 'connection' in error_msg.lower():
-                health['network_issues'] += 1
-            
-            return False, f"{error_type}: {error_msg}", response_time
+            return
+        
+        error_msg = str(error)
+        error_type = type(error).__name__
+        
+        # Record failure
+        health['failure_count'] += 1
+        health['last_failure'] = datetime.now().isoformat()
+        health['last_error'] = f"{error_type}: {error_msg}"
+        
+        # Categorize error types
+        if 'SSL' in error_type or 'certificate' in error_msg.lower():
+            health['ssl_issues'] += 1
+        elif 'timeout' in error_msg.lower() or 'Timeout' in error_type:
+            health['timeout_issues'] += 1
+        elif 'xml' in error_msg.lower() or 'parse' in error_msg.lower():
+            health['xml_issues'] += 1
+        elif 'network' in error_msg.lower() or 'connection' in error_msg.lower():
+            health['network_issues'] += 1
     
     def validate_feeds(self, feed_urls: List[str], max_workers: int = 5) -> Dict[str, Dict]:
         """
@@ -0,0 +1,339 @@
+import asyncio
+import hashlib
+import html
+import json
+import logging
+import os
+import pickle
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+import chardet
+import feedparser
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Feeds fetched at the same time across all hosts
+RSS_MAX_CONCURRENCY = int(os.getenv("RSS_MAX_CONCURRENCY", "20"))
+# Requests in flight to one host (politeness towards sites with several feeds)
+RSS_PER_HOST_CONCURRENCY = int(os.getenv("RSS_PER_HOST_CONCURRENCY", "2"))
+# Processes parsing feed bodies; 0 parses on a single background thread instead
+RSS_PARSE_WORKERS = int(os.getenv("RSS_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/rss+xml, application/xml, application/atom+xml, text/xml, */*',
+    'Accept-Language': 'en-US,en;q=0.9'
+}
+
+
+class FeedParseError(ValueError):
+    """Stands in for a feedparser bozo exception that cannot cross a process boundary."""
+
+
+@dataclass
+class FeedFetchResult:
+    """Outcome of fetching one feed."""
+    feed_url: str
+    feed: Any = None
+    error: Optional[Exception] = None
+    not_modified: bool = False
+    url: Optional[str] = None  # URL variant that answered
+    response_time: float = 0.0
+
+
+def url_variants(feed_url: str) -> List[str]:
+    """The feed URL followed by the alternative endpoints tried when it does not work."""
+    return list(dict.fromkeys([
+        feed_url,
+        feed_url.rstrip('/') + '/feed',
+        feed_url.rstrip('/') + '/rss',
+        feed_url.replace('feed', 'rss')
+    ]))
+
+
+def clean_xml(xml_content: str) -> Optional[str]:
+    """Clean problematic XML content"""
+    if not xml_content:
+        return None
+
+    try:
+        # Detect encoding if not UTF-8
+        detected = chardet.detect(xml_content.encode())
+        if detected['encoding'] and detected['encoding'].lower() != 'utf-8':
+            xml_content = xml_content.encode(detected['encoding']).decode('utf-8', errors='ignore')
+
+        # Remove invalid XML characters
+        xml_content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', xml_content)
+
+        # Fix common HTML entities
+        xml_content = html.unescape(xml_content)
+
+        # Fix unclosed CDATA sections
+        xml_content = re.sub(r'<!\[CDATA\[([^\]]*)(?!\]\])>', r'<![CDATA[\1]]>', xml_content)
+
+        # Fix malformed tags
+        soup = BeautifulSoup(xml_content, 'xml')
+        return str(soup)
+    except Exception as e:
+        logger.warning(f"Error cleaning XML: {str(e)}")
+        return None
+
+
+def is_usable_feed(feed: Any) -> bool:
+    """A parsed feed with entries and no parse error beyond an encoding override."""
+    if not feed or not feed.get('entries'):
+        return False
+    return feed.get('bozo', 0) != 1 or isinstance(feed.get('bozo_exception'), feedparser.CharacterEncodingOverride)
+
+
+def parse_feed_content(content: bytes, content_type: str) -> Dict[str, Any]:
+    """
+    Parse a feed body (runs in the parse worker pool).
+
+    HTML pages are searched for an advertised RSS link first. Bodies that do not parse
+    cleanly are run through clean_xml and parsed again.
+
+    Returns:
+        {'feed': parsed feed or None, 'alternate': RSS link found in an HTML page or None}
+    """
+    if 'html' in content_type:
+        rss_link = BeautifulSoup(content, 'html.parser').find('link', type='application/rss+xml')
+        if rss_link and rss_link.get('href'):
+            return {'feed': None, 'alternate': rss_link['href']}
+
+    feed = feedparser.parse(content)
+    if feed.get('bozo', 0) == 1 or not feed.get('entries', []):
+        text = content.decode(feed.get('encoding') or 'utf-8', errors='replace')
+        cleaned_content = clean_xml(text)
+        if cleaned_content:
+            feed = feedparser.parse(cleaned_content)
+
+    # Parser exceptions (e.g. SAXParseException) do not pickle
+    exception = feed.get('bozo_exception')
+    if exception is not None:
+        try:
+            pickle.dumps(exception)
+        except Exception:
+            feed['bozo_exception'] = FeedParseError(f"{type(exception).__name__}: {exception}")
+    return {'feed': feed, 'alternate': None}
+
+
+class RSSFetchEngine:
+    """
+    Concurrent RSS fetcher shared by the RSS collectors.
+
+    Feeds are downloaded with aiohttp under a global and a per-host concurrency limit, each request
+    with its own timeout. Per feed it persists the URL variant that worked, whether TLS verification
+    had to be disabled, and the ETag/Last-Modified validators, so the next run asks with
+    If-None-Match/If-Modified-Since and a 304 costs no download or parse. Feed bodies are parsed
+    in a worker pool so the event loop keeps fetching.
+
+    Validators are kept per scope (the query set a collector filters with): a 304 means
+    "nothing new for this scope", so a run for a different target still gets the full feed.
+    State is only written by commit_state(), which collectors call after saving their output.
+    """
+
+    def __init__(self, timeout: float = 15, headers: Dict[str, str] = None,
+                 max_concurrency: int = RSS_MAX_CONCURRENCY, per_host_concurrency: int = RSS_PER_HOST_CONCURRENCY,
+                 parse_workers: int = RSS_PARSE_WORKERS, state_file: Path = None):
+        self.timeout = timeout
+        self.headers = {k: v for k, v in (headers or DEFAULT_HEADERS).items() if k.lower() != 'connection'}
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.parse_workers = parse_workers
+        self.state_file = state_file or Path(__file__).parent.parent.parent / "data" / "rss_fetch_state.json"
+        self.state = self._load_state()
+        # Validators from the last fetch_all, persisted by commit_state once its articles are written
+        self._pending_validators: Dict[str, Dict[str, Dict[str, Optional[str]]]] = {}
+        self.stats = {'fetched': 0, 'not_modified': 0, 'failed': 0}
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('feeds', {})
+        except Exception as e:
+            logger.warning(f"Failed to load RSS fetch state: {e}")
+        return {}
+
+    def _save_state(self):
+        """Write the fetch state atomically so a crash never leaves a truncated file."""
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.state_file.with_suffix('.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'feeds': self.state, 'updated_at': datetime.now().isoformat()}, f, indent=2)
+            os.replace(temp_file, self.state_file)
+        except Exception as e:
+            logger.warning(f"Failed to save RSS fetch state: {e}")
+
+    @staticmethod
+    def scope_key(*parts: Any) -> str:
+        """Short stable key for the query set validators are stored under."""
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def fetch_all(self, feed_urls: List[str], scope: str = 'default',
+                  overall_timeout: Optional[float] = None) -> Dict[str, FeedFetchResult]:
+        """
+        Fetch and parse feeds concurrently.
+
+        New ETag/Last-Modified validators are held in memory: call commit_state() after the
+        returned articles have been written, so a failed run refetches them instead of getting 304s.
+
+        Args:
+            feed_urls: Feeds to fetch
+            scope: Key the conditional-GET validators are stored under
+            overall_timeout: Seconds after which unfinished feeds are abandoned
+
+        Returns:
+            FeedFetchResult per feed URL
+        """
+        self.stats = {'fetched': 0, 'not_modified': 0, 'failed': 0}
+        self._pending_validators = {}
+        if not feed_urls:
+            return {}
+
+        if self.parse_workers > 0:
+            executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+        else:
+            executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            results = asyncio.run(self._fetch_all(feed_urls, scope, overall_timeout, executor))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        logger.info(f"RSS fetch: {self.stats['fetched']} parsed, {self.stats['not_modified']} not modified, "
+                    f"{self.stats['failed']} failed out of {len(feed_urls)} feeds")
+        return results
+
+    def commit_state(self):
+        """Persist the validators of the last fetch_all; call once its articles are safely written."""
+        for feed_url, scopes in self._pending_validators.items():
+            self.state.setdefault(feed_url, {}).setdefault('validators', {}).update(scopes)
+        self._pending_validators = {}
+        self._save_state()
+
+    async def _fetch_all(self, feed_urls: List[str], scope: str, overall_timeout: Optional[float],
+                         executor: Executor) -> Dict[str, FeedFetchResult]:
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300)
+
+        async with aiohttp.ClientSession(connector=connector, headers=self.headers) as session:
+            context = (session, global_limit, host_limits, executor)
+            tasks = {asyncio.create_task(self._fetch_feed(context, feed_url, scope)): feed_url
+                     for feed_url in dict.fromkeys(feed_urls)}
+            done, pending = await asyncio.wait(tasks, timeout=overall_timeout)
+
+            results = {}
+            for task in pending:
+                task.cancel()
+                feed_url = tasks[task]
+                results[feed_url] = FeedFetchResult(feed_url, error=asyncio.TimeoutError(
+                    f"Overall collection timeout ({overall_timeout}s) reached"))
+                self.stats['failed'] += 1
+            if pending:
+                logger.warning(f"Overall collection timeout ({overall_timeout}s) reached. "
+                               f"Abandoned {len(pending)}/{len(tasks)} feeds.")
+                await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                results[tasks[task]] = task.result()
+        return results
+
+    async def _request(self, context, url: str, headers: Dict[str, str], verify_ssl: bool):
+        """One GET under the host and global limits; returns (status, headers, body)."""
+        session, global_limit, host_limits, _ = context
+        host_limit = host_limits.setdefault(urlparse(url).netloc, asyncio.Semaphore(self.per_host_concurrency))
+        # Host slot first so a request waiting on a busy host does not hold a global slot
+        async with host_limit, global_limit:
+            async with session.get(url, headers=headers, ssl=None if verify_ssl else False,
+                                   timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                body = await response.read() if response.status == 200 else b''
+                return response.status, response.headers, body
+
+    async def _fetch_feed(self, context, feed_url: str, scope: str) -> FeedFetchResult:
+        start = time.monotonic()
+        state = self.state.setdefault(feed_url, {})
+        validators = state.get('validators', {}).get(scope, {})
+        # The variant that worked last time goes first
+        candidates = list(dict.fromkeys([state['url']] + url_variants(feed_url))) if state.get('url') else url_variants(feed_url)
+
+        last_error: Optional[Exception] = None
+        last_feed = None
+        for url in candidates:
+            headers = {}
+            if url == state.get('url'):
+                if validators.get('etag'):
+                    headers['If-None-Match'] = validators['etag']
+                if validators.get('last_modified'):
+                    headers['If-Modified-Since'] = validators['last_modified']
+
+            try:
+                feed, status, response_headers, final_url = await self._fetch_url(context, url, headers, state)
+            except Exception as e:
+                logger.debug(f"Fetch failed for {url}: {type(e).__name__} - {e}")
+                last_error = e
+                continue
+
+            if status == 304:
+                self.stats['not_modified'] += 1
+                return FeedFetchResult(feed_url, not_modified=True, url=url, response_time=time.monotonic() - start)
+            if status != 200:
+                last_error = HTTPError(url, status, f"HTTP Error: {status}", {}, None)
+                continue
+
+            if is_usable_feed(feed):
+                state['url'] = final_url
+                self._pending_validators.setdefault(feed_url, {})[scope] = {
+                    'etag': response_headers.get('ETag'),
+                    'last_modified': response_headers.get('Last-Modified')
+                }
+                state['last_success'] = datetime.now().isoformat()
+                self.stats['fetched'] += 1
+                return FeedFetchResult(feed_url, feed=feed, url=final_url, response_time=time.monotonic() - start)
+            last_feed = last_feed or feed
+
+        # Nothing usable: hand back the best parse so the collector reports its error
+        if last_feed is not None:
+            self.stats['fetched'] += 1
+            return FeedFetchResult(feed_url, feed=last_feed, response_time=time.monotonic() - start)
+        self.stats['failed'] += 1
+        return FeedFetchResult(feed_url, error=last_error or ValueError("No feed data received"),
+                               response_time=time.monotonic() - start)
+
+    async def _fetch_url(self, context, url: str, headers: Dict[str, str], state: Dict[str, Any], depth: int = 0):
+        """
+        Fetch one URL (retrying without TLS verification if needed) and parse it in the worker pool.
+
+        Returns:
+            (parsed feed or None, HTTP status, response headers, URL the feed came from)
+        """
+        verify_ssl = state.get('verify_ssl', True)
+        try:
+            status, response_headers, body = await self._request(context, url, headers, verify_ssl)
+        except (aiohttp.ClientSSLError, aiohttp.ClientConnectorCertificateError):
+            if not verify_ssl:
+                raise
+            logger.debug(f"SSL verification failed for {url}, trying without verification")
+            status, response_headers, body = await self._request(context, url, headers, False)
+            state['verify_ssl'] = False
+
+        if status != 200:
+            return None, status, response_headers, url
+
+        loop = asyncio.get_running_loop()
+        parsed = await loop.run_in_executor(context[3], parse_feed_content, body,
+                                            response_headers.get('Content-Type', '').lower())
+        if parsed['alternate'] and depth == 0:
+            return await self._fetch_url(context, urljoin(url, parsed['alternate']), {}, state, depth + 1)
+        return parsed['feed'], status, response_headers, url
@@ -0,0 +1,59 @@
+import re
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class RSSQueryMatcher:
+    """
+    Matches RSS entries against every search query in a single pass.
+    The collectors fetch each feed once and ask the matcher which queries an entry belongs to,
+    instead of re-fetching and re-scanning every feed once per query.
+    """
+
+    def __init__(self, queries: List[str], custom_queries: List[str] = None, accept_all_without_custom: bool = False):
+        """
+        Args:
+            queries: Search queries in collection order (attribution goes to the earliest relevant one)
+            custom_queries: Keywords that make an entry relevant to every query
+            accept_all_without_custom: Treat every entry as relevant when there are no custom queries
+        """
+        self.queries = list(queries)
+        self._lowered = [query.lower() for query in self.queries]
+        self._custom = {keyword.lower() for keyword in (custom_queries or [])}
+        self._accept_all = accept_all_without_custom and not self._custom
+
+        # Longest terms first so the alternation prefers the most specific match
+        terms = sorted({term for term in self._lowered + list(self._custom) if term}, key=len, reverse=True)
+        self._pattern = re.compile('|'.join(re.escape(term) for term in terms)) if terms else None
+        # An empty term is a substring of every text and never shows up in a regex hit
+        self._has_empty_term = '' in self._lowered or '' in self._custom
+
+    def match(self, title: str, description: str) -> Tuple[Optional[int], List[str]]:
+        """
+        Find the queries an entry is relevant to.
+
+        An entry is relevant to a query when any custom query occurs in its title or description,
+        or when the query itself occurs there and is not one of the custom queries.
+
+        Returns:
+            (index of the first relevant query or None, queries that occur in the text)
+        """
+        text = (title + " " + description).lower()
+
+        if self._has_empty_term or (self._pattern is not None and self._pattern.search(text)):
+            matched = [query for query, lowered in zip(self.queries, self._lowered) if lowered in text]
+            custom_hit = any(keyword in text for keyword in self._custom)
+        else:
+            matched = []
+            custom_hit = False
+
+        if not self.queries:
+            return None, matched
+        if custom_hit or self._accept_all:
+            return 0, matched
+
+        for index, lowered in enumerate(self._lowered):
+            if lowered not in self._custom and lowered in text:
+                return index, matched
+        return None, matched
@@ -228,7 +228,13 @@ class PresidentialDataProcessor:
             return "No data available for presidential report generation."
         
         insights = self.get_presidential_insights(data)
-        
+        return self.format_presidential_report(insights)
+
+    def format_presidential_report(self, insights: Dict[str, Any]) -> str:
+        """
+        Render the strategic report text from insights (as returned by get_presidential_insights,
+        or pre-aggregated with a high_impact_count instead of the high_impact_items list).
+        """
         report = f"""
 PRESIDENTIAL STRATEGIC ANALYSIS REPORT
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -243,7 +249,9 @@ SENTIMENT DISTRIBUTION:
         
         report += "\nSTRATEGIC IMPACT ASSESSMENT:\n"
         
-        if 'high_impact_items' in insights:
+        if 'high_impact_count' in insights:
+            report += f"- High Impact Items Requiring Attention: {insights['high_impact_count']}\n"
+        elif 'high_impact_items' in insights:
             report += f"- High Impact Items Requiring Attention: {len(insights['high_impact_items'])}\n"
         
         if 'priority_topics' in insights:
@@ -0,0 +1,191 @@
+"""
+Deterministic pre-LLM triage for sentiment batches.
+Drops records that should not reach the model (empty, link-only, too short, unsupported
+script, no target keyword, in-batch duplicates) and gives them a cheap default result.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+
+import pandas as pd
+
+logger = logging.getLogger('RecordTriage')
+
+# Triage reasons, in the order rules are applied
+REASON_EMPTY = 'empty'
+REASON_LINK_ONLY = 'link_only'
+REASON_TOO_SHORT = 'too_short'
+REASON_UNSUPPORTED_SCRIPT = 'unsupported_script'
+REASON_NO_TARGET_KEYWORD = 'no_target_keyword'
+REASON_DUPLICATE = 'duplicate'
+
+DEFAULT_TRIAGE_CONFIG = {
+    "enabled": True,
+    "min_chars": 15,
+    "min_words": 3,
+    "skip_link_only": True,
+    "dedupe_in_batch": True,
+    "require_target_keyword": True,
+    "allowed_scripts": ["latin"],
+    "min_script_ratio": 0.5,
+    "llm_calls_per_record": 3,           # sentiment + ministry + issue
+    "estimated_tokens_per_call": 2600    # Same estimate the rate limiter uses per request
+}
+
+# Letter ranges per script, used for the unsupported language/script rule
+SCRIPT_RANGES = {
+    "latin": "A-Za-z\u00C0-\u024F",
+    "arabic": "\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF",
+    "devanagari": "\u0900-\u097F",
+    "bengali": "\u0980-\u09FF",
+    "cyrillic": "\u0400-\u04FF",
+    "chinese": "\u4E00-\u9FFF",
+}
+
+# URLs, @mentions and #hashtags; a record with nothing else is link-only
+LINK_OR_TAG_PATTERN = r'(?:https?://\S+|www\.\S+|[@#]\w+)'
+
+
+@dataclass
+class TriageResult:
+    """Outcome of triaging one batch."""
+    total: int
+    send_indices: List[int] = field(default_factory=list)   # Indices that go to the LLM
+    skipped: Dict[int, str] = field(default_factory=dict)    # Index -> reason
+    duplicate_of: Dict[int, int] = field(default_factory=dict)  # Duplicate index -> index it copies
+    estimated_tokens_saved: int = 0
+
+    def reason_counts(self) -> Dict[str, int]:
+        """Count skipped records per reason."""
+        counts: Dict[str, int] = {}
+        for reason in self.skipped.values():
+            counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+    def expand(self, sent_results: List[Optional[Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Map results for send_indices back onto the full batch.
+
+        Skipped records get a default result tagged with their reason; in-batch
+        duplicates receive a copy of the result of the record they duplicate.
+        """
+        full_results: List[Optional[Dict[str, Any]]] = [None] * self.total
+        for idx, result in zip(self.send_indices, sent_results):
+            full_results[idx] = result
+        for idx, reason in self.skipped.items():
+            if reason == REASON_DUPLICATE:
+                source = full_results[self.duplicate_of[idx]]
+                full_results[idx] = dict(source) if source is not None else None
+            else:
+                full_results[idx] = default_triage_result(reason)
+        return full_results
+
+
+def default_triage_result(reason: str) -> Dict[str, Any]:
+    """Cheap default analysis result for a record skipped by triage."""
+    return {
+        'sentiment_label': 'neutral',
+        'sentiment_score': 0.0,
+        'sentiment_justification': f'Skipped by triage ({reason}) - No action required',
+        'issue_label': 'Unlabeled Content',
+        'issue_slug': 'non_governance',
+        'ministry_hint': 'non_governance',
+        'issue_confidence': 0.0,
+        'issue_keywords': [],
+        'embedding': [],
+        'triage_reason': reason
+    }
+
+
+class RecordTriage:
+    """
+    Applies configurable, vectorized rules over a batch of texts before any LLM call.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the triage stage.
+
+        Args:
+            config: Overrides for DEFAULT_TRIAGE_CONFIG (the agent's "triage" config section)
+        """
+        self.config = {**DEFAULT_TRIAGE_CONFIG, **(config or {})}
+        self.enabled = bool(self.config.get("enabled", True))
+        self.tokens_per_record = int(self.config["llm_calls_per_record"]) * int(self.config["estimated_tokens_per_call"])
+
+        allowed = [SCRIPT_RANGES[name] for name in self.config.get("allowed_scripts") or [] if name in SCRIPT_RANGES]
+        self.allowed_letters_pattern = f"[{''.join(allowed)}]" if allowed else None
+
+        logger.info(f"RecordTriage initialized (enabled={self.enabled}): {self.config}")
+
+    @staticmethod
+    def _target_pattern(target_terms: Optional[List[str]]) -> Optional[str]:
+        """Compile target terms into one case-insensitive alternation."""
+        terms = sorted({str(term).strip() for term in (target_terms or []) if term and str(term).strip()}, key=len, reverse=True)
+        if not terms:
+            return None
+        return '|'.join(re.escape(term) for term in terms)
+
+    def triage(self, texts: List[str], target_terms: Optional[List[str]] = None,
+               match_texts: Optional[List[str]] = None) -> TriageResult:
+        """
+        Decide which records in a batch are sent to the LLM.
+
+        Args:
+            texts: Texts that would be sent to batch_get_sentiment
+            target_terms: Target name and query variations; empty disables the keyword rule
+            match_texts: Optional wider haystacks (e.g. title + text + content) for the keyword rule
+
+        Returns:
+            TriageResult with the indices to send and the reasons for the rest
+        """
+        result = TriageResult(total=len(texts))
+        if not texts:
+            return result
+        if not self.enabled:
+            result.send_indices = list(range(len(texts)))
+            return result
+
+        series = pd.Series(texts, dtype='object').fillna('').astype(str).str.strip()
+        reasons = pd.Series([None] * len(series), dtype='object')
+
+        def apply_rule(mask: pd.Series, reason: str):
+            reasons[mask & reasons.isna()] = reason
+
+        lengths = series.str.len()
+        apply_rule(lengths == 0, REASON_EMPTY)
+
+        if self.config.get("skip_link_only", True):
+            residual = series.str.replace(LINK_OR_TAG_PATTERN, '', regex=True).str.replace(r'[\W_]+', '', regex=True)
+            apply_rule(residual.str.len() == 0, REASON_LINK_ONLY)
+
+        word_counts = series.str.split().str.len().fillna(0)
+        apply_rule((lengths < int(self.config["min_chars"])) | (word_counts < int(self.config["min_words"])), REASON_TOO_SHORT)
+
+        if self.allowed_letters_pattern:
+            letters = series.str.count(r'[^\W\d_]')
+            allowed_letters = series.str.count(self.allowed_letters_pattern)
+            ratio = allowed_letters / letters.where(letters > 0)
+            apply_rule(ratio.fillna(1.0) < float(self.config["min_script_ratio"]), REASON_UNSUPPORTED_SCRIPT)
+
+        target_pattern = self._target_pattern(target_terms)
+        if self.config.get("require_target_keyword", True) and target_pattern:
+            haystacks = series if match_texts is None else pd.Series(match_texts, dtype='object').fillna('').astype(str)
+            apply_rule(~haystacks.str.contains(target_pattern, case=False, regex=True), REASON_NO_TARGET_KEYWORD)
+
+        if self.config.get("dedupe_in_batch", True):
+            candidates = reasons.isna()
+            keys = series.str.lower().str.replace(r'\s+', ' ', regex=True)
+            first_index = pd.Series(range(len(series))).where(candidates).groupby(keys.where(candidates)).transform('first')
+            duplicates = candidates & keys.where(candidates).duplicated(keep='first') & keys.where(candidates).notna()
+            for idx in duplicates[duplicates].index:
+                result.duplicate_of[int(idx)] = int(first_index[idx])
+            apply_rule(duplicates, REASON_DUPLICATE)
+
+        skipped_mask = reasons.notna()
+        result.send_indices = [int(i) for i in reasons.index[~skipped_mask]]
+        result.skipped = {int(i): reasons[i] for i in reasons.index[skipped_mask]}
+        result.estimated_tokens_saved = len(result.skipped) * self.tokens_per_record
+        return result
@@ -0,0 +1,179 @@
+"""
+Bulk Result Writer - Applies analysis results for a batch of records in a few statements
+Replaces per-record ORM attribute updates and per-record embedding existence checks
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from sqlalchemy import update, bindparam, cast, values, column, Integer, Float, String, Text, JSON
+from sqlalchemy.orm import Session
+
+from src.api.models import SentimentData, SentimentEmbedding
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 1536
+DEFAULT_EMBEDDING_MODEL = 'text-embedding-3-small'
+
+# Analysis columns written back to sentiment_data, with the types used to build the VALUES list
+ANALYSIS_COLUMNS = {
+    'sentiment_label': String,
+    'sentiment_score': Float,
+    'sentiment_justification': Text,
+    'issue_label': String,
+    'issue_slug': String,
+    'issue_confidence': Float,
+    'issue_keywords': JSON,
+    'ministry_hint': String,
+}
+
+# Keep bound parameters per statement well below PostgreSQL's 65535 limit
+MAX_ROWS_PER_STATEMENT = 1000
+
+
+class BulkResultWriter:
+    """
+    Collects (entry_id, sentiment fields, issue fields, embedding) tuples for a batch
+    and applies them with one UPDATE for sentiment_data and one upsert for
+    sentiment_embeddings. The UPDATE also bumps run_timestamp, which the API cache
+    uses to find rows changed in place. The caller commits once per batch.
+    """
+
+    def __init__(self, db: Session, embedding_model: str = DEFAULT_EMBEDDING_MODEL):
+        """
+        Initialize the writer.
+
+        Args:
+            db: Database session the batch is written through
+            embedding_model: Model name stored alongside each embedding
+        """
+        self.db = db
+        self.embedding_model = embedding_model
+        self.dialect = db.get_bind().dialect.name
+        self.analysis_rows: List[Dict[str, Any]] = []
+        self.embedding_rows: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.analysis_rows)
+
+    def add(self, entry_id: int, analysis_result: Dict[str, Any]):
+        """
+        Queue the analysis result for one record.
+
+        Args:
+            entry_id: Primary key of the sentiment_data row
+            analysis_result: Combined result from DataProcessor.get_sentiment/batch_get_sentiment
+        """
+        entry_id = int(entry_id)
+        self.analysis_rows.append({
+            'entry_id': entry_id,
+            'sentiment_label': analysis_result['sentiment_label'],
+            'sentiment_score': analysis_result['sentiment_score'],
+            'sentiment_justification': analysis_result['sentiment_justification'],
+            'issue_label': analysis_result.get('issue_label'),
+            'issue_slug': analysis_result.get('issue_slug'),
+            'issue_confidence': analysis_result.get('issue_confidence'),
+            'issue_keywords': json.dumps(analysis_result.get('issue_keywords', [])),
+            'ministry_hint': analysis_result.get('ministry_hint'),
+        })
+
+        embedding_data = analysis_result.get('embedding', [])
+        if embedding_data and len(embedding_data) == EMBEDDING_DIMENSIONS:  # Validate embedding
+            self.embedding_rows.append({
+                'entry_id': entry_id,
+                'embedding': json.dumps(embedding_data),
+                'embedding_model': self.embedding_model,
+            })
+
+    def flush(self) -> int:
+        """
+        Apply all queued results and clear the queue. Does not commit.
+
+        Returns:
+            Number of sentiment_data rows written
+        """
+        written = len(self.analysis_rows)
+        written_at = datetime.utcnow()
+        for start in range(0, len(self.analysis_rows), MAX_ROWS_PER_STATEMENT):
+            self._update_analysis(self.analysis_rows[start:start + MAX_ROWS_PER_STATEMENT], written_at)
+        for start in range(0, len(self.embedding_rows), MAX_ROWS_PER_STATEMENT):
+            self._upsert_embeddings(self.embedding_rows[start:start + MAX_ROWS_PER_STATEMENT])
+
+        self.analysis_rows = []
+        self.embedding_rows = []
+        return written
+
+    def _update_analysis(self, rows: List[Dict[str, Any]], written_at: datetime):
+        """Write analysis columns (and run_timestamp) for a chunk of rows in a single statement."""
+        if not rows:
+            return
+        table = SentimentData.__table__
+
+        if self.dialect == 'postgresql':
+            # UPDATE sentiment_data SET ... FROM (VALUES ...) AS v WHERE entry_id = v.entry_id
+            value_columns = [column('entry_id', Integer)] + [
+                column(name, col_type) for name, col_type in ANALYSIS_COLUMNS.items()
+            ]
+            names = ['entry_id'] + list(ANALYSIS_COLUMNS)
+            batch_values = values(*value_columns, name='v').data(
+                [tuple(row[name] for name in names) for row in rows]
+            )
+            # VALUES columns that are NULL in every row are typed as text by PostgreSQL, so cast explicitly
+            stmt = update(table).where(table.c.entry_id == batch_values.c.entry_id).values({
+                'run_timestamp': written_at,
+                **{name: cast(batch_values.c[name], table.c[name].type) for name in ANALYSIS_COLUMNS}
+            })
+            self.db.execute(stmt)
+        else:
+            # Other dialects: one executemany UPDATE keyed on entry_id
+            stmt = update(table).where(table.c.entry_id == bindparam('b_entry_id')).values({
+                'run_timestamp': bindparam('b_run_timestamp'),
+                **{name: bindparam(f'b_{name}') for name in ANALYSIS_COLUMNS}
+            })
+            self.db.execute(stmt, [{'b_run_timestamp': written_at, **{f'b_{key}': value for key, value in row.items()}}
+                                   for row in rows])
+
+    def _upsert_embeddings(self, rows: List[Dict[str, Any]]):
+        """Insert or update embeddings for a chunk of rows in a single statement."""
+        if not rows:
+            return
+        insert_factory = self._dialect_insert()
+
+        if insert_factory is not None:
+            stmt = insert_factory(SentimentEmbedding.__table__).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['entry_id'],
+                set_={
+                    'embedding': stmt.excluded.embedding,
+                    'embedding_model': stmt.excluded.embedding_model,
+                }
+            )
+            self.db.execute(stmt)
+            return
+
+        # Generic fallback: one lookup for existing ids, then bulk insert/update
+        entry_ids = [row['entry_id'] for row in rows]
+        existing_ids = {
+            entry_id for (entry_id,) in self.db.query(SentimentEmbedding.entry_id).filter(
+                SentimentEmbedding.entry_id.in_(entry_ids)
+            )
+        }
+        to_update = [row for row in rows if row['entry_id'] in existing_ids]
+        to_insert = [row for row in rows if row['entry_id'] not in existing_ids]
+        if to_update:
+            self.db.bulk_update_mappings(SentimentEmbedding, to_update)
+        if to_insert:
+            self.db.bulk_insert_mappings(SentimentEmbedding, to_insert)
+
+    def _dialect_insert(self) -> Optional[Any]:
+        """Return the dialect-specific insert() supporting ON CONFLICT, if any."""
+        if self.dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+            return insert
+        if self.dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+            return insert
+        return None
@@ -61,6 +61,17 @@ class DeduplicationService:
                 return str(record[field])
         return ""
     
+    def has_material_text_change(self, existing_record: Dict[str, Any], new_record: Dict[str, Any]) -> bool:
+        """
+        Check whether a re-collected duplicate's text differs enough from the stored
+        record to need re-analysis. Compares all text fields, normalized.
+        """
+        existing_text = ' '.join(self.normalize_text(existing_record.get(field)) for field in self.text_fields).strip()
+        new_text = ' '.join(self.normalize_text(new_record.get(field)) for field in self.text_fields).strip()
+        if existing_text == new_text:
+            return False
+        return not self.is_similar_text(existing_text, new_text)
+    
     def find_existing_duplicates(self, new_records: List[Dict[str, Any]], db: Session, user_id: str) -> Dict[str, List[int]]:
         """
         Find existing duplicates in the database for the new records.
@@ -0,0 +1,270 @@
+"""
+Engagement Tracker - Append-only engagement snapshots, pre-aggregated velocity windows and compaction
+Keeps counter history out of the wide sentiment_data rows
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import pandas as pd
+from sqlalchemy import insert, delete
+from sqlalchemy.orm import Session
+
+from src.api.models import EngagementSnapshot, EngagementVelocity
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_METRICS = ['likes', 'retweets', 'comments', 'views']
+# Metrics that count as engagement for velocity ranking (views are reported separately)
+ENGAGEMENT_METRICS = ['likes', 'retweets', 'comments']
+# Raw record fields collectors use for view counts
+VIEW_FIELDS = ['views', 'view_count', 'viewCount', 'playCount']
+
+DEFAULT_ENGAGEMENT_CONFIG = {
+    "enabled": True,
+    "velocity_windows_hours": [1, 6, 24],
+    "raw_retention_hours": 48,      # Older snapshots are downsampled to one per hour
+    "hourly_retention_days": 14,    # Older still are downsampled to one per day
+    "counter_refresh_hours": 6,     # Counters on sentiment_data are rewritten at most this often per row...
+    "counter_refresh_ratio": 0.5    # ...unless one moved by this share of its stored value
+}
+
+# Keep bound parameters per statement well below PostgreSQL's 65535 limit
+MAX_ROWS_PER_STATEMENT = 1000
+
+# Agent configuration whose engagement_tracking section overrides the defaults
+AGENT_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "agent_config.json"
+
+
+def load_engagement_config(config_path: Path = AGENT_CONFIG_PATH) -> Dict[str, Any]:
+    """The agent config's engagement_tracking section over DEFAULT_ENGAGEMENT_CONFIG (the defaults when unreadable)."""
+    try:
+        with open(config_path, 'r') as f:
+            section = json.load(f).get('engagement_tracking', {})
+    except FileNotFoundError:
+        section = {}
+    except Exception as e:
+        logger.warning(f"Failed to read engagement_tracking from {config_path}: {e}")
+        section = {}
+    return {**DEFAULT_ENGAGEMENT_CONFIG, **section}
+
+
+def _to_int(value: Any) -> Optional[int]:
+    """Convert a raw metric to int, returning None for missing or unparsable values."""
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+        if isinstance(value, str):
+            value = value.strip().replace(',', '')
+            if not value:
+                return None
+        return int(float(value))
+    except (ValueError, TypeError):
+        return None
+
+
+def snapshot_metrics(record_data: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """Extract integer engagement metrics from a raw collected record."""
+    metrics = {metric: _to_int(record_data.get(metric)) for metric in ENGAGEMENT_METRICS}
+    metrics['views'] = next(
+        (value for value in (_to_int(record_data.get(field)) for field in VIEW_FIELDS) if value is not None),
+        None
+    )
+    return metrics
+
+
+class EngagementSnapshotWriter:
+    """
+    Collects engagement metrics for a batch of records, appends them to
+    engagement_snapshots in one statement and refreshes the pre-aggregated
+    engagement_velocity windows for the touched records. The caller commits.
+    """
+
+    def __init__(self, db: Session, user_id: Any = None, windows_hours: Optional[List[int]] = None):
+        """
+        Initialize the writer.
+
+        Args:
+            db: Database session the batch is written through
+            user_id: Owner of the records, stored on the velocity rows for per-user ranking
+            windows_hours: Velocity windows to maintain
+        """
+        self.db = db
+        self.user_id = user_id
+        self.windows_hours = sorted(set(windows_hours or DEFAULT_ENGAGEMENT_CONFIG["velocity_windows_hours"]))
+        self.rows: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, entry_id: int, record_data: Dict[str, Any]):
+        """
+        Queue a snapshot for one record.
+
+        Args:
+            entry_id: Primary key of the sentiment_data row
+            record_data: Raw collected record carrying likes/retweets/comments/views
+        """
+        metrics = snapshot_metrics(record_data)
+        if all(value is None for value in metrics.values()):
+            return
+        self.rows.append({'entry_id': int(entry_id), **metrics})
+
+    def flush(self, ts: Optional[datetime] = None) -> int:
+        """
+        Append all queued snapshots and refresh velocity windows. Does not commit.
+
+        Args:
+            ts: Snapshot timestamp (defaults to now, UTC)
+
+        Returns:
+            Number of snapshots written
+        """
+        if not self.rows:
+            return 0
+        ts = ts or datetime.utcnow()
+        rows = [{**row, 'ts': ts} for row in self.rows]
+        for start in range(0, len(rows), MAX_ROWS_PER_STATEMENT):
+            self.db.execute(insert(EngagementSnapshot.__table__), rows[start:start + MAX_ROWS_PER_STATEMENT])
+
+        entry_ids = sorted({row['entry_id'] for row in rows})
+        refresh_velocity(self.db, entry_ids, self.windows_hours, now=ts, user_id=self.user_id)
+
+        written = len(rows)
+        self.rows = []
+        return written
+
+
+def refresh_velocity(db: Session, entry_ids: List[int], windows_hours: List[int],
+                     now: Optional[datetime] = None, user_id: Any = None) -> int:
+    """
+    Recompute engagement_velocity rows for the given records.
+
+    For each window the baseline is the last snapshot at or before (now - window),
+    or the first snapshot seen if the record is younger than the window.
+
+    Returns:
+        Number of velocity rows written
+    """
+    if not entry_ids:
+        return 0
+    now = now or datetime.utcnow()
+    max_window = max(windows_hours)
+    # Look back two windows so a baseline before the window start is usually available
+    since = now - timedelta(hours=2 * max_window)
+
+    frames = []
+    for start in range(0, len(entry_ids), MAX_ROWS_PER_STATEMENT):
+        chunk = entry_ids[start:start + MAX_ROWS_PER_STATEMENT]
+        query = db.query(
+            EngagementSnapshot.entry_id, EngagementSnapshot.ts,
+            *[getattr(EngagementSnapshot, metric) for metric in SNAPSHOT_METRICS]
+        ).filter(
+            EngagementSnapshot.entry_id.in_(chunk),
+            EngagementSnapshot.ts >= since
+        )
+        frames.append(pd.DataFrame(query.all(), columns=['entry_id', 'ts'] + SNAPSHOT_METRICS))
+    snapshots = pd.concat(frames, ignore_index=True)
+    if snapshots.empty:
+        return 0
+
+    snapshots = snapshots.sort_values(['entry_id', 'ts'])
+    # A metric missing from one cycle carries the previous value forward
+    snapshots[SNAPSHOT_METRICS] = snapshots.groupby('entry_id')[SNAPSHOT_METRICS].ffill().fillna(0)
+    grouped = snapshots.groupby('entry_id')
+    latest = grouped.last()
+    first = grouped.first()
+
+    velocity_rows = []
+    for window in windows_hours:
+        window_start = now - timedelta(hours=window)
+        baseline = snapshots[snapshots['ts'] <= window_start].groupby('entry_id').last()
+        baseline = baseline.reindex(latest.index).combine_first(first)
+
+        deltas = latest[SNAPSHOT_METRICS] - baseline[SNAPSHOT_METRICS]
+        engagement_delta = deltas[ENGAGEMENT_METRICS].sum(axis=1)
+        elapsed_hours = (latest['ts'] - baseline['ts']).dt.total_seconds() / 3600.0
+        velocity = (engagement_delta / elapsed_hours.where(elapsed_hours > 0)).fillna(0.0)
+        latest_engagement = latest[ENGAGEMENT_METRICS].sum(axis=1)
+
+        for entry_id in latest.index:
+            velocity_rows.append({
+                'entry_id': int(entry_id),
+                'window_hours': int(window),
+                'user_id': user_id,
+                'likes_delta': int(deltas.at[entry_id, 'likes']),
+                'retweets_delta': int(deltas.at[entry_id, 'retweets']),
+                'comments_delta': int(deltas.at[entry_id, 'comments']),
+                'views_delta': int(deltas.at[entry_id, 'views']),
+                'engagement_delta': int(engagement_delta.at[entry_id]),
+                'latest_engagement': int(latest_engagement.at[entry_id]),
+                'velocity_per_hour': float(velocity.at[entry_id]),
+                'computed_at': now,
+            })
+
+    # Replace the windows for these records: one DELETE and one INSERT per chunk
+    table = EngagementVelocity.__table__
+    touched_ids = [int(entry_id) for entry_id in latest.index]
+    for start in range(0, len(touched_ids), MAX_ROWS_PER_STATEMENT):
+        db.execute(delete(table).where(table.c.entry_id.in_(touched_ids[start:start + MAX_ROWS_PER_STATEMENT])))
+    for start in range(0, len(velocity_rows), MAX_ROWS_PER_STATEMENT):
+        db.execute(insert(table), velocity_rows[start:start + MAX_ROWS_PER_STATEMENT])
+    return len(velocity_rows)
+
+
+def compact_snapshots(db: Session, now: Optional[datetime] = None,
+                      raw_retention_hours: int = DEFAULT_ENGAGEMENT_CONFIG["raw_retention_hours"],
+                      hourly_retention_days: int = DEFAULT_ENGAGEMENT_CONFIG["hourly_retention_days"],
+                      since: Optional[Dict[str, datetime]] = None) -> Dict[str, Any]:
+    """
+    Downsample older snapshots, keeping the last snapshot per record per bucket.
+
+    Snapshots older than raw_retention_hours are reduced to one per hour, and
+    those older than hourly_retention_days to one per day. Does not commit.
+
+    Args:
+        since: Optional lower bounds per tier ('hourly', 'daily') from a previous run,
+            so only snapshots that aged past a cutoff since then are scanned
+
+    Returns:
+        Deleted row counts per tier and the cutoffs to pass back as `since` next time
+    """
+    now = now or datetime.utcnow()
+    since = since or {}
+    tiers = [
+        ('hourly', now - timedelta(hours=raw_retention_hours), 'h'),
+        ('daily', now - timedelta(days=hourly_retention_days), 'D'),
+    ]
+
+    result = {'deleted': {}, 'cutoffs': {}}
+    for tier, cutoff, frequency in tiers:
+        query = db.query(EngagementSnapshot.id, EngagementSnapshot.entry_id, EngagementSnapshot.ts).filter(
+            EngagementSnapshot.ts < cutoff
+        )
+        lower_bound = since.get(tier)
+        if lower_bound is not None:
+            # Re-scan from the start of the bucket containing the previous cutoff
+            query = query.filter(EngagementSnapshot.ts >= pd.Timestamp(lower_bound).floor(frequency).to_pydatetime())
+        rows = pd.DataFrame(query.all(), columns=['id', 'entry_id', 'ts'])
+
+        stale_ids = []
+        if not rows.empty:
+            rows['bucket'] = pd.to_datetime(rows['ts']).dt.floor(frequency)
+            rows = rows.sort_values(['entry_id', 'bucket', 'ts'])
+            stale = rows.duplicated(subset=['entry_id', 'bucket'], keep='last')
+            stale_ids = [int(snapshot_id) for snapshot_id in rows.loc[stale, 'id']]
+
+        table = EngagementSnapshot.__table__
+        for start in range(0, len(stale_ids), MAX_ROWS_PER_STATEMENT):
+            db.execute(delete(table).where(table.c.id.in_(stale_ids[start:start + MAX_ROWS_PER_STATEMENT])))
+
+        result['deleted'][tier] = len(stale_ids)
+        result['cutoffs'][tier] = cutoff
+        if stale_ids:
+            logger.info(f"Compacted {len(stale_ids)} engagement snapshots older than {cutoff.isoformat()} to {tier} resolution")
+    return result
@@ -0,0 +1,198 @@
+"""
+Sentiment Rollups - Incrementally maintained dashboard aggregates
+Counts, score sums and engagement sums per user, time bucket and dimension combination,
+recomputed only for the day buckets an analysis batch touched
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Set, Iterable, Tuple
+
+import pandas as pd
+from sqlalchemy import insert, delete, and_, or_, func
+from sqlalchemy.orm import Session
+
+from src.api.models import SentimentData, SentimentRollup
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_DIMENSIONS = ['platform', 'sentiment_label', 'ministry_hint', 'issue_slug', 'location_label']
+# Raw engagement column -> rollup sum column
+ENGAGEMENT_SUMS = {'likes': 'likes_sum', 'retweets': 'retweets_sum', 'comments': 'comments_sum'}
+GRANULARITIES = {'day': 'D', 'hour': 'h'}
+
+DEFAULT_ROLLUP_CONFIG = {
+    "enabled": True,
+    "hourly_retention_days": 14     # Hour buckets are kept (and rebuilt) only for this many recent days
+}
+
+# Keep bound parameters per statement well below PostgreSQL's 65535 limit
+MAX_ROWS_PER_STATEMENT = 1000
+
+
+def _user_criterion(column, user_id: Optional[Any]):
+    return column.is_(None) if user_id is None else column == user_id
+
+
+def _bucket_time(frame: pd.DataFrame) -> pd.Series:
+    """Records are bucketed by created_at (as the dashboard filters), falling back to run_timestamp."""
+    return pd.to_datetime(frame['created_at']).fillna(pd.to_datetime(frame['run_timestamp']))
+
+
+def touched_days(db: Session, entry_ids: Iterable[int]) -> Dict[Any, Set[pd.Timestamp]]:
+    """Map each user to the day buckets containing the given records."""
+    entry_ids = [int(entry_id) for entry_id in entry_ids]
+    days_by_user: Dict[Any, Set[pd.Timestamp]] = {}
+    for start in range(0, len(entry_ids), MAX_ROWS_PER_STATEMENT):
+        rows = db.query(SentimentData.user_id, SentimentData.created_at, SentimentData.run_timestamp).filter(
+            SentimentData.entry_id.in_(entry_ids[start:start + MAX_ROWS_PER_STATEMENT])
+        ).all()
+        if not rows:
+            continue
+        frame = pd.DataFrame(rows, columns=['user_id', 'created_at', 'run_timestamp'])
+        frame['day'] = _bucket_time(frame).dt.floor('D')
+        for user_id, days in frame.groupby('user_id', dropna=False)['day']:
+            days_by_user.setdefault(None if pd.isna(user_id) else user_id, set()).update(days.dropna())
+    return days_by_user
+
+
+def _day_ranges(days: Iterable[pd.Timestamp]) -> List[Tuple[datetime, datetime]]:
+    """Merge day buckets into contiguous [start, end) ranges."""
+    ranges = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + pd.Timedelta(days=1)
+        else:
+            ranges.append([day, day + pd.Timedelta(days=1)])
+    return [(start.to_pydatetime(), end.to_pydatetime()) for start, end in ranges]
+
+
+def _aggregate(frame: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """Group records into rollup rows for one granularity."""
+    grouped = frame.assign(
+        bucket_start=frame['bucket_time'].dt.floor(GRANULARITIES[granularity])
+    ).groupby(['bucket_start'] + ROLLUP_DIMENSIONS, dropna=False, observed=True)
+    result = grouped.agg(
+        record_count=('sentiment_score', 'size'),
+        sentiment_score_sum=('sentiment_score', 'sum'),
+        sentiment_score_count=('sentiment_score', 'count'),
+        **{sum_column: (column, 'sum') for column, sum_column in ENGAGEMENT_SUMS.items()}
+    ).reset_index()
+    result['granularity'] = granularity
+    return result
+
+
+def _load_range(db: Session, user_id: Optional[Any], start: datetime, end: datetime) -> pd.DataFrame:
+    """Read the rollup inputs of a user's records bucketed in [start, end)."""
+    rows = db.query(
+        SentimentData.created_at, SentimentData.run_timestamp, SentimentData.sentiment_score,
+        *[getattr(SentimentData, column) for column in ROLLUP_DIMENSIONS + list(ENGAGEMENT_SUMS)]
+    ).filter(
+        _user_criterion(SentimentData.user_id, user_id),
+        or_(
+            and_(SentimentData.created_at >= start, SentimentData.created_at < end),
+            and_(SentimentData.created_at.is_(None),
+                 SentimentData.run_timestamp >= start, SentimentData.run_timestamp < end)
+        )
+    ).all()
+    frame = pd.DataFrame(rows, columns=['created_at', 'run_timestamp', 'sentiment_score']
+                         + ROLLUP_DIMENSIONS + list(ENGAGEMENT_SUMS))
+    frame['bucket_time'] = _bucket_time(frame)
+    frame['sentiment_score'] = pd.to_numeric(frame['sentiment_score'], errors='coerce')
+    for column in ENGAGEMENT_SUMS:
+        frame[column] = pd.to_numeric(frame[column], errors='coerce').fillna(0).astype('int64')
+    return frame
+
+
+def _rollup_mappings(result: pd.DataFrame, user_id: Optional[Any], now: datetime) -> List[Dict[str, Any]]:
+    records = result.astype(object).where(result.notna(), None).to_dict('records')
+    for record in records:
+        record['user_id'] = user_id
+        record['bucket_start'] = pd.Timestamp(record['bucket_start']).to_pydatetime()
+        record['sentiment_score_sum'] = float(record['sentiment_score_sum'] or 0.0)
+        for column in ['record_count', 'sentiment_score_count'] + list(ENGAGEMENT_SUMS.values()):
+            record[column] = int(record[column] or 0)
+        record['updated_at'] = now
+    return records
+
+
+def refresh_rollups(db: Session, days_by_user: Dict[Any, Set[pd.Timestamp]],
+                    hourly_retention_days: int = DEFAULT_ROLLUP_CONFIG['hourly_retention_days'],
+                    now: Optional[datetime] = None) -> int:
+    """
+    Recompute the rollup rows of the given day buckets from their records (caller commits).
+
+    Day rows are rebuilt for every touched day; hour rows only for days inside the hourly
+    retention window, and hour rows older than the window are dropped.
+
+    Returns:
+        Number of rollup rows written
+    """
+    now = now or datetime.utcnow()
+    hourly_cutoff = pd.Timestamp(now - timedelta(days=hourly_retention_days)).floor('D').to_pydatetime()
+    table = SentimentRollup.__table__
+    written = 0
+
+    for user_id, days in days_by_user.items():
+        for start, end in _day_ranges(days):
+            db.execute(delete(table).where(
+                _user_criterion(table.c.user_id, user_id),
+                table.c.bucket_start >= start, table.c.bucket_start < end
+            ))
+            frame = _load_range(db, user_id, start, end)
+            if frame.empty:
+                continue
+
+            results = [_aggregate(frame, 'day')]
+            recent = frame[frame['bucket_time'] >= pd.Timestamp(hourly_cutoff)]
+            if not recent.empty:
+                results.append(_aggregate(recent, 'hour'))
+            mappings = _rollup_mappings(pd.concat(results, ignore_index=True), user_id, now)
+            for offset in range(0, len(mappings), MAX_ROWS_PER_STATEMENT):
+                db.execute(insert(table), mappings[offset:offset + MAX_ROWS_PER_STATEMENT])
+            written += len(mappings)
+
+    db.execute(delete(table).where(table.c.granularity == 'hour', table.c.bucket_start < hourly_cutoff))
+    return written
+
+
+def update_rollups_for_entries(db: Session, entry_ids: Iterable[int],
+                               hourly_retention_days: int = DEFAULT_ROLLUP_CONFIG['hourly_retention_days']) -> int:
+    """Refresh the buckets touched by a batch of records (caller commits)."""
+    days_by_user = touched_days(db, entry_ids)
+    if not days_by_user:
+        return 0
+    return refresh_rollups(db, days_by_user, hourly_retention_days)
+
+
+def rebuild_rollups(db: Session, user_ids: Optional[List[Any]] = None,
+                    hourly_retention_days: int = DEFAULT_ROLLUP_CONFIG['hourly_retention_days'],
+                    chunk_days: int = 7) -> int:
+    """
+    Rebuild rollups from scratch for the given users (default: every user), aggregating chunk_days days per step.
+
+    Each user's old rows are deleted and the new ones written in one transaction, so dashboards
+    keep serving the previous rollups until the rebuild commits.
+
+    Returns:
+        Number of rollup rows written
+    """
+    if user_ids is None:
+        user_ids = [row[0] for row in db.query(SentimentData.user_id).distinct().all()]
+
+    written = 0
+    bucket_time = func.coalesce(SentimentData.created_at, SentimentData.run_timestamp)
+    for uid in user_ids:
+        db.execute(delete(SentimentRollup.__table__).where(_user_criterion(SentimentRollup.user_id, uid)))
+        first, last = db.query(func.min(bucket_time), func.max(bucket_time)).filter(
+            _user_criterion(SentimentData.user_id, uid)).one()
+        if first is not None:
+            day = pd.Timestamp(first).floor('D')
+            last_day = pd.Timestamp(last).floor('D')
+            while day <= last_day:
+                days = set(pd.date_range(day, min(day + pd.Timedelta(days=chunk_days - 1), last_day), freq='D'))
+                written += refresh_rollups(db, {uid: days}, hourly_retention_days)
+                day += pd.Timedelta(days=chunk_days)
+        db.commit()
+        logger.info(f"Rebuilt rollups for user {uid}: {written} rows so far")
+    return written
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Check that an older row re-labelled in place shows up after one incremental cache refresh.
+
+Runs against a throwaway in-memory SQLite database.
+"""
+
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the repository root to the path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(tempfile.mkdtemp()) / 'cache_relabel.db'}"
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from src.api import models
+from src.api.data_cache import SentimentDataCache
+from src.utils.bulk_result_writer import BulkResultWriter
+
+
+def test_relabelled_row_refreshes():
+    """Label an old, already analysed row again and refresh the snapshot incrementally."""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for table in (models.SentimentData.__table__, models.SentimentEmbedding.__table__):
+            conn.execute(CreateTable(table, include_foreign_key_constraints=[]))
+    Session = sessionmaker(bind=engine)
+    user_id = uuid.uuid4()
+    collected = datetime.utcnow() - timedelta(days=3)
+
+    with Session() as db:
+        db.add_all([
+            models.SentimentData(
+                user_id=user_id, run_timestamp=collected + timedelta(hours=i), created_at=collected, date=collected,
+                text=f"post {i}", sentiment_label="neutral", sentiment_score=0.0,
+                sentiment_justification="initial analysis"
+            )
+            for i in range(5)
+        ])
+        db.commit()
+
+    cache = SentimentDataCache()
+    with Session() as db:
+        snapshot = cache._full_load(db, str(user_id))
+
+    with Session() as db:
+        writer = BulkResultWriter(db)
+        writer.add(2, {
+            'sentiment_label': 'negative', 'sentiment_score': -0.8,
+            'sentiment_justification': 're-analysed after a text change'
+        })
+        writer.flush()
+        db.commit()
+
+    with Session() as db:
+        refreshed = cache._incremental_refresh(db, str(user_id), snapshot)
+
+    label = refreshed.frame.loc[refreshed.frame['entry_id'] == 2, 'sentiment_label'].iloc[0]
+    if label == 'negative':
+        print("✅ Re-labelled row picked up by the incremental refresh")
+        return True
+    print(f"❌ Re-labelled row still cached as {label!r}")
+    return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_relabelled_row_refreshes() else 1)
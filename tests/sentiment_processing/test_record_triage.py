@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Check the pre-LLM triage rules, their precedence, duplicate fan-out and the disabled path.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the repository root to the path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.processing.record_triage import (
+    RecordTriage, DEFAULT_TRIAGE_CONFIG,
+    REASON_EMPTY, REASON_LINK_ONLY, REASON_TOO_SHORT, REASON_UNSUPPORTED_SCRIPT,
+    REASON_NO_TARGET_KEYWORD, REASON_DUPLICATE
+)
+
+TARGET_TERMS = ["Tinubu", "Bola Tinubu"]
+KEPT = "Tinubu signs the new budget into law"
+TOKENS_PER_RECORD = DEFAULT_TRIAGE_CONFIG["llm_calls_per_record"] * DEFAULT_TRIAGE_CONFIG["estimated_tokens_per_call"]
+
+
+def check(description, actual, expected):
+    """Print one outcome and report whether it matched."""
+    if actual == expected:
+        print(f"✅ {description}")
+        return True
+    print(f"❌ {description}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def test_each_rule():
+    """Each rule on its own tags its record with its reason."""
+    texts = [
+        "",
+        None,
+        "https://x.com/status/1 #Tinubu @presidency",
+        "Tinubu wins",
+        "تينوبو يتحدث عن الاقتصاد اليوم في أبوجا",
+        "The weather in Lagos is lovely this morning",
+        KEPT,
+        "  tinubu signs the NEW   budget into law ",
+    ]
+    result = RecordTriage().triage(texts, TARGET_TERMS)
+
+    print("\nTriage rules")
+    print("=" * 60)
+    checks = [
+        check("Empty text", result.skipped.get(0), REASON_EMPTY),
+        check("Missing text", result.skipped.get(1), REASON_EMPTY),
+        check("Links, mentions and hashtags only", result.skipped.get(2), REASON_LINK_ONLY),
+        check("Too short", result.skipped.get(3), REASON_TOO_SHORT),
+        check("Arabic script", result.skipped.get(4), REASON_UNSUPPORTED_SCRIPT),
+        check("No target keyword", result.skipped.get(5), REASON_NO_TARGET_KEYWORD),
+        check("Case/whitespace variant is a duplicate", result.skipped.get(7), REASON_DUPLICATE),
+        check("Duplicate points at its first occurrence", result.duplicate_of, {7: 6}),
+        check("Only the original is sent", result.send_indices, [6]),
+        check("Tokens saved", result.estimated_tokens_saved, 7 * TOKENS_PER_RECORD),
+        check("Reason counts", result.reason_counts(), {
+            REASON_EMPTY: 2, REASON_LINK_ONLY: 1, REASON_TOO_SHORT: 1, REASON_UNSUPPORTED_SCRIPT: 1,
+            REASON_NO_TARGET_KEYWORD: 1, REASON_DUPLICATE: 1
+        }),
+    ]
+    assert all(checks)
+
+
+def test_rule_precedence():
+    """A record matching several rules keeps the reason of the earliest rule."""
+    texts = [
+        "   ",                                              # empty, link-only and short
+        "#Tinubu",                                          # link-only and short
+        "تينوبو",                                            # short and unsupported script
+        "يتحدث الرئيس عن الاقتصاد اليوم في أبوجا",             # unsupported script and no keyword
+        "Tinubu wins",
+        "Tinubu wins",                                      # short duplicates are not duplicates
+        "The weather in Lagos is lovely this morning",
+        "The weather in Lagos is lovely this morning",      # keyword misses are not duplicates
+    ]
+    result = RecordTriage().triage(texts, TARGET_TERMS)
+
+    print("\nRule precedence")
+    print("=" * 60)
+    checks = [
+        check("Empty before link-only and short", result.skipped.get(0), REASON_EMPTY),
+        check("Link-only before short", result.skipped.get(1), REASON_LINK_ONLY),
+        check("Short before unsupported script", result.skipped.get(2), REASON_TOO_SHORT),
+        check("Unsupported script before keyword", result.skipped.get(3), REASON_UNSUPPORTED_SCRIPT),
+        check("Short records are not deduplicated",
+              [result.skipped.get(4), result.skipped.get(5)], [REASON_TOO_SHORT, REASON_TOO_SHORT]),
+        check("Keyword misses are not deduplicated",
+              [result.skipped.get(6), result.skipped.get(7)], [REASON_NO_TARGET_KEYWORD, REASON_NO_TARGET_KEYWORD]),
+        check("No duplicate links recorded", result.duplicate_of, {}),
+        check("Nothing sent", result.send_indices, []),
+    ]
+    assert all(checks)
+
+
+def test_keyword_rule_inputs():
+    """The keyword rule reads match_texts when given and is off without target terms."""
+    texts = ["The budget was signed into law this morning"]
+    triage = RecordTriage()
+
+    print("\nKeyword rule inputs")
+    print("=" * 60)
+    checks = [
+        check("Keyword missing from text", triage.triage(texts, TARGET_TERMS).skipped, {0: REASON_NO_TARGET_KEYWORD}),
+        check("Keyword found in match_texts",
+              triage.triage(texts, TARGET_TERMS, ["President Tinubu: " + texts[0]]).send_indices, [0]),
+        check("No target terms disables the rule", triage.triage(texts, []).send_indices, [0]),
+        check("Rule switched off in config",
+              RecordTriage({"require_target_keyword": False}).triage(texts, TARGET_TERMS).send_indices, [0]),
+    ]
+    assert all(checks)
+
+
+def test_expand_fan_out():
+    """expand maps sent results back, copies them to duplicates and fills defaults for the rest."""
+    texts = [KEPT, "", KEPT, "Tinubu visits Kano to open the new rail line", KEPT.upper(), "Tinubu visits Kano to open the new rail line"]
+    result = RecordTriage().triage(texts, TARGET_TERMS)
+    sent = [{'sentiment_label': 'positive', 'sentiment_score': 0.7}, None]
+    full = result.expand(sent)
+
+    print("\nDuplicate fan-out")
+    print("=" * 60)
+    checks = [
+        check("Originals are sent", result.send_indices, [0, 3]),
+        check("Duplicates point at their originals", result.duplicate_of, {2: 0, 4: 0, 5: 3}),
+        check("Full batch length", len(full), len(texts)),
+        check("Sent result kept", full[0], sent[0]),
+        check("Duplicates receive the original's result", [full[2], full[4]], [sent[0], sent[0]]),
+        check("Duplicates receive copies", any(full[i] is full[0] for i in (2, 4)), False),
+        check("Duplicate of a failed record stays empty", full[5], None),
+        check("Skipped record gets the default result", (full[1] or {}).get('triage_reason'), REASON_EMPTY),
+        check("Default result is neutral", (full[1] or {}).get('sentiment_label'), 'neutral'),
+    ]
+    assert all(checks)
+
+
+def test_disabled():
+    """With triage disabled every record is sent and expand passes results through."""
+    texts = ["", "#Tinubu", "Tinubu wins", KEPT, KEPT]
+    result = RecordTriage({"enabled": False}).triage(texts, TARGET_TERMS)
+    sent = [{'sentiment_label': 'neutral'} for _ in texts]
+
+    print("\nDisabled triage")
+    print("=" * 60)
+    checks = [
+        check("Every record sent", result.send_indices, list(range(len(texts)))),
+        check("Nothing skipped", result.skipped, {}),
+        check("No duplicates recorded", result.duplicate_of, {}),
+        check("No tokens saved", result.estimated_tokens_saved, 0),
+        check("expand passes results through", result.expand(sent), sent),
+        check("Empty batch", RecordTriage().triage([], TARGET_TERMS).send_indices, []),
+    ]
+    assert all(checks)
+
+
+if __name__ == "__main__":
+    tests = [test_each_rule, test_rule_precedence, test_keyword_rule_inputs, test_expand_fan_out, test_disabled]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError:
+            pass
+    print(f"\n{passed}/{len(tests)} triage checks passed")
+    sys.exit(0 if passed == len(tests) else 1)